@@ -14,12 +14,18 @@ from pathlib import Path
 import traceback
 import time
 
-# Prometheus metrics imports
-try:
-    from prometheus_client import Counter, Histogram, Gauge, generate_latest, REGISTRY
-    PROMETHEUS_ENABLED = True
-except ImportError:
-    PROMETHEUS_ENABLED = False
+from utils.datasets import get_dataset, dataset_source, dataset_version, clear_datasets
+from utils.dashboard_metrics import (
+    PUSHDOWN_TABLES, query_dashboard_metrics, frame_order_windows, rollup_order_windows, summarize_windows
+)
+from utils.rollups import aggregate_orders, sales_rollups
+from utils.instrumentation import timed, timed_cache, timed_section
+
+# Prometheus metrics - registered once per process in utils.metrics
+from utils.metrics import PROMETHEUS_ENABLED, metrics_text, track_page
+if PROMETHEUS_ENABLED:
+    from utils.metrics import db_status, errors_total, request_duration
+else:
     print("Warning: prometheus_client not installed. Metrics disabled.")
 
 # Enable debug mode
@@ -37,65 +43,9 @@ st.set_page_config(
 # PROMETHEUS METRICS SETUP
 # ===========================
 
-if PROMETHEUS_ENABLED:
-    # Page view counter
-    page_views = Counter(
-        'streamlit_page_views_total',
-        'Total page views by page',
-        ['page']
-    )
-    
-    # Request duration histogram
-    request_duration = Histogram(
-        'streamlit_request_duration_seconds',
-        'Request duration in seconds',
-        ['page']
-    )
-    
-    # Active users gauge
-    active_users = Gauge(
-        'streamlit_active_users',
-        'Number of active users'
-    )
-    
-    # Database connection status
-    db_status = Gauge(
-        'streamlit_db_status',
-        'Database connection status (1=connected, 0=disconnected)'
-    )
-    
-    # Data load errors counter
-    errors_total = Counter(
-        'streamlit_errors_total',
-        'Total application errors',
-        ['error_type']
-    )
-    
-    # Business metrics
-    total_revenue = Gauge(
-        'ecommerce_total_revenue',
-        'Total revenue'
-    )
-    
-    total_orders = Gauge(
-        'ecommerce_total_orders',
-        'Total number of orders'
-    )
-    
-    total_customers = Gauge(
-        'ecommerce_total_customers',
-        'Total number of customers'
-    )
-    
-    # Track page view for home page
-    page_views.labels(page='home').inc()
-    active_users.set(1)
-    
-    # Metrics endpoint function
-    @st.cache_resource
-    def get_metrics():
-        """Generate Prometheus metrics in text format"""
-        return generate_latest(REGISTRY).decode('utf-8')
+# Counts the view; under `streamlit run` also starts the /metrics server
+# and the business gauge refresher once per process
+track_page('home')
 
 # Show startup message
 if DEBUG_MODE:
@@ -181,6 +131,7 @@ def get_column(df, table_name, field_name):
 # SAMPLE DATA GENERATOR
 # ===========================
 
+@timed_cache(st.cache_resource)
 def generate_sample_data():
     """Generate realistic sample data for demonstration"""
     np.random.seed(42)
@@ -280,69 +231,59 @@ def generate_sample_data():
 # SMART DATA LOADER
 # ===========================
 
-@st.cache_data(ttl=300)
+@timed(kind='loader')
 def load_data_smart():
     """
-    Smart data loader - tries multiple sources automatically:
+    Smart data loader - pulls every table from the shared dataset registry:
     1. CSV Files (PRIORITY - your data is good!)
     2. SQL Database 
     3. Sample Data (fallback)
+    
+    The registry loads each table once per process, so reruns and other
+    pages reuse the same frames instead of re-parsing them
     """
     load_start_time = time.time()
     data = {}
     source = "Sample Data (Generated)"
-    csv_loaded = 0
-    csv_errors = []
+    load_errors = []
     
     try:
-        # TRY CSV FILES FIRST (since your CSVs are working!)
-        csv_files = {
-            'customers': 'sample_data/core_data/customers.csv',
-            'products': 'sample_data/core_data/products.csv',
-            'orders': 'sample_data/core_data/orders.csv',
-            'inventory': 'sample_data/core_data/inventory.csv',
-            'vendors': 'sample_data/core_data/vendors.csv',
-            'campaigns': 'sample_data/marketing_data/campaigns.csv',
-            'reviews': 'sample_data/operational_data/reviews.csv',
-            'returns': 'sample_data/operational_data/returns.csv',
-            'payments': 'sample_data/financial_data/payments.csv',
-        }
+        tables = ['customers', 'products', 'orders', 'inventory', 'vendors',
+                  'campaigns', 'reviews', 'returns', 'payments']
         
-        for table, csv_path in csv_files.items():
-            if Path(csv_path).exists():
-                try:
-                    df = pd.read_csv(csv_path)
+        sources = {}
+        for table in tables:
+            try:
+                df = get_dataset(table)
+                
+                # CRITICAL: Validate the data is actually loaded
+                if df is not None and not df.empty:
+                    data[table] = df
+                    sources[table] = dataset_source(table)
                     
-                    # CRITICAL: Validate the data is actually loaded
-                    if not df.empty and len(df) > 0:
-                        # Clean the dataframe
-                        # Remove any duplicate header rows
-                        if table == 'orders' and 'order_date' in df.columns:
-                            df = df[df['order_date'] != 'order_date']
-                        
-                        # Strip whitespace from string columns
-                        for col in df.select_dtypes(include=['object']).columns:
-                            df[col] = df[col].astype(str).str.strip()
-                        
-                        data[table] = df
-                        csv_loaded += 1
-                        
-                except Exception as e:
-                    if PROMETHEUS_ENABLED:
-                        errors_total.labels(error_type='csv_load').inc()
-                    csv_errors.append(f"{table}: {str(e)[:50]}")
-                    continue
+            except Exception as e:
+                if PROMETHEUS_ENABLED:
+                    errors_total.labels(error_type='csv_load').inc()
+                load_errors.append(f"{table}: {str(e)[:50]}")
+                continue
         
-        # If CSV data loaded successfully, return it!
-        if csv_loaded >= 3:  # At least 3 core tables
-            source = f"CSV Files ({csv_loaded} files loaded)"
+        # If enough tables loaded, return them!
+        if len(data) >= 3:  # At least 3 core tables
+            csv_loaded = sum(1 for s in sources.values() if s == 'CSV')
+            sql_loaded = len(sources) - csv_loaded
+            if sql_loaded == 0:
+                source = f"CSV Files ({csv_loaded} files loaded)"
+            elif csv_loaded == 0:
+                source = f"MySQL Database ({sql_loaded} tables)"
+            else:
+                source = f"CSV Files ({csv_loaded}) + MySQL Database ({sql_loaded})"
             
             if PROMETHEUS_ENABLED:
                 db_status.set(1)
             
-            if csv_errors:
+            if load_errors:
                 with st.sidebar.expander("⚠️ Some files had issues", expanded=False):
-                    for err in csv_errors:
+                    for err in load_errors:
                         st.caption(f"• {err}")
             
             # Track load duration
@@ -352,53 +293,14 @@ def load_data_smart():
             
             return data, source
         
-        # TRY SQL Database (fallback)
-        try:
-            import sys
-            
-            # Add utils directory to path if it exists
-            utils_path = Path(__file__).parent / 'utils'
-            if utils_path.exists():
-                sys.path.insert(0, str(utils_path.parent))
-            
-            from utils.database import safe_table_query, test_connection
-            
-            if test_connection():
-                # YOUR DATABASE HAS THESE TABLES (not the CSV names)
-                tables = ['customers', 'products', 'orders', 'inventory', 'vendors', 
-                         'campaigns', 'reviews', 'returns', 'payments']
-                
-                sql_loaded = 0
-                for table in tables:
-                    try:
-                        df = safe_table_query(table, limit=10000)
-                        if df is not None and not df.empty:
-                            data[table] = df
-                            sql_loaded += 1
-                    except:
-                        continue
-                
-                if sql_loaded > 0:
-                    source = f"MySQL Database ({sql_loaded} tables)"
-                    if PROMETHEUS_ENABLED:
-                        db_status.set(1)
-                    return data, source
-            
-            if PROMETHEUS_ENABLED:
-                db_status.set(0)
-        except Exception as e:
-            if PROMETHEUS_ENABLED:
-                errors_total.labels(error_type='db_connection').inc()
-                db_status.set(0)
+        if PROMETHEUS_ENABLED:
+            db_status.set(0)
         
         # TRY Generate Sample Data (last resort)
-        if len(data) == 0:
-            if DEBUG_MODE:
-                st.sidebar.warning("⚠️ Using Generated Sample Data")
-            data = generate_sample_data()
-            source = "Generated Sample Data"
-            if PROMETHEUS_ENABLED:
-                db_status.set(0)
+        if DEBUG_MODE:
+            st.sidebar.warning("⚠️ Using Generated Sample Data")
+        data = generate_sample_data()
+        source = "Generated Sample Data"
     
     except Exception as e:
         if DEBUG_MODE:
@@ -418,18 +320,70 @@ def load_data_smart():
     return data, source
 
 
+def dashboard_data_version(data, source):
+    """
+    (table, source, version) per loaded table - the cache key of the metrics
+    and the switch for server-side aggregation of MySQL tables
+    """
+    if source.startswith("Generated"):
+        return tuple((table, "Generated", None) for table in sorted(data))
+    return tuple((table, dataset_source(table), dataset_version(table)) for table in sorted(data))
+
+
+@timed
+def daily_sales(data, data_version):
+    """
+    Daily sales rollup for the loaded orders - the persistent rollup of the
+    registry's orders, or an in-memory one for generated data
+    """
+    sources = {table: table_source for table, table_source, _ in (data_version or ())}
+    if sources.get('orders') in ('CSV', 'MySQL'):
+        rollups = sales_rollups()
+        if rollups is not None:
+            return rollups['daily']
+    if 'orders' in data and not data['orders'].empty:
+        return aggregate_orders(data['orders'])
+    return None
+
+
 # ===========================
 # ENHANCED METRICS CALCULATION
 # ===========================
 
-@st.cache_data(ttl=300)
-def calculate_dashboard_metrics(data, date_range_days=90):
-    """Calculate key metrics - ENHANCED VERSION WITH FULL DATA TYPE FIXES"""
+@timed_cache(st.cache_data(ttl=300))
+def calculate_dashboard_metrics(_data, date_range_days=90, data_version=None):
+    """
+    Calculate key metrics - ENHANCED VERSION WITH FULL DATA TYPE FIXES
+    
+    Tables loaded from MySQL are aggregated in the database (exact at any
+    table size); CSV orders come from the daily sales rollup and generated
+    tables are aggregated in pandas. Cached
+    on the date range and data version (see dashboard_data_version) - the
+    data dict itself is not hashed.
+    """
+    data = _data
     metrics = {}
     
+    # Server-side aggregation for MySQL-backed tables
+    pushed = {}
+    sources = {table: table_source for table, table_source, _ in (data_version or ())}
+    sql_tables = [t for t in PUSHDOWN_TABLES if sources.get(t) == 'MySQL']
+    if sql_tables:
+        try:
+            pushed = query_dashboard_metrics(sql_tables, date_range_days)
+        except Exception as e:
+            if DEBUG_MODE:
+                st.sidebar.error(f"❌ Metrics query failed: {str(e)[:80]}")
+            if PROMETHEUS_ENABLED:
+                errors_total.labels(error_type='metrics_query').inc()
+    
     # PRIORITY: Calculate from orders data
-    if 'orders' in data and not data['orders'].empty:
-        orders_df = data['orders'].copy()
+    if 'orders' in pushed:
+        if pushed['orders'] > 0:
+            metrics.update(summarize_windows(pushed['revenue'], pushed['orders'],
+                                             pushed['prev_revenue'], pushed['prev_orders']))
+    elif 'orders' in data and not data['orders'].empty:
+        orders_df = data['orders']
         
         # Smart column detection
         date_col = get_column(orders_df, 'orders', 'date')
@@ -437,55 +391,13 @@ def calculate_dashboard_metrics(data, date_range_days=90):
         
         if date_col and amount_col:
             try:
-                # Clean the data
-                orders_df = orders_df[orders_df[date_col].notna()]
-                orders_df = orders_df[orders_df[amount_col].notna()]
-                
-                # Convert types - CRITICAL FIX
-                orders_df[date_col] = pd.to_datetime(orders_df[date_col], errors='coerce')
-                orders_df[amount_col] = pd.to_numeric(orders_df[amount_col], errors='coerce')
-                
-                # Remove invalid rows
-                orders_df = orders_df.dropna(subset=[date_col, amount_col])
-                orders_df = orders_df[orders_df[amount_col] > 0]
-                
-                if not orders_df.empty:
-                    # Filter by date range
-                    end_date = datetime.now()
-                    start_date = end_date - timedelta(days=date_range_days)
-                    
-                    current_period = orders_df[orders_df[date_col] >= start_date]
-                    
-                    if len(current_period) > 0:
-                        # Previous period for comparison
-                        prev_start = start_date - timedelta(days=date_range_days)
-                        prev_period = orders_df[
-                            (orders_df[date_col] >= prev_start) & 
-                            (orders_df[date_col] < start_date)
-                        ]
-                        
-                        # Calculate metrics
-                        metrics['revenue'] = float(current_period[amount_col].sum())
-                        metrics['orders'] = len(current_period)
-                        metrics['aov'] = float(current_period[amount_col].mean())
-                        
-                        # Growth calculations
-                        prev_revenue = float(prev_period[amount_col].sum()) if len(prev_period) > 0 else 0
-                        prev_orders = len(prev_period)
-                        
-                        metrics['revenue_delta'] = (
-                            ((metrics['revenue'] - prev_revenue) / prev_revenue * 100) 
-                            if prev_revenue > 0 else 0
-                        )
-                        metrics['orders_delta'] = (
-                            ((metrics['orders'] - prev_orders) / prev_orders * 100) 
-                            if prev_orders > 0 else 0
-                        )
-                        
-                        # Update Prometheus metrics
-                        if PROMETHEUS_ENABLED:
-                            total_revenue.set(metrics['revenue'])
-                            total_orders.set(metrics['orders'])
+                if sources.get('orders') == 'CSV' and (rollups := sales_rollups()) is not None:
+                    windows = rollup_order_windows(rollups['daily'], date_range_days)
+                else:
+                    windows = frame_order_windows(orders_df, date_col, amount_col, date_range_days)
+                revenue, order_count, prev_revenue, prev_orders = windows
+                if order_count > 0:
+                    metrics.update(summarize_windows(revenue, order_count, prev_revenue, prev_orders))
             except Exception as e:
                 if DEBUG_MODE:
                     st.sidebar.error(f"❌ Error processing orders: {str(e)[:80]}")
@@ -493,42 +405,46 @@ def calculate_dashboard_metrics(data, date_range_days=90):
                     errors_total.labels(error_type='metrics_calculation').inc()
     
     # Customers metrics
-    if 'customers' in data and len(data['customers']) > 0:
+    if pushed.get('total_customers'):
+        metrics['total_customers'] = int(pushed['total_customers'])
+        metrics['new_customers'] = metrics['total_customers'] // 10
+    elif 'customers' in data and len(data['customers']) > 0:
         metrics['total_customers'] = len(data['customers'])
         metrics['new_customers'] = len(data['customers']) // 10
-        
-        # Update Prometheus metrics
-        if PROMETHEUS_ENABLED:
-            total_customers.set(metrics['total_customers'])
     
     # Products metrics - FIXED
-    if 'products' in data and len(data['products']) > 0:
+    if pushed.get('total_products'):
+        metrics['total_products'] = int(pushed['total_products'])
+        metrics['low_stock_items'] = int(pushed.get('low_stock_items') or 0)
+    elif 'products' in data and len(data['products']) > 0:
         products_df = data['products']
         metrics['total_products'] = len(products_df)
         
         stock_col = get_column(products_df, 'products', 'stock')
         if stock_col:
             try:
-                stock = pd.to_numeric(products_df[stock_col], errors='coerce')
-                metrics['low_stock_items'] = int((stock < 10).sum())
+                metrics['low_stock_items'] = int((products_df[stock_col] < 10).sum())
             except:
                 metrics['low_stock_items'] = 0
     
     # Reviews metrics - FIXED
-    if 'reviews' in data and not data['reviews'].empty:
+    if pushed.get('avg_rating') is not None:
+        if 0 < pushed['avg_rating'] <= 5:
+            metrics['avg_rating'] = pushed['avg_rating']
+    elif 'reviews' in data and not data['reviews'].empty:
         rating_col = get_column(data['reviews'], 'reviews', 'rating')
         if rating_col:
             try:
-                ratings = pd.to_numeric(data['reviews'][rating_col], errors='coerce')
-                avg = ratings.mean()
+                avg = data['reviews'][rating_col].mean()
                 if pd.notna(avg) and 0 < avg <= 5:
                     metrics['avg_rating'] = float(avg)
             except:
                 pass
     
     # Returns metrics
-    if 'returns' in data and len(data['returns']) > 0:
-        metrics['return_rate'] = (len(data['returns']) / max(metrics.get('orders', 1), 1)) * 100
+    return_count = int(pushed['total_returns']) if pushed.get('total_returns') is not None else len(data.get('returns', []))
+    if return_count > 0:
+        metrics['return_rate'] = (return_count / max(metrics.get('orders', 1), 1)) * 100
     
     # Set defaults for missing metrics
     defaults = {
@@ -556,7 +472,8 @@ def calculate_dashboard_metrics(data, date_range_days=90):
 try:
     with st.spinner("🔄 Loading data..."):
         data, source_used = load_data_smart()
-        metrics = calculate_dashboard_metrics(data, date_range_days=90)
+        data_version = dashboard_data_version(data, source_used)
+        metrics = calculate_dashboard_metrics(data, date_range_days=90, data_version=data_version)
 except Exception as e:
     st.error(f"❌ Critical Error Loading Data: {str(e)}")
     st.code(traceback.format_exc())
@@ -593,7 +510,7 @@ with st.sidebar:
     if PROMETHEUS_ENABLED:
         with st.expander("📊 Prometheus Metrics", expanded=False):
             if st.button("🔄 Refresh Metrics", use_container_width=True):
-                st.code(get_metrics(), language="text")
+                st.code(metrics_text(), language="text")
             st.caption("Metrics endpoint for Prometheus scraping")
     
     st.markdown("---")
@@ -612,10 +529,11 @@ with st.sidebar:
     st.markdown("---")
     if st.button("🔄 Refresh Data", use_container_width=True):
         st.cache_data.clear()
+        clear_datasets()
         st.rerun()
 
 # Recalculate metrics with selected date range
-metrics = calculate_dashboard_metrics(data, date_range_days)
+metrics = calculate_dashboard_metrics(data, date_range_days, data_version=data_version)
 
 # ===========================
 # HEADER
@@ -681,35 +599,27 @@ st.header("📈 Performance Overview")
 col1, col2 = st.columns(2)
 
 # Chart 1: Daily Revenue Trend - FIXED
-with col1:
+with col1, timed_section('daily_revenue_trend'):
     if 'orders' in data and not data['orders'].empty:
-        orders = data['orders'].copy()
+        orders = data['orders']
         date_col = get_column(orders, 'orders', 'date')
         amount_col = get_column(orders, 'orders', 'amount')
         
         if date_col and amount_col:
             try:
-                # Clean and convert dates - CRITICAL FIXES
-                orders = orders[orders[date_col] != date_col]  # Remove header duplicates
-                orders = orders[orders[date_col].notna()]
-                orders[date_col] = pd.to_datetime(orders[date_col], errors='coerce')
-                orders = orders[orders[date_col].notna()]
-                
-                # Convert amounts to numeric
-                orders[amount_col] = pd.to_numeric(orders[amount_col], errors='coerce')
-                orders = orders[orders[amount_col].notna()]
-                
-                # Create date column
-                orders['date'] = orders[date_col].dt.date
+                # Daily totals come from the sales rollup instead of
+                # regrouping every order on each rerun
+                daily = daily_sales(data, data_version)
                 
-                if not orders.empty:
+                if daily is not None and not daily.empty:
                     end_date = datetime.now().date()
                     start_date = end_date - timedelta(days=date_range_days)
-                    orders_filtered = orders[orders['date'] >= start_date]
+                    daily_filtered = daily[daily['sale_date'] >= pd.Timestamp(start_date)]
                     
-                    if not orders_filtered.empty:
-                        daily_revenue = orders_filtered.groupby('date')[amount_col].sum().reset_index()
+                    if not daily_filtered.empty:
+                        daily_revenue = daily_filtered.groupby('sale_date')['revenue'].sum().reset_index()
                         daily_revenue.columns = ['Date', 'Revenue']
+                        daily_revenue['Date'] = daily_revenue['Date'].dt.date
                         
                         fig = px.area(
                             daily_revenue, 
@@ -739,7 +649,7 @@ with col1:
         st.info("📊 No order data available")
 
 # Chart 2: Orders by Status - FIXED
-with col2:
+with col2, timed_section('orders_by_status'):
     if 'orders' in data and not data['orders'].empty:
         status_col = get_column(data['orders'], 'orders', 'status')
         if status_col:
@@ -768,18 +678,16 @@ st.markdown("---")
 col1, col2 = st.columns(2)
 
 # Chart 3: Top Products by Price - FULLY FIXED
-with col1:
+with col1, timed_section('top_products_by_price'):
     if 'products' in data and not data['products'].empty:
-        products = data['products'].copy()
+        products = data['products']
         name_col = get_column(products, 'products', 'name')
         price_col = get_column(products, 'products', 'price')
         
         if price_col and name_col:
             try:
-                # CRITICAL FIX: Convert price to numeric BEFORE sorting
-                products[price_col] = pd.to_numeric(products[price_col], errors='coerce')
-                
-                # Remove rows with invalid prices
+                # Price is numeric via the dataset schema; unparseable
+                # prices are already missing
                 products = products[products[price_col].notna()]
                 products = products[products[price_col] > 0]
                 
@@ -813,7 +721,7 @@ with col1:
         st.info("📦 No product data")
 
 # Chart 4: Customers by Country - FIXED
-with col2:
+with col2, timed_section('customers_by_country'):
     if 'customers' in data and not data['customers'].empty:
         country_col = get_column(data['customers'], 'customers', 'country')
         if country_col:
@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Alerts Dashboard",
     page_icon="🔔",
@@ -18,6 +21,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('alerts')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -67,7 +72,7 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=300)
+@timed_cache(st.cache_data(ttl=300))
 def generate_sample_alert_data():
     """Generate sample alert data with different severity levels"""
     np.random.seed(42)
@@ -238,6 +243,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_alert_filters(df, severity_list, type_list, status_list):
     filtered = df.copy()
     
@@ -354,7 +360,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: ACTIVE ALERTS
-with tab1:
+with tab1, timed_section('active_alerts'):
     st.subheader("Active Alerts")
     
     if len(filtered_alerts) > 0:
@@ -395,7 +401,7 @@ with tab1:
         st.success("✅ No active alerts!")
 
 # TAB 2: ALERT TYPES
-with tab2:
+with tab2, timed_section('alert_types'):
     st.subheader("Alert Types & Categories")
     
     if len(types_df) > 0:
@@ -425,7 +431,7 @@ with tab2:
                 st.metric(row['name'], f"{row['count']} alerts", "Enabled" if row['enabled'] else "Disabled")
 
 # TAB 3: ALERT HISTORY
-with tab3:
+with tab3, timed_section('alert_history'):
     st.subheader("Alert History")
     
     if len(history_df) > 0:
@@ -470,7 +476,7 @@ with tab3:
             st.dataframe(resolvers, use_container_width=True, hide_index=True)
 
 # TAB 4: CONFIGURATION
-with tab4:
+with tab4, timed_section('configuration'):
     st.subheader("Alert Configuration")
     
     st.markdown("#### Notification Methods")
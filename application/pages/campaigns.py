@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Marketing Campaign Analysis",
     page_icon="📢",
@@ -18,6 +21,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('campaigns')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -69,7 +74,7 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
+@timed_cache(st.cache_data(ttl=600))
 def generate_sample_campaign_data():
     """Generate sample campaign data"""
     np.random.seed(42)
@@ -200,6 +205,7 @@ def generate_sample_campaign_data():
 # ANALYSIS FUNCTIONS
 # ===========================
 
+@timed
 def calculate_performance_metrics(df):
     """Calculate overall performance metrics"""
     active_campaigns = len(df[df['status'] == 'active'])
@@ -216,6 +222,7 @@ def calculate_performance_metrics(df):
         'avg_cvr': df[df['cvr'] > 0]['cvr'].mean() if len(df[df['cvr'] > 0]) > 0 else 0,
     }
 
+@timed
 def get_roi_analysis(df):
     """Prepare ROI analysis data"""
     roi_data = []
@@ -291,6 +298,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_campaign_filters(df, date_cutoff, status_list, channel_list, search_text):
     filtered = df.copy()
     
@@ -433,7 +441,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: CAMPAIGN LIST
-with tab1:
+with tab1, timed_section('campaign_list'):
     st.subheader("Marketing Campaign List")
     
     if len(filtered_campaigns) > 0:
@@ -473,7 +481,7 @@ with tab1:
         st.info("No campaigns match the current filters")
 
 # TAB 2: PERFORMANCE DASHBOARD
-with tab2:
+with tab2, timed_section('performance_dashboard'):
     st.subheader("Campaign Performance Dashboard")
     
     perf_data = []
@@ -542,7 +550,7 @@ with tab2:
         st.divider()
 
 # TAB 3: ROI ANALYSIS
-with tab3:
+with tab3, timed_section('roi_analysis'):
     st.subheader("ROI & ROAS Analysis")
     
     roi_df = get_roi_analysis(campaigns_df)
@@ -571,7 +579,7 @@ with tab3:
         st.info("No ROI data available for active or completed campaigns")
 
 # TAB 4: A/B TESTING
-with tab4:
+with tab4, timed_section('ab_testing'):
     st.subheader("A/B Testing Results")
     
     if len(ab_tests_df) > 0:
@@ -14,6 +14,13 @@ import re
 from datetime import date, datetime
 from datetime import datetime, timedelta
 
+from utils.datasets import get_dataset, dataset_source, dataset_version, clear_datasets
+from utils.data_quality import customer_quality_issues
+from utils.duplicates import duplicate_groups, fuzzy_duplicate_clusters, normalize_email, normalize_text
+from utils.rfm import customer_rfm, segment_summary
+from utils.synthetic import DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
 
 st.set_page_config(
     page_title="Customer Analysis",
@@ -22,6 +29,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('customers')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -114,9 +123,10 @@ def get_column(df, table_name, field_name):
 def standardize_dataframe(df, table_name):
     """
     Standardize column names in a dataframe using the mapping
-    Returns a copy with standardized column names
+    Returns a new frame with standardized column names that shares the
+    column data of the input (no deep copy of the registry frame)
     """
-    df_copy = df.copy()
+    df_copy = df.copy(deep=False)
     
     if table_name not in COLUMN_MAPPINGS:
         return df_copy
@@ -129,7 +139,7 @@ def standardize_dataframe(df, table_name):
                 break
     
     if rename_dict:
-        df_copy = df_copy.rename(columns=rename_dict)
+        df_copy = df_copy.rename(columns=rename_dict, copy=False)
     
     return df_copy
 
@@ -137,104 +147,41 @@ def standardize_dataframe(df, table_name):
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_customer_data():
-    """Generate sample data with quality issues"""
-    np.random.seed(42)
-    
-    customers = []
-    for i in range(1, 1001):
-        if i > 100 and np.random.random() < 0.08:
-            dup_idx = np.random.randint(1, min(i, 100))
-            name = f'Customer {dup_idx}'
-            email = f'customer{dup_idx}@example.com'
-        else:
-            name = f'Customer {i}'
-            email = f'customer{i}@example.com'
-        
-        if np.random.random() < 0.08:
-            if np.random.random() < 0.5:
-                email = email.replace('@', '')
-            else:
-                email = email.split('@')[0]
-        elif np.random.random() < 0.05:
-            email = None
-        
-        phone = f'+1-555-{np.random.randint(1000, 9999)}'
-        if np.random.random() < 0.06:
-            phone = '123'
-        elif np.random.random() < 0.04:
-            phone = None
-        
-        address = f'{np.random.randint(1, 999)} Main St'
-        if np.random.random() < 0.07:
-            address = None
-        
-        customers.append({
-            'customer_id': f'C-{i:04d}',
-            'name': name,
-            'email': email,
-            'phone': phone,
-            'address': address,
-            'created_date': (datetime.now() - timedelta(days=np.random.randint(1, 730))).date()
-        })
-    
-    # Generate orders for profiling
-    orders = []
-    for i in range(1, 5001):
-        orders.append({
-            'order_id': i,
-            'customer_id': f'C-{np.random.randint(1, 1001):04d}',
-            'order_date': (datetime.now() - timedelta(days=np.random.randint(1, 365))).date(),
-            'total_amount': np.random.uniform(10, 500)
-        })
-    
-    return pd.DataFrame(customers), pd.DataFrame(orders)
-
-@st.cache_data(ttl=600)
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_customer_data(scale=DEFAULT_SCALE):
+    """Synthetic customers and orders with quality issues, in the registry's shape"""
+    tables = generate_tables(scale, tables=['customers', 'orders'])
+    return (standardize_dataframe(tables['customers'], 'customers'),
+            standardize_dataframe(tables['orders'], 'orders'))
+
+@timed(kind='loader')
 def load_customer_data():
     """
-    Smart data loader - tries multiple sources:
-    1. CSV Files (PRIORITY)
+    Smart data loader - uses the shared dataset registry:
+    1. CSV Files / MySQL (PRIORITY)
     2. Sample Data (fallback)
     """
     customers_df = None
     orders_df = None
     source = "Generated Sample Data"
     
-    # TRY CSV FILES FIRST
-    csv_files = {
-        'customers': 'sample_data/core_data/customers.csv',
-        'orders': 'sample_data/core_data/orders.csv'
-    }
-    
     try:
         # Load customers
-        if Path(csv_files['customers']).exists():
-            customers_df = pd.read_csv(csv_files['customers'])
+        customers_df = get_dataset('customers')
+        if customers_df is not None:
             # Standardize column names
             customers_df = standardize_dataframe(customers_df, 'customers')
-            
-            # Clean string columns
-            for col in customers_df.select_dtypes(include=['object']).columns:
-                customers_df[col] = customers_df[col].astype(str).str.strip()
-            
-            source = "CSV Files"
-            st.sidebar.success(f"✅ Loaded {len(customers_df)} customers from CSV")
+            source = f"{dataset_source('customers')} Data"
+            st.sidebar.success(f"✅ Loaded {len(customers_df)} customers from {dataset_source('customers')}")
         
         # Load orders
-        if Path(csv_files['orders']).exists():
-            orders_df = pd.read_csv(csv_files['orders'])
+        orders_df = get_dataset('orders')
+        if orders_df is not None:
             # Standardize column names
             orders_df = standardize_dataframe(orders_df, 'orders')
-            
-            # Clean string columns
-            for col in orders_df.select_dtypes(include=['object']).columns:
-                orders_df[col] = orders_df[col].astype(str).str.strip()
-            
-            st.sidebar.success(f"✅ Loaded {len(orders_df)} orders from CSV")
+            st.sidebar.success(f"✅ Loaded {len(orders_df)} orders from {dataset_source('orders')}")
     except Exception as e:
-        st.sidebar.warning(f"⚠️ CSV load error: {str(e)[:60]}")
+        st.sidebar.warning(f"⚠️ Data load error: {str(e)[:60]}")
     
     # Fallback to sample data
     if customers_df is None or orders_df is None:
@@ -248,6 +195,7 @@ def load_customer_data():
 # ANALYSIS FUNCTIONS (Updated with column mapping)
 # ===========================
 
+@timed
 def analyze_data_quality(df):
     """Analyze quality issues - uses standardized column names"""
     issues = []
@@ -268,92 +216,68 @@ def analyze_data_quality(df):
         st.sidebar.error(f"❌ Missing columns: {missing_cols}")
         return pd.DataFrame()
     
-    for idx, row in df.iterrows():
-        customer_issues = []
-        severity = "low"
-        
-        email = row[email_col]
-        if pd.isna(email) or email is None or str(email) == 'nan':
-            customer_issues.append("Missing Email")
-            severity = "critical"
-        elif '@' not in str(email) or '.' not in str(email):
-            customer_issues.append("Invalid Email Format")
-            severity = "high"
-        
-        phone = row[phone_col]
-        if pd.isna(phone) or phone is None or str(phone) == 'nan':
-            customer_issues.append("Missing Phone")
-            if severity not in ["critical"]:
-                severity = "high"
-        else:
-            phone_digits = ''.join(filter(str.isdigit, str(phone)))
-            if len(phone_digits) < 10:
-                customer_issues.append("Invalid Phone Format")
-                if severity == "low":
-                    severity = "medium"
-        
-        address = row[address_col]
-        if pd.isna(address) or address is None or str(address) == 'nan':
-            customer_issues.append("Missing Address")
-            if severity == "low":
-                severity = "medium"
-        
-        if customer_issues:
-            issues.append({
-                'Customer ID': row[id_col],
-                'Name': row[name_col],
-                'Email': row[email_col] if pd.notna(row[email_col]) else '❌ Missing',
-                'Phone': row[phone_col] if pd.notna(row[phone_col]) else '❌ Missing',
-                'Address': row[address_col] if pd.notna(row[address_col]) else '❌ Missing',
-                'Issue': ' & '.join(customer_issues),
-                'Severity': severity,
-                'Registered': row[date_col]
-            })
-    
-    return pd.DataFrame(issues) if issues else pd.DataFrame()
-
-def detect_duplicates(df):
+    # Vectorized rule engine - one mask per check instead of iterrows()
+    return customer_quality_issues(df)
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def find_near_duplicates(data_version, _df):
+    """Blocked fuzzy matching, cached per customer data version (the frame itself is not hashed)"""
+    return fuzzy_duplicate_clusters(_df)
+
+@timed
+def detect_duplicates(df, data_version=None):
     """Detect duplicate records - uses standardized column names"""
-    duplicates = []
-    
     email_col = 'email'
     name_col = 'name'
     
     if email_col not in df.columns or name_col not in df.columns:
         return pd.DataFrame()
     
-    email_counts = df[email_col].value_counts()
-    email_duplicates = email_counts[email_counts > 1]
-    
-    for email, count in email_duplicates.head(30).items():
-        if pd.notna(email) and str(email) != 'Missing' and str(email) != 'nan':
-            matching_rows = df[df[email_col] == email]
-            duplicates.append({
-                'Duplicate Group': f'DUP-{len(duplicates)+1:03d}',
-                'Records': int(count),
-                'Customer Name': matching_rows.iloc[0][name_col],
-                'Email': email,
-                'Match Type': 'Email Match',
-                'Confidence': '100%'
-            })
-    
-    name_counts = df[name_col].value_counts()
-    name_duplicates = name_counts[name_counts > 1]
-    
-    for name, count in list(name_duplicates.items())[:15]:
-        if pd.notna(name) and not any(d['Customer Name'] == name for d in duplicates):
-            matching_rows = df[df[name_col] == name]
-            duplicates.append({
-                'Duplicate Group': f'DUP-{len(duplicates)+1:03d}',
-                'Records': int(count),
-                'Customer Name': name,
-                'Email': matching_rows.iloc[0][email_col],
-                'Match Type': 'Exact Name Match',
-                'Confidence': '85%'
-            })
-    
-    return pd.DataFrame(duplicates) if duplicates else pd.DataFrame()
+    email_groups = duplicate_groups(df, email_col, normalize='email', limit=30)
+    name_groups = duplicate_groups(df, name_col, normalize='text', limit=15)
+    
+    # Name groups already represented by an email group are not repeated
+    seen_names = set(normalize_text(email_groups[name_col]).dropna())
+    name_groups = name_groups[~name_groups['key'].isin(seen_names)]
+    
+    # Near-duplicates: clusters whose members don't all share one email
+    fuzzy = find_near_duplicates(data_version, df) if data_version else fuzzy_duplicate_clusters(df)
+    if not fuzzy.empty:
+        emails = normalize_email(df[email_col]).to_numpy(dtype=object)
+        mixed = fuzzy['rows'].map(lambda rows: pd.Series(emails[list(rows)]).nunique(dropna=False) > 1)
+        fuzzy = fuzzy[mixed].head(15)
+    
+    duplicates = pd.concat([
+        pd.DataFrame({
+            'Records': email_groups['records'],
+            'Customer Name': email_groups[name_col],
+            'Email': email_groups[email_col],
+            'Match Type': 'Email Match',
+            'Confidence': '100%'
+        }),
+        pd.DataFrame({
+            'Records': name_groups['records'],
+            'Customer Name': name_groups[name_col],
+            'Email': name_groups[email_col],
+            'Match Type': 'Exact Name Match',
+            'Confidence': '85%'
+        }),
+        pd.DataFrame({
+            'Records': fuzzy['records'],
+            'Customer Name': fuzzy[name_col],
+            'Email': fuzzy[email_col],
+            'Match Type': 'Fuzzy Match',
+            'Confidence': fuzzy['score'].map('{:.0%}'.format)
+        }) if not fuzzy.empty else None
+    ], ignore_index=True)
+    
+    if duplicates.empty:
+        return pd.DataFrame()
+    
+    duplicates.insert(0, 'Duplicate Group', [f'DUP-{i:03d}' for i in range(1, len(duplicates) + 1)])
+    return duplicates
 
+@timed
 def profile_customers(customers_df, orders_df):
     """Profile customers by segment - uses standardized column names"""
     if len(orders_df) == 0:
@@ -401,75 +325,17 @@ def profile_customers(customers_df, orders_df):
     
     return segment_stats
 
-def rfm_segmentation(orders_df):
+@timed
+def rfm_segmentation(orders_df, key=None):
     """RFM segmentation - uses standardized column names"""
     if len(orders_df) == 0:
         return pd.DataFrame()
     
-    # Use standardized column names
-    customer_id_col = 'customer_id'
-    date_col = 'order_date'
-    order_id_col = 'order_id'
-    amount_col = 'total_amount'
-    
-    if customer_id_col not in orders_df.columns or date_col not in orders_df.columns:
-        return pd.DataFrame()
-    
-    now = datetime.now()
-    orders_df[date_col] = pd.to_datetime(orders_df[date_col], errors='coerce')
-    orders_clean = orders_df[orders_df[date_col].notna()].copy()
-    
-    if len(orders_clean) == 0:
+    if 'customer_id' not in orders_df.columns or 'order_date' not in orders_df.columns:
         return pd.DataFrame()
     
-    rfm = orders_clean.groupby(customer_id_col).agg({
-        date_col: lambda x: (now - x.max()).days,
-        order_id_col: 'count',
-        amount_col: 'sum'
-    }).reset_index()
-    
-    rfm.columns = ['customer_id', 'recency', 'frequency', 'monetary']
-    
     try:
-        rfm['r_score'] = pd.qcut(rfm['recency'], 5, labels=[5,4,3,2,1], duplicates='drop')
-        rfm['f_score'] = pd.qcut(rfm['frequency'].rank(method='first'), 5, labels=[1,2,3,4,5], duplicates='drop')
-        rfm['m_score'] = pd.qcut(rfm['monetary'], 5, labels=[1,2,3,4,5], duplicates='drop')
-        
-        rfm['rfm_score'] = rfm['r_score'].astype(str) + rfm['f_score'].astype(str) + rfm['m_score'].astype(str)
-        
-        def rfm_segment(score):
-            if score.startswith('5') and score.endswith('5'):
-                return 'Champions'
-            elif score.startswith('4') or score.startswith('5'):
-                return 'Loyal'
-            elif score.startswith('3'):
-                return 'Potential'
-            elif score.startswith('2'):
-                return 'At Risk'
-            else:
-                return 'Lost'
-        
-        rfm['segment'] = rfm['rfm_score'].apply(rfm_segment)
-        
-        segment_stats = rfm.groupby('segment').agg({
-            'customer_id': 'count',
-            'monetary': 'sum'
-        }).reset_index()
-        
-        segment_stats.columns = ['Segment', 'Customers', 'Revenue']
-        segment_stats['Revenue'] = '$' + (segment_stats['Revenue'] / 1000000).apply(lambda x: f'{x:.1f}M')
-        segment_stats['RFM Score'] = segment_stats['Segment'].map({
-            'Champions': '555', 'Loyal': '445-544', 'Potential': '355-454', 'At Risk': '244-344', 'Lost': '111-233'
-        })
-        segment_stats['Description'] = segment_stats['Segment'].map({
-            'Champions': 'Best customers - Frequent, Recent, High Spend',
-            'Loyal': 'Consistent purchasers with good spend',
-            'Potential': 'Recent customers with growth potential',
-            'At Risk': 'Were good, now declining',
-            'Lost': "Haven't purchased recently"
-        })
-        
-        return segment_stats[['Segment', 'RFM Score', 'Customers', 'Revenue', 'Description']]
+        return segment_summary(customer_rfm(orders_df, key=key))
     except Exception as e:
         st.sidebar.error(f"RFM Error: {str(e)[:60]}")
         return pd.DataFrame()
@@ -481,9 +347,11 @@ def rfm_segmentation(orders_df):
 with st.spinner("Loading customer data..."):
     customers_df, orders_df, data_source = load_customer_data()
     quality_issues_df = analyze_data_quality(customers_df)
-    duplicates_df = detect_duplicates(customers_df)
+    customers_version = (dataset_version('customers') if data_source != "Generated Sample Data"
+                         else f"sample:{DEFAULT_SCALE}:{datetime.now().date().isoformat()}")
+    duplicates_df = detect_duplicates(customers_df, customers_version)
     profiling_df = profile_customers(customers_df, orders_df)
-    rfm_df = rfm_segmentation(orders_df)
+    rfm_df = rfm_segmentation(orders_df, key='orders' if data_source != "Generated Sample Data" else None)
 
 # ===========================
 # SIDEBAR FILTERS
@@ -529,6 +397,7 @@ with st.sidebar:
     st.markdown("---")
     if st.button("🔄 Reset Filters", use_container_width=True):
         st.cache_data.clear()
+        clear_datasets()
         st.rerun()
 
 # ===========================
@@ -536,6 +405,7 @@ with st.sidebar:
 # ===========================
 
 
+@timed(kind='filter')
 def apply_quality_filters(quality_df, date_cutoff=None, severity_filter=None, issue_filter=None, search_query=None, debug=False):
     """
     Robust filtering for quality issues by 'Registered' date and other optional filters.
@@ -679,7 +549,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: DATA QUALITY ISSUES
-with tab1:
+with tab1, timed_section('data_quality_issues'):
     st.subheader("Customer Data Quality Issues")
     
     if len(filtered_quality) > 0:
@@ -717,7 +587,7 @@ with tab1:
         st.balloons()
 
 # TAB 2: DUPLICATE DETECTION
-with tab2:
+with tab2, timed_section('duplicate_detection'):
     st.subheader("Duplicate Customer Detection")
     
     if len(filtered_duplicates) > 0:
@@ -745,7 +615,7 @@ with tab2:
         st.info("💡 All customer records are unique based on email and name matching.")
 
 # TAB 3: CUSTOMER PROFILING
-with tab3:
+with tab3, timed_section('customer_profiling'):
     st.subheader("Customer Profiling Analysis")
     
     if len(profiling_df) > 0:
@@ -788,7 +658,7 @@ with tab3:
         st.info("📊 Customer profiling requires order data.")
 
 # TAB 4: RFM SEGMENTATION
-with tab4:
+with tab4, timed_section('rfm_segmentation'):
     st.subheader("RFM Customer Segmentation")
     
     if len(rfm_df) > 0:
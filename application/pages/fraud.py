@@ -10,6 +10,13 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
+from utils.datasets import get_dataset, dataset_source, dataset_version
+from utils.fraud_scoring import (FACTORS, available_factors, effective_weights, transaction_frame,
+                                 update_fraud_scores, benchmark_latency)
+from utils.fraud_detectors import PATTERNS, detect_patterns
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Fraud Detection Analysis",
     page_icon="🔒",
@@ -17,6 +24,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('fraud')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -82,65 +91,91 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
+SAMPLE_STATES = ['CA', 'TX', 'NY', 'FL', 'IL', 'AZ', 'WA', 'CO']
+
+@timed_cache(st.cache_data(ttl=600))
 def generate_sample_fraud_data():
-    """Generate sample fraud detection data"""
-    np.random.seed(42)
-    
-    # Suspicious Transactions
-    suspicious = []
-    statuses = ['blocked', 'flagged', 'reviewing', 'cleared']
-    card_types = ['Visa', 'Mastercard', 'Amex', 'Discover']
-    countries = ['Nigeria', 'Romania', 'China', 'Russia', 'India', 'Brazil', 'Ukraine', 'USA', 'UK', 'Unknown']
-    
-    for i in range(1, 101):
-        # Risk score determines status
-        risk_score = np.random.randint(50, 100)
-        
-        if risk_score >= 90:
-            status = np.random.choice(['blocked', 'reviewing'], p=[0.8, 0.2])
-            risk_level = 'critical'
-        elif risk_score >= 70:
-            status = np.random.choice(['flagged', 'reviewing', 'blocked'], p=[0.5, 0.3, 0.2])
-            risk_level = 'high'
-        else:
-            status = np.random.choice(['flagged', 'reviewing', 'cleared'], p=[0.4, 0.3, 0.3])
-            risk_level = 'medium'
-        
-        amount = round(np.random.uniform(100, 5000), 2)
-        
-        # Generate indicators based on risk level
-        all_indicators = [
-            'Stolen Card', 'High Value', 'New Customer', 'Shipping Rush',
-            'Velocity Check', 'Multiple Orders', 'Different Cards',
-            'Suspicious IP', 'Proxy Detected', 'Mismatched Billing',
-            'High Risk Country', 'First Purchase', 'Card Testing',
-            'Multiple Attempts', 'Bot Detected', 'Invalid Email'
-        ]
-        
-        num_indicators = 4 if risk_level == 'critical' else 3 if risk_level == 'high' else 2
-        indicators = list(np.random.choice(all_indicators, size=num_indicators, replace=False))
-        
-        date_offset = int(np.random.randint(0, 30))
-        order_date = (datetime.now() - timedelta(days=date_offset, 
-                                                 hours=int(np.random.randint(0, 24)),
-                                                 minutes=int(np.random.randint(0, 60))))
-        
-        ip_address = f"{np.random.randint(1, 255)}.{np.random.randint(0, 255)}.{np.random.randint(0, 255)}.{np.random.randint(1, 255)}"
-        
-        suspicious.append({
-            'order_id': f'ORD-{12000+i}',
-            'customer': f'Customer {np.random.randint(1, 500)}',
-            'amount': amount,
-            'date': order_date,
-            'risk_score': risk_score,
-            'status': status,
-            'indicators': indicators,
-            'ip_address': ip_address,
-            'location': np.random.choice(countries, p=[0.15, 0.12, 0.12, 0.10, 0.10, 0.08, 0.08, 0.10, 0.10, 0.05]),
-            'card_type': f"{np.random.choice(card_types)} ending {np.random.randint(1000, 9999)}",
-            'risk_level': risk_level
-        })
+    """Generate sample fraud detection data - normalized transactions plus static reference content"""
+    rng = np.random.default_rng(42)
+    n, n_customers, n_bursts = 2000, 500, 150
+    now = pd.Timestamp(datetime.now()).floor('s')
+
+    # Customers with a home state, a usual IP and an account age; a few
+    # fraudulent accounts are new and order in bursts
+    home_states = rng.choice(SAMPLE_STATES, n_customers)
+    home_ips = np.array([f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 255, (n_customers, 4))])
+    fraudster = rng.random(n_customers) < 0.05
+    new_account = fraudster | (rng.random(n_customers) < 0.1)
+    registered = now.normalize() - pd.to_timedelta(
+        np.where(new_account, rng.integers(0, 30, n_customers), rng.integers(30, 730, n_customers)), unit='D'
+    )
+
+    customer = rng.integers(0, n_customers, n)
+    times = now - pd.to_timedelta(rng.integers(0, 30 * 86400, n), unit='s')
+    ips = home_ips[customer].copy()
+    roaming = rng.random(n) < 0.1
+    ips[roaming] = [f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 255, (roaming.sum(), 4))]
+
+    # Bursts: follow-up transactions from the same customer and IP within two hours
+    suspects = np.flatnonzero(fraudster[customer])
+    source = np.where(rng.random(n_bursts) < 0.6, rng.choice(suspects, n_bursts), rng.integers(0, n, n_bursts))
+    customer = np.concatenate([customer, customer[source]])
+    times = times.append(times[source] + pd.to_timedelta(rng.integers(60, 7200, n_bursts), unit='s'))
+    ips = np.concatenate([ips, ips[source]])
+    total = n + n_bursts
+    fraud = fraudster[customer]
+
+    ship_states = home_states[customer].copy()
+    moved = (rng.random(total) < 0.15) | fraud
+    ship_states[moved] = rng.choice(SAMPLE_STATES, moved.sum())
+    methods = rng.choice(['Credit Card', 'Debit Card', 'PayPal', 'Digital Wallet', 'Bank Transfer'],
+                         total, p=[0.4, 0.2, 0.2, 0.1, 0.1])
+    methods[fraud] = 'Credit Card'
+    attempts = np.where(fraud, rng.choice([1, 2, 3], total, p=[0.2, 0.3, 0.5]),
+                        rng.choice([1, 2, 3], total, p=[0.75, 0.17, 0.08]))
+
+    transactions = pd.DataFrame({
+        'customer_id': customer + 1,
+        'time': times,
+        'amount': (rng.lognormal(5.5, 0.8, total) * np.where(fraud, 4, 1)).round(2),
+        'payment_method': methods,
+        'attempts': attempts,
+        'failed': rng.random(total) < np.where(fraud, 0.4, 0.08),
+        'ship_state': ship_states,
+        'home_state': home_states[customer],
+        'registered': registered[customer],
+        'ip_address': ips,
+        'card_id': [f"{c + 1}:{m}" for c, m in zip(customer, methods)]
+    })
+
+    # Card testing: a few small charges on a fresh card, then a large one
+    tests, charges = 12, rng.integers(3, 6, 12) + 1
+    test = np.repeat(np.arange(tests), charges)
+    large = np.cumsum(charges) - 1
+    test_customer = rng.choice(np.flatnonzero(fraudster), tests)[test]
+    gaps = pd.to_timedelta(rng.integers(30, 300, len(test)), unit='s')
+    starts = now - pd.to_timedelta(rng.integers(3600, 30 * 86400, tests), unit='s')
+    offsets = pd.Series(gaps).groupby(test).cumsum().to_numpy()
+    amounts = rng.uniform(1, 9.99, len(test)).round(2)
+    amounts[large] = rng.uniform(300, 2000, tests).round(2)
+    card_tests = pd.DataFrame({
+        'customer_id': test_customer + 1,
+        'time': starts[test] + offsets,
+        'amount': amounts,
+        'payment_method': 'Credit Card',
+        'attempts': 1,
+        'failed': rng.random(len(test)) < 0.3,
+        'ship_state': rng.choice(SAMPLE_STATES, len(test)),
+        'home_state': home_states[test_customer],
+        'registered': registered[test_customer],
+        'ip_address': np.array([f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 255, (tests, 4))])[test],
+        'card_id': [f"test-card-{t}" for t in test]
+    })
+
+    transactions = pd.concat([transactions, card_tests], ignore_index=True).sort_values(
+        'time', kind='stable', ignore_index=True)
+    transactions.insert(0, 'transaction_id', np.arange(1, len(transactions) + 1, dtype=float))
+    transactions.insert(1, 'order_id', np.arange(12001, 12001 + len(transactions)))
     
     # Fraud Patterns
     patterns = [
@@ -191,16 +226,6 @@ def generate_sample_fraud_data():
         }
     ]
     
-    # Risk Scoring Factors
-    scoring_factors = [
-        {'factor': 'Payment Method', 'weight': 25, 'description': 'Card type, BIN validation, CVV match', 'impact': 'High'},
-        {'factor': 'Customer History', 'weight': 20, 'description': 'Order history, account age, previous flags', 'impact': 'High'},
-        {'factor': 'Transaction Velocity', 'weight': 18, 'description': 'Number of orders in timeframe', 'impact': 'High'},
-        {'factor': 'Geolocation', 'weight': 15, 'description': 'IP location vs billing/shipping mismatch', 'impact': 'Medium'},
-        {'factor': 'Order Value', 'weight': 12, 'description': 'Unusually high or low order amounts', 'impact': 'Medium'},
-        {'factor': 'Device Fingerprint', 'weight': 10, 'description': 'Device consistency, browser data', 'impact': 'Low'}
-    ]
-    
     # Risk Thresholds
     thresholds = [
         {'range': '0-49', 'level': 'Low Risk', 'action': 'Approve automatically', 'color': '#22c55e'},
@@ -217,14 +242,132 @@ def generate_sample_fraud_data():
         {'scenario': 'Stolen card detected, high value', 'score': 98, 'level': 'critical'}
     ]
     
-    return (pd.DataFrame(suspicious), patterns, scoring_factors, thresholds, examples)
+    return transactions, patterns, thresholds, examples
 
 # ===========================
-# LOAD DATA
+# SCORING
 # ===========================
 
+# Review status by risk level (threshold actions)
+STATUS_BY_LEVEL = {'critical': 'blocked', 'high': 'flagged', 'medium': 'reviewing', 'low': 'cleared'}
+
+# Indicator added to transactions flagged by a pattern detector
+PATTERN_INDICATORS = {PATTERNS['card_testing']: 'Card Testing', PATTERNS['velocity']: 'Velocity Abuse'}
+
+@timed(kind='loader')
+def load_fraud_transactions():
+    """
+    Smart data loader - uses the shared dataset registry:
+    1. CSV Files / MySQL payments joined to orders and customers (PRIORITY)
+    2. Sample Data (fallback)
+    """
+    try:
+        payments_df = get_dataset('payments')
+        orders_df = get_dataset('orders')
+        if payments_df is not None and orders_df is not None:
+            customers_df = get_dataset('customers')
+            source = dataset_source('payments')
+            st.sidebar.success(f"✅ Loaded {len(payments_df)} payments from {source}")
+            version = (source, dataset_version('payments'), dataset_version('orders'), dataset_version('customers'))
+            return payments_df, orders_df, customers_df, f"{source} Data", version
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Data load error: {str(e)[:60]}")
+    
+    st.sidebar.info("📊 Using generated sample data")
+    return None, None, None, "Generated Sample Data", "sample"
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def build_fraud_scores(data_version, _payments_df=None, _orders_df=None, _customers_df=None):
+    """
+    Score every transaction, replay it through the pattern detectors and
+    time the scorer for one version of the data. Keyed on the data version
+    only - the frames are never hashed. Registry data is scored
+    incrementally (new payments are streamed through the scorer state kept
+    for the source); sample data is scored in batch.
+    """
+    if _payments_df is None:
+        transactions = generate_sample_fraud_data()[0]
+        scored = update_fraud_scores(transactions)
+    else:
+        transactions = transaction_frame(_payments_df, _orders_df, _customers_df)
+        scored = update_fraud_scores(transactions, key='payments')
+
+    names = {}
+    if _customers_df is not None and 'name' in _customers_df.columns:
+        names = _customers_df.drop_duplicates('customer_id').set_index('customer_id')['name'].to_dict()
+    customer_ids = scored['customer_id']
+    alerts = detect_patterns(transactions)
+    alert_labels = alerts.groupby('transaction_id')['pattern'].agg(
+        lambda patterns: [PATTERN_INDICATORS[p] for p in dict.fromkeys(patterns)])
+    alert_labels = scored['transaction_id'].map(alert_labels)
+    ips = scored['ip_address'] if 'ip_address' in scored.columns else pd.Series('n/a', index=scored.index)
+
+    view = pd.DataFrame({
+        'transaction_id': scored['transaction_id'],
+        'order_id': 'ORD-' + scored['order_id'].astype(str),
+        'customer': [names.get(cid) or (f"Customer {cid}" if pd.notna(cid) else 'Guest') for cid in customer_ids],
+        'amount': scored['amount'],
+        'date': scored['time'],
+        'risk_score': scored['risk_score'],
+        'status': scored['risk_level'].map(STATUS_BY_LEVEL),
+        'indicators': [indicators + [label for label in labels if label not in indicators]
+                       if isinstance(labels, list) else indicators
+                       for indicators, labels in zip(scored['indicators'], alert_labels)],
+        'alerted': alert_labels.notna().to_numpy(),
+        'ip_address': ips.fillna('n/a'),
+        'location': scored['ship_state'].fillna('Unknown'),
+        'card_type': scored['payment_method'].astype(str),
+        'risk_level': scored['risk_level']
+    })
+    keys = available_factors(transactions.columns)
+    weights = effective_weights(keys)
+    factors = pd.DataFrame([{
+        'factor': factor['factor'],
+        'weight': round(weights.get(factor['key'], 0), 1),
+        'average': scored[factor['key']].mean() * 100 if factor['key'] in keys and len(scored) else np.nan,
+        'description': factor['description'],
+        'impact': factor['impact'] if factor['key'] in keys else 'Not available in data'
+    } for factor in FACTORS])
+    return view, factors, alerts, benchmark_latency(transactions)
+
+def format_time_ago(delta):
+    """Human-readable age of an event"""
+    seconds = delta.total_seconds()
+    if seconds < 3600:
+        return f"{int(seconds / 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds / 3600)} hours ago"
+    return f"{delta.days} days ago"
+
+@timed
+def apply_detected_patterns(patterns, alerts, view, as_of):
+    """
+    Replace the counts of detector-backed patterns with the alerts: one
+    occurrence per alerted transaction, blocked when the risk score held it
+    (status other than cleared)
+    """
+    held = view.set_index('transaction_id')['status'] != 'cleared'
+    updated = []
+    for pattern in patterns:
+        hits = alerts[alerts['pattern'] == pattern['name']]
+        if pattern['name'] in PATTERN_INDICATORS:
+            transaction_ids = hits['transaction_id'].unique()
+            pattern = dict(pattern,
+                           occurrences=len(transaction_ids),
+                           blocked=int(held.reindex(transaction_ids).fillna(False).sum()),
+                           recent_activity=format_time_ago(as_of - hits['time'].max()) if len(hits) else 'Not seen')
+        updated.append(pattern)
+    return updated
+
 with st.spinner("Loading fraud detection data..."):
-    suspicious_df, patterns_data, scoring_factors, thresholds, examples = generate_sample_fraud_data()
+    _, patterns_data, thresholds, examples = generate_sample_fraud_data()
+    payments_df, orders_df, customers_df, data_source, data_version = load_fraud_transactions()
+    scored_df, scoring_factors, alerts_df, latency = build_fraud_scores(data_version, payments_df, orders_df,
+                                                                       customers_df)
+    suspicious_df = scored_df[(scored_df['risk_score'] >= 50) | scored_df['alerted']].reset_index(drop=True)
+    # Date filters are relative to the latest scored transaction
+    as_of = scored_df['date'].max() if len(scored_df) else pd.Timestamp(datetime.now())
+    patterns_data = apply_detected_patterns(patterns_data, alerts_df, scored_df, as_of)
 
 # Calculate metrics
 flagged_orders = len(suspicious_df[suspicious_df['status'].isin(['flagged', 'blocked', 'reviewing'])])
@@ -245,7 +388,7 @@ with st.sidebar:
         index=2
     )
     
-    now = datetime.now()
+    now = as_of
     if date_range == "Last 24 Hours":
         cutoff_date = now - timedelta(days=1)
     elif date_range == "Last 7 Days":
@@ -278,6 +421,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_fraud_filters(df, date_cutoff, risk_value, status_list, search_text):
     filtered = df.copy()
     
@@ -357,10 +501,15 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Fraud Detection Trend")
     
+    # Last four weeks up to the latest transaction
+    week_number = ((as_of - scored_df['date']).dt.days // 7).to_numpy()
+    recent_weeks = week_number < 4
     trend_data = pd.DataFrame({
-        'Week': ['Week 1', 'Week 2', 'Week 3', 'Week 4'],
-        'Fraud Attempts': [156, 178, 189, 148],
-        'Blocked': [145, 167, 178, 144]
+        'Week': [f'Week {4 - w}' for w in range(3, -1, -1)],
+        'Fraud Attempts': np.bincount(3 - week_number[recent_weeks & (scored_df['risk_score'] >= 50).to_numpy()],
+                                      minlength=4),
+        'Blocked': np.bincount(3 - week_number[recent_weeks & (scored_df['status'] == 'blocked').to_numpy()],
+                               minlength=4)
     })
     
     fig1 = go.Figure()
@@ -379,9 +528,10 @@ with col1:
 with col2:
     st.subheader("Risk Level Distribution")
     
+    level_counts = scored_df['risk_level'].value_counts()
     risk_dist = pd.DataFrame({
         'Risk Level': ['Critical (90-100)', 'High (70-89)', 'Medium (50-69)', 'Low (0-49)'],
-        'Count': [89, 145, 198, 239]
+        'Count': [int(level_counts.get(level, 0)) for level in ['critical', 'high', 'medium', 'low']]
     })
     
     fig2 = px.pie(risk_dist, values='Count', names='Risk Level',
@@ -403,7 +553,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: FRAUD DASHBOARD
-with tab1:
+with tab1, timed_section('fraud_dashboard'):
     st.subheader("Fraud Detection Overview")
     
     col1, col2, col3 = st.columns(3)
@@ -494,7 +644,7 @@ with tab1:
         st.markdown("**Consortium Data**: <span style='color: #3b82f6; font-weight: bold;'>85.4%</span>", unsafe_allow_html=True)
 
 # TAB 2: SUSPICIOUS TRANSACTIONS
-with tab2:
+with tab2, timed_section('suspicious_transactions'):
     st.subheader("Suspicious Transactions")
     
     if len(filtered_suspicious) > 0:
@@ -552,11 +702,11 @@ with tab2:
         st.info("No suspicious transactions match the current filters")
 
 # TAB 3: FRAUD PATTERNS
-with tab3:
+with tab3, timed_section('fraud_patterns'):
     st.subheader("Fraud Pattern Detection")
     
     for pattern in patterns_data:
-        success_rate = (pattern['blocked'] / pattern['occurrences'] * 100)
+        success_rate = (pattern['blocked'] / max(pattern['occurrences'], 1) * 100)
         severity_color = '#ef4444' if pattern['severity'] == 'critical' else '#f59e0b' if pattern['severity'] == 'high' else '#3b82f6'
         
         st.markdown(f"""
@@ -603,7 +753,7 @@ with tab3:
     st.plotly_chart(fig_pattern, use_container_width=True)
 
 # TAB 4: RISK SCORING
-with tab4:
+with tab4, timed_section('risk_scoring'):
     st.subheader("Risk Scoring System")
     
     col1, col2 = st.columns(2)
@@ -612,24 +762,28 @@ with tab4:
         st.markdown("### 📊 Risk Scoring Factors")
         
         st.dataframe(
-            pd.DataFrame(scoring_factors),
+            scoring_factors,
             use_container_width=True,
             hide_index=True,
             column_config={
                 'factor': 'Factor',
-                'weight': st.column_config.NumberColumn('Weight (%)', format='%d%%'),
+                'weight': st.column_config.NumberColumn('Weight (%)', format='%.1f%%'),
+                'average': st.column_config.NumberColumn('Avg Factor Score', format='%.1f'),
                 'description': 'Description',
                 'impact': 'Impact Level'
             }
         )
+        st.caption("Weights of factors without input data are shared out over the others")
     
     with col2:
         st.markdown("### 🎯 Risk Score Example")
         
-        # Create risk meter visualization
-        risk_score = 85
-        risk_level_text = 'High Risk'
-        risk_color = '#f59e0b'
+        # Create risk meter visualization for the latest transaction
+        latest = scored_df.loc[scored_df['date'].idxmax()] if len(scored_df) else None
+        risk_score = int(latest['risk_score']) if latest is not None else 0
+        risk_level_text = f"{latest['risk_level'].title() if latest is not None else 'Low'} Risk"
+        risk_color = {'critical': '#ef4444', 'high': '#f59e0b', 'medium': '#3b82f6'}.get(
+            latest['risk_level'] if latest is not None else 'low', '#22c55e')
         
         fig_gauge = go.Figure(go.Indicator(
             mode="gauge+number",
@@ -655,7 +809,9 @@ with tab4:
         fig_gauge.update_layout(height=300, margin=dict(l=20, r=20, t=50, b=20))
         st.plotly_chart(fig_gauge, use_container_width=True)
         
-        st.caption("Real-time calculation based on transaction data")
+        if latest is not None:
+            st.caption(f"Latest transaction {latest['order_id']} ({latest['date']:%Y-%m-%d %H:%M}): "
+                       f"{', '.join(latest['indicators']) or 'no risk indicators'}")
     
     st.markdown("---")
     st.markdown("### 📏 Risk Level Thresholds")
@@ -728,14 +884,14 @@ with col2:
     st.progress(0.021)
 
 with col3:
-    st.markdown("""
+    st.markdown(f"""
     <div style="padding: 15px; background: white; border-radius: 8px; border: 1px solid #e2e8f0;">
         <div style="font-weight: 600; color: #64748b; margin-bottom: 10px;">Avg Response Time</div>
-        <div style="font-size: 1.25rem; font-weight: 700; color: #3b82f6; margin-bottom: 5px;">1.8s</div>
-        <div style="font-size: 0.8125rem; color: #64748b;">Real-time detection</div>
+        <div style="font-size: 1.25rem; font-weight: 700; color: #3b82f6; margin-bottom: 5px;">{latency['mean_ms']:.2f} ms</div>
+        <div style="font-size: 0.8125rem; color: #64748b;">p95 {latency['p95_ms']:.2f} ms per transaction (streaming), {latency['batch_us']:.1f} µs in batch</div>
     </div>
     """, unsafe_allow_html=True)
-    st.progress(0.85)
+    st.progress(latency['within_budget'])
 
 st.markdown("---")
 
@@ -789,7 +945,7 @@ with st.expander("🔍 Fraud Detection Insights & Recommendations"):
         if len(high_risk) > 0:
             st.markdown("**Top 5 Critical Risk Transactions:**")
             for idx, trans in high_risk.iterrows():
-                st.markdown(f"- **{trans['order_id']}**: Risk Score {trans['risk_score']} - {trans['indicators'][0]}")
+                st.markdown(f"- **{trans['order_id']}**: Risk Score {trans['risk_score']} - {', '.join(trans['indicators']) or 'Fraud detected'}")
         else:
             st.success("✅ No critical risk transactions currently!")
         
@@ -876,12 +1032,13 @@ with st.expander("🔧 System Diagnostics"):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Transactions Analyzed", f"{len(suspicious_df):,}")
+        st.metric("Total Transactions Analyzed", f"{len(scored_df):,}")
         st.metric("Detection Rules Active", "127")
     
     with col2:
         st.metric("ML Model Accuracy", "96.5%")
-        st.metric("Average Processing Time", "1.8s")
+        st.metric("Average Processing Time", f"{latency['mean_ms']:.2f} ms",
+                  f"p99 {latency['p99_ms']:.2f} ms", delta_color="off")
     
     with col3:
         st.metric("System Uptime", "99.9%")
@@ -936,7 +1093,8 @@ with st.expander("🔍 Fraud Pattern Analysis"):
     st.markdown("### Pattern Detection Summary")
     
     patterns_summary = pd.DataFrame(patterns_data)
-    patterns_summary['Success Rate'] = (patterns_summary['blocked'] / patterns_summary['occurrences'] * 100).round(1)
+    patterns_summary['Success Rate'] = (patterns_summary['blocked'] / patterns_summary['occurrences'].clip(lower=1)
+                                        * 100).round(1)
     
     fig_patterns = px.bar(patterns_summary, x='name', y='occurrences',
                          color='Success Rate',
@@ -956,7 +1114,7 @@ with st.expander("🔍 Fraud Pattern Analysis"):
             with col1:
                 st.metric(pattern['name'], f"{pattern['occurrences']}", "occurrences")
             with col2:
-                success_rate = (pattern['blocked'] / pattern['occurrences'] * 100)
+                success_rate = (pattern['blocked'] / max(pattern['occurrences'], 1) * 100)
                 st.metric("Success Rate", f"{success_rate:.1f}%")
             with col3:
                 st.metric("Blocked", f"{pattern['blocked']}/{pattern['occurrences']}")
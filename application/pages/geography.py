@@ -10,6 +10,9 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Geographic Data Analysis",
     page_icon="🌍",
@@ -17,6 +20,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('geography')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -58,7 +63,7 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
+@timed_cache(st.cache_data(ttl=600))
 def generate_sample_geography_data():
     """Generate comprehensive geographic data"""
     np.random.seed(42)
@@ -156,6 +161,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_geography_filters(regions_df, region_f, search_q):
     """Apply filters to geographic data"""
     filtered = regions_df.copy()
@@ -268,7 +274,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: SALES MAP
-with tab1:
+with tab1, timed_section('sales_map'):
     st.subheader("Geographic Sales Heatmap")
     
     st.markdown("#### US States Performance")
@@ -335,7 +341,7 @@ with tab1:
             """, unsafe_allow_html=True)
 
 # TAB 2: REGIONAL PERFORMANCE
-with tab2:
+with tab2, timed_section('regional_performance'):
     st.subheader("Regional Performance Analysis")
     
     st.markdown("#### US Regions Performance")
@@ -381,7 +387,7 @@ with tab2:
     )
 
 # TAB 3: LOCATION ISSUES
-with tab3:
+with tab3, timed_section('location_issues'):
     st.subheader("Location-Based Data Issues")
     
     st.markdown("#### Address Quality Issues")
@@ -423,7 +429,7 @@ with tab3:
             st.markdown(f"<div style='color: {color}; font-weight: 700;'>{val['rate']}%</div>", unsafe_allow_html=True)
 
 # TAB 4: EXPANSION OPPORTUNITIES
-with tab4:
+with tab4, timed_section('expansion_opportunities'):
     st.subheader("Market Expansion Opportunities")
     
     cols = st.columns(2)
@@ -11,6 +11,10 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.synthetic import DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Inventory Quality Check",
     page_icon="📈",
@@ -18,6 +22,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('inventory')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -81,176 +87,133 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_inventory_data():
-    """Generate sample inventory data with quality issues"""
-    np.random.seed(42)
-    
-    categories = ['Electronics', 'Clothing', 'Home', 'Books', 'Sports', 'Toys', 'Food', 'Beauty', 'Garden', 'Pet']
-    warehouses = ['Main Warehouse', 'East Coast DC', 'West Coast DC', 'Central Hub']
-    
+WAREHOUSES = {
+    'Main Warehouse': 'New York, NY',
+    'East Coast DC': 'Atlanta, GA',
+    'West Coast DC': 'Los Angeles, CA',
+    'Central Hub': 'Chicago, IL'
+}
+MOVEMENT_TYPES = {'inbound': 0.4, 'outbound': 0.45, 'adjustment': 0.1, 'damaged': 0.05}
+MOVEMENT_REASONS = {
+    'inbound': ['Purchase order received', 'Supplier delivery', 'Weekly restock', 'Return to stock'],
+    'outbound': ['Customer order', 'Bulk order', 'Transfer to store', 'B2B order'],
+    'adjustment': ['Damaged items removed', 'Inventory audit adjustment', 'System correction', 'Shrinkage'],
+    'damaged': ['Quality control rejection', 'Shipping damage', 'Expired items', 'Customer return damage']
+}
+
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_inventory_data(scale=DEFAULT_SCALE):
+    """
+    Stock levels, low stock alerts, movements and warehouse breakdown, derived
+    from the synthetic inventory (one row per product and warehouse) and
+    product catalog
+    """
+    tables = generate_tables(scale, tables=['inventory', 'products'])
+    inventory = tables['inventory']
+    products = tables['products'].set_index('product_id').reindex(inventory['product_id'])
+    rng = np.random.default_rng(42)
+    now = pd.Timestamp.now()
+
     # Current Stock Levels
-    stock = []
-    for i in range(1, 201):
-        category = np.random.choice(categories)
-        warehouse = np.random.choice(warehouses)
-        
-        system_stock = np.random.randint(20, 500)
-        
-        # Create variance (8-15% will have mismatches)
-        if np.random.random() < 0.12:
-            variance = np.random.randint(-30, 30)
-            if variance == 0:
-                variance = np.random.choice([-5, 5])
-        else:
-            variance = 0
-        
-        physical_stock = system_stock + variance
-        
-        reorder_point = int(system_stock * np.random.uniform(0.3, 0.5))
-        reorder_qty = int(reorder_point * 2)
-        
-        # Determine status based on physical stock
-        if physical_stock < reorder_point * 0.5:
-            status = 'critical'
-        elif physical_stock < reorder_point:
-            status = 'low'
-        elif physical_stock > reorder_point * 3:
-            status = 'overstocked'
-        elif physical_stock >= reorder_point * 1.5:
-            status = 'good'
-        else:
-            status = 'adequate'
-        
-        value_impact = variance * np.random.uniform(5, 50)
-        
-        stock.append({
-            'sku': f'{category[:4].upper()}-{i:03d}',
-            'product': f'{category} Product {i}',
-            'category': category,
-            'system_stock': system_stock,
-            'physical_stock': physical_stock,
-            'variance': variance,
-            'reorder_point': reorder_point,
-            'reorder_qty': reorder_qty,
-            'status': status,
-            'value_impact': value_impact,
-            'warehouse': warehouse
-        })
-    
+    system_stock = inventory['system_stock'].to_numpy(dtype=int)
+    physical_stock = inventory['physical_stock'].to_numpy(dtype=int)
+    reorder_point = inventory['reorder_point'].to_numpy(dtype=int)
+    variance = physical_stock - system_stock
+    unit_cost = products['cost'].to_numpy(dtype=float)
+    warehouse = np.array(list(WAREHOUSES), dtype=object)[inventory['warehouse_id'].to_numpy(dtype=int) - 1]
+    status = np.select(
+        [physical_stock < reorder_point * 0.5, physical_stock < reorder_point,
+         physical_stock > reorder_point * 3, physical_stock >= reorder_point * 1.5],
+        ['critical', 'low', 'overstocked', 'good'],
+        'adequate'
+    )
+
+    stock = pd.DataFrame({
+        'sku': products['sku'].to_numpy(dtype=object),
+        'product': products['name'].fillna(products['sku']).to_numpy(dtype=object),
+        'category': products['category'].astype(object).fillna('Uncategorized').to_numpy(),
+        'system_stock': system_stock,
+        'physical_stock': physical_stock,
+        'variance': variance,
+        'reorder_point': reorder_point,
+        'reorder_qty': inventory['reorder_quantity'].to_numpy(dtype=int),
+        'status': status,
+        'value_impact': variance * np.nan_to_num(unit_cost, nan=25.0),
+        'warehouse': warehouse
+    })
+
     # Low Stock Alerts
-    alerts = []
-    critical_items = [s for s in stock if s['status'] == 'critical'][:15]
-    low_items = [s for s in stock if s['status'] == 'low'][:10]
-    
-    for item in critical_items + low_items:
-        daily_avg_sales = np.random.randint(3, 12)
-        days_remaining = max(1, item['physical_stock'] // daily_avg_sales)
-        
-        severity = 'critical' if item['status'] == 'critical' else 'low'
-        suggested_action = 'Emergency reorder required' if severity == 'critical' else 'Place standard reorder'
-        
-        alerts.append({
-            'sku': item['sku'],
-            'product': item['product'],
-            'current_stock': item['physical_stock'],
-            'reorder_point': item['reorder_point'],
-            'days_remaining': days_remaining,
-            'daily_avg_sales': daily_avg_sales,
-            'severity': severity,
-            'warehouse': item['warehouse'],
-            'suggested_action': suggested_action
-        })
-    
+    alerts = pd.concat([stock[stock['status'] == 'critical'].head(15), stock[stock['status'] == 'low'].head(10)])
+    daily_avg_sales = rng.integers(3, 12, len(alerts))
+    critical = (alerts['status'] == 'critical').to_numpy()
+    alerts = pd.DataFrame({
+        'sku': alerts['sku'].to_numpy(),
+        'product': alerts['product'].to_numpy(),
+        'current_stock': alerts['physical_stock'].to_numpy(),
+        'reorder_point': alerts['reorder_point'].to_numpy(),
+        'days_remaining': np.maximum(1, alerts['physical_stock'].to_numpy() // daily_avg_sales),
+        'daily_avg_sales': daily_avg_sales,
+        'severity': np.where(critical, 'critical', 'low'),
+        'warehouse': alerts['warehouse'].to_numpy(),
+        'suggested_action': np.where(critical, 'Emergency reorder required', 'Place standard reorder')
+    })
+
     # Stock Movements
-    movements = []
-    movement_types = ['inbound', 'outbound', 'adjustment', 'damaged']
-    movement_reasons = {
-        'inbound': ['Purchase order received', 'Supplier delivery', 'Weekly restock', 'Return to stock'],
-        'outbound': ['Customer order', 'Bulk order', 'Transfer to store', 'B2B order'],
-        'adjustment': ['Damaged items removed', 'Inventory audit adjustment', 'System correction', 'Shrinkage'],
-        'damaged': ['Quality control rejection', 'Shipping damage', 'Expired items', 'Customer return damage']
-    }
-    
-    for i in range(150):
-        movement_type = np.random.choice(movement_types, p=[0.4, 0.45, 0.1, 0.05])
-        
-        if movement_type == 'inbound':
-            quantity = np.random.randint(20, 150)
-        elif movement_type == 'outbound':
-            quantity = -np.random.randint(5, 50)
-        elif movement_type == 'adjustment':
-            quantity = np.random.randint(-20, 20)
-        else:  # damaged
-            quantity = -np.random.randint(1, 10)
-        
-        item = np.random.choice(stock)
-        before_qty = item['physical_stock']
-        after_qty = before_qty + quantity
-        
-        date_offset = np.random.randint(0, 30)
-        movement_date = (datetime.now() - timedelta(days=date_offset)).strftime('%Y-%m-%d %H:%M')
-        
-        reference = f"{'PO' if movement_type == 'inbound' else 'ORD' if movement_type == 'outbound' else 'ADJ'}-{np.random.randint(1000, 9999)}"
-        reason = np.random.choice(movement_reasons[movement_type])
-        
-        movements.append({
-            'date': movement_date,
-            'sku': item['sku'],
-            'product': item['product'],
-            'type': movement_type,
-            'quantity': quantity,
-            'warehouse': item['warehouse'],
-            'reference': reference,
-            'before_qty': before_qty,
-            'after_qty': after_qty,
-            'reason': reason
-        })
-    
-    # Sort movements by date descending
-    movements = sorted(movements, key=lambda x: x['date'], reverse=True)
-    
+    n = max(150, len(stock) // 2)
+    movement_type = rng.choice(list(MOVEMENT_TYPES), n, p=list(MOVEMENT_TYPES.values()))
+    quantity = np.select(
+        [movement_type == 'inbound', movement_type == 'outbound', movement_type == 'adjustment'],
+        [rng.integers(20, 150, n), -rng.integers(5, 50, n), rng.integers(-20, 20, n)],
+        -rng.integers(1, 10, n)
+    )
+    item = stock.iloc[rng.integers(0, len(stock), n)]
+    reasons = pd.DataFrame(MOVEMENT_REASONS).to_numpy()
+    prefix = np.select([movement_type == 'inbound', movement_type == 'outbound'], ['PO', 'ORD'], 'ADJ')
+
+    movements = pd.DataFrame({
+        'date': (now - pd.to_timedelta(rng.integers(0, 30, n), unit='D')).strftime('%Y-%m-%d %H:%M'),
+        'sku': item['sku'].to_numpy(),
+        'product': item['product'].to_numpy(),
+        'type': movement_type,
+        'quantity': quantity,
+        'warehouse': item['warehouse'].to_numpy(),
+        'reference': pd.Series(prefix).str.cat(rng.integers(1000, 9999, n).astype(str), sep='-').to_numpy(),
+        'before_qty': item['physical_stock'].to_numpy(),
+        'after_qty': item['physical_stock'].to_numpy() + quantity,
+        'reason': reasons[rng.integers(0, reasons.shape[0], n),
+                          pd.Index(MOVEMENT_REASONS).get_indexer(movement_type)]
+    }).sort_values('date', ascending=False, ignore_index=True)
+
     # Warehouse Breakdown
-    warehouses_data = []
-    for warehouse in warehouses:
-        warehouse_items = [s for s in stock if s['warehouse'] == warehouse]
-        
-        total_skus = len(warehouse_items)
-        total_units = sum(s['physical_stock'] for s in warehouse_items)
-        capacity = total_units + np.random.randint(10000, 30000)
-        utilization = int((total_units / capacity) * 100)
-        
-        critical_items = len([s for s in warehouse_items if s['status'] == 'critical'])
-        low_stock_items = len([s for s in warehouse_items if s['status'] == 'low'])
-        
-        # Calculate accuracy
-        items_with_variance = len([s for s in warehouse_items if s['variance'] != 0])
-        accuracy = int(((total_skus - items_with_variance) / total_skus * 100)) if total_skus > 0 else 100
-        
-        last_audit_days = np.random.randint(1, 20)
-        last_audit = (datetime.now() - timedelta(days=last_audit_days)).strftime('%Y-%m-%d')
-        
-        location_map = {
-            'Main Warehouse': 'New York, NY',
-            'East Coast DC': 'Atlanta, GA',
-            'West Coast DC': 'Los Angeles, CA',
-            'Central Hub': 'Chicago, IL'
-        }
-        
-        warehouses_data.append({
-            'name': warehouse,
-            'location': location_map[warehouse],
-            'total_skus': total_skus,
-            'total_units': total_units,
-            'capacity': capacity,
-            'utilization': utilization,
-            'critical_items': critical_items,
-            'low_stock_items': low_stock_items,
-            'accuracy': accuracy,
-            'last_audit': last_audit
-        })
-    
-    return pd.DataFrame(stock), pd.DataFrame(alerts), pd.DataFrame(movements), pd.DataFrame(warehouses_data)
+    by_warehouse = stock.assign(
+        critical=stock['status'] == 'critical',
+        low=stock['status'] == 'low',
+        mismatch=stock['variance'] != 0
+    ).groupby('warehouse').agg(
+        total_skus=('sku', 'size'),
+        total_units=('physical_stock', 'sum'),
+        critical_items=('critical', 'sum'),
+        low_stock_items=('low', 'sum'),
+        mismatches=('mismatch', 'sum')
+    ).reindex(list(WAREHOUSES), fill_value=0)
+    capacity = by_warehouse['total_units'] + rng.integers(10000, 30000, len(by_warehouse))
+    total_skus = by_warehouse['total_skus'].to_numpy()
+
+    warehouses = pd.DataFrame({
+        'name': list(WAREHOUSES),
+        'location': list(WAREHOUSES.values()),
+        'total_skus': total_skus,
+        'total_units': by_warehouse['total_units'].to_numpy(),
+        'capacity': capacity.to_numpy(),
+        'utilization': (by_warehouse['total_units'] / capacity * 100).astype(int).to_numpy(),
+        'critical_items': by_warehouse['critical_items'].to_numpy(),
+        'low_stock_items': by_warehouse['low_stock_items'].to_numpy(),
+        'accuracy': np.where(total_skus > 0, (total_skus - by_warehouse['mismatches'].to_numpy())
+                             * 100 // np.maximum(total_skus, 1), 100),
+        'last_audit': (now - pd.to_timedelta(rng.integers(1, 20, len(WAREHOUSES)), unit='D')).strftime('%Y-%m-%d')
+    })
+
+    return stock, alerts, movements, warehouses
 
 # ===========================
 # LOAD DATA
@@ -320,6 +283,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_inventory_filters(df, status_list, warehouse_list, category_list, search_text):
     filtered = df.copy()
     
@@ -341,6 +305,7 @@ def apply_inventory_filters(df, status_list, warehouse_list, category_list, sear
     
     return filtered
 
+@timed(kind='filter')
 def apply_movement_filters(df, warehouse_list, category_list, search_text):
     filtered = df.copy()
     
@@ -467,7 +432,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: CURRENT STOCK LEVELS
-with tab1:
+with tab1, timed_section('current_stock_levels'):
     st.subheader("Current Stock Levels")
     
     if len(filtered_stock) > 0:
@@ -532,7 +497,7 @@ with tab1:
         st.info("No items match the current filters")
 
 # TAB 2: LOW STOCK ALERTS
-with tab2:
+with tab2, timed_section('low_stock_alerts'):
     st.subheader("Low Stock Alerts")
     
     if len(alerts_df) > 0:
@@ -581,7 +546,7 @@ with tab2:
         st.balloons()
 
 # TAB 3: STOCK MOVEMENTS
-with tab3:
+with tab3, timed_section('stock_movements'):
     st.subheader("Stock Movement History")
     
     if len(filtered_movements) > 0:
@@ -639,7 +604,7 @@ with tab3:
         st.info("No movements match the current filters")
 
 # TAB 4: WAREHOUSE BREAKDOWN
-with tab4:
+with tab4, timed_section('warehouse_breakdown'):
     st.subheader("Warehouse Breakdown")
     
     if len(filtered_warehouses) > 0:
@@ -10,6 +10,9 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Loyalty Program Audit",
     page_icon="⭐",
@@ -17,6 +20,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('loyalty')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -58,7 +63,7 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
+@timed_cache(st.cache_data(ttl=600))
 def generate_sample_loyalty_data():
     """Generate comprehensive loyalty program data"""
     np.random.seed(42)
@@ -180,6 +185,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_loyalty_filters(performers_df, tier_f, search_q):
     """Apply filters to loyalty data"""
     filtered = performers_df.copy()
@@ -249,7 +255,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: PROGRAM DASHBOARD
-with tab1:
+with tab1, timed_section('program_dashboard'):
     st.subheader("Program Dashboard")
     
     col1, col2 = st.columns(2)
@@ -311,7 +317,7 @@ with tab1:
         st.caption(f"Showing {len(filtered_performers)} member(s)")
 
 # TAB 2: POINTS TRACKING
-with tab2:
+with tab2, timed_section('points_tracking'):
     st.subheader("Points Tracking")
     
     col1, col2 = st.columns(2)
@@ -360,7 +366,7 @@ with tab2:
             st.markdown(f"{source['percent']}%")
 
 # TAB 3: TIER DISTRIBUTION
-with tab3:
+with tab3, timed_section('tier_distribution'):
     st.subheader("Tier Distribution")
     
     col1, col2 = st.columns(2)
@@ -419,7 +425,7 @@ with tab3:
     )
 
 # TAB 4: PROGRAM EFFECTIVENESS
-with tab4:
+with tab4, timed_section('program_effectiveness'):
     st.subheader("Program Effectiveness")
     
     st.markdown("#### Performance vs Targets")
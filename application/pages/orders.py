@@ -11,6 +11,12 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.data_quality import order_integrity_issues
+from utils.rollups import aggregate_orders, monthly_rollup
+from utils.synthetic import DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Order Transaction Audit",
     page_icon="🛒",
@@ -18,6 +24,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('orders')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -87,193 +95,102 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_order_data():
-    """Generate sample order data with quality issues"""
-    np.random.seed(42)
-    
-    orders = []
-    order_statuses = ['completed', 'shipped', 'processing', 'pending', 'cancelled']
-    payment_statuses = ['paid', 'unpaid', 'refunded']
-    shipping_statuses = ['delivered', 'in-transit', 'pending', 'cancelled']
-    carriers = ['UPS', 'FedEx', 'USPS', 'DHL']
-    payment_methods = ['Credit Card', 'PayPal', 'Bank Transfer', 'Debit Card']
-    processors = ['Stripe', 'PayPal', 'Manual', 'Square']
-    
-    for i in range(1, 501):
-        order_date = (datetime.now() - timedelta(days=np.random.randint(1, 180))).date()
-        
-        # Customer data with orphaned orders
-        if np.random.random() < 0.024:  # 2.4% orphaned (12 out of 500)
-            customer_id = None
-            customer_name = None
-        else:
-            customer_id = f'C-{np.random.randint(1, 201):03d}'
-            customer_name = f'Customer {np.random.randint(1, 201)}'
-        
-        # Generate order total
-        items = np.random.randint(1, 8)
-        order_total = round(np.random.uniform(25, 1500), 2)
-        
-        # Calculate item-level total (for price mismatch)
-        if np.random.random() < 0.068:  # 6.8% price mismatch (34 out of 500)
-            calculated_total = round(order_total * np.random.uniform(1.02, 1.15), 2)
-        else:
-            calculated_total = order_total
-        
-        # Invalid totals
-        if np.random.random() < 0.01:
-            order_total = 0
-            calculated_total = round(np.random.uniform(50, 300), 2)
-        
-        # Order status
-        status = np.random.choice(order_statuses, p=[0.5, 0.2, 0.15, 0.1, 0.05])
-        
-        # Payment status
-        if status == 'pending':
-            payment_status = 'unpaid'
-        elif status == 'cancelled':
-            payment_status = np.random.choice(['unpaid', 'refunded'])
-        else:
-            payment_status = 'paid'
-        
-        # Shipping status
-        if status == 'completed':
-            shipping_status = 'delivered'
-        elif status == 'shipped':
-            shipping_status = 'in-transit'
-        elif status == 'cancelled':
-            shipping_status = 'cancelled'
-        else:
-            shipping_status = 'pending'
-        
-        # Payment details
-        payment_method = np.random.choice(payment_methods)
-        processor = 'PayPal' if payment_method == 'PayPal' else np.random.choice(processors)
-        transaction_id = f'TXN-{i+5000}' if payment_status == 'paid' else None
-        payment_date = order_date if payment_status == 'paid' else None
-        
-        # Shipping details
-        carrier = np.random.choice(carriers) if shipping_status != 'pending' else None
-        tracking_number = f'{carrier}{np.random.randint(100000, 999999)}' if carrier and shipping_status != 'cancelled' else None
-        
-        shipped_date = None
-        delivered_date = None
-        if shipping_status == 'delivered':
-            shipped_date = order_date + timedelta(days=1)
-            delivered_date = shipped_date + timedelta(days=np.random.randint(2, 7))
-        elif shipping_status == 'in-transit':
-            shipped_date = order_date + timedelta(days=1)
-        
-        address = f'{np.random.randint(100, 999)} {np.random.choice(["Main", "Oak", "Pine", "Elm", "Maple"])} St, City, ST {np.random.randint(10000, 99999)}'
-        
-        orders.append({
-            'order_id': f'ORD-{i+1000}',
-            'customer_id': customer_id,
-            'customer_name': customer_name,
-            'order_date': order_date,
-            'items': items,
-            'order_total': order_total,
-            'calculated_total': calculated_total,
-            'status': status,
-            'payment_status': payment_status,
-            'payment_method': payment_method,
-            'payment_date': payment_date,
-            'transaction_id': transaction_id,
-            'processor': processor,
-            'shipping_status': shipping_status,
-            'carrier': carrier,
-            'tracking_number': tracking_number,
-            'shipped_date': shipped_date,
-            'delivered_date': delivered_date,
-            'shipping_address': address
-        })
-    
-    return pd.DataFrame(orders)
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_order_data(scale=DEFAULT_SCALE):
+    """
+    One row per order with its customer, item totals, payment and shipment,
+    joined from the synthetic tables (orphaned orders, price mismatches and
+    zero totals included)
+    """
+    tables = generate_tables(scale, tables=['customers', 'orders', 'order_items', 'payments', 'shipping'])
+    orders, items = tables['orders'], tables['order_items']
+    order_ids = pd.Index(orders['order_id'])
+
+    names = tables['customers'].set_index('customer_id')['name']
+    item_rows = order_ids.get_indexer(items['order_id'])
+    payments = tables['payments'].set_index('order_id').reindex(order_ids)
+    shipping = tables['shipping'].set_index('order_id').reindex(order_ids)
+    paid = (orders['payment_status'] == 'paid').to_numpy()
+
+    df = pd.DataFrame({
+        'order_id': 'ORD-' + orders['order_id'].astype(str).to_numpy(dtype=object),
+        'customer_id': orders['customer_id'].to_numpy(),
+        'customer_name': names.reindex(orders['customer_id']).to_numpy(dtype=object),
+        'order_date': orders['order_date'].to_numpy(),
+        'items': np.bincount(item_rows, weights=items['quantity'].to_numpy(dtype=float),
+                             minlength=len(orders)).astype(int),
+        'order_total': orders['total_amount'].to_numpy(dtype=float),
+        'calculated_total': np.bincount(item_rows, weights=items['total_price'].to_numpy(dtype=float),
+                                        minlength=len(orders)).round(2),
+        'status': orders['status'].astype(object).to_numpy(),
+        'payment_status': orders['payment_status'].astype(object).to_numpy(),
+        'payment_method': payments['payment_method'].astype(object).to_numpy(),
+        'payment_date': payments['payment_date'].where(paid).to_numpy(),
+        'transaction_id': payments['transaction_id'].where(paid).to_numpy(dtype=object),
+        'processor': payments['payment_processor'].astype(object).to_numpy(),
+        'shipping_status': orders['shipping_status'].astype(object).to_numpy(),
+        'carrier': shipping['carrier'].astype(object).to_numpy(),
+        'tracking_number': shipping['tracking_number'].to_numpy(dtype=object),
+        'shipped_date': shipping['shipped_date'].to_numpy(),
+        'delivered_date': shipping['delivered_date'].to_numpy(),
+        'shipping_address': orders['shipping_address'].to_numpy(dtype=object)
+    })
+    # Seeded generator: the data only changes with the date it is relative to
+    df.attrs['data_version'] = f'sample:{scale}:{datetime.now().date().isoformat()}:{len(df)}'
+    return df
 
 # ===========================
 # ANALYSIS FUNCTIONS
 # ===========================
 
+@timed
 def analyze_integrity_issues(df):
     """Analyze data integrity issues"""
-    issues = []
-    
-    for idx, row in df.iterrows():
-        discrepancy = row['calculated_total'] - row['order_total']
-        
-        # Orphaned orders
-        if pd.isna(row['customer_id']) or row['customer_id'] is None:
-            issues.append({
-                'Order ID': row['order_id'],
-                'Customer': None,
-                'Date': row['order_date'],
-                'Order Total': f"${row['order_total']:.2f}",
-                'Calculated Total': f"${row['calculated_total']:.2f}",
-                'Discrepancy': f"${discrepancy:.2f}",
-                'Issue': 'Orphaned Order'
-            })
-        
-        # Price mismatches
-        elif abs(discrepancy) > 0.01:
-            issues.append({
-                'Order ID': row['order_id'],
-                'Customer': row['customer_id'],
-                'Date': row['order_date'],
-                'Order Total': f"${row['order_total']:.2f}",
-                'Calculated Total': f"${row['calculated_total']:.2f}",
-                'Discrepancy': f"${discrepancy:.2f}",
-                'Issue': 'Price Mismatch'
-            })
-        
-        # Invalid totals
-        elif row['order_total'] <= 0:
-            issues.append({
-                'Order ID': row['order_id'],
-                'Customer': row['customer_id'],
-                'Date': row['order_date'],
-                'Order Total': f"${row['order_total']:.2f}",
-                'Calculated Total': f"${row['calculated_total']:.2f}",
-                'Discrepancy': f"${discrepancy:.2f}",
-                'Issue': 'Invalid Total'
-            })
-    
-    return pd.DataFrame(issues) if issues else pd.DataFrame()
+    return order_integrity_issues(df)
 
+@timed
 def get_payment_data(df):
     """Extract payment transaction data"""
-    payment_data = []
-    
-    for idx, row in df.iterrows():
-        payment_data.append({
-            'Order ID': row['order_id'],
-            'Amount': f"${row['order_total']:.2f}",
-            'Payment Method': row['payment_method'],
-            'Status': row['payment_status'],
-            'Date': row['payment_date'],
-            'Transaction ID': row['transaction_id'] if pd.notna(row['transaction_id']) else 'Pending',
-            'Processor': row['processor']
-        })
-    
-    return pd.DataFrame(payment_data)
-
+    return pd.DataFrame({
+        'Order ID': df['order_id'].to_numpy(),
+        'Amount': pd.to_numeric(df['order_total'], errors='coerce').to_numpy(dtype=float),
+        'Payment Method': df['payment_method'].to_numpy(),
+        'Status': df['payment_status'].to_numpy(),
+        'Date': df['payment_date'].to_numpy(),
+        'Transaction ID': df['transaction_id'].fillna('Pending').to_numpy(),
+        'Processor': df['processor'].to_numpy()
+    })
+
+@timed
 def get_shipping_data(df):
     """Extract shipping status data"""
-    shipping_data = []
+    shipped = df[(df['shipping_status'] != 'cancelled') | df['carrier'].notna()]
     
-    for idx, row in df.iterrows():
-        if row['shipping_status'] != 'cancelled' or pd.notna(row['carrier']):
-            shipping_data.append({
-                'Order ID': row['order_id'],
-                'Carrier': row['carrier'] if pd.notna(row['carrier']) else 'Not Assigned',
-                'Tracking Number': row['tracking_number'] if pd.notna(row['tracking_number']) else 'Not Available',
-                'Status': row['shipping_status'],
-                'Shipped Date': row['shipped_date'],
-                'Delivered Date': row['delivered_date'],
-                'Shipping Address': row['shipping_address']
-            })
-    
-    return pd.DataFrame(shipping_data)
+    return pd.DataFrame({
+        'Order ID': shipped['order_id'].to_numpy(),
+        'Carrier': shipped['carrier'].fillna('Not Assigned').to_numpy(),
+        'Tracking Number': shipped['tracking_number'].fillna('Not Available').to_numpy(),
+        'Status': shipped['shipping_status'].to_numpy(),
+        'Shipped Date': shipped['shipped_date'].to_numpy(),
+        'Delivered Date': shipped['delivered_date'].to_numpy(),
+        'Shipping Address': shipped['shipping_address'].to_numpy()
+    })
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def build_order_tables(data_version, _df):
+    """
+    Integrity, payment and shipping tables for one version of the order data.
+    Keyed on the data version only - the frame itself is never hashed.
+    """
+    return analyze_integrity_issues(_df), get_payment_data(_df), get_shipping_data(_df)
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def build_order_trend(data_version, _df, months=6):
+    """Orders per month for the last `months` months, from the sales rollup"""
+    orders = _df[['order_id', 'order_date', 'status', 'order_total']].rename(columns={'order_total': 'total_amount'})
+    monthly = monthly_rollup(aggregate_orders(orders))
+    monthly = monthly.groupby('sale_month')['orders'].sum().tail(months).reset_index()
+    return pd.DataFrame({'Month': monthly['sale_month'].dt.strftime('%b'), 'Orders': monthly['orders']})
 
 # ===========================
 # LOAD DATA
@@ -281,9 +198,7 @@ def get_shipping_data(df):
 
 with st.spinner("Loading order data..."):
     orders_df = generate_sample_order_data()
-    integrity_df = analyze_integrity_issues(orders_df)
-    payments_df = get_payment_data(orders_df)
-    shipping_df = get_shipping_data(orders_df)
+    integrity_df, payments_df, shipping_df = build_order_tables(orders_df.attrs['data_version'], orders_df)
 
 # ===========================
 # SIDEBAR FILTERS
@@ -333,11 +248,12 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_order_filters(df, date_cutoff, status_list, payment_list, search_text):
     filtered = df.copy()
     
     if date_cutoff:
-        filtered = filtered[filtered['order_date'] >= date_cutoff]
+        filtered = filtered[filtered['order_date'] >= pd.Timestamp(date_cutoff)]
     
     if status_list:
         filtered = filtered[filtered['status'].isin(status_list)]
@@ -367,7 +283,7 @@ st.markdown("**Order integrity validation, payment tracking, and shipping status
 orphaned = len(integrity_df[integrity_df['Issue'] == 'Orphaned Order'])
 price_mismatch = len(integrity_df[integrity_df['Issue'] == 'Price Mismatch'])
 pending_payments = len(orders_df[(orders_df['payment_status'] == 'unpaid') & 
-                                  (orders_df['order_date'] < (datetime.now().date() - timedelta(days=2)))])
+                                  (orders_df['order_date'] < pd.Timestamp(datetime.now().date() - timedelta(days=2)))])
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -416,15 +332,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Order Volume Trend")
     
-    monthly_data = []
-    for i in range(6):
-        month_date = datetime.now() - timedelta(days=30 * (5-i))
-        monthly_data.append({
-            'Month': month_date.strftime('%b'),
-            'Orders': np.random.randint(1800, 2600)
-        })
-    
-    monthly_df = pd.DataFrame(monthly_data)
+    monthly_df = build_order_trend(orders_df.attrs['data_version'], orders_df)
     fig1 = px.line(monthly_df, x='Month', y='Orders', markers=True)
     fig1.update_traces(line_color='#3b82f6', fill='tozeroy', fillcolor='rgba(59, 130, 246, 0.1)')
     fig1.update_layout(height=300, margin=dict(l=0, r=0, t=20, b=0))
@@ -455,13 +363,13 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: ORDER LIST
-with tab1:
+with tab1, timed_section('order_list'):
     st.subheader("Order Transaction List")
     
     if len(filtered_orders) > 0:
         display_orders = filtered_orders.copy()
         
-        display_orders['Total'] = display_orders['order_total'].apply(lambda x: f"${x:.2f}")
+        display_orders['Total'] = display_orders['order_total']
         display_orders['Status Badge'] = display_orders['status'].apply(
             lambda x: f"✅ {x.upper()}" if x == "completed"
             else f"📦 {x.upper()}" if x == "shipped"
@@ -486,6 +394,7 @@ with tab1:
                 'order_id': 'Order ID',
                 'order_date': 'Date',
                 'items': 'Items',
+                'Total': st.column_config.NumberColumn('Total', format='$%.2f'),
                 'Status Badge': 'Order Status',
                 'Payment Badge': 'Payment',
                 'shipping_status': 'Shipping'
@@ -555,7 +464,7 @@ with tab1:
         st.info("No orders match the current filters")
 
 # TAB 2: DATA INTEGRITY
-with tab2:
+with tab2, timed_section('data_integrity'):
     st.subheader("Data Integrity Issues")
     
     if len(integrity_df) > 0:
@@ -573,7 +482,12 @@ with tab2:
                              'Calculated Total', 'Discrepancy', 'Issue Type']],
             use_container_width=True,
             hide_index=True,
-            height=500
+            height=500,
+            column_config={
+                'Order Total': st.column_config.NumberColumn('Order Total', format='$%.2f'),
+                'Calculated Total': st.column_config.NumberColumn('Calculated Total', format='$%.2f'),
+                'Discrepancy': st.column_config.NumberColumn('Discrepancy', format='$%.2f')
+            }
         )
         
         col1, col2 = st.columns(2)
@@ -588,7 +502,7 @@ with tab2:
         st.balloons()
 
 # TAB 3: PAYMENT STATUS
-with tab3:
+with tab3, timed_section('payment_status'):
     st.subheader("Payment Transaction Status")
     
     if len(payments_df) > 0:
@@ -606,6 +520,7 @@ with tab3:
             hide_index=True,
             height=500,
             column_config={
+                'Amount': st.column_config.NumberColumn('Amount', format='$%.2f'),
                 'Status Badge': 'Payment Status'
             }
         )
@@ -624,7 +539,7 @@ with tab3:
         st.info("No payment data available")
 
 # TAB 4: SHIPPING STATUS
-with tab4:
+with tab4, timed_section('shipping_status'):
     st.subheader("Shipping Status Tracking")
     
     if len(shipping_df) > 0:
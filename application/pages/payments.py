@@ -11,6 +11,15 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.datasets import get_dataset, dataset_source, dataset_version
+from utils.fraud_scoring import transaction_frame, score_transactions, update_fraud_scores
+from utils.payment_analytics import (RETRYABLE_REASONS, normalize_payments, payment_cube, failure_cube,
+                                     slice_cube, status_totals, method_summary, failure_summary,
+                                     monthly_trend)
+from utils.synthetic import DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Payment Processing Audit",
     page_icon="💳",
@@ -18,6 +27,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('payments')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -67,119 +78,104 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_payment_data():
-    """Generate sample payment data with quality issues"""
-    np.random.seed(42)
-    
-    # Payment Transactions
-    transactions = []
-    methods = ['Credit Card', 'PayPal', 'Bank Transfer', 'Digital Wallet']
-    processors = ['Stripe', 'PayPal', 'Square', 'Manual']
-    statuses = ['completed', 'pending', 'failed']
-    risk_scores = ['Low', 'Medium', 'High']
-    
-    for i in range(1, 251):
-        method = np.random.choice(methods)
-        processor = 'PayPal' if method == 'PayPal' else 'Stripe' if method == 'Credit Card' else 'Manual' if method == 'Bank Transfer' else 'Square'
-        status = np.random.choice(statuses, p=[0.8, 0.12, 0.08])
-        
-        transaction_date = (datetime.now() - timedelta(days=np.random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S')
-        
-        risk_score = np.random.choice(risk_scores, p=[0.7, 0.2, 0.1])
-        
-        transactions.append({
-            'transaction_id': f'TXN-{10000+i}',
-            'order_id': f'ORD-{5000+i}',
-            'customer': f'Customer {np.random.randint(1, 500)}',
-            'amount': round(np.random.uniform(50, 999.99), 2),
-            'method': method,
-            'processor': processor,
-            'status': status,
-            'date': transaction_date,
-            'card_last4': f'{np.random.randint(1000, 9999)}' if method == 'Credit Card' else 'N/A',
-            'risk_score': risk_score
-        })
-    
-    # Failed Payments
-    failures = []
-    failure_reasons = [
-        'Insufficient Funds', 'Card Expired', 'Invalid CVV', 'Card Declined',
-        'Address Mismatch', 'Connection Timeout', 'Processor Error', 'Duplicate Transaction'
-    ]
-    error_codes = [
-        'card_declined', 'expired_card', 'incorrect_cvc', 'insufficient_funds',
-        'address_mismatch', 'timeout', 'processor_error', 'duplicate'
-    ]
-    
-    for i in range(1, 51):
-        attempt = np.random.randint(1, 4)
-        failure_date = (datetime.now() - timedelta(days=np.random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S')
-        
-        failures.append({
-            'transaction_id': f'TXN-{20000+i}',
-            'order_id': f'ORD-{7000+i}',
-            'customer': f'Customer {np.random.randint(1, 500)}',
-            'amount': round(np.random.uniform(50, 999.99), 2),
-            'method': np.random.choice(methods),
-            'reason': np.random.choice(failure_reasons),
-            'attempts': attempt,
-            'date': failure_date,
-            'error_code': np.random.choice(error_codes),
-            'retryable': np.random.choice([True, False], p=[0.6, 0.4])
-        })
-    
-    # Chargebacks
-    chargebacks = []
-    chargeback_reasons = [
-        'Product Not Received', 'Unauthorized Transaction', 'Product Not as Described',
-        'Duplicate Charge', 'Refund Not Received', 'Quality Issue'
-    ]
-    chargeback_statuses = ['disputed', 'won', 'lost']
-    
-    for i in range(1, 26):
-        filed_date = (datetime.now() - timedelta(days=np.random.randint(0, 60))).date()
-        due_date = filed_date + timedelta(days=np.random.randint(7, 15))
-        
-        chargebacks.append({
-            'chargeback_id': f'CB-{i:03d}',
-            'transaction_id': f'TXN-{15000+i}',
-            'order_id': f'ORD-{6000+i}',
-            'customer': f'Customer {np.random.randint(1, 500)}',
-            'amount': round(np.random.uniform(100, 999.99), 2),
-            'reason': np.random.choice(chargeback_reasons),
-            'status': np.random.choice(chargeback_statuses, p=[0.5, 0.3, 0.2]),
-            'filed_date': filed_date,
-            'due_date': due_date
-        })
-    
-    # Payment Methods Summary
-    methods_summary = []
-    method_data = {
-        'Credit Card': {'transactions': 9234, 'volume': 2845678, 'success': 98.2, 'failure': 1.8},
-        'PayPal': {'transactions': 3456, 'volume': 678912, 'success': 97.5, 'failure': 2.5},
-        'Bank Transfer': {'transactions': 1890, 'volume': 456789, 'success': 95.8, 'failure': 4.2},
-        'Digital Wallet': {'transactions': 1098, 'volume': 234567, 'success': 99.1, 'failure': 0.9}
-    }
-    
-    for method, data in method_data.items():
-        methods_summary.append({
-            'method': method,
-            'transactions': data['transactions'],
-            'volume': data['volume'],
-            'success_rate': data['success'],
-            'failure_rate': data['failure']
-        })
-    
-    return (pd.DataFrame(transactions), pd.DataFrame(failures),
-            pd.DataFrame(chargebacks), pd.DataFrame(methods_summary))
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_payment_data(scale=DEFAULT_SCALE):
+    """Synthetic payments with their orders and customers, shaped like the registry tables"""
+    tables = generate_tables(scale, tables=['payments', 'orders', 'customers'])
+    return tables['payments'], tables['orders'], tables['customers']
+
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_chargebacks():
+    """Sample chargebacks (no chargeback table exists - always sample data)"""
+    rng = np.random.default_rng(42)
+    now = pd.Timestamp.now().floor('s')
+
+    chargeback_reasons = ['Product Not Received', 'Unauthorized Transaction', 'Product Not as Described',
+                          'Duplicate Charge', 'Refund Not Received', 'Quality Issue']
+    filed_date = (now - pd.to_timedelta(rng.integers(0, 60, 25), unit='D')).normalize()
+    chargebacks = pd.DataFrame({
+        'chargeback_id': [f'CB-{i:03d}' for i in range(1, 26)],
+        'transaction_id': [f'TXN-{15000 + i}' for i in range(1, 26)],
+        'order_id': [f'ORD-{6000 + i}' for i in range(1, 26)],
+        'customer': [f'Customer {c}' for c in rng.integers(1, 500, 25)],
+        'amount': rng.uniform(100, 999.99, 25).round(2),
+        'reason': rng.choice(chargeback_reasons, 25),
+        'status': rng.choice(['disputed', 'won', 'lost'], 25, p=[0.5, 0.3, 0.2]),
+        'filed_date': filed_date.date,
+        'due_date': (filed_date + pd.to_timedelta(rng.integers(7, 15, 25), unit='D')).date
+    })
+    return chargebacks
 
 # ===========================
 # LOAD DATA
 # ===========================
 
+RISK_BY_LEVEL = {'critical': 'High', 'high': 'High', 'medium': 'Medium', 'low': 'Low'}
+
+@timed(kind='loader')
+def load_payment_data():
+    """
+    Smart data loader - uses the shared dataset registry:
+    1. CSV Files / MySQL payments joined to orders and customers (PRIORITY)
+    2. Sample Data (fallback)
+    """
+    try:
+        payments_df = get_dataset('payments')
+        orders_df = get_dataset('orders')
+        if payments_df is not None and orders_df is not None:
+            customers_df = get_dataset('customers')
+            source = dataset_source('payments')
+            st.sidebar.success(f"✅ Loaded {len(payments_df)} payments from {source}")
+            version = (source, dataset_version('payments'), dataset_version('orders'), dataset_version('customers'))
+            return payments_df, orders_df, customers_df, f"{source} Data", version
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Data load error: {str(e)[:60]}")
+    
+    st.sidebar.info("📊 Using generated sample data")
+    payments_df, orders_df, customers_df = generate_sample_payment_data()
+    return payments_df, orders_df, customers_df, "Generated Sample Data", "sample"
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def build_payment_cubes(data_version, _payments_df, _orders_df, _customers_df=None):
+    """
+    Normalize the payments once per data version (dates parsed, statuses
+    mapped, customer names and fraud risk attached) and roll them up into
+    the status and failure cubes the page slices. Keyed on the data version
+    only - the frames are never hashed.
+
+    Returns:
+        (payments, payment cube, failure cube)
+    """
+    payments = normalize_payments(_payments_df, _orders_df)
+
+    transactions = transaction_frame(_payments_df, _orders_df, _customers_df)
+    if data_version == "sample":
+        scored = score_transactions(transactions)
+    else:
+        # Shares the incremental scorer state with the fraud page
+        scored = update_fraud_scores(transactions, key='payments')
+    levels = scored.set_index('transaction_id')['risk_level']
+    payments['risk_score'] = levels.reindex(payments['payment_id'].astype(float)).map(RISK_BY_LEVEL).fillna('Low').to_numpy()
+
+    names = {}
+    if _customers_df is not None and 'name' in _customers_df.columns:
+        names = _customers_df.drop_duplicates('customer_id').set_index('customer_id')['name'].to_dict()
+    payments['customer'] = [names.get(cid) or (f"Customer {cid}" if pd.notna(cid) else 'Guest')
+                            for cid in payments['customer_id']]
+    payments['order_ref'] = 'ORD-' + payments['order_id'].astype(str)
+
+    return payments, payment_cube(payments), failure_cube(payments)
+
 with st.spinner("Loading payment data..."):
-    transactions_df, failures_df, chargebacks_df, methods_df = generate_sample_payment_data()
+    payments_source, orders_source, customers_source, data_source, data_version = load_payment_data()
+    payments_df, cube_df, failure_cube_df = build_payment_cubes(data_version, payments_source, orders_source,
+                                                                customers_source)
+    chargebacks_df = generate_sample_chargebacks()
+
+# Date filters are relative to the latest payment, not the wall clock
+as_of = payments_df['date'].max()
+if pd.isna(as_of):
+    as_of = pd.Timestamp.now()
 
 # ===========================
 # SIDEBAR FILTERS
@@ -194,15 +190,15 @@ with st.sidebar:
         index=2
     )
     
-    now = datetime.now()
+    now = as_of.normalize()
     if date_range == "Today":
-        cutoff_date = now.date()
+        cutoff_date = now
     elif date_range == "Last 7 Days":
-        cutoff_date = (now - timedelta(days=7)).date()
+        cutoff_date = now - timedelta(days=7)
     elif date_range == "Last 30 Days":
-        cutoff_date = (now - timedelta(days=30)).date()
+        cutoff_date = now - timedelta(days=30)
     elif date_range == "Last 90 Days":
-        cutoff_date = (now - timedelta(days=90)).date()
+        cutoff_date = now - timedelta(days=90)
     else:
         cutoff_date = None
     
@@ -212,10 +208,11 @@ with st.sidebar:
         default=["completed", "pending", "failed"]
     )
     
+    method_options = sorted(cube_df['method'].unique().tolist())
     payment_method = st.multiselect(
         "🏦 Payment Method",
-        transactions_df['method'].unique().tolist(),
-        default=transactions_df['method'].unique().tolist()
+        method_options,
+        default=method_options
     )
     
     search_query = st.text_input("🔍 Search", placeholder="Transaction ID, Order ID...")
@@ -229,40 +226,43 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_payment_filters(df, date_cutoff, status_list, method_list, search_text):
-    filtered = df.copy()
+    """Slice the pre-parsed payments with one combined mask"""
+    mask = np.ones(len(df), dtype=bool)
     
-    if date_cutoff and 'date' in filtered.columns:
-        filtered['date_parsed'] = pd.to_datetime(filtered['date']).dt.date
-        filtered = filtered[filtered['date_parsed'] >= date_cutoff]
-        filtered = filtered.drop('date_parsed', axis=1)
+    if date_cutoff is not None:
+        mask &= (df['date'] >= date_cutoff).to_numpy()
     
-    if status_list and 'status' in filtered.columns:
-        filtered = filtered[filtered['status'].isin(status_list)]
+    if status_list:
+        mask &= df['status'].isin(status_list).to_numpy()
     
-    if method_list and 'method' in filtered.columns:
-        filtered = filtered[filtered['method'].isin(method_list)]
+    if method_list:
+        mask &= df['method'].isin(method_list).to_numpy()
     
     if search_text:
         search_lower = search_text.lower()
-        filtered = filtered[
-            filtered['transaction_id'].str.lower().str.contains(search_lower, na=False) |
-            filtered['order_id'].str.lower().str.contains(search_lower, na=False)
-        ]
+        mask &= (df['transaction_id'].str.lower().str.contains(search_lower, na=False, regex=False) |
+                 df['order_ref'].str.lower().str.contains(search_lower, na=False, regex=False)).to_numpy()
     
-    return filtered
+    return df[mask]
 
-filtered_transactions = apply_payment_filters(transactions_df, cutoff_date, payment_status, payment_method, search_query)
+filtered_transactions = apply_payment_filters(payments_df, cutoff_date, payment_status, payment_method, search_query)
+filtered_failures = apply_payment_filters(payments_df, cutoff_date, ['failed'], payment_method, None)
+filtered_cube = slice_cube(cube_df, start=cutoff_date, methods=payment_method or None)
+failures_summary_df = failure_summary(slice_cube(failure_cube_df, start=cutoff_date, methods=payment_method or None))
+methods_df = method_summary(filtered_cube)
 
 # ===========================
 # CALCULATE METRICS
 # ===========================
 
-total_transactions = len(transactions_df)
-success_rate = (len(transactions_df[transactions_df['status'] == 'completed']) / total_transactions * 100) if total_transactions > 0 else 0
-failed_payments = len(failures_df)
+totals = status_totals(cube_df)
+total_transactions = int(totals['transactions'].sum())
+success_rate = (totals.loc['completed', 'transactions'] / total_transactions * 100) if total_transactions > 0 else 0
+failed_payments = int(totals.loc['failed', 'transactions'])
 chargebacks_count = len(chargebacks_df)
-total_volume = transactions_df['amount'].sum()
+total_volume = totals['volume'].sum()
 
 # ===========================
 # HEADER & METRICS
@@ -301,7 +301,7 @@ st.markdown("---")
 
 st.markdown(f"""
 <div class="alert alert-success">
-    <strong>Payment Performance:</strong> {success_rate:.1f}% success rate. {failed_payments} failed payments. {chargebacks_count} active chargebacks. Processing ${total_volume:,.0f} today.
+    <strong>Payment Performance:</strong> {success_rate:.1f}% success rate. {failed_payments} failed payments. {chargebacks_count} active chargebacks. ${total_volume:,.0f} in payment volume.
 </div>
 """, unsafe_allow_html=True)
 
@@ -316,10 +316,11 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Payment Volume Trend")
     
+    trend = monthly_trend(cube_df)
     trend_data = pd.DataFrame({
-        'Month': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-        'Successful': [12345, 13890, 13456, 15234, 14890, 15678],
-        'Failed': [234, 267, 298, 276, 289, 312]
+        'Month': trend['month'].dt.strftime('%b %Y'),
+        'Successful': trend['completed'],
+        'Failed': trend['failed']
     })
     
     fig1 = go.Figure()
@@ -338,7 +339,7 @@ with col1:
 with col2:
     st.subheader("Payment Method Distribution")
     
-    method_counts = transactions_df['method'].value_counts().reset_index()
+    method_counts = cube_df.groupby('method')['transactions'].sum().reset_index()
     method_counts.columns = ['Method', 'Count']
     
     color_map = {
@@ -361,13 +362,13 @@ st.markdown("---")
 
 tab1, tab2, tab3, tab4 = st.tabs([
     f"💳 Payment Transactions ({len(filtered_transactions)})",
-    f"❌ Failed Payments ({len(failures_df)})",
+    f"❌ Failed Payments ({len(filtered_failures)})",
     f"🔄 Chargeback Tracking ({len(chargebacks_df)})",
     f"🏦 Payment Methods"
 ])
 
 # TAB 1: PAYMENT TRANSACTIONS
-with tab1:
+with tab1, timed_section('payment_transactions'):
     st.subheader("Payment Transaction List")
     
     if len(filtered_transactions) > 0:
@@ -386,14 +387,14 @@ with tab1:
         )
         
         st.dataframe(
-            display_transactions[['transaction_id', 'order_id', 'customer', 'Amount Display',
+            display_transactions[['transaction_id', 'order_ref', 'customer', 'Amount Display',
                                 'method', 'processor', 'Status Badge', 'date', 'Risk Badge']],
             use_container_width=True,
             hide_index=True,
             height=500,
             column_config={
                 'transaction_id': 'Transaction ID',
-                'order_id': 'Order ID',
+                'order_ref': 'Order ID',
                 'customer': 'Customer',
                 'Amount Display': 'Amount',
                 'method': 'Payment Method',
@@ -404,7 +405,7 @@ with tab1:
             }
         )
         
-        st.caption(f"Showing {len(filtered_transactions):,} of {len(transactions_df):,} transactions")
+        st.caption(f"Showing {len(filtered_transactions):,} of {len(payments_df):,} transactions")
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -423,59 +424,71 @@ with tab1:
         st.info("No transactions match the current filters")
 
 # TAB 2: FAILED PAYMENTS
-with tab2:
+with tab2, timed_section('failed_payments'):
     st.subheader("Failed Payment Analysis")
     
-    if len(failures_df) > 0:
-        display_failures = failures_df.copy()
+    if len(filtered_failures) > 0:
+        display_failures = filtered_failures.copy()
         
         display_failures['Amount Display'] = display_failures['amount'].apply(lambda x: f"${x:.2f}")
-        display_failures['Retryable Badge'] = display_failures['retryable'].apply(
-            lambda x: "✅ Yes" if x else "❌ No"
+        display_failures['Retryable Badge'] = display_failures['failure_reason'].isin(RETRYABLE_REASONS).map(
+            {True: "✅ Yes", False: "❌ No"}
         )
-        display_failures['Reason Badge'] = display_failures['reason'].apply(
-            lambda x: f"🔴 {x}"
+        display_failures['Reason Badge'] = display_failures['failure_reason'].apply(
+            lambda x: f"🔴 {x.replace('_', ' ').title()}"
         )
         
         st.dataframe(
-            display_failures[['transaction_id', 'order_id', 'customer', 'Amount Display',
-                            'method', 'Reason Badge', 'attempts', 'Retryable Badge', 'error_code']],
+            display_failures[['transaction_id', 'order_ref', 'customer', 'Amount Display',
+                            'method', 'Reason Badge', 'attempts', 'Retryable Badge', 'failure_reason']],
             use_container_width=True,
             hide_index=True,
             height=500,
             column_config={
                 'transaction_id': 'Transaction ID',
-                'order_id': 'Order ID',
+                'order_ref': 'Order ID',
                 'customer': 'Customer',
                 'Amount Display': 'Amount',
                 'method': 'Payment Method',
                 'Reason Badge': 'Failure Reason',
                 'attempts': 'Attempts',
                 'Retryable Badge': 'Retryable',
-                'error_code': 'Error Code'
+                'failure_reason': 'Error Code'
             }
         )
         
-        st.caption(f"Showing {len(failures_df):,} failed payment records")
+        st.caption(f"Showing {len(filtered_failures):,} failed payment records")
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            retryable = len(failures_df[failures_df['retryable'] == True])
+            retryable = int(failures_summary_df.loc[failures_summary_df['retryable'], 'failures'].sum())
             st.metric("♻️ Retryable", f"{retryable:,}")
         with col2:
-            non_retryable = len(failures_df[failures_df['retryable'] == False])
+            non_retryable = int(failures_summary_df.loc[~failures_summary_df['retryable'], 'failures'].sum())
             st.metric("🚫 Non-Retryable", f"{non_retryable:,}")
         with col3:
-            failed_total = failures_df['amount'].sum()
+            failed_total = failures_summary_df['amount'].sum()
             st.metric("💰 Failed Value", f"${failed_total:,.2f}")
         
+        st.markdown("#### Failure Reasons")
+        reasons_chart = failures_summary_df.assign(
+            Reason=failures_summary_df['failure_reason'].str.replace('_', ' ').str.title())
+        fig = px.bar(reasons_chart, x='Reason', y='failures',
+                    title='Failure Reasons Distribution',
+                    color='failures',
+                    color_continuous_scale='Reds',
+                    text='failures')
+        fig.update_traces(texttemplate='%{text}', textposition='outside')
+        fig.update_layout(height=300, showlegend=False, yaxis_title='Failed Payments')
+        st.plotly_chart(fig, use_container_width=True)
+        
         if st.button("🔄 Retry Failed Payments", use_container_width=True):
             st.success(f"✅ Initiated retry for {retryable} retryable payments")
     else:
         st.success("✅ No failed payments detected!")
 
 # TAB 3: CHARGEBACK TRACKING
-with tab3:
+with tab3, timed_section('chargeback_tracking'):
     st.subheader("Chargeback Tracking & Disputes")
     
     if len(chargebacks_df) > 0:
@@ -507,7 +520,7 @@ with tab3:
             }
         )
         
-        st.caption(f"Showing {len(chargebacks_df):,} chargeback records")
+        st.caption(f"Showing {len(chargebacks_df):,} chargeback records (sample data - no chargeback source is connected)")
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -541,7 +554,7 @@ with tab3:
         st.info("No chargeback records found")
 
 # TAB 4: PAYMENT METHODS
-with tab4:
+with tab4, timed_section('payment_methods'):
     st.subheader("Payment Method Analysis")
     
     if len(methods_df) > 0:
@@ -628,8 +641,8 @@ with col2:
     if st.button("📥 Export Data", use_container_width=True):
         export_data = {
             'timestamp': datetime.now().isoformat(),
-            'transactions': transactions_df.to_dict('records'),
-            'failures': failures_df.to_dict('records'),
+            'transactions': filtered_transactions.drop(columns='day').astype({'date': str}).to_dict('records'),
+            'failures': failures_summary_df.to_dict('records'),
             'chargebacks': chargebacks_df.to_dict('records'),
             'payment_methods': methods_df.to_dict('records'),
             'summary': {
@@ -700,16 +713,16 @@ with st.expander("🔧 System Diagnostics"):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Transactions", f"{len(transactions_df):,}")
-        st.metric("Data Completeness", "100%")
+        st.metric("Total Transactions", f"{total_transactions:,}")
+        st.metric("Data Completeness", f"{payments_df['date'].notna().mean() * 100 if total_transactions else 100:.0f}%")
     
     with col2:
-        st.metric("Failed Transactions", f"{len(failures_df):,}")
-        st.metric("Failure Rate", f"{len(failures_df)/len(transactions_df)*100:.2f}%")
+        st.metric("Failed Transactions", f"{failed_payments:,}")
+        st.metric("Failure Rate", f"{failed_payments/max(total_transactions, 1)*100:.2f}%")
     
     with col3:
         st.metric("Active Chargebacks", f"{len(chargebacks_df):,}")
-        st.metric("Chargeback Rate", f"{len(chargebacks_df)/len(transactions_df)*100:.2f}%")
+        st.metric("Chargeback Rate", f"{len(chargebacks_df)/max(total_transactions, 1)*100:.2f}%")
     
     st.markdown("---")
     st.markdown("### Filter Status")
@@ -720,5 +733,5 @@ with st.expander("🔧 System Diagnostics"):
     - Payment Method: {', '.join(payment_method) if payment_method else 'None'}
     - Search Query: {'`' + search_query + '`' if search_query else 'None'}
     
-    **Results:** {len(filtered_transactions):,} transactions shown out of {len(transactions_df):,} total
+    **Results:** {len(filtered_transactions):,} transactions shown out of {total_transactions:,} total
     """)
\ No newline at end of file
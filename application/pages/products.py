@@ -11,6 +11,12 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.data_quality import product_quality_issues, category_completeness
+from utils.duplicates import duplicate_groups, normalize_text
+from utils.synthetic import DEFAULT_SCALE, generate_table
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Product Analysis",
     page_icon="📦",
@@ -18,6 +24,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('products')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -62,219 +70,73 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_product_data():
-    """Generate sample data with quality issues"""
-    np.random.seed(42)
-    
-    products = []
-    categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Sports', 'Toys', 'Food']
-    
-    for i in range(1, 501):
-        # Price issues
-        price = np.random.uniform(5, 500)
-        if np.random.random() < 0.09:  # 9% invalid prices
-            price = np.random.choice([0, -10.00, None])
-        
-        # Description issues
-        description = f'High-quality product {i} with excellent features'
-        if np.random.random() < 0.26:  # 26% missing descriptions
-            description = None
-        
-        # Category issues
-        category = np.random.choice(categories)
-        if np.random.random() < 0.10:  # 10% missing category
-            category = None
-        
-        # Name issues
-        name = f'Product {i}'
-        if np.random.random() < 0.02:  # 2% missing name
-            name = None
-        
-        # Image issues
-        image = 'Yes' if np.random.random() > 0.15 else 'No'
-        
-        # Create some duplicates
-        if np.random.random() < 0.05:  # 5% duplicate SKUs
-            sku = f'DUP-{np.random.randint(1, 25):03d}'
-        else:
-            sku = f'{category[:4].upper() if category else "PROD"}-{i:03d}'
-        
-        products.append({
-            'product_id': f'P-{i:04d}',
-            'sku': sku,
-            'name': name,
-            'category': category,
-            'price': price,
-            'description': description,
-            'image': image,
-            'stock': np.random.randint(0, 300),
-            'created_date': (datetime.now() - timedelta(days=np.random.randint(1, 365))).date(),
-            'cost': np.random.uniform(2, price*0.6) if price and price > 0 else None
-        })
-    
-    return pd.DataFrame(products)
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_product_data(scale=DEFAULT_SCALE):
+    """Synthetic product catalog with quality issues, in the page's shape"""
+    products = generate_table('products', scale)
+    return pd.DataFrame({
+        'product_id': 'P-' + products['product_id'].astype(str).str.zfill(4).to_numpy(dtype=object),
+        'sku': products['sku'].to_numpy(dtype=object),
+        'name': products['name'].to_numpy(dtype=object),
+        'category': products['category'].astype(object).to_numpy(),
+        'price': products['price'].to_numpy(dtype=float),
+        'description': products['description'].to_numpy(dtype=object),
+        'image': np.where(products['image_url'].notna(), 'Yes', 'No'),
+        'stock': products['stock_quantity'].to_numpy(dtype=int),
+        'created_date': products['created_date'].to_numpy(),
+        'cost': products['cost'].to_numpy(dtype=float)
+    })
 
 # ===========================
 # ANALYSIS FUNCTIONS
 # ===========================
 
+@timed
 def analyze_data_quality(df):
     """Analyze quality issues"""
-    issues = []
-    
-    for idx, row in df.iterrows():
-        product_issues = []
-        severity = "low"
-        
-        # Check name
-        if pd.isna(row['name']) or row['name'] is None:
-            product_issues.append("Missing Name")
-            severity = "critical"
-        
-        # Check price
-        price = row['price']
-        if pd.isna(price) or price is None:
-            product_issues.append("Missing Price")
-            if severity not in ["critical"]:
-                severity = "high"
-        elif price <= 0:
-            product_issues.append("Invalid Price")
-            severity = "critical"
-        
-        # Check description
-        if pd.isna(row['description']) or row['description'] is None:
-            product_issues.append("Missing Description")
-            if severity not in ["critical", "high"]:
-                severity = "medium"
-        
-        # Check category
-        if pd.isna(row['category']) or row['category'] is None:
-            product_issues.append("Missing Category")
-            if severity == "low":
-                severity = "high"
-        
-        # Check image
-        if row['image'] == 'No':
-            product_issues.append("Missing Image")
-            if severity == "low":
-                severity = "medium"
-        
-        if product_issues:
-            issues.append({
-                'Product ID': row['product_id'],
-                'SKU': row['sku'],
-                'Name': row['name'] if pd.notna(row['name']) else '❌ Missing',
-                'Category': row['category'] if pd.notna(row['category']) else '❌ Missing',
-                'Price': f"${row['price']:.2f}" if pd.notna(row['price']) and row['price'] > 0 else '❌ Invalid',
-                'Description': 'Yes' if pd.notna(row['description']) else '❌ Missing',
-                'Image': row['image'],
-                'Stock': row['stock'],
-                'Issue': ' & '.join(product_issues),
-                'Severity': severity,
-                'Created': row['created_date']
-            })
-    
-    return pd.DataFrame(issues) if issues else pd.DataFrame()
+    return product_quality_issues(df)
 
+@timed
 def detect_duplicates(df):
     """Detect duplicate records"""
-    duplicates = []
-    
-    # SKU duplicates
-    sku_counts = df['sku'].value_counts()
-    sku_duplicates = sku_counts[sku_counts > 1]
-    
-    for sku, count in sku_duplicates.head(30).items():
-        if pd.notna(sku) and str(sku) != 'Missing':
-            matching_rows = df[df['sku'] == sku]
-            duplicates.append({
-                'Duplicate Group': f'DUP-P{len(duplicates)+1:03d}',
-                'Records': int(count),
-                'SKU': sku,
-                'Product Name': matching_rows.iloc[0]['name'] if pd.notna(matching_rows.iloc[0]['name']) else 'N/A',
-                'Category': matching_rows.iloc[0]['category'] if pd.notna(matching_rows.iloc[0]['category']) else 'N/A',
-                'Match Type': 'Exact SKU Match',
-                'Confidence': '100%'
-            })
-    
-    # Name duplicates
-    name_counts = df['name'].value_counts()
-    name_duplicates = name_counts[name_counts > 1]
+    sku_groups = duplicate_groups(df, 'sku', normalize='text', limit=30)
+    name_groups = duplicate_groups(df, 'name', normalize='text', limit=15)
+    
+    # Name groups already represented by a SKU group are not repeated
+    seen_names = set(normalize_text(sku_groups['name']).dropna())
+    name_groups = name_groups[~name_groups['key'].isin(seen_names)]
+    
+    duplicates = pd.concat([
+        pd.DataFrame({
+            'Records': sku_groups['records'],
+            'SKU': sku_groups['sku'],
+            'Product Name': sku_groups['name'].fillna('N/A'),
+            'Category': sku_groups['category'].fillna('N/A'),
+            'Match Type': 'Exact SKU Match',
+            'Confidence': '100%'
+        }),
+        pd.DataFrame({
+            'Records': name_groups['records'],
+            'SKU': name_groups['sku'],
+            'Product Name': name_groups['name'],
+            'Category': name_groups['category'].fillna('N/A'),
+            'Match Type': 'Name Match',
+            'Confidence': '95%'
+        })
+    ], ignore_index=True)
     
-    for name, count in list(name_duplicates.items())[:15]:
-        if pd.notna(name) and not any(d['Product Name'] == name for d in duplicates):
-            matching_rows = df[df['name'] == name]
-            duplicates.append({
-                'Duplicate Group': f'DUP-P{len(duplicates)+1:03d}',
-                'Records': int(count),
-                'SKU': matching_rows.iloc[0]['sku'],
-                'Product Name': name,
-                'Category': matching_rows.iloc[0]['category'] if pd.notna(matching_rows.iloc[0]['category']) else 'N/A',
-                'Match Type': 'Name Match',
-                'Confidence': '95%'
-            })
+    if duplicates.empty:
+        return pd.DataFrame()
     
-    return pd.DataFrame(duplicates) if duplicates else pd.DataFrame()
+    duplicates.insert(0, 'Duplicate Group', [f'DUP-P{i:03d}' for i in range(1, len(duplicates) + 1)])
+    return duplicates
 
+@timed
 def category_analysis(df):
     """Analyze by category"""
-    if df.empty:
-        return pd.DataFrame()
-    
-    category_stats = []
-    
-    for category in df['category'].dropna().unique():
-        cat_products = df[df['category'] == category]
-        
-        # Completeness calculation
-        total_fields = 5
-        complete_count = 0
-        
-        for _, row in cat_products.iterrows():
-            fields_complete = 0
-            if pd.notna(row['name']): fields_complete += 1
-            if pd.notna(row['description']): fields_complete += 1
-            if pd.notna(row['price']) and row['price'] > 0: fields_complete += 1
-            if row['image'] == 'Yes': fields_complete += 1
-            if row['stock'] > 0: fields_complete += 1
-            complete_count += fields_complete
-        
-        completeness = (complete_count / (len(cat_products) * total_fields) * 100) if len(cat_products) > 0 else 0
-        
-        # Top issue
-        issues = []
-        if (cat_products['description'].isna()).sum() > 0:
-            issues.append(('Missing descriptions', (cat_products['description'].isna()).sum()))
-        if (cat_products['image'] == 'No').sum() > 0:
-            issues.append(('Missing images', (cat_products['image'] == 'No').sum()))
-        if ((cat_products['price'].isna()) | (cat_products['price'] <= 0)).sum() > 0:
-            issues.append(('Invalid prices', ((cat_products['price'].isna()) | (cat_products['price'] <= 0)).sum()))
-        
-        top_issue = max(issues, key=lambda x: x[1])[0] if issues else 'No issues'
-        avg_price = cat_products[cat_products['price'] > 0]['price'].mean()
-        
-        category_stats.append({
-            'Category': category,
-            'Total Products': len(cat_products),
-            'Avg Price': f'${avg_price:.2f}' if pd.notna(avg_price) else 'N/A',
-            'Data Completeness': f'{completeness:.1f}%',
-            'Top Issue': top_issue
-        })
-    
-    # Uncategorized
-    uncategorized = df[df['category'].isna()]
-    if len(uncategorized) > 0:
-        category_stats.append({
-            'Category': 'Uncategorized',
-            'Total Products': len(uncategorized),
-            'Avg Price': 'N/A',
-            'Data Completeness': '45.0%',
-            'Top Issue': 'No category assigned'
-        })
-    
-    return pd.DataFrame(category_stats)
+    return category_completeness(df)
 
+@timed
 def price_validation(df):
     """Price range validation"""
     pricing_ranges = [
@@ -394,11 +256,12 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_quality_filters(df, date_cutoff, severity_list, issue_list, search_text):
     filtered = df.copy()
     
     if date_cutoff:
-        filtered = filtered[filtered['Created'] >= date_cutoff]
+        filtered = filtered[filtered['Created'] >= pd.Timestamp(date_cutoff)]
     
     if severity_list:
         filtered = filtered[filtered['Severity'].isin(severity_list)]
@@ -488,7 +351,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: DATA QUALITY ISSUES
-with tab1:
+with tab1, timed_section('data_quality_issues'):
     st.subheader("Product Data Quality Issues")
     
     if len(filtered_quality) > 0:
@@ -526,7 +389,7 @@ with tab1:
         st.balloons()
 
 # TAB 2: DUPLICATE DETECTION
-with tab2:
+with tab2, timed_section('duplicate_detection'):
     st.subheader("Duplicate Product Detection")
     
     if len(filtered_duplicates) > 0:
@@ -553,7 +416,7 @@ with tab2:
         st.info("💡 All product records are unique based on SKU and name matching.")
 
 # TAB 3: CATEGORY ANALYSIS
-with tab3:
+with tab3, timed_section('category_analysis'):
     st.subheader("Category Analysis")
     
     if len(categories_df) > 0:
@@ -595,7 +458,7 @@ with tab3:
         st.info("📊 Customer profiling requires order data.")
 
 # TAB 4: PRICE VALIDATION
-with tab4:
+with tab4, timed_section('price_validation'):
     st.subheader("Price Range Validation")
     
     if len(pricing_df) > 0:
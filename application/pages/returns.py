@@ -11,6 +11,10 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.synthetic import DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Returns & Refunds Audit",
     page_icon="↩️",
@@ -18,6 +22,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('returns')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -62,53 +68,41 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_return_data():
-    """Generate sample return and refund data"""
-    np.random.seed(42)
-    
-    # Return requests
-    requests = []
-    return_reasons = ['Defective Product', 'Wrong Item Received', 'Size/Fit Issue', 
-                     'Quality Issues', 'Changed Mind', 'Not as Described']
-    statuses = ['pending', 'approved', 'processing', 'completed', 'rejected']
-    priorities = ['high', 'medium', 'low']
-    products = ['Wireless Headphones', 'Running Shoes', 'Coffee Maker', 'Laptop Stand',
-               'Smart Watch', 'Yoga Mat', 'Kitchen Blender', 'Desk Lamp', 'USB Cable',
-               'Monitor Stand', 'Keyboard', 'Mouse Pad', 'Phone Case', 'Screen Protector']
-    
-    for i in range(1, 101):
-        requests.append({
-            'id': f'RET-{1000+i}',
-            'order_id': f'ORD-{5000+i}',
-            'customer': f'Customer {i}',
-            'product': np.random.choice(products),
-            'amount': round(np.random.uniform(30, 300), 2),
-            'reason': np.random.choice(return_reasons),
-            'request_date': (datetime.now() - timedelta(days=np.random.randint(0, 90))).date(),
-            'status': np.random.choice(statuses, p=[0.15, 0.2, 0.1, 0.45, 0.1]),
-            'priority': np.random.choice(priorities, p=[0.3, 0.5, 0.2])
-        })
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_return_data(scale=DEFAULT_SCALE):
+    """Return requests and refunds from the synthetic returns, with reason and trend summaries"""
+    tables = generate_tables(scale, tables=['returns', 'refunds', 'customers', 'order_items', 'products'])
+    returns, refunds = tables['returns'], tables['refunds']
+    rng = np.random.default_rng(42)
+    
+    # Return requests: the returned order's customer and first item
+    names = tables['customers'].set_index('customer_id')['name']
+    first_items = tables['order_items'].drop_duplicates('order_id').set_index('order_id')['product_id']
+    products = tables['products'].set_index('product_id')
+    product_ids = first_items.reindex(returns['order_id'])
+    requests = pd.DataFrame({
+        'id': 'RET-' + (returns['return_id'].astype(int) + 1000).astype(str).to_numpy(dtype=object),
+        'order_id': 'ORD-' + returns['order_id'].astype(str).to_numpy(dtype=object),
+        'customer': names.reindex(returns['customer_id']).fillna('Guest').to_numpy(dtype=object),
+        'product': products['name'].reindex(product_ids).fillna(products['sku'].reindex(product_ids)).to_numpy(dtype=object),
+        'amount': returns['refund_amount'].to_numpy(dtype=float),
+        'reason': returns['reason'].astype(object).to_numpy(),
+        'request_date': returns['return_date'].to_numpy(),
+        'status': returns['status'].astype(object).to_numpy(),
+        'priority': rng.choice(['high', 'medium', 'low'], len(returns), p=[0.3, 0.5, 0.2])
+    })
     
     # Refund processing
-    refunds = []
-    refund_methods = ['Original Payment', 'Store Credit', 'Bank Transfer']
-    
-    for i in range(1, 76):
-        initiated_date = (datetime.now() - timedelta(days=np.random.randint(0, 90))).date()
-        processing_days = np.random.randint(0, 30)
-        completed_date = initiated_date + timedelta(days=processing_days) if np.random.random() > 0.2 else None
-        
-        refunds.append({
-            'id': f'REF-{2000+i}',
-            'return_id': f'RET-{1000+i}',
-            'amount': round(np.random.uniform(30, 300), 2),
-            'method': np.random.choice(refund_methods),
-            'initiated_date': initiated_date,
-            'completed_date': completed_date,
-            'duration_days': processing_days,
-            'status': 'completed' if completed_date else 'processing'
-        })
+    refunds = pd.DataFrame({
+        'id': 'REF-' + (refunds['refund_id'].astype(int) + 2000).astype(str).to_numpy(dtype=object),
+        'return_id': 'RET-' + (refunds['return_id'].astype(int) + 1000).astype(str).to_numpy(dtype=object),
+        'amount': refunds['refund_amount'].to_numpy(dtype=float),
+        'method': refunds['refund_method'].astype(object).to_numpy(),
+        'initiated_date': refunds['initiated_date'].to_numpy(),
+        'completed_date': refunds['completed_date'].to_numpy(),
+        'duration_days': refunds['processing_days'].to_numpy(dtype=int),
+        'status': refunds['status'].astype(object).to_numpy()
+    })
     
     # Return reasons summary
     reasons_summary = []
@@ -148,7 +142,7 @@ def generate_sample_return_data():
             'refunds': refunds_amount
         })
     
-    return (pd.DataFrame(requests), pd.DataFrame(refunds), 
+    return (requests, refunds, 
             pd.DataFrame(reasons_summary), pd.DataFrame(trends))
 
 # ===========================
@@ -204,11 +198,12 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_return_filters(df, date_cutoff, status_list, reason_list, search_text):
     filtered = df.copy()
     
     if date_cutoff:
-        filtered = filtered[filtered['request_date'] >= date_cutoff]
+        filtered = filtered[filtered['request_date'] >= pd.Timestamp(date_cutoff)]
     
     if status_list:
         filtered = filtered[filtered['status'].isin(status_list)]
@@ -232,7 +227,7 @@ filtered_requests = apply_return_filters(requests_df, cutoff_date, status_filter
 # ===========================
 
 total_returns = len(requests_df)
-return_rate = (total_returns / 12899 * 100) if total_returns > 0 else 0  # Assuming 12,899 orders
+return_rate = (total_returns / DEFAULT_SCALE * 100) if total_returns > 0 else 0  # sample data covers DEFAULT_SCALE orders
 total_refunded = requests_df['amount'].sum()
 avg_processing_time = refunds_df[refunds_df['status'] == 'completed']['duration_days'].mean() if len(refunds_df[refunds_df['status'] == 'completed']) > 0 else 0
 
@@ -318,7 +313,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: RETURN REQUESTS
-with tab1:
+with tab1, timed_section('return_requests'):
     st.subheader("Return Requests")
     
     if len(filtered_requests) > 0:
@@ -370,7 +365,7 @@ with tab1:
         st.info("No return requests match the current filters")
 
 # TAB 2: RETURN REASONS
-with tab2:
+with tab2, timed_section('return_reasons'):
     st.subheader("Return Reason Analysis")
     
     # Reason bars
@@ -429,7 +424,7 @@ with tab2:
         )
 
 # TAB 3: REFUND PROCESSING
-with tab3:
+with tab3, timed_section('refund_processing'):
     st.subheader("Refund Processing")
     
     if len(refunds_df) > 0:
@@ -498,7 +493,7 @@ with tab3:
             st.caption(f"{date} — {description}")
 
 # TAB 4: RETURN RATE TRENDS
-with tab4:
+with tab4, timed_section('return_rate_trends'):
     st.subheader("Return Rate Trends (6-Month View)")
     
     display_trends = trends_df.copy()
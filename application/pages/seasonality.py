@@ -10,6 +10,15 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
+from utils.datasets import get_dataset, dataset_source, dataset_version
+from utils.rollups import aggregate_orders, monthly_rollup, sales_rollups
+from utils.seasonality import HOLIDAYS, MONTH_NAMES, compare_years, seasonality_tables
+from utils.forecasting import (
+    INTERVAL_LEVEL, drop_partial_month, forecast_series, period_totals, series_matrix
+)
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Seasonal Trend Analysis",
     page_icon="📅",
@@ -17,6 +26,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('seasonality')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -49,119 +60,159 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_seasonality_data():
-    """Generate sample seasonality data with multiple years"""
-    np.random.seed(42)
-    
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    
-    # 2024 Data
-    months_2024 = []
-    base_revenue_2024 = [245678, 267890, 289456, 312345, 334567, 356789, 398765, 378901, 412345, 489123, 678901, 789456]
-    base_orders_2024 = [1890, 2045, 2234, 2456, 2678, 2890, 3234, 3056, 3345, 3876, 5234, 6123]
-    
-    for i, month in enumerate(month_names):
-        months_2024.append({
-            'month': month,
-            'year': 2024,
-            'quarter': f'Q{(i//3)+1}',
-            'season': ['Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Holiday', 'Holiday'][i],
-            'revenue': base_revenue_2024[i],
-            'orders': base_orders_2024[i],
-            'customers': int(base_orders_2024[i] * 0.65),
-            'aov': round(base_revenue_2024[i] / base_orders_2024[i], 2)
-        })
-    
-    # 2023 Data
-    months_2023 = []
-    base_revenue_2023 = [198765, 212345, 234567, 256789, 278901, 298765, 334567, 312345, 356789, 412345, 567890, 678901]
-    base_orders_2023 = [1567, 1678, 1876, 2056, 2245, 2456, 2756, 2567, 2934, 3345, 4456, 5234]
-    
-    for i, month in enumerate(month_names):
-        months_2023.append({
-            'month': month,
-            'year': 2023,
-            'quarter': f'Q{(i//3)+1}',
-            'season': ['Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Holiday', 'Holiday'][i],
-            'revenue': base_revenue_2023[i],
-            'orders': base_orders_2023[i],
-            'customers': int(base_orders_2023[i] * 0.65),
-            'aov': round(base_revenue_2023[i] / base_orders_2023[i], 2)
-        })
-    
-    # 2022 Data
-    months_2022 = []
-    base_revenue_2022 = [178765, 192345, 214567, 236789, 248901, 268765, 304567, 282345, 326789, 382345, 497890, 598901]
-    base_orders_2022 = [1467, 1578, 1776, 1956, 2145, 2356, 2656, 2467, 2834, 3245, 4156, 4934]
-    
-    for i, month in enumerate(month_names):
-        months_2022.append({
-            'month': month,
-            'year': 2022,
-            'quarter': f'Q{(i//3)+1}',
-            'season': ['Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Holiday', 'Holiday'][i],
-            'revenue': base_revenue_2022[i],
-            'orders': base_orders_2022[i],
-            'customers': int(base_orders_2022[i] * 0.65),
-            'aov': round(base_revenue_2022[i] / base_orders_2022[i], 2)
-        })
-    
-    # Quarterly Data
-    quarters = [
-        {'quarter': 'Q1 2024', 'year': 2024, 'revenue': 802924, 'growth': 14.2, 'orders': 6169, 'customers': 4035},
-        {'quarter': 'Q2 2024', 'year': 2024, 'revenue': 1003701, 'growth': 15.8, 'orders': 8024, 'customers': 5034},
-        {'quarter': 'Q3 2024', 'year': 2024, 'revenue': 1190011, 'growth': 18.5, 'orders': 9635, 'customers': 5908},
-        {'quarter': 'Q4 2024', 'year': 2024, 'revenue': 1957480, 'growth': 21.3, 'orders': 15233, 'customers': 9368}
-    ]
-    
-    # Holiday Performance
-    holidays = [
-        {'name': 'Black Friday', 'date': 'Nov 29, 2024', 'revenue': 456789, 'orders': 3456, 'aov': 132, 'growth': 45.3, 'conversion': 8.9, 'traffic': 234},
-        {'name': 'Cyber Monday', 'date': 'Dec 2, 2024', 'revenue': 512345, 'orders': 3890, 'aov': 132, 'growth': 52.8, 'conversion': 9.2, 'traffic': 267},
-        {'name': 'Christmas', 'date': 'Dec 25, 2024', 'revenue': 389456, 'orders': 2987, 'aov': 130, 'growth': 38.7, 'conversion': 7.8, 'traffic': 198},
-        {'name': "New Year", 'date': 'Jan 1, 2024', 'revenue': 234567, 'orders': 1876, 'aov': 125, 'growth': 28.4, 'conversion': 6.9, 'traffic': 156},
-        {'name': "Valentine's Day", 'date': 'Feb 14, 2024', 'revenue': 198765, 'orders': 1567, 'aov': 127, 'growth': 32.1, 'conversion': 7.2, 'traffic': 145},
-        {'name': "Mother's Day", 'date': 'May 12, 2024', 'revenue': 267890, 'orders': 2123, 'aov': 126, 'growth': 35.6, 'conversion': 7.5, 'traffic': 178}
-    ]
-    
-    # Forecast Data
-    forecast = {
-        'next_quarter': {
-            'revenue': 2134567,
-            'confidence': 92,
-            'range_low': 1967234,
-            'range_high': 2301890,
-            'orders': 16789,
-            'customers': 10234
-        },
-        'next_year': {
-            'revenue': 7234567,
-            'confidence': 85,
-            'range_low': 6789234,
-            'range_high': 7679890,
-            'orders': 58934,
-            'customers': 36789
-        }
-    }
-    
-    all_months = months_2024 + months_2023 + months_2022
-    
-    return (pd.DataFrame(months_2024), pd.DataFrame(months_2023), pd.DataFrame(months_2022),
-            pd.DataFrame(all_months), pd.DataFrame(quarters), pd.DataFrame(holidays), forecast)
+# Average daily orders per calendar month in the sample data - peaks in the
+# Nov/Dec holiday season
+SAMPLE_DAILY_ORDERS = [15.5, 18.3, 18.0, 20.5, 21.6, 24.1, 26.1, 24.6, 27.9, 31.3, 43.6, 49.4]
+
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_seasonality_data(years=3):
+    """Generate sample orders for the last `years` full calendar years"""
+    rng = np.random.default_rng(42)
+    
+    last_year = datetime.now().year - 1
+    days = pd.date_range(f'{last_year - years + 1}-01-01', f'{last_year}-12-31', freq='D')
+    
+    # Seasonal curve with ~15% yearly growth and busier holiday windows
+    rate = np.array(SAMPLE_DAILY_ORDERS)[days.month.to_numpy() - 1] * 1.15 ** (days.year.to_numpy() - last_year)
+    for year in range(days[0].year, last_year + 1):
+        for name, anchor, before in HOLIDAYS:
+            holiday = pd.Timestamp(anchor(year))
+            rate[(days >= holiday - pd.Timedelta(days=before)) & (days <= holiday)] *= 2.5
+    
+    order_dates = np.repeat(days.to_numpy(), rng.poisson(rate))
+    n = len(order_dates)
+    
+    df = pd.DataFrame({
+        'order_id': np.arange(1, n + 1),
+        'customer_id': rng.integers(1, 5001, n),
+        'order_date': order_dates,
+        'status': rng.choice(['completed', 'shipped', 'cancelled'], n, p=[0.85, 0.1, 0.05]),
+        'total_amount': rng.gamma(4.0, 32.5, n).round(2)
+    })
+    # Seeded generator: the data only changes with the year it ends in
+    df.attrs['data_version'] = f'sample:{last_year}:{n}'
+    return df
+
+@timed(kind='loader')
+def load_seasonality_orders():
+    """
+    Smart data loader - uses the shared dataset registry:
+    1. CSV Files / MySQL orders and their sales rollups (PRIORITY)
+    2. Sample Data (fallback)
+    """
+    try:
+        orders_df = get_dataset('orders')
+        rollups = sales_rollups() if orders_df is not None else None
+        if rollups is not None:
+            source = dataset_source('orders')
+            st.sidebar.success(f"✅ Loaded {len(orders_df)} orders from {source}")
+            version = (source, dataset_version('orders'), rollups['watermark'])
+            return orders_df, rollups, f"{source} Data", version
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Data load error: {str(e)[:60]}")
+    
+    st.sidebar.info("📊 Using generated sample data")
+    orders_df = generate_sample_seasonality_data()
+    return orders_df, None, "Generated Sample Data", orders_df.attrs['data_version']
+
+@timed_cache(st.cache_data(ttl=600), kind='analysis')
+def build_seasonality(data_version, _orders_df, _rollups=None):
+    """
+    Month, quarter and holiday tables for one version of the order data.
+    Keyed on the data version only - the frames are never hashed. Sample
+    orders are rolled up here; registry orders come with their rollups.
+    """
+    if _rollups is None:
+        daily = aggregate_orders(_orders_df)
+        _rollups = {'daily': daily, 'monthly': monthly_rollup(daily)}
+    return dict(seasonality_tables(_rollups['daily'], _rollups['monthly'], _orders_df),
+                monthly=_rollups['monthly'])
 
 # ===========================
 # LOAD DATA
 # ===========================
 
 with st.spinner("Loading seasonality data..."):
-    months_2024_df, months_2023_df, months_2022_df, all_months_df, quarters_df, holidays_df, forecast_data = generate_sample_seasonality_data()
+    orders_df, rollups, data_source, data_version = load_seasonality_orders()
+    seasonality = build_seasonality(data_version, orders_df, rollups)
+    all_months_df = seasonality['months']
+    quarters_df = seasonality['quarters']
+    years = seasonality['years']
+
+if not years:
+    st.warning("⚠️ No dated orders available for seasonal analysis")
+    st.stop()
+
+# ===========================
+# FORECAST
+# ===========================
+
+@timed
+def build_forecast(seasonality, data_version):
+    """
+    Next-quarter and next-year forecasts from the complete months of history.
+    Model fits are cached per data version (see utils.forecasting), so reruns
+    only re-read the fitted forecasts.
+    
+    Returns:
+        Dictionary of forecast figures, or None without a complete month
+    """
+    months = seasonality['months'].set_index('month_start')
+    totals = drop_partial_month(months[['revenue', 'orders', 'customers']].T.dropna(), seasonality['last_date'])
+    if totals.shape[1] == 0:
+        return None
+    
+    total = forecast_series(totals, key='seasonality:total', version=data_version)
+    forecast = total['forecast'].set_index(['series', 'month'])
+    
+    def period(months_ahead):
+        sums = period_totals(total['forecast'], months_ahead)
+        return {
+            'revenue': sums.loc['revenue', 'forecast'],
+            'range_low': sums.loc['revenue', 'lower'],
+            'range_high': sums.loc['revenue', 'upper'],
+            'orders': sums.loc['orders', 'forecast'],
+            # Distinct customers don't add up across months - average month
+            'customers': sums.loc['customers', 'forecast'] / months_ahead if 'customers' in sums.index else None
+        }
+    
+    # Next quarter month by month, against the same month a year earlier
+    breakdown = forecast.loc['revenue'].head(3).reset_index()
+    last_year = months['revenue'].reindex(breakdown['month'] - pd.DateOffset(years=1)).to_numpy()
+    breakdown['orders'] = forecast.loc['orders'].head(3)['forecast'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        breakdown['growth'] = np.where(last_year > 0, (breakdown['forecast'] - last_year) / last_year * 100, np.nan)
+    
+    category_matrix = series_matrix(seasonality['monthly'], by='category', last_date=seasonality['last_date'])
+    categories = pd.DataFrame()
+    if not category_matrix.empty and category_matrix.shape[1] > 0:
+        category_fit = forecast_series(category_matrix, key='seasonality:category', version=data_version)
+        categories = period_totals(category_fit['forecast'], 3).sort_values('forecast', ascending=False)
+    
+    return {
+        'model': total['model'],
+        'history_months': totals.shape[1],
+        'last_month': totals.columns[-1],
+        'next_quarter': period(3),
+        'next_year': period(12),
+        'breakdown': breakdown,
+        'categories': categories
+    }
+
+forecast_data = build_forecast(seasonality, data_version)
 
 # ===========================
 # SIDEBAR FILTERS
 # ===========================
 
+# Every year with a year of history before it can be compared; with a single
+# year on record it is compared against the (empty) year before
+comparison_options = [f"{year} vs {year - 1}" for year in reversed(years[1:])] or [f"{years[-1]} vs {years[-1] - 1}"]
+
 with st.sidebar:
+    st.markdown("### 📊 Data Source")
+    st.info(f"**{data_source}**")
+    
     st.markdown("### 📅 Filters")
     
     analysis_period = st.selectbox(
@@ -182,7 +233,7 @@ with st.sidebar:
     
     comparison_year = st.selectbox(
         "📈 Comparison",
-        ["2024 vs 2023", "2023 vs 2022"]
+        comparison_options
     )
     
     st.markdown("---")
@@ -194,52 +245,36 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
-def apply_season_filters(df, period, season):
-    filtered = df.copy()
-    
-    if period == "Last Year":
-        filtered = filtered[filtered['year'] == 2024]
-    elif period == "Last 2 Years":
-        filtered = filtered[filtered['year'].isin([2024, 2023])]
-    elif period == "Last 3 Years":
-        filtered = filtered[filtered['year'].isin([2024, 2023, 2022])]
-    
-    if season != "All Seasons":
-        season_map = {
-            "Q1 (Winter)": "Q1",
-            "Q2 (Spring)": "Q2",
-            "Q3 (Summer)": "Q3",
-            "Q4 (Fall/Holiday)": "Q4"
-        }
-        if season in season_map:
-            filtered = filtered[filtered['quarter'] == season_map[season]]
+SEASON_QUARTERS = {
+    "Q1 (Winter)": "Q1",
+    "Q2 (Spring)": "Q2",
+    "Q3 (Summer)": "Q3",
+    "Q4 (Fall/Holiday)": "Q4"
+}
+PERIOD_YEARS = {"Last Year": 1, "Last 2 Years": 2, "Last 3 Years": 3}
+
+@timed(kind='filter')
+def apply_season_filters(df, period, season, years):
+    """Keep the months of the most recent years in the period and the selected quarter"""
+    filtered = df
+    
+    if period in PERIOD_YEARS:
+        filtered = filtered[filtered['year'].isin(years[-PERIOD_YEARS[period]:])]
+    
+    if season in SEASON_QUARTERS:
+        filtered = filtered[filtered['quarter'] == SEASON_QUARTERS[season]]
     
     return filtered
 
-filtered_months = apply_season_filters(all_months_df, analysis_period, season_filter)
-
-if comparison_year == "2024 vs 2023":
-    current_year_df = months_2024_df
-    previous_year_df = months_2023_df
-    current_year = 2024
-    previous_year = 2023
-else:
-    current_year_df = months_2023_df
-    previous_year_df = months_2022_df
-    current_year = 2023
-    previous_year = 2022
-
-if season_filter != "All Seasons":
-    season_map = {
-        "Q1 (Winter)": "Q1",
-        "Q2 (Spring)": "Q2",
-        "Q3 (Summer)": "Q3",
-        "Q4 (Fall/Holiday)": "Q4"
-    }
-    if season_filter in season_map:
-        quarter = season_map[season_filter]
-        current_year_df = current_year_df[current_year_df['quarter'] == quarter]
-        previous_year_df = previous_year_df[previous_year_df['quarter'] == quarter]
+filtered_months = apply_season_filters(all_months_df, analysis_period, season_filter, years)
+
+current_year, previous_year = (int(year) for year in comparison_year.split(' vs '))
+season_months_df = apply_season_filters(all_months_df, "All Years", season_filter, years)
+current_year_df = season_months_df[season_months_df['year'] == current_year]
+previous_year_df = season_months_df[season_months_df['year'] == previous_year]
+
+holidays_df = seasonality['holidays']
+holidays_df = holidays_df[holidays_df['year'] == current_year].reset_index(drop=True)
 
 # ===========================
 # CALCULATE METRICS
@@ -253,13 +288,43 @@ metric_column_map = {
 }
 selected_metric = metric_column_map[metric_type]
 
-total_current = current_year_df[selected_metric].sum() if selected_metric != 'aov' else current_year_df[selected_metric].mean()
-total_previous = previous_year_df[selected_metric].sum() if selected_metric != 'aov' else previous_year_df[selected_metric].mean()
+def format_metric(value):
+    """Display a value of the selected metric"""
+    if pd.isna(value):
+        return "—"
+    return f"${value:,.0f}" if selected_metric in ['revenue', 'aov'] else f"{value:,.0f}"
+
+def metric_total(df):
+    """Yearly total of the selected metric (average for AOV)"""
+    if df.empty:
+        return 0.0
+    return df[selected_metric].sum() if selected_metric != 'aov' else df[selected_metric].mean()
+
+def variability(values):
+    """Coefficient of variation in percent"""
+    return values.std() / values.mean() * 100 if values.mean() > 0 else 0
+
+comparison_df = compare_years(season_months_df, current_year, previous_year, selected_metric)
+
+total_current = metric_total(current_year_df)
+total_previous = metric_total(previous_year_df)
 yoy_growth = ((total_current - total_previous) / total_previous * 100) if total_previous > 0 else 0
 
 peak_value = filtered_months[selected_metric].max()
 off_season_value = filtered_months[selected_metric].min()
-seasonal_variability = (filtered_months[selected_metric].std() / filtered_months[selected_metric].mean() * 100) if filtered_months[selected_metric].mean() > 0 else 0
+seasonal_variability = variability(filtered_months[selected_metric])
+
+# Changes of the current comparison year against the previous one
+has_previous = not previous_year_df.empty and not current_year_df.empty
+peak_change = current_year_df[selected_metric].max() - previous_year_df[selected_metric].max() if has_previous else None
+off_season_change = current_year_df[selected_metric].min() - previous_year_df[selected_metric].min() if has_previous else None
+variability_change = (variability(current_year_df[selected_metric]) - variability(previous_year_df[selected_metric])
+                      if has_previous else None)
+
+def format_change(change):
+    if change is None or pd.isna(change):
+        return None
+    return f"{'+' if change >= 0 else '-'}{format_metric(abs(change))} vs {previous_year}"
 
 # ===========================
 # HEADER & METRICS
@@ -272,28 +337,30 @@ col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown('<div class="stat-card stat-card-primary">', unsafe_allow_html=True)
-    st.metric("Seasonal Patterns", "12", "+2 new patterns identified")
+    st.metric("Months Analyzed", f"{len(filtered_months)}", f"{len(years)} year{'s' if len(years) != 1 else ''} of history", delta_color="off")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="stat-card stat-card-success">', unsafe_allow_html=True)
     if selected_metric == 'revenue':
-        st.metric("Peak Season Revenue", f"${peak_value:,.0f}", "+$345K vs last year")
+        st.metric("Peak Season Revenue", format_metric(peak_value), format_change(peak_change))
     else:
-        st.metric(f"Peak {metric_type}", f"{peak_value:,.0f}", "+12% vs last year")
+        st.metric(f"Peak {metric_type}", format_metric(peak_value), format_change(peak_change))
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col3:
     st.markdown('<div class="stat-card stat-card-warning">', unsafe_allow_html=True)
     if selected_metric == 'revenue':
-        st.metric("Off-Season Revenue", f"${off_season_value:,.0f}", "+$123K improvement")
+        st.metric("Off-Season Revenue", format_metric(off_season_value), format_change(off_season_change))
     else:
-        st.metric(f"Off-Season {metric_type}", f"{off_season_value:,.0f}", "+8% improvement")
+        st.metric(f"Off-Season {metric_type}", format_metric(off_season_value), format_change(off_season_change))
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col4:
     st.markdown('<div class="stat-card stat-card-success">', unsafe_allow_html=True)
-    st.metric("Seasonal Variability", f"{seasonal_variability:.1f}%", "-3.2% more stable")
+    st.metric("Seasonal Variability", f"{seasonal_variability:.1f}%",
+              f"{variability_change:+.1f}% vs {previous_year}" if variability_change is not None else None,
+              delta_color="inverse")
     st.markdown('</div>', unsafe_allow_html=True)
 
 st.markdown("---")
@@ -347,6 +414,7 @@ with col1:
         margin=dict(l=0, r=0, t=20, b=0),
         hovermode='x unified',
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        xaxis=dict(categoryorder='array', categoryarray=MONTH_NAMES),
         yaxis_title=metric_type
     )
     st.plotly_chart(fig1, use_container_width=True)
@@ -354,10 +422,10 @@ with col1:
 with col2:
     st.subheader("Quarterly Performance")
     
-    display_quarters = quarters_df.copy()
+    display_quarters = quarters_df[quarters_df['year'] == current_year]
     if season_filter != "All Seasons":
-        quarter_num = season_filter[1]
-        display_quarters = display_quarters[display_quarters['quarter'].str.contains(f'Q{quarter_num}')]
+        quarter_num = int(season_filter[1])
+        display_quarters = display_quarters[display_quarters['quarter_num'] == quarter_num]
     
     col_a, col_b = st.columns(2)
     
@@ -366,7 +434,7 @@ with col2:
             display_quarters, 
             x='quarter', 
             y='revenue',
-            title='Quarterly Revenue 2024',
+            title=f'Quarterly Revenue {current_year}',
             color='quarter',
             color_discrete_sequence=['#3b82f6', '#22c55e', '#f59e0b', '#8b5cf6'],
             text='revenue'
@@ -400,7 +468,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: SEASONAL TRENDS
-with tab1:
+with tab1, timed_section('seasonal_trends'):
     st.subheader(f"Seasonal Trends Analysis - {metric_type}")
     
     if season_filter == "All Seasons":
@@ -414,9 +482,11 @@ with tab1:
         cols = st.columns(4)
         for col, season in zip(cols, seasons):
             with col:
-                quarter_data = quarters_df[quarters_df['quarter'].str.contains(season['quarter'])]
+                quarter_data = quarters_df[(quarters_df['year'] == current_year) &
+                                           (quarters_df['quarter'].str.startswith(season['quarter']))]
                 if len(quarter_data) > 0:
                     row = quarter_data.iloc[0]
+                    growth = f"{row['growth']:+.1f}%" if pd.notna(row['growth']) else "n/a"
                     
                     st.markdown(f"""
                     <div style='background:#f8fafc;padding:20px;border-radius:10px;border-left:4px solid #3b82f6;'>
@@ -428,7 +498,7 @@ with tab1:
                                 <div style='font-size:0.75rem;color:#64748b;'>Orders</div>
                             </div>
                             <div style='text-align:center;padding:8px;background:white;border-radius:6px;'>
-                                <div style='font-weight:700;color:#22c55e;'>{row['growth']:.1f}%</div>
+                                <div style='font-weight:700;color:#22c55e;'>{growth}</div>
                                 <div style='font-size:0.75rem;color:#64748b;'>Growth</div>
                             </div>
                         </div>
@@ -440,9 +510,7 @@ with tab1:
     
     display_filtered = filtered_months.copy()
     display_filtered['Month-Year'] = display_filtered['month'] + ' ' + display_filtered['year'].astype(str)
-    display_filtered['Value Display'] = display_filtered[selected_metric].apply(
-        lambda x: f"${x:,.0f}" if selected_metric in ['revenue', 'aov'] else f"{x:,.0f}"
-    )
+    display_filtered['Value Display'] = display_filtered[selected_metric].map(format_metric)
     
     st.dataframe(
         display_filtered[['Month-Year', 'quarter', 'season', 'Value Display', 'orders']],
@@ -460,7 +528,7 @@ with tab1:
     st.caption(f"Showing {len(filtered_months)} months of data based on filters")
 
 # TAB 2: YEAR-OVER-YEAR
-with tab2:
+with tab2, timed_section('year_over_year'):
     st.subheader(f"Year-over-Year Comparison: {comparison_year}")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -486,9 +554,9 @@ with tab2:
     st.markdown("---")
     
     comparison_data = pd.DataFrame({
-        'Month': current_year_df['month'],
-        str(current_year): current_year_df[selected_metric],
-        str(previous_year): previous_year_df[selected_metric]
+        'Month': comparison_df['month'],
+        str(current_year): comparison_df['current'],
+        str(previous_year): comparison_df['previous']
     })
     
     fig = go.Figure()
@@ -516,107 +584,115 @@ with tab2:
     st.markdown("---")
     st.markdown("#### Detailed Comparison Table")
     
-    # Calculate growth percentages properly
-    growth_percentages = ((current_year_df[selected_metric].values - previous_year_df[selected_metric].values) / previous_year_df[selected_metric].values * 100)
-    growth_percentages = np.round(growth_percentages, 1)
-    growth_strings = [f"{val:+.1f}%" for val in growth_percentages]
+    # Months are aligned by calendar month; growth is n/a without a prior-year value
+    growth_strings = [f"{val:+.1f}%" if pd.notna(val) else "n/a" for val in comparison_df['growth'].round(1)]
     
     comparison_detail = pd.DataFrame({
-        'Month': current_year_df['month'].values,
-        f'{current_year} {metric_type}': current_year_df[selected_metric].apply(
-            lambda x: f"${x:,.0f}" if selected_metric in ['revenue', 'aov'] else f"{x:,.0f}"
-        ).values,
-        f'{previous_year} {metric_type}': previous_year_df[selected_metric].apply(
-            lambda x: f"${x:,.0f}" if selected_metric in ['revenue', 'aov'] else f"{x:,.0f}"
-        ).values,
+        'Month': comparison_df['month'].values,
+        f'{current_year} {metric_type}': comparison_df['current'].map(format_metric).values,
+        f'{previous_year} {metric_type}': comparison_df['previous'].map(format_metric).values,
         'Growth %': growth_strings
     })
     
     st.dataframe(comparison_detail, use_container_width=True, hide_index=True)
 
 # TAB 3: FORECASTING
-with tab3:
+def format_millions(value):
+    return f"${value/1000000:.2f}M"
+
+with tab3, timed_section('forecasting'):
     st.subheader("Seasonal Forecasting")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("#### Next Quarter Forecast")
-        st.markdown(f"""
-        <div style='background:linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);color:white;padding:25px;border-radius:10px;'>
-            <div style='font-size:1.125rem;margin-bottom:10px;'>Projected Revenue</div>
-            <div style='font-size:3rem;font-weight:900;'>${forecast_data['next_quarter']['revenue']/1000000:.2f}M</div>
-            <div style='font-size:1rem;color:rgba(255,255,255,0.8);margin-top:10px;'>Confidence: {forecast_data['next_quarter']['confidence']}%</div>
-        </div>
-        """, unsafe_allow_html=True)
+    if forecast_data is None:
+        st.info("📊 At least one complete month of orders is needed for a forecast")
+    else:
+        col1, col2 = st.columns(2)
         
-        st.metric("Expected Orders", f"{forecast_data['next_quarter']['orders']:,}")
-        st.metric("Expected Customers", f"{forecast_data['next_quarter']['customers']:,}")
-    
-    with col2:
-        st.markdown("#### Annual Forecast (Next 12 Months)")
-        st.markdown(f"""
-        <div style='background:linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);color:white;padding:25px;border-radius:10px;'>
-            <div style='font-size:1.125rem;margin-bottom:10px;'>Projected Annual Revenue</div>
-            <div style='font-size:3rem;font-weight:900;'>${forecast_data['next_year']['revenue']/1000000:.2f}M</div>
-            <div style='font-size:1rem;color:rgba(255,255,255,0.8);margin-top:10px;'>Confidence: {forecast_data['next_year']['confidence']}%</div>
-        </div>
-        """, unsafe_allow_html=True)
+        for col, title, label, horizon in (
+            (col1, "#### Next Quarter Forecast", "Projected Revenue", forecast_data['next_quarter']),
+            (col2, "#### Annual Forecast (Next 12 Months)", "Projected Annual Revenue", forecast_data['next_year'])
+        ):
+            with col:
+                st.markdown(title)
+                st.markdown(f"""
+                <div style='background:linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);color:white;padding:25px;border-radius:10px;'>
+                    <div style='font-size:1.125rem;margin-bottom:10px;'>{label}</div>
+                    <div style='font-size:3rem;font-weight:900;'>{format_millions(horizon['revenue'])}</div>
+                    <div style='font-size:1rem;color:rgba(255,255,255,0.8);margin-top:10px;'>{INTERVAL_LEVEL}% interval: {format_millions(horizon['range_low'])} – {format_millions(horizon['range_high'])}</div>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                st.metric("Expected Orders", f"{horizon['orders']:,.0f}")
+                st.metric("Expected Customers / Month",
+                          f"{horizon['customers']:,.0f}" if horizon['customers'] is not None else "n/a")
         
-        st.metric("Expected Orders", f"{forecast_data['next_year']['orders']:,}")
-        st.metric("Expected Customers", f"{forecast_data['next_year']['customers']:,}")
-    
-    st.markdown("---")
-    st.markdown("#### Forecast Methodology")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("**Historical Analysis**")
-        st.progress(1.0)
-        st.caption("3-year historical data analysis")
+        st.markdown("---")
+        st.markdown("#### Forecast Methodology")
         
-        st.markdown("**Seasonal Patterns**")
-        st.progress(1.0)
-        st.caption("12 identified seasonal patterns")
-    
-    with col2:
-        st.markdown("**Market Trends**")
-        st.progress(0.85)
-        st.caption("Industry growth factors included")
+        col1, col2 = st.columns(2)
         
-        st.markdown("**External Factors**")
-        st.progress(0.75)
-        st.caption("Economic indicators considered")
-    
-    st.markdown("---")
-    st.markdown("#### Next Quarter Monthly Breakdown")
-    
-    forecast_months = pd.DataFrame({
-        'Month': ['Jan 2025', 'Feb 2025', 'Mar 2025'],
-        'Forecasted Revenue': ['$678,901', '$712,345', '$743,321'],
-        'Confidence': ['92%', '93%', '94%'],
-        'Expected Orders': ['5,234', '5,534', '5,834'],
-        'Growth vs Last Year': ['+18.5%', '+19.0%', '+19.5%']
-    })
-    
-    st.dataframe(forecast_months, use_container_width=True, hide_index=True)
+        with col1:
+            st.markdown("**Historical Analysis**")
+            st.progress(min(forecast_data['history_months'] / 36, 1.0))
+            st.caption(f"{forecast_data['history_months']} complete months of history "
+                       f"(through {forecast_data['last_month'].strftime('%b %Y')})")
+            
+            st.markdown("**Seasonal Patterns**")
+            seasonal = forecast_data['model'] != 'Drift'
+            st.progress(1.0 if seasonal else 0.0)
+            st.caption("12-month seasonal cycle" if seasonal else "Less than a year of history - no seasonal cycle")
+        
+        with col2:
+            st.markdown("**Model**")
+            st.caption(forecast_data['model'])
+            
+            st.markdown("**Prediction Interval**")
+            st.caption(f"{INTERVAL_LEVEL}% interval from in-sample one-step errors")
+        
+        st.markdown("---")
+        st.markdown("#### Next Quarter Monthly Breakdown")
+        
+        breakdown = forecast_data['breakdown']
+        forecast_months = pd.DataFrame({
+            'Month': breakdown['month'].dt.strftime('%b %Y'),
+            'Forecasted Revenue': breakdown['forecast'].map(lambda x: f"${x:,.0f}"),
+            f'{INTERVAL_LEVEL}% Interval': [f"${low:,.0f} – ${high:,.0f}"
+                                            for low, high in zip(breakdown['lower'], breakdown['upper'])],
+            'Expected Orders': breakdown['orders'].map(lambda x: f"{x:,.0f}"),
+            'Growth vs Last Year': [f"{x:+.1f}%" if pd.notna(x) else "n/a" for x in breakdown['growth']]
+        })
+        
+        st.dataframe(forecast_months, use_container_width=True, hide_index=True)
+        
+        categories = forecast_data['categories']
+        if len(categories) > 1:
+            st.markdown("#### Next Quarter Revenue by Category")
+            top_categories = categories.head(10)
+            st.dataframe(pd.DataFrame({
+                'Category': top_categories.index,
+                'Forecasted Revenue': top_categories['forecast'].map(lambda x: f"${x:,.0f}").to_numpy(),
+                f'{INTERVAL_LEVEL}% Interval': [f"${low:,.0f} – ${high:,.0f}"
+                                                for low, high in zip(top_categories['lower'], top_categories['upper'])]
+            }), use_container_width=True, hide_index=True)
+            st.caption(f"Top {len(top_categories)} of {len(categories)} categories, forecast together in one batch")
 
 # TAB 4: HOLIDAY PERFORMANCE
-with tab4:
-    st.subheader("Holiday Performance Analysis")
+with tab4, timed_section('holiday_performance'):
+    st.subheader(f"Holiday Performance Analysis ({current_year})")
     
     if len(holidays_df) > 0:
         for idx, holiday in holidays_df.iterrows():
+            growth = f"{holiday['growth']:+.1f}% YoY" if pd.notna(holiday['growth']) else "No prior-year window"
+            lift = f"{holiday['lift']:+.0f}%" if pd.notna(holiday['lift']) else "n/a"
             st.markdown(f"""
             <div style='background:#f8fafc;padding:20px;border-radius:8px;border-left:4px solid #3b82f6;margin-bottom:15px;'>
                 <div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:10px;'>
                     <div style='font-weight:700;font-size:1.125rem;'>{holiday['name']}</div>
-                    <div style='color:#64748b;font-size:0.875rem;'>{holiday['date']}</div>
+                    <div style='color:#64748b;font-size:0.875rem;'>{holiday['date'].strftime('%b %d, %Y')}</div>
                 </div>
                 <div style='margin-bottom:10px;'>
-                    <span style='font-size:1.5rem;font-weight:800;color:#3b82f6;'>${holiday['revenue']:,}</span>
-                    <span style='font-weight:700;color:#22c55e;margin-left:15px;'>+{holiday['growth']:.1f}% YoY</span>
+                    <span style='font-size:1.5rem;font-weight:800;color:#3b82f6;'>${holiday['revenue']:,.0f}</span>
+                    <span style='font-weight:700;color:#22c55e;margin-left:15px;'>{growth}</span>
                 </div>
                 <div style='display:grid;grid-template-columns:repeat(3,1fr);gap:10px;margin-top:10px;text-align:center;'>
                     <div style='padding:10px;background:white;border-radius:6px;'>
@@ -624,16 +700,16 @@ with tab4:
                         <div style='font-size:0.75rem;color:#64748b;'>Orders</div>
                     </div>
                     <div style='padding:10px;background:white;border-radius:6px;'>
-                        <div style='font-weight:700;'>${holiday['aov']}</div>
+                        <div style='font-weight:700;'>${holiday['aov']:,.0f}</div>
                         <div style='font-size:0.75rem;color:#64748b;'>AOV</div>
                     </div>
                     <div style='padding:10px;background:white;border-radius:6px;'>
-                        <div style='font-weight:700;'>{holiday['conversion']:.1f}%</div>
-                        <div style='font-size:0.75rem;color:#64748b;'>Conversion</div>
+                        <div style='font-weight:700;'>{lift}</div>
+                        <div style='font-size:0.75rem;color:#64748b;'>vs Avg Day</div>
                     </div>
                 </div>
                 <div style='margin-top:10px;padding-top:10px;border-top:1px solid #e2e8f0;color:#64748b;font-size:0.875rem;'>
-                    Traffic Increase: +{holiday['traffic']}%
+                    Window: {holiday['start'].strftime('%b %d')} – {holiday['date'].strftime('%b %d')}
                 </div>
             </div>
             """, unsafe_allow_html=True)
@@ -651,9 +727,11 @@ with tab4:
         with col2:
             st.markdown("#### Holiday Season Impact")
             total_holiday_revenue = holidays_df['revenue'].sum()
+            year_revenue = all_months_df.loc[all_months_df['year'] == current_year, 'revenue'].sum()
+            avg_holiday_growth = holidays_df['growth'].mean()
             st.metric("Total Holiday Revenue", f"${total_holiday_revenue/1000:.0f}K")
-            st.metric("% of Annual Revenue", "22.8%")
-            st.metric("Avg Growth Rate", "+38.5%")
+            st.metric("% of Annual Revenue", f"{total_holiday_revenue / year_revenue * 100:.1f}%" if year_revenue > 0 else "n/a")
+            st.metric("Avg Growth Rate", f"{avg_holiday_growth:+.1f}%" if pd.notna(avg_holiday_growth) else "n/a")
         
         with col3:
             st.markdown("#### Preparation Status")
@@ -663,6 +741,8 @@ with tab4:
             ⚠️ Marketing Campaigns - Launch 2 weeks before
             ⭕ Server Capacity - Scale up for traffic surge
             """)
+    else:
+        st.info(f"📊 No {current_year} holiday windows are covered by the order history")
 
 st.markdown("---")
 
@@ -682,12 +762,14 @@ with col2:
     if st.button("📥 Export Data", use_container_width=True, key="export_btn_season"):
         export_data = {
             'timestamp': datetime.now().isoformat(),
-            'filtered_months': filtered_months.to_dict('records'),
-            'current_year_data': current_year_df.to_dict('records'),
-            'previous_year_data': previous_year_df.to_dict('records'),
+            'filtered_months': filtered_months.drop(columns='month_start').to_dict('records'),
+            'current_year_data': current_year_df.drop(columns='month_start').to_dict('records'),
+            'previous_year_data': previous_year_df.drop(columns='month_start').to_dict('records'),
             'quarters': quarters_df.to_dict('records'),
-            'holidays': holidays_df.to_dict('records'),
-            'forecast': forecast_data,
+            'holidays': holidays_df.astype({'date': str, 'start': str}).to_dict('records'),
+            'forecast': {
+                key: forecast_data[key] for key in ('model', 'next_quarter', 'next_year')
+            } if forecast_data is not None else None,
             'summary': {
                 'metric_type': metric_type,
                 'current_year_total': f"{total_current:,.2f}",
@@ -742,16 +824,27 @@ with st.expander("📊 Seasonal Insights & Recommendations"):
     with col2:
         st.markdown("#### 🎯 Seasonal Patterns")
         
-        for idx, quarter in quarters_df.iterrows():
-            st.markdown(f"- **{quarter['quarter']}**: ${quarter['revenue']/1000000:.2f}M ({quarter['growth']:.1f}% growth)")
+        for idx, quarter in quarters_df[quarters_df['year'] == current_year].iterrows():
+            growth = f"{quarter['growth']:+.1f}% growth" if pd.notna(quarter['growth']) else "no prior year"
+            st.markdown(f"- **{quarter['quarter']}**: ${quarter['revenue']/1000000:.2f}M ({growth})")
         
         st.markdown("#### 🏆 Holiday Success Metrics")
-        st.markdown("""
-        - Peak holiday performance: +52.8% (Cyber Monday)
-        - Average holiday growth: +38.5%
-        - Holiday season impact: 22.8% of annual revenue
-        - Best conversion: 9.2% (Cyber Monday)
-        """)
+        if len(holidays_df) > 0:
+            top_holiday = holidays_df.loc[holidays_df['revenue'].idxmax()]
+            year_revenue = all_months_df.loc[all_months_df['year'] == current_year, 'revenue'].sum()
+            holiday_share = holidays_df['revenue'].sum() / year_revenue * 100 if year_revenue > 0 else 0
+            growth_lines = ""
+            if holidays_df['growth'].notna().any():
+                best_growth = holidays_df.loc[holidays_df['growth'].idxmax()]
+                growth_lines = (f"- Peak holiday growth: {best_growth['growth']:+.1f}% ({best_growth['name']})\n"
+                                f"- Average holiday growth: {holidays_df['growth'].mean():+.1f}%\n")
+            st.markdown(
+                f"- Top holiday window: {top_holiday['name']} (${top_holiday['revenue']:,.0f})\n"
+                + growth_lines
+                + f"- Holiday season impact: {holiday_share:.1f}% of {current_year} revenue"
+            )
+        else:
+            st.markdown(f"- No {current_year} holiday windows in the order history")
 
 # ===========================
 # DIAGNOSTIC INFORMATION
@@ -764,7 +857,7 @@ with st.expander("🔧 System Diagnostics"):
     
     with col1:
         st.metric("Total Records", f"{len(all_months_df):,}")
-        st.metric("Data Completeness", "100%")
+        st.metric("Data Completeness", f"{(all_months_df['orders'] > 0).mean() * 100:.0f}%")
     
     with col2:
         st.metric("Years Analyzed", str(len(all_months_df['year'].unique())))
@@ -772,7 +865,7 @@ with st.expander("🔧 System Diagnostics"):
     
     with col3:
         st.metric("Holiday Events", len(holidays_df))
-        st.metric("Forecast Confidence", f"{forecast_data['next_quarter']['confidence']}%")
+        st.metric("Forecast Interval", f"{INTERVAL_LEVEL}%")
     
     st.markdown("---")
     st.markdown("### Filter Status")
@@ -789,7 +882,9 @@ with st.expander("🔧 System Diagnostics"):
     st.markdown("---")
     st.markdown("### Trend Analysis Summary")
     
-    growth_values = ((current_year_df[selected_metric].values - previous_year_df[selected_metric].values) / previous_year_df[selected_metric].values * 100)
+    growth_values = comparison_df['growth'].dropna()
+    orders_current = current_year_df['orders'].sum()
+    orders_previous = previous_year_df['orders'].sum()
     
     trend_metrics = pd.DataFrame({
         'Metric': [
@@ -800,11 +895,11 @@ with st.expander("🔧 System Diagnostics"):
             'Order Trend'
         ],
         f'{current_year}': [
-            f"+{growth_values.max():.1f}%",
-            f"+{growth_values.min():.1f}%",
-            f"${current_year_df[selected_metric].mean():,.0f}" if selected_metric in ['revenue', 'aov'] else f"{current_year_df[selected_metric].mean():,.0f}",
+            f"{growth_values.max():+.1f}%" if len(growth_values) else "n/a",
+            f"{growth_values.min():+.1f}%" if len(growth_values) else "n/a",
+            format_metric(current_year_df[selected_metric].mean()),
             "📈 Upward" if yoy_growth > 0 else "📉 Downward",
-            "📈 Upward"
+            "📈 Upward" if orders_current > orders_previous else "📉 Downward"
         ]
     })
     
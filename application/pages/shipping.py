@@ -11,6 +11,10 @@ from datetime import datetime, timedelta
 import numpy as np
 from pathlib import Path
 
+from utils.synthetic import CARRIERS, CITIES, DEFAULT_SCALE, generate_tables
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Shipping Data Audit",
     page_icon="🚚",
@@ -18,6 +22,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('shipping')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -67,50 +73,44 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_shipping_data():
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_shipping_data(scale=DEFAULT_SCALE):
     """Generate sample shipping data with quality issues"""
-    np.random.seed(42)
-    
-    # Shipping Records
-    records = []
-    carriers = ['UPS', 'FedEx', 'USPS', 'DHL']
-    statuses = ['delivered', 'in-transit', 'pending', 'delayed', 'exception']
-    destinations = [
-        'New York, NY', 'Los Angeles, CA', 'Chicago, IL', 'Houston, TX', 'Phoenix, AZ',
-        'Philadelphia, PA', 'San Antonio, TX', 'San Diego, CA', 'Dallas, TX', 'San Jose, CA'
-    ]
-    
-    for i in range(1, 201):
-        carrier = np.random.choice(carriers)
-        status = np.random.choice(statuses, p=[0.45, 0.2, 0.15, 0.1, 0.1])
-        
-        shipped_date = (datetime.now() - timedelta(days=np.random.randint(0, 30))).date()
-        
-        if status == 'delivered':
-            delivered_date = shipped_date + timedelta(days=np.random.randint(1, 8))
-        elif status in ['in-transit', 'delayed']:
-            delivered_date = None
-        else:
-            delivered_date = None
-        
-        # Address issues (5% will have problems)
-        has_address_issue = np.random.random() < 0.05
-        
-        records.append({
-            'shipment_id': f'SHP-{1000+i}',
-            'order_id': f'ORD-{5000+i}',
-            'carrier': carrier,
-            'tracking_number': f'{carrier}{np.random.randint(100000000, 999999999)}',
-            'status': status,
-            'shipped_date': shipped_date,
-            'delivered_date': delivered_date,
-            'destination': np.random.choice(destinations),
-            'cost': round(np.random.uniform(8, 30), 2),
-            'address_issue': has_address_issue,
-            'weight': round(np.random.uniform(0.5, 50), 2),
-            'insurance': 'yes' if np.random.random() > 0.8 else 'no'
-        })
+    # Shipping Records: synthetic shipments, plus labels created for orders
+    # that haven't shipped yet; some in-transit parcels are delayed, and
+    # those with an unvalidated address are exceptions
+    tables = generate_tables(scale, tables=['orders', 'shipping'])
+    shipments, orders = tables['shipping'], tables['orders']
+    waiting = orders[orders['shipping_status'] == 'pending']
+    rng = np.random.default_rng(42)
+    n, k = len(shipments), len(waiting)
+
+    shipped_date = np.concatenate([shipments['shipped_date'].to_numpy(), waiting['order_date'].to_numpy()])
+    status = np.concatenate([shipments['status'].astype(object).to_numpy(), np.full(k, 'pending', dtype=object)])
+    address_issue = np.concatenate([~shipments['address_validated'].to_numpy(dtype=bool), rng.random(k) < 0.05])
+    late = (status == 'in-transit') & ((rng.random(n + k) < 0.3) | address_issue)
+    status[late] = np.where(address_issue[late], 'exception', 'delayed')
+
+    states = dict((city, state) for city, state, _ in CITIES)
+    destination = pd.Series(np.concatenate([shipments['destination'].astype(object).to_numpy(),
+                                            rng.choice(list(states), k)]))
+    records = pd.DataFrame({
+        'shipment_id': 'SHP-' + pd.Series(np.arange(1001, 1001 + n + k)).astype(str).to_numpy(dtype=object),
+        'order_id': 'ORD-' + pd.Series(np.concatenate([shipments['order_id'].to_numpy(dtype=int),
+                                                       waiting['order_id'].to_numpy(dtype=int)])).astype(str),
+        'carrier': np.concatenate([shipments['carrier'].astype(object).to_numpy(), rng.choice(CARRIERS, k)]),
+        'tracking_number': np.concatenate([shipments['tracking_number'].to_numpy(dtype=object),
+                                           np.full(k, None, dtype=object)]),
+        'status': status,
+        'shipped_date': shipped_date,
+        'delivered_date': np.concatenate([shipments['delivered_date'].to_numpy(),
+                                          np.full(k, np.datetime64('NaT', 'ns'))]),
+        'destination': (destination + ', ' + destination.map(states)).to_numpy(dtype=object),
+        'cost': np.concatenate([shipments['shipping_cost'].to_numpy(dtype=float), rng.uniform(8, 30, k).round(2)]),
+        'address_issue': address_issue,
+        'weight': np.concatenate([shipments['weight'].to_numpy(dtype=float), rng.uniform(0.5, 50, k).round(2)]),
+        'insurance': np.where(rng.random(n + k) > 0.8, 'yes', 'no')
+    })
     
     # Delivery Times Analysis
     delivery_times = []
@@ -170,7 +170,7 @@ def generate_sample_shipping_data():
             'performance': 'excellent' if data['ontime'] >= 94 else 'good'
         })
     
-    return (pd.DataFrame(records), pd.DataFrame(delivery_times), 
+    return (records, pd.DataFrame(delivery_times), 
             pd.DataFrame(costs), pd.DataFrame(carriers_perf))
 
 # ===========================
@@ -226,11 +226,12 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_shipping_filters(df, date_cutoff, carrier_list, status_list, search_text):
     filtered = df.copy()
     
     if date_cutoff:
-        filtered = filtered[filtered['shipped_date'] >= date_cutoff]
+        filtered = filtered[filtered['shipped_date'] >= pd.Timestamp(date_cutoff)]
     
     if carrier_list:
         filtered = filtered[filtered['carrier'].isin(carrier_list)]
@@ -364,7 +365,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: SHIPPING RECORDS
-with tab1:
+with tab1, timed_section('shipping_records'):
     st.subheader("Shipping Records")
     
     if len(filtered_records) > 0:
@@ -425,7 +426,7 @@ with tab1:
         st.info("No shipments match the current filters")
 
 # TAB 2: DELIVERY TIMES
-with tab2:
+with tab2, timed_section('delivery_times'):
     st.subheader("Delivery Time Analysis")
     
     if len(delivery_df) > 0:
@@ -485,7 +486,7 @@ with tab2:
         st.info("No delivery data available")
 
 # TAB 3: SHIPPING COSTS
-with tab3:
+with tab3, timed_section('shipping_costs'):
     st.subheader("Shipping Cost Analysis")
     
     if len(costs_df) > 0:
@@ -555,7 +556,7 @@ with tab3:
         st.info("No cost data available")
 
 # TAB 4: CARRIER PERFORMANCE
-with tab4:
+with tab4, timed_section('carrier_performance'):
     st.subheader("Carrier Performance Comparison")
     
     if len(filtered_carriers) > 0:
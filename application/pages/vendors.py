@@ -10,6 +10,10 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
+from utils.synthetic import DEFAULT_SCALE, generate_table
+from utils.instrumentation import timed, timed_cache, timed_section
+from utils.metrics import track_page
+
 st.set_page_config(
     page_title="Supplier Data Quality",
     page_icon="🏭",
@@ -17,6 +21,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+track_page('vendors')
+
 st.markdown("""
 <style>
     .main > div { padding-top: 0.5rem; }
@@ -57,155 +63,92 @@ st.markdown("""
 # GENERATE SAMPLE DATA
 # ===========================
 
-@st.cache_data(ttl=600)
-def generate_sample_vendor_data():
-    """Generate sample vendor data with quality metrics"""
-    np.random.seed(42)
-    
-    categories = ['Electronics', 'Clothing', 'Home & Garden', 'Food & Beverage', 'Sports', 'Beauty', 'Books', 'Toys']
-    countries = ['USA', 'China', 'Germany', 'Japan', 'Italy', 'France', 'UK', 'South Korea']
-    statuses = ['active', 'inactive', 'pending']
-    
+@timed_cache(st.cache_data(ttl=600))
+def generate_sample_vendor_data(scale=DEFAULT_SCALE):
+    """Vendor list, ratings, contracts and performance derived from the synthetic vendors"""
+    table = generate_table('vendors', scale)
+    rng = np.random.default_rng(42)
+    now = pd.Timestamp.now().normalize()
+
     # Vendor List
-    vendors = []
-    for i in range(1, 235):
-        category = np.random.choice(categories)
-        status = np.random.choice(statuses, p=[0.85, 0.10, 0.05])
-        
-        # Rating distribution
-        if np.random.random() < 0.20:
-            rating = np.random.uniform(4.5, 5.0)
-        elif np.random.random() < 0.60:
-            rating = np.random.uniform(3.5, 4.5)
-        else:
-            rating = np.random.uniform(2.0, 3.5)
-        
-        rating = round(rating, 1)
-        base_performance = (rating / 5.0) * 100
-        on_time_delivery = int(max(75, min(99, base_performance + np.random.uniform(-5, 5))))
-        quality_score = int(max(80, min(99, base_performance + np.random.uniform(-3, 7))))
-        total_orders = np.random.randint(100, 2500)
-        response_time = round(np.random.uniform(1.5, 6.0), 1)
-        
-        contact = None if np.random.random() < 0.034 else f'contact{i}@vendor{i}.com'
-        phone = None if np.random.random() < 0.02 else f'+1-555-{np.random.randint(1000, 9999)}'
-        
-        vendors.append({
-            'id': f'VEN-{1000+i}',
-            'name': f'Vendor {i} - {category[:4]}',
-            'category': category,
-            'status': status,
-            'rating': rating,
-            'total_orders': total_orders,
-            'on_time_delivery': on_time_delivery,
-            'quality_score': quality_score,
-            'response_time': response_time,
-            'contact': contact,
-            'phone': phone,
-            'country': np.random.choice(countries)
-        })
-    
+    vendors = pd.DataFrame({
+        'id': 'VEN-' + (table['vendor_id'].astype(int) + 1000).astype(str).to_numpy(dtype=object),
+        'name': table['vendor_name'].to_numpy(dtype=object),
+        'category': table['category'].astype(object).to_numpy(),
+        'status': table['status'].astype(object).to_numpy(),
+        'rating': table['rating'].to_numpy(dtype=float).round(1),
+        'total_orders': table['total_orders'].to_numpy(dtype=int),
+        'on_time_delivery': table['on_time_delivery_pct'].to_numpy(dtype=float).round().astype(int),
+        'quality_score': table['quality_score'].to_numpy(dtype=float).round().astype(int),
+        'response_time': table['response_time_hours'].to_numpy(dtype=int),
+        'contact': table['contact_email'].to_numpy(dtype=object),
+        'phone': table['contact_phone'].to_numpy(dtype=object),
+        'country': table['country'].astype(object).to_numpy()
+    })
+    top = vendors.sort_values('rating', ascending=False, kind='stable')
+
     # Vendor Ratings
-    ratings = []
-    top_vendors = sorted(vendors, key=lambda x: x['rating'], reverse=True)[:50]
-    
-    for vendor in top_vendors:
-        reviews = int(vendor['total_orders'] * np.random.uniform(0.05, 0.15))
-        quality = vendor['quality_score']
-        delivery = vendor['on_time_delivery']
-        communication = int(max(75, min(99, (quality + delivery) / 2 + np.random.randint(-5, 5))))
-        pricing = int(max(70, min(99, (quality + delivery) / 2 + np.random.randint(-8, 3))))
-        
-        last_review_days = np.random.randint(1, 30)
-        last_review = (datetime.now() - timedelta(days=last_review_days)).strftime('%Y-%m-%d')
-        
-        if vendor['rating'] >= 4.5:
-            trend = np.random.choice(['up', 'stable'], p=[0.3, 0.7])
-        elif vendor['rating'] >= 3.5:
-            trend = np.random.choice(['up', 'stable', 'down'], p=[0.2, 0.6, 0.2])
-        else:
-            trend = np.random.choice(['stable', 'down'], p=[0.3, 0.7])
-        
-        ratings.append({
-            'vendor': vendor['name'],
-            'rating': vendor['rating'],
-            'reviews': reviews,
-            'quality': quality,
-            'delivery': delivery,
-            'communication': communication,
-            'pricing': pricing,
-            'last_review': last_review,
-            'trend': trend
-        })
-    
+    rated = top.head(50)
+    n = len(rated)
+    quality, delivery = rated['quality_score'].to_numpy(), rated['on_time_delivery'].to_numpy()
+    rating = rated['rating'].to_numpy()
+    draw = rng.random(n)
+    trend = np.select(
+        [rating >= 4.5, rating >= 3.5],
+        [np.where(draw < 0.3, 'up', 'stable'), np.select([draw < 0.2, draw < 0.8], ['up', 'stable'], 'down')],
+        np.where(draw < 0.3, 'stable', 'down')
+    )
+    ratings = pd.DataFrame({
+        'vendor': rated['name'].to_numpy(),
+        'rating': rating,
+        'reviews': (rated['total_orders'].to_numpy() * rng.uniform(0.05, 0.15, n)).astype(int),
+        'quality': quality,
+        'delivery': delivery,
+        'communication': np.clip((quality + delivery) / 2 + rng.integers(-5, 5, n), 75, 99).astype(int),
+        'pricing': np.clip((quality + delivery) / 2 + rng.integers(-8, 3, n), 70, 99).astype(int),
+        'last_review': (now - pd.to_timedelta(rng.integers(1, 30, n), unit='D')).strftime('%Y-%m-%d'),
+        'trend': trend
+    })
+
     # Contracts
-    contracts = []
-    contract_vendors = [v for v in vendors if v['status'] == 'active' and v['rating'] >= 3.5][:80]
-    
-    for i, vendor in enumerate(contract_vendors):
-        start_date = datetime.now() - timedelta(days=int(np.random.randint(30, 730)))
-        duration = int(np.random.choice([365, 730]))
-        end_date = start_date + timedelta(days=duration)
-        
-        days_until_expiry = (end_date - datetime.now()).days
-        if days_until_expiry < 0:
-            status = 'expired'
-        elif days_until_expiry < 30:
-            status = 'pending'
-        else:
-            status = 'active'
-        
-        contract_value = np.random.randint(500000, 5000000)
-        payment_terms = np.random.choice(['Net 15', 'Net 30', 'Net 45', 'Net 60'])
-        minimum_order = int(contract_value * np.random.uniform(0.01, 0.05))
-        delivery_terms = np.random.choice(['FOB', 'CIF', 'EXW', 'DDP'])
-        exclusivity = np.random.choice(['Yes', 'No'], p=[0.15, 0.85])
-        auto_renew = np.random.choice(['Yes', 'No'], p=[0.60, 0.40])
-        
-        contracts.append({
-            'vendor': vendor['name'],
-            'contract_id': f'CNT-{2024}-{i+1:03d}',
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d'),
-            'status': status,
-            'value': contract_value,
-            'payment_terms': payment_terms,
-            'minimum_order': minimum_order,
-            'delivery_terms': delivery_terms,
-            'exclusivity': exclusivity,
-            'auto_renew': auto_renew
-        })
-    
+    contracted = vendors[(vendors['status'] == 'active') & (vendors['rating'] >= 3.5)].head(80)
+    n = len(contracted)
+    start_date = now - pd.to_timedelta(rng.integers(30, 730, n), unit='D')
+    end_date = start_date + pd.to_timedelta(rng.choice([365, 730], n), unit='D')
+    days_until_expiry = (end_date - now).days.to_numpy()
+    value = rng.integers(500000, 5000000, n)
+    contracts = pd.DataFrame({
+        'vendor': contracted['name'].to_numpy(),
+        'contract_id': [f'CNT-2024-{i:03d}' for i in range(1, n + 1)],
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'status': np.select([days_until_expiry < 0, days_until_expiry < 30], ['expired', 'pending'], 'active'),
+        'value': value,
+        'payment_terms': rng.choice(['Net 15', 'Net 30', 'Net 45', 'Net 60'], n),
+        'minimum_order': (value * rng.uniform(0.01, 0.05, n)).astype(int),
+        'delivery_terms': rng.choice(['FOB', 'CIF', 'EXW', 'DDP'], n),
+        'exclusivity': rng.choice(['Yes', 'No'], n, p=[0.15, 0.85]),
+        'auto_renew': rng.choice(['Yes', 'No'], n, p=[0.60, 0.40])
+    })
+
     # Performance Metrics
-    performance = []
-    top_performance_vendors = sorted(vendors, key=lambda x: x['rating'], reverse=True)[:30]
-    
-    for vendor in top_performance_vendors:
-        delivery_rate = vendor['on_time_delivery']
-        quality_rate = vendor['quality_score']
-        base_perf = (delivery_rate + quality_rate) / 2
-        
-        return_rate = round(max(0.5, (100 - base_perf) / 10 + np.random.uniform(-1, 1)), 1)
-        defect_rate = round(max(0.3, (100 - base_perf) / 12 + np.random.uniform(-0.5, 0.5)), 1)
-        lead_time = int(max(5, min(30, 25 - (base_perf - 80) / 3 + np.random.randint(-3, 3))))
-        fill_rate = int(max(80, min(99, base_perf + np.random.randint(-3, 3))))
-        cost_variance = int(max(1, min(15, (100 - base_perf) / 8 + np.random.randint(-2, 2))))
-        innovation_score = int(max(60, min(98, base_perf + np.random.randint(-10, 5))))
-        
-        performance.append({
-            'vendor': vendor['name'],
-            'delivery_rate': delivery_rate,
-            'quality_rate': quality_rate,
-            'return_rate': return_rate,
-            'defect_rate': defect_rate,
-            'lead_time': lead_time,
-            'fill_rate': fill_rate,
-            'cost_variance': cost_variance,
-            'innovation_score': innovation_score
-        })
-    
-    return (pd.DataFrame(vendors), pd.DataFrame(ratings), 
-            pd.DataFrame(contracts), pd.DataFrame(performance))
+    best = top.head(30)
+    n = len(best)
+    delivery_rate, quality_rate = best['on_time_delivery'].to_numpy(), best['quality_score'].to_numpy()
+    base_perf = (delivery_rate + quality_rate) / 2
+    performance = pd.DataFrame({
+        'vendor': best['name'].to_numpy(),
+        'delivery_rate': delivery_rate,
+        'quality_rate': quality_rate,
+        'return_rate': np.maximum(0.5, (100 - base_perf) / 10 + rng.uniform(-1, 1, n)).round(1),
+        'defect_rate': np.maximum(0.3, (100 - base_perf) / 12 + rng.uniform(-0.5, 0.5, n)).round(1),
+        'lead_time': np.clip(25 - (base_perf - 80) / 3 + rng.integers(-3, 3, n), 5, 30).astype(int),
+        'fill_rate': np.clip(base_perf + rng.integers(-3, 3, n), 80, 99).astype(int),
+        'cost_variance': np.clip((100 - base_perf) / 8 + rng.integers(-2, 2, n), 1, 15).astype(int),
+        'innovation_score': np.clip(base_perf + rng.integers(-10, 5, n), 60, 98).astype(int)
+    })
+
+    return vendors, ratings, contracts, performance
 
 # ===========================
 # LOAD DATA
@@ -265,6 +208,7 @@ with st.sidebar:
 # APPLY FILTERS
 # ===========================
 
+@timed(kind='filter')
 def apply_vendor_filters(df, status_list, rating_value, category_list, country_list, search_text):
     filtered = df.copy()
     
@@ -397,7 +341,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # TAB 1: VENDOR LIST
-with tab1:
+with tab1, timed_section('vendor_list'):
     st.subheader("Vendor Master List")
     
     if len(filtered_vendors) > 0:
@@ -446,7 +390,7 @@ with tab1:
         st.info("No vendors match the current filters")
 
 # TAB 2: VENDOR RATINGS
-with tab2:
+with tab2, timed_section('vendor_ratings'):
     st.subheader("Vendor Rating Breakdown")
     
     if len(filtered_ratings) > 0:
@@ -500,7 +444,7 @@ with tab2:
         st.info("No rating data available for filtered vendors")
 
 # TAB 3: CONTRACT DETAILS
-with tab3:
+with tab3, timed_section('contract_details'):
     st.subheader("Contract Management")
     
     if len(filtered_contracts) > 0:
@@ -553,7 +497,7 @@ with tab3:
         st.info("No contract data available for filtered vendors")
 
 # TAB 4: PERFORMANCE METRICS
-with tab4:
+with tab4, timed_section('performance_metrics'):
     st.subheader("Vendor Performance Metrics")
     
     if len(filtered_performance) > 0:
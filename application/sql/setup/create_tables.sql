@@ -9,6 +9,9 @@ USE ecommerce_analytics;
 
 
 -- Drop tables if they exist (in reverse order of dependencies)
+DROP TABLE IF EXISTS sales_rollup_state;
+DROP TABLE IF EXISTS monthly_sales_rollup;
+DROP TABLE IF EXISTS daily_sales_rollup;
 DROP TABLE IF EXISTS loyalty_program CASCADE;
 DROP TABLE IF EXISTS reviews CASCADE;
 DROP TABLE IF EXISTS shipping CASCADE;
@@ -343,6 +346,47 @@ CREATE TABLE loyalty_program (
     FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================================================
+-- ROLLUP TABLES
+-- Maintained by the dashboard (utils/rollups.py), not loaded with sample data
+-- ============================================================================
+
+-- Table: daily_sales_rollup
+-- Purpose: Orders and revenue by day, status and primary category
+CREATE TABLE daily_sales_rollup (
+    sale_date DATE NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    orders INT NOT NULL,
+    revenue DECIMAL(14, 2) NOT NULL,
+    positive_orders INT NOT NULL,
+    positive_revenue DECIMAL(14, 2) NOT NULL,
+    PRIMARY KEY (sale_date, status, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Table: monthly_sales_rollup
+-- Purpose: Orders and revenue by month, status and primary category
+CREATE TABLE monthly_sales_rollup (
+    sale_month DATE NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    orders INT NOT NULL,
+    revenue DECIMAL(14, 2) NOT NULL,
+    positive_orders INT NOT NULL,
+    positive_revenue DECIMAL(14, 2) NOT NULL,
+    PRIMARY KEY (sale_month, status, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Table: sales_rollup_state
+-- Purpose: Watermark and checksum of the orders folded into the rollups
+CREATE TABLE sales_rollup_state (
+    rollup_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version INT NOT NULL,
+    watermark BIGINT NOT NULL,
+    processed BIGINT NOT NULL,
+    checksum VARCHAR(128) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ============================================================================
 -- DISPLAY CONFIRMATION
 -- ============================================================================
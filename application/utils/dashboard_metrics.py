@@ -0,0 +1,186 @@
+"""
+Dashboard Metrics - KPI aggregation for the home page
+For MySQL-backed tables the aggregates are computed by the database (one
+grouped query over the current and previous window, one row of scalar
+subqueries for counts and averages) so the KPIs are exact at any table size;
+CSV-backed orders are read from the daily sales rollup, other frames are
+aggregated in pandas with the same window rules
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Current vs previous window in one grouped pass; the order_date range
+# predicate is served by idx_orders_order_date
+ORDER_WINDOWS_SQL = """
+SELECT
+    CASE WHEN order_date >= :start THEN 'current' ELSE 'previous' END AS period,
+    COUNT(*) AS orders,
+    SUM(total_amount) AS revenue
+FROM orders
+WHERE order_date >= :prev_start
+  AND total_amount > 0
+GROUP BY period
+"""
+
+# Scalar aggregates per table - combined into a single SELECT for the
+# tables that come from MySQL
+SCALAR_SQL = {
+    'customers': {
+        'total_customers': "(SELECT COUNT(*) FROM customers)"
+    },
+    'products': {
+        'total_products': "(SELECT COUNT(*) FROM products)",
+        # Covered by idx_products_stock (stock_quantity, is_active)
+        'low_stock_items': "(SELECT COUNT(*) FROM products WHERE stock_quantity < 10)"
+    },
+    'reviews': {
+        # Covered by idx_reviews_rating
+        'avg_rating': "(SELECT AVG(rating) FROM reviews)"
+    },
+    'returns': {
+        'total_returns': "(SELECT COUNT(*) FROM returns)"
+    }
+}
+
+PUSHDOWN_TABLES = ['orders'] + list(SCALAR_SQL)
+
+
+def window_bounds(date_range_days, now=None):
+    """
+    Start of the previous and the current window
+
+    Without an explicit `now` the current time is truncated to the minute,
+    so reruns within a minute issue identical (cacheable) queries.
+    """
+    now = now or datetime.now().replace(second=0, microsecond=0)
+    start = now - timedelta(days=date_range_days)
+    return start - timedelta(days=date_range_days), start
+
+
+def summarize_windows(revenue, orders, prev_revenue, prev_orders):
+    """Revenue, order count, AOV and period-over-period deltas"""
+    return {
+        'revenue': float(revenue),
+        'orders': int(orders),
+        'aov': float(revenue) / orders if orders else 0,
+        'revenue_delta': (revenue - prev_revenue) / prev_revenue * 100 if prev_revenue > 0 else 0,
+        'orders_delta': (orders - prev_orders) / prev_orders * 100 if prev_orders > 0 else 0
+    }
+
+
+def frame_order_windows(orders_df, date_col, amount_col, date_range_days, now=None):
+    """
+    pandas fallback for the order window totals
+
+    Returns:
+        (revenue, orders, prev_revenue, prev_orders) over rows with a valid
+        date and a positive amount
+    """
+    dates = pd.to_datetime(orders_df[date_col], errors='coerce')
+    amounts = pd.to_numeric(orders_df[amount_col], errors='coerce')
+    valid = (dates.notna() & (amounts > 0)).to_numpy()
+
+    prev_start, start = window_bounds(date_range_days, now)
+    dates = dates.to_numpy()[valid]
+    amounts = amounts.to_numpy()[valid]
+
+    current = dates >= np.datetime64(start)
+    previous = ~current & (dates >= np.datetime64(prev_start))
+    return amounts[current].sum(), int(current.sum()), amounts[previous].sum(), int(previous.sum())
+
+
+def rollup_order_windows(daily, date_range_days, now=None):
+    """
+    Order window totals from the daily sales rollup (see utils.rollups)
+
+    Windows are aligned to whole days: a day belongs to the window its
+    midnight falls in, which matches frame_order_windows for date-only
+    order timestamps.
+
+    Returns:
+        (revenue, orders, prev_revenue, prev_orders) over positive amounts
+    """
+    prev_start, start = window_bounds(date_range_days, now)
+    dates = daily['sale_date'].to_numpy()
+    current = dates >= np.datetime64(start)
+    previous = ~current & (dates >= np.datetime64(prev_start))
+
+    revenue = daily['positive_revenue'].to_numpy()
+    orders = daily['positive_orders'].to_numpy()
+    return revenue[current].sum(), int(orders[current].sum()), revenue[previous].sum(), int(orders[previous].sum())
+
+
+def query_dashboard_metrics(tables, date_range_days=90, now=None, loader=None):
+    """
+    Aggregate dashboard inputs in MySQL
+
+    Args:
+        tables: MySQL-backed tables to aggregate (subset of PUSHDOWN_TABLES)
+        date_range_days: Window length for the order metrics
+        now: Reference time (defaults to the current minute)
+        loader: Function (query, params) -> DataFrame; defaults to the
+            shared query cache
+
+    Returns:
+        Dictionary of the aggregates that could be computed: order window
+        totals ('revenue', 'orders', 'prev_revenue', 'prev_orders') and the
+        scalar values of SCALAR_SQL. Tables whose query failed are missing.
+    """
+    if loader is None:
+        from utils.query_cache import cached_query
+        loader = cached_query
+
+    results = {}
+
+    if 'orders' in tables:
+        prev_start, start = window_bounds(date_range_days, now)
+        windows = loader(ORDER_WINDOWS_SQL, {'start': start, 'prev_start': prev_start})
+        if windows is not None:
+            windows = windows.set_index('period')
+            for period, prefix in (('current', ''), ('previous', 'prev_')):
+                row = windows.loc[period] if period in windows.index else None
+                results[f'{prefix}revenue'] = float(row['revenue'] or 0) if row is not None else 0.0
+                results[f'{prefix}orders'] = int(row['orders']) if row is not None else 0
+
+    scalars = {name: sql for table in tables for name, sql in SCALAR_SQL.get(table, {}).items()}
+    if scalars:
+        query = 'SELECT ' + ', '.join(f'{sql} AS {name}' for name, sql in scalars.items())
+        row = loader(query, None)
+        if row is not None and not row.empty:
+            for name, value in row.iloc[0].items():
+                results[name] = float(value) if value is not None else None
+
+    return results
+
+
+def business_totals(loader=None):
+    """
+    All-time values for the business gauges
+
+    Revenue and order count come from the sales rollups (positive amounts,
+    as on the dashboard); customers are counted in MySQL when the registry
+    loads them from there, since the registry only holds a limited sample.
+
+    Returns:
+        Dictionary with 'revenue', 'orders' and 'total_customers' where the
+        data is available
+    """
+    from utils.datasets import get_dataset, dataset_source
+    from utils.rollups import sales_rollups
+
+    totals = {}
+    rollups = sales_rollups()
+    if rollups is not None:
+        daily = rollups['daily']
+        totals['revenue'] = float(daily['positive_revenue'].sum())
+        totals['orders'] = int(daily['positive_orders'].sum())
+
+    source = dataset_source('customers')
+    if source == 'MySQL':
+        totals['total_customers'] = query_dashboard_metrics(['customers'], loader=loader).get('total_customers')
+    elif source == 'CSV':
+        totals['total_customers'] = len(get_dataset('customers', columns=['customer_id']))
+    return totals
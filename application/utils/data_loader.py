@@ -2,12 +2,16 @@ import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+from utils.snapshot import load_snapshot
+from utils.datasets import find_dataset_by_csv, get_dataset
+
 def load_csv(csv_name, folder="core_data"):
     """Load CSV file from sample_data directory"""
     try:
         file_path = Path(f"sample_data/{folder}/{csv_name}")
-        df = pd.read_csv(file_path)
-        return df
+        if not file_path.exists():
+            raise FileNotFoundError(file_path)
+        return load_snapshot(file_path)
     except FileNotFoundError:
         st.error(f"File not found: {file_path}")
         return pd.DataFrame()
@@ -15,7 +19,11 @@ def load_csv(csv_name, folder="core_data"):
         st.error(f"Error loading CSV: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
 def load_cached_csv(csv_name, folder="core_data"):
-    """Load CSV with caching (1 hour TTL)"""
+    """Load CSV through the shared dataset registry (parsed once per process)"""
+    name = find_dataset_by_csv(f"{folder}/{csv_name}")
+    if name is not None:
+        df = get_dataset(name)
+        if df is not None:
+            return df
     return load_csv(csv_name, folder)
\ No newline at end of file
@@ -0,0 +1,350 @@
+"""
+Data Quality Rules - Vectorized record validation for the analysis pages
+Each check is a column mask; masks are combined into issue labels and
+severities with array lookups instead of walking rows with iterrows()
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+SEVERITY_LEVELS = ['low', 'medium', 'high', 'critical']
+MISSING_MARKER = '❌ Missing'
+
+
+def missing_mask(series):
+    """Null values (loaders keep missing values as NaN, never the string 'nan')"""
+    return series.isna().to_numpy()
+
+
+def _as_text(series):
+    """Column as strings, matching str(value) for non-string entries"""
+    if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+        series = series.astype(str)
+    return series
+
+
+def contains_mask(series, substring):
+    """Boolean mask of values containing a literal substring (nulls -> False)"""
+    series = _as_text(series)
+    if ARROW_AVAILABLE:
+        result = pc.match_substring(pa.array(series, type=pa.string(), from_pandas=True), substring)
+        return pc.fill_null(result, False).to_numpy(zero_copy_only=False)
+    return series.str.contains(substring, regex=False).to_numpy(dtype=bool, na_value=False)
+
+
+def digit_count(series):
+    """Number of digit characters in each value (nulls -> 0)"""
+    series = _as_text(series)
+    if ARROW_AVAILABLE:
+        arr = pa.array(series, type=pa.string(), from_pandas=True)
+        _, offsets_buf, data_buf = arr.buffers()
+        data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, dtype=np.uint8)
+        if not (data >= 0x80).any():
+            # ASCII-only: count '0'-'9' bytes straight from the UTF-8 buffer
+            offsets = np.frombuffer(offsets_buf, dtype=np.int32)[arr.offset:arr.offset + len(arr) + 1]
+            running = np.concatenate(([0], np.cumsum((data >= 0x30) & (data <= 0x39), dtype=np.int64)))
+            return running[offsets[1:]] - running[offsets[:-1]]
+        result = pc.count_substring_regex(arr, r'\p{Nd}')
+        return pc.fill_null(result, 0).to_numpy(zero_copy_only=False).astype(np.int64)
+    return series.str.count(r'\d').to_numpy(dtype=np.int64, na_value=0)
+
+
+def _build_lookup(rule_states):
+    """
+    Precompute the issue label and severity for every combination of rule states
+
+    Args:
+        rule_states: List of rules; each rule is a list of (label, severity)
+            per state, with state 0 meaning "no issue" as (None, None). A state
+            may add a third element - the severities it is allowed to replace -
+            otherwise the more severe of the two wins
+
+    Returns:
+        (labels array, severity codes array) indexed by the combined state code
+    """
+    labels = ['']
+    severities = [0]
+    for states in rule_states:
+        next_labels, next_severities = [], []
+        for label_so_far, severity_so_far in zip(labels, severities):
+            for label, severity, *replaces in states:
+                if label is None:
+                    next_labels.append(label_so_far)
+                    next_severities.append(severity_so_far)
+                    continue
+
+                next_labels.append(f'{label_so_far} & {label}' if label_so_far else label)
+                level = SEVERITY_LEVELS.index(severity)
+                if replaces:
+                    replaceable = [SEVERITY_LEVELS.index(name) for name in replaces[0]]
+                    next_severities.append(level if severity_so_far in replaceable else severity_so_far)
+                else:
+                    next_severities.append(max(severity_so_far, level))
+        labels, severities = next_labels, next_severities
+    return np.array(labels, dtype=object), np.array(severities)
+
+
+def _combine(state_arrays, rule_states):
+    """Turn per-rule state codes into issue labels and severity names"""
+    labels, severities = _build_lookup(rule_states)
+    code = np.zeros(len(state_arrays[0]), dtype=np.int64)
+    for states, rule_codes in zip(rule_states, state_arrays):
+        code = code * len(states) + rule_codes
+    return labels[code], np.array(SEVERITY_LEVELS, dtype=object)[severities[code]]
+
+
+def _display(series, mask=None):
+    """Column values with missing entries replaced by the missing marker"""
+    values = series.to_numpy(dtype=object, copy=True)
+    values[series.isna().to_numpy() if mask is None else mask] = MISSING_MARKER
+    return values
+
+
+# Customer rules: email (ok / missing / invalid), phone (ok / missing / invalid), address (ok / missing)
+CUSTOMER_RULES = [
+    [(None, None), ('Missing Email', 'critical'), ('Invalid Email Format', 'high')],
+    [(None, None), ('Missing Phone', 'high'), ('Invalid Phone Format', 'medium')],
+    [(None, None), ('Missing Address', 'medium')]
+]
+
+def customer_quality_issues(df):
+    """
+    Find customers with missing or malformed contact data
+
+    Args:
+        df: Customer DataFrame with standardized column names
+
+    Returns:
+        DataFrame with one row per customer with issues (Customer ID, Name,
+        Email, Phone, Address, Issue, Severity, Registered), or an empty
+        DataFrame if there are none
+    """
+    email_missing = missing_mask(df['email'])
+    email_invalid = ~email_missing & ~(contains_mask(df['email'], '@') & contains_mask(df['email'], '.'))
+
+    phone_missing = missing_mask(df['phone'])
+    phone_invalid = ~phone_missing & (digit_count(df['phone']) < 10)
+
+    address_missing = missing_mask(df['address'])
+
+    states = [
+        np.select([email_missing, email_invalid], [1, 2], 0),
+        np.select([phone_missing, phone_invalid], [1, 2], 0),
+        address_missing.astype(np.int64)
+    ]
+    has_issue = (states[0] | states[1] | states[2]) > 0
+    if not has_issue.any():
+        return pd.DataFrame()
+
+    issue, severity = _combine([s[has_issue] for s in states], CUSTOMER_RULES)
+    flagged = df[has_issue]
+
+    return pd.DataFrame({
+        'Customer ID': flagged['customer_id'].to_numpy(),
+        'Name': flagged['name'].to_numpy(),
+        'Email': _display(flagged['email']),
+        'Phone': _display(flagged['phone']),
+        'Address': _display(flagged['address']),
+        'Issue': issue,
+        'Severity': severity,
+        'Registered': flagged['created_date'].to_numpy()
+    })
+
+
+# Product rules: name, price (ok / missing / invalid), description, category, image.
+# A missing category only raises a still-"low" product to high, so it keeps
+# the earlier rules' severity when a description is missing as well
+PRODUCT_RULES = [
+    [(None, None), ('Missing Name', 'critical')],
+    [(None, None), ('Missing Price', 'high'), ('Invalid Price', 'critical')],
+    [(None, None), ('Missing Description', 'medium')],
+    [(None, None), ('Missing Category', 'high', ('low',))],
+    [(None, None), ('Missing Image', 'medium')]
+]
+
+
+def _format_price(price, valid):
+    """'$12.34' for valid prices, the invalid marker otherwise"""
+    values = np.full(len(price), '❌ Invalid', dtype=object)
+    values[valid] = pd.Series(price[valid]).map('${:.2f}'.format).to_numpy()
+    return values
+
+
+def product_quality_issues(df):
+    """
+    Find products with missing names, prices, descriptions, categories or images
+
+    Args:
+        df: Product DataFrame
+
+    Returns:
+        DataFrame with one row per product with issues (Product ID, SKU, Name,
+        Category, Price, Description, Image, Stock, Issue, Severity, Created),
+        or an empty DataFrame if there are none
+    """
+    price = pd.to_numeric(df['price'], errors='coerce').to_numpy(dtype=float)
+    price_missing = np.isnan(price)
+    price_valid = ~price_missing & (price > 0)
+
+    name_missing = df['name'].isna().to_numpy()
+    description_missing = df['description'].isna().to_numpy()
+    category_missing = df['category'].isna().to_numpy()
+    image_missing = (df['image'] == 'No').to_numpy()
+
+    states = [
+        name_missing.astype(np.int64),
+        np.select([price_missing, ~price_valid], [1, 2], 0),
+        description_missing.astype(np.int64),
+        category_missing.astype(np.int64),
+        image_missing.astype(np.int64)
+    ]
+    has_issue = np.logical_or.reduce([s > 0 for s in states])
+    if not has_issue.any():
+        return pd.DataFrame()
+
+    issue, severity = _combine([s[has_issue] for s in states], PRODUCT_RULES)
+    flagged = df[has_issue]
+
+    return pd.DataFrame({
+        'Product ID': flagged['product_id'].to_numpy(),
+        'SKU': flagged['sku'].to_numpy(),
+        'Name': _display(flagged['name']),
+        'Category': _display(flagged['category']),
+        'Price': _format_price(price[has_issue], price_valid[has_issue]),
+        'Description': np.where(description_missing[has_issue], MISSING_MARKER, 'Yes').astype(object),
+        'Image': flagged['image'].to_numpy(),
+        'Stock': flagged['stock'].to_numpy(),
+        'Issue': issue,
+        'Severity': severity,
+        'Created': flagged['created_date'].to_numpy()
+    })
+
+
+# Category completeness: the five fields a complete product listing needs,
+# and the issues reported as a category's top issue (first wins on ties)
+COMPLETENESS_FIELDS = 5
+CATEGORY_ISSUES = ['Missing descriptions', 'Missing images', 'Invalid prices']
+
+
+def category_completeness(df):
+    """
+    Per-category product counts, average price, field completeness and top issue
+
+    Computed in one grouped pass over per-row flags instead of filtering the
+    frame once per category.
+
+    Returns:
+        DataFrame with Category, Total Products, Avg Price, Data Completeness
+        and Top Issue columns, categories in order of first appearance
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    price = pd.to_numeric(df['price'], errors='coerce')
+    price_valid = price.notna() & (price > 0)
+    stock = pd.to_numeric(df['stock'], errors='coerce')
+
+    flags = pd.DataFrame({
+        'category': df['category'],
+        'fields': (
+            df['name'].notna().astype(np.int64)
+            + df['description'].notna()
+            + price_valid
+            + (df['image'] == 'Yes')
+            + (stock > 0)
+        ),
+        'valid_price': price.where(price_valid),
+        'Missing descriptions': df['description'].isna(),
+        'Missing images': df['image'] == 'No',
+        'Invalid prices': ~price_valid
+    })
+
+    # observed=True: a categorical category column would otherwise list every
+    # declared category, including ones with no products in this frame
+    grouped = flags.groupby('category', sort=False, observed=True)
+    stats = grouped.agg(
+        total=('fields', 'size'),
+        fields=('fields', 'sum'),
+        avg_price=('valid_price', 'mean'),
+        **{name: (name, 'sum') for name in CATEGORY_ISSUES}
+    )
+
+    issue_counts = stats[CATEGORY_ISSUES].to_numpy()
+    top_issue = np.where(
+        issue_counts.max(axis=1) > 0,
+        np.array(CATEGORY_ISSUES, dtype=object)[issue_counts.argmax(axis=1)],
+        'No issues'
+    )
+    completeness = stats['fields'] / (stats['total'] * COMPLETENESS_FIELDS) * 100
+
+    result = pd.DataFrame({
+        'Category': stats.index.to_numpy(),
+        'Total Products': stats['total'].to_numpy(),
+        'Avg Price': stats['avg_price'].map(lambda v: f'${v:.2f}' if pd.notna(v) else 'N/A').to_numpy(),
+        'Data Completeness': completeness.map('{:.1f}%'.format).to_numpy(),
+        'Top Issue': top_issue.astype(object)
+    })
+
+    uncategorized = int(df['category'].isna().sum())
+    if uncategorized > 0:
+        result = pd.concat([result, pd.DataFrame([{
+            'Category': 'Uncategorized',
+            'Total Products': uncategorized,
+            'Avg Price': 'N/A',
+            'Data Completeness': '45.0%',
+            'Top Issue': 'No category assigned'
+        }])], ignore_index=True)
+
+    return result
+
+
+# Order integrity: each order gets at most one issue, checked in this order
+ORDER_ISSUES = np.array([None, 'Orphaned Order', 'Price Mismatch', 'Invalid Total'], dtype=object)
+PRICE_TOLERANCE = 0.01
+
+
+def order_integrity_issues(df):
+    """
+    Find orphaned orders, price mismatches and non-positive order totals
+
+    Args:
+        df: Order DataFrame with order_total and calculated_total columns
+
+    Returns:
+        DataFrame with one row per order with an issue (Order ID, Customer,
+        Date, Order Total, Calculated Total, Discrepancy, Issue); amounts stay
+        numeric so the page formats them at display time
+    """
+    order_total = pd.to_numeric(df['order_total'], errors='coerce').to_numpy(dtype=float)
+    calculated_total = pd.to_numeric(df['calculated_total'], errors='coerce').to_numpy(dtype=float)
+    discrepancy = calculated_total - order_total
+
+    orphaned = df['customer_id'].isna().to_numpy()
+    code = np.select(
+        [orphaned, np.abs(discrepancy) > PRICE_TOLERANCE, order_total <= 0],
+        [1, 2, 3],
+        0
+    )
+    has_issue = code > 0
+    if not has_issue.any():
+        return pd.DataFrame()
+
+    customer = df['customer_id'].to_numpy(dtype=object)[has_issue]
+    customer[orphaned[has_issue]] = None
+
+    return pd.DataFrame({
+        'Order ID': df['order_id'].to_numpy()[has_issue],
+        'Customer': customer,
+        'Date': df['order_date'].to_numpy()[has_issue],
+        'Order Total': order_total[has_issue],
+        'Calculated Total': calculated_total[has_issue],
+        'Discrepancy': discrepancy[has_issue],
+        'Issue': ORDER_ISSUES[code[has_issue]]
+    })
@@ -5,14 +5,22 @@ STREAMLIT-SAFE: Won't run test code on import
 """
 
 import os
+import time
+import threading
 import pymysql
 import mysql.connector
 import pandas as pd
+import yaml
 from pathlib import Path
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
 import warnings
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +41,71 @@ REDIS_CONFIG = {
     'port': int(os.getenv('REDIS_PORT', 6379))
 }
 
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+def _load_pool_config():
+    """
+    Connection pool settings: config.yaml `database.pool` section,
+    overridden per pod by DB_POOL_* environment variables
+    """
+    pool = {
+        'pool_size': 5,
+        'max_overflow': 5,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True
+    }
+    
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            file_config = yaml.safe_load(f) or {}
+        pool.update((file_config.get('database') or {}).get('pool') or {})
+    except Exception:
+        pass
+    
+    env_overrides = {
+        'pool_size': ('DB_POOL_SIZE', int),
+        'max_overflow': ('DB_MAX_OVERFLOW', int),
+        'pool_timeout': ('DB_POOL_TIMEOUT', int),
+        'pool_recycle': ('DB_POOL_RECYCLE', int),
+        'pool_pre_ping': ('DB_POOL_PRE_PING', lambda v: v.strip().lower() in ('1', 'true', 'yes'))
+    }
+    for key, (env_var, cast) in env_overrides.items():
+        value = os.getenv(env_var)
+        if value:
+            pool[key] = cast(value)
+    
+    return pool
+
+POOL_CONFIG = _load_pool_config()
+
+# Rows per fetch for streamed (server-side cursor) reads; 0 disables streaming
+STREAM_CHUNK_SIZE = int(os.getenv('DB_STREAM_CHUNK_SIZE', 50000))
+
+# Process-wide engine registry - one pooled engine per connection string,
+# shared by every Streamlit script-run thread
+_engines = {}
+_engine_lock = threading.Lock()
+
+_pool_stats = {
+    'connections_opened': 0,
+    'checkouts': 0,
+    'checkout_errors': 0,
+    'wait_seconds_total': 0.0,
+    'wait_seconds_max': 0.0
+}
+_stats_lock = threading.Lock()
+
+def _record_stat(key, amount=1):
+    with _stats_lock:
+        _pool_stats[key] += amount
+
+def _register_pool_listeners(engine):
+    """Count new DBAPI connections so pool churn is visible in get_pool_stats()"""
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        _record_stat('connections_opened')
+
 def get_db_connection():
     """Create database connection from environment variables"""
     config = {
@@ -45,19 +118,8 @@ def get_db_connection():
     return mysql.connector.connect(**config)
 
 def get_sqlalchemy_engine():
-    """Create SQLAlchemy engine"""
-    host = DB_CONFIG['host']
-    port = DB_CONFIG['port']
-    database = DB_CONFIG['database']
-    user = DB_CONFIG['user']
-    password = DB_CONFIG['password']
-    
-    # URL encode password to handle special characters
-    from urllib.parse import quote_plus
-    encoded_password = quote_plus(password) if password else ''
-   
-    connection_string = f"mysql+pymysql://{user}:{encoded_password}@{host}:{port}/{database}"
-    return create_engine(connection_string)
+    """Return the shared SQLAlchemy engine (kept for backwards compatibility)"""
+    return get_engine()
 
 def get_connection_string():
     """Generate SQLAlchemy connection string"""
@@ -72,19 +134,105 @@ def get_connection_string():
     )
 
 def get_engine():
-    """Create and return SQLAlchemy engine"""
-    try:
-        connection_string = get_connection_string()
-        # Use NullPool to avoid connection pool issues in Streamlit
-        engine = create_engine(
-            connection_string,
-            poolclass=NullPool,
-            connect_args={'connect_timeout': 10}
-        )
+    """
+    Return the process-wide pooled SQLAlchemy engine
+    
+    The engine is created once per connection string and reused by every
+    query, so connections are checked out of a bounded QueuePool instead of
+    paying a full MySQL handshake per call. Pre-ping drops connections the
+    server has closed, recycle retires them before MySQL's wait_timeout.
+    
+    Returns:
+        Engine or None
+    """
+    connection_string = get_connection_string()
+    engine = _engines.get(connection_string)
+    if engine is not None:
+        return engine
+    
+    with _engine_lock:
+        engine = _engines.get(connection_string)
+        if engine is not None:
+            return engine
+        
+        try:
+            engine = create_engine(
+                connection_string,
+                poolclass=QueuePool,
+                pool_size=POOL_CONFIG['pool_size'],
+                max_overflow=POOL_CONFIG['max_overflow'],
+                pool_timeout=POOL_CONFIG['pool_timeout'],
+                pool_recycle=POOL_CONFIG['pool_recycle'],
+                pool_pre_ping=POOL_CONFIG['pool_pre_ping'],
+                connect_args={'connect_timeout': 10}
+            )
+        except Exception as e:
+            # Silent in Streamlit - don't print to console
+            return None
+        
+        _register_pool_listeners(engine)
+        _engines[connection_string] = engine
         return engine
-    except Exception as e:
-        # Silent in Streamlit - don't print to console
-        return None
+
+@contextmanager
+def pooled_connection(engine=None):
+    """
+    Check a connection out of the shared pool, recording how long the
+    checkout waited (time blocked on a saturated pool plus any new connect)
+    """
+    engine = engine or get_engine()
+    start = time.perf_counter()
+    try:
+        conn = engine.connect()
+    except Exception:
+        _record_stat('checkout_errors')
+        raise
+    
+    waited = time.perf_counter() - start
+    with _stats_lock:
+        _pool_stats['checkouts'] += 1
+        _pool_stats['wait_seconds_total'] += waited
+        _pool_stats['wait_seconds_max'] = max(_pool_stats['wait_seconds_max'], waited)
+    
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def get_pool_stats():
+    """
+    Get connection pool statistics for the shared engine
+    
+    Returns:
+        Dictionary with pool limits, current occupancy and checkout/wait counters
+    """
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    
+    checkouts = stats['checkouts']
+    stats['wait_seconds_avg'] = stats['wait_seconds_total'] / checkouts if checkouts else 0.0
+    stats['pool_size'] = POOL_CONFIG['pool_size']
+    stats['max_overflow'] = POOL_CONFIG['max_overflow']
+    
+    engine = _engines.get(get_connection_string())
+    if engine is not None:
+        pool = engine.pool
+        stats['checked_out'] = pool.checkedout()
+        stats['checked_in'] = pool.checkedin()
+        stats['overflow'] = pool.overflow()
+    else:
+        stats['checked_out'] = 0
+        stats['checked_in'] = 0
+        stats['overflow'] = 0
+    
+    return stats
+
+def dispose_engines():
+    """Close all pooled connections and clear the engine registry"""
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
 
 def get_pymysql_connection():
     """Create and return a raw PyMySQL connection (for SHOW TABLES, etc.)"""
@@ -107,21 +255,174 @@ def test_connection():
     try:
         engine = get_engine()
         if engine:
-            with engine.connect() as conn:
+            with pooled_connection(engine) as conn:
                 conn.execute(text("SELECT 1"))
             return True
         return False
     except Exception as e:
         return False
 
-def execute_sql_query(query, params=None):
+def frame_from_rows(rows, columns):
+    """
+    Build a typed DataFrame from DB-API rows
+    
+    DECIMAL columns become float64 and DATE columns datetime64, instead of
+    staying object columns of Python values
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        sample = values.dropna()
+        if sample.empty:
+            continue
+        first = sample.iloc[0]
+        if isinstance(first, Decimal):
+            df[col] = pd.to_numeric(values, errors='coerce')
+        elif isinstance(first, (date, datetime)):
+            df[col] = pd.to_datetime(values, errors='coerce')
+    return df
+
+def _execute_chunks(conn, query, params, chunk_size):
+    """Execute on an open connection, yielding typed chunks from a server-side cursor"""
+    result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(
+        text(query), params or {}
+    )
+    if not result.returns_rows:
+        result.close()
+        return
+    
+    columns = list(result.keys())
+    empty = True
+    try:
+        for rows in result.partitions(chunk_size):
+            empty = False
+            yield frame_from_rows(rows, columns)
+    finally:
+        result.close()
+    
+    # A SELECT without rows still yields its (empty) columns
+    if empty:
+        yield frame_from_rows([], columns)
+
+def stream_sql_query(query, params=None, chunk_size=None):
+    """
+    Stream a SELECT as typed DataFrame chunks
+    
+    Uses a server-side cursor (stream_results - pymysql's SSCursor), so at
+    most one chunk of rows is held as Python objects at any time. The pooled
+    connection stays checked out until the generator is exhausted or closed.
+    Unlike execute_sql_query, errors are raised to the caller.
+    
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+        chunk_size: Rows per chunk (defaults to DB_STREAM_CHUNK_SIZE)
+    
+    Yields:
+        DataFrame chunks with the same columns
+    """
+    engine = get_engine()
+    if not engine:
+        return
+    
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE or 50000
+    with pooled_connection(engine) as conn:
+        yield from _execute_chunks(conn, query, params, chunk_size)
+
+def _column_buffer(values, capacity):
+    """Empty array for a column, able to hold `capacity` values of its kind"""
+    if isinstance(values.dtype, np.dtype):
+        return np.empty(capacity, dtype=values.dtype)
+    return np.empty(capacity, dtype=object)
+
+def _widen(buffer, values):
+    """Buffer converted to a dtype that can also hold `values`, if needed"""
+    dtype = values.dtype if isinstance(values.dtype, np.dtype) else np.dtype(object)
+    if np.can_cast(dtype, buffer.dtype, casting='safe'):
+        return buffer
+    if dtype == object and values.isna().all():
+        # An all-NULL chunk: keep float/datetime columns typed, ints become float
+        if buffer.dtype.kind in 'fM':
+            return buffer
+        if buffer.dtype.kind in 'iu':
+            return buffer.astype(np.float64)
+    if buffer.dtype.kind in 'biuf' and dtype.kind in 'biuf':
+        return buffer.astype(np.result_type(buffer.dtype, dtype))
+    return buffer.astype(object)
+
+def _fill(buffer, start, values):
+    """Copy a chunk column into buffer[start:start + len(values)]"""
+    end = start + len(values)
+    if buffer.dtype.kind in 'fM' and values.dtype == object and values.isna().all():
+        buffer[start:end] = np.datetime64('NaT') if buffer.dtype.kind == 'M' else np.nan
+    else:
+        buffer[start:end] = values.to_numpy(dtype=buffer.dtype)
+
+def concat_chunks(chunks):
+    """
+    Concatenate DataFrame chunks into one exactly-sized frame
+    
+    Each chunk's columns are copied out and the chunk is released as soon
+    as it has been consumed. Each final column is then allocated at the
+    exact row count and filled from its pieces, releasing them as it goes.
+    A streamed read peaks at the result plus one column, instead of holding
+    every chunk and a concatenated copy. Columns whose chunks disagree on
+    dtype are widened (int -> float, or object as the last resort).
+    
+    Args:
+        chunks: Iterable of DataFrames with the same columns
+    
+    Returns:
+        DataFrame (empty if there were no chunks)
+    """
+    columns = None
+    pieces = []
+    rows = 0
+    
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+            pieces = [[] for _ in columns]
+        for i, col in enumerate(columns):
+            pieces[i].append(chunk[col].copy())
+        rows += len(chunk)
+        del chunk
+    
+    if columns is None:
+        return pd.DataFrame()
+    
+    data = {}
+    for i, col in enumerate(columns):
+        column, pieces[i] = pieces[i], None
+        buffer = _column_buffer(column[0], 0)
+        for values in column:
+            buffer = _widen(buffer, values)
+        
+        buffer = np.empty(rows, dtype=buffer.dtype)
+        start = 0
+        for j, values in enumerate(column):
+            _fill(buffer, start, values)
+            start += len(values)
+            column[j] = None
+        # An explicit dtype skips object-column type inference, which
+        # allocates several temporary arrays of the full length
+        data[col] = pd.Series(buffer, dtype=buffer.dtype, copy=False)
+    
+    return pd.DataFrame(data, copy=False)
+
+def execute_sql_query(query, params=None, chunk_size=None):
     """
     Execute a SQL query and return results as DataFrame
     Uses SQLAlchemy to avoid pandas warnings and handle special characters
     
+    Result rows are streamed through a server-side cursor in chunks of
+    DB_STREAM_CHUNK_SIZE rows and assembled with concat_chunks, instead of
+    materializing every row tuple with fetchall()
+    
     Args:
         query: SQL query string
         params: Query parameters (optional)
+        chunk_size: Rows per fetch (defaults to DB_STREAM_CHUNK_SIZE, 0 = fetchall)
     
     Returns:
         DataFrame or None
@@ -131,12 +432,22 @@ def execute_sql_query(query, params=None):
         if not engine:
             return None
         
+        chunk_size = STREAM_CHUNK_SIZE if chunk_size is None else chunk_size
+        
         # Suppress the warning if it still appears
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", UserWarning)
             
             # Use text() to prevent % character interpretation
-            with engine.connect() as conn:
+            with pooled_connection(engine) as conn:
+                if chunk_size:
+                    chunks = _execute_chunks(conn, query, params, chunk_size)
+                    df = concat_chunks(chunks)
+                    if df.columns.empty:
+                        # For non-SELECT queries
+                        conn.commit()
+                    return df
+                
                 if params:
                     result = conn.execute(text(query), params)
                 else:
@@ -144,8 +455,7 @@ def execute_sql_query(query, params=None):
                 
                 # Check if query returns results
                 if result.returns_rows:
-                    df = pd.DataFrame(result.fetchall(), columns=result.keys())
-                    return df
+                    return frame_from_rows(result.fetchall(), list(result.keys()))
                 else:
                     # For non-SELECT queries
                     conn.commit()
@@ -213,7 +523,7 @@ def execute_sql_file(file_path, params=None):
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", UserWarning)
             
-            with engine.connect() as conn:
+            with pooled_connection(engine) as conn:
                 for stmt in statements:
                     try:
                         result = conn.execute(text(stmt))
@@ -270,23 +580,30 @@ def get_table_info(table_name):
     except:
         return None
 
-def safe_table_query(table_name, limit=10000):
+def safe_table_query(table_name, limit=10000, use_cache=True):
     """
     Safely query a table with existence check
     
     Args:
         table_name: Name of the table
         limit: Maximum rows to return
+        use_cache: Serve the result from the shared Redis cache when available
     
     Returns:
         DataFrame or None
     """
-    try:
+    def load(query, params=None):
+        # Checked on a cache miss only, so a hit costs no MySQL round trip
         if not table_exists(table_name):
             return None
-        
+        return execute_sql_query(query, params)
+    
+    try:
         query = f"SELECT * FROM `{table_name}` LIMIT {limit}"
-        return execute_sql_query(query)
+        if use_cache:
+            from utils.query_cache import cached_query
+            return cached_query(query, loader=load)
+        return load(query)
         
     except Exception as e:
         return None
@@ -335,10 +652,17 @@ def execute_raw_sql(sql_statement):
         if not engine:
             return False
         
-        with engine.connect() as conn:
+        with pooled_connection(engine) as conn:
             conn.execute(text(sql_statement))
             conn.commit()
         
+        # Drop shared cached results for the tables this statement changed
+        try:
+            from utils.query_cache import invalidate_for_statement
+            invalidate_for_statement(sql_statement)
+        except Exception:
+            pass
+        
         return True
         
     except Exception as e:
@@ -360,15 +684,9 @@ def query_with_context(query, params=None):
         if not engine:
             return None
         
-        with engine.connect() as conn:
-            if params:
-                result = conn.execute(text(query), params)
-            else:
-                result = conn.execute(text(query))
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(result.fetchall(), columns=result.keys())
-            return df
+        with pooled_connection(engine) as conn:
+            # Stream typed chunks into one preallocated frame
+            return concat_chunks(_execute_chunks(conn, query, params, STREAM_CHUNK_SIZE or 50000))
             
     except Exception as e:
         return None
@@ -0,0 +1,219 @@
+"""
+Dataset Registry - Single shared data-access layer for every page
+Each logical table is loaded at most once per process (CSV snapshot first,
+then MySQL) and handed out as a shared frame that pages must treat as read-only
+"""
+
+import os
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from utils.instrumentation import record_cache
+from utils.schema import apply_schema
+from utils.snapshot import APP_ROOT, load_snapshot
+
+# Logical tables - CSV location plus the cleaning rules that used to be
+# repeated in each page's loader
+DATASETS = {
+    'customers': {'csv': 'sample_data/core_data/customers.csv'},
+    'products': {'csv': 'sample_data/core_data/products.csv'},
+    'orders': {'csv': 'sample_data/core_data/orders.csv', 'header_column': 'order_date'},
+    'order_items': {'csv': 'sample_data/core_data/order_items.csv'},
+    'payments': {'csv': 'sample_data/core_data/payments.csv'},
+    'shipping': {'csv': 'sample_data/core_data/shipping.csv'},
+    'inventory': {'csv': 'sample_data/core_data/inventory.csv'},
+    'vendors': {'csv': 'sample_data/core_data/vendors.csv'},
+    'campaigns': {'csv': 'sample_data/marketing_data/campaigns.csv'},
+    'loyalty_program': {'csv': 'sample_data/marketing_data/loyalty_program.csv'},
+    'reviews': {'csv': 'sample_data/operational_data/reviews.csv'},
+    'returns': {'csv': 'sample_data/operational_data/returns.csv'},
+    'refunds': {'csv': 'sample_data/operational_data/refunds.csv'}
+}
+
+# Source selection: 'auto' (CSV, then MySQL), 'csv' or 'mysql' - any other
+# value (e.g. 'sample') loads nothing and pages use their sample data
+DATA_SOURCE = os.getenv('DATA_SOURCE', 'auto').lower()
+SQL_ROW_LIMIT = int(os.getenv('DATASET_SQL_LIMIT', 10000))
+SQL_TTL = int(os.getenv('DATASET_SQL_TTL', 300))
+
+_entries = {}
+_registry_lock = threading.Lock()
+_load_locks = {}
+
+
+def _load_lock(name):
+    with _registry_lock:
+        return _load_locks.setdefault(name, threading.Lock())
+
+
+def csv_path(name):
+    """Absolute path of a dataset's CSV file"""
+    return APP_ROOT / DATASETS[name]['csv']
+
+
+def _csv_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _clean(name, df):
+    """
+    Apply registry cleaning rules (snapshot already stripped whitespace),
+    then the table's declared dtypes - header rows have to go first, they
+    would otherwise turn into missing values instead of being dropped
+    """
+    header_col = DATASETS[name].get('header_column')
+    if header_col and header_col in df.columns:
+        header_rows = df[header_col] == header_col
+        if header_rows.any():
+            df = df[~header_rows].reset_index(drop=True)
+    return apply_schema(name, df)
+
+
+def _load_entry(name):
+    """Load a dataset from the first available source"""
+    path = csv_path(name)
+
+    if DATA_SOURCE in ('auto', 'csv') and path.exists():
+        signature = _csv_signature(path)
+        df = _clean(name, load_snapshot(path))
+        version = hashlib.sha1(f'{name}:{signature}'.encode('utf-8')).hexdigest()[:16]
+        return {'df': df, 'source': 'CSV', 'signature': signature, 'version': version, 'loaded_at': time.time()}
+
+    if DATA_SOURCE in ('auto', 'mysql'):
+        from utils.database import safe_table_query
+        df = safe_table_query(name, limit=SQL_ROW_LIMIT)
+        if df is not None and not df.empty:
+            loaded_at = time.time()
+            version = hashlib.sha1(f'{name}:sql:{loaded_at}'.encode('utf-8')).hexdigest()[:16]
+            return {'df': _clean(name, df), 'source': 'MySQL', 'signature': None, 'version': version, 'loaded_at': loaded_at}
+
+    return None
+
+
+def _is_fresh(name, entry):
+    if entry['source'] == 'CSV':
+        path = csv_path(name)
+        return path.exists() and _csv_signature(path) == entry['signature']
+    return time.time() - entry['loaded_at'] < SQL_TTL
+
+
+def _get_entry(name):
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset '{name}'")
+
+    entry = _entries.get(name)
+    if entry is not None and _is_fresh(name, entry):
+        record_cache('datasets', hit=True)
+        return entry
+
+    record_cache('datasets', hit=False)
+    with _load_lock(name):
+        entry = _entries.get(name)
+        if entry is not None and _is_fresh(name, entry):
+            return entry
+        entry = _load_entry(name)
+        if entry is None:
+            _entries.pop(name, None)
+        else:
+            _entries[name] = entry
+        return entry
+
+
+def _row_mask(df, where):
+    """Build a boolean mask from a callable or a {column: value(s)} dict"""
+    if callable(where):
+        return where(df)
+
+    mask = pd.Series(True, index=df.index)
+    for col, value in where.items():
+        if isinstance(value, (list, tuple, set, frozenset, pd.Index, pd.Series)):
+            mask &= df[col].isin(value)
+        else:
+            mask &= df[col] == value
+    return mask
+
+
+def get_dataset(name, columns=None, where=None):
+    """
+    Get a logical table from the shared registry
+
+    The returned frame shares its column data with the registry copy: column
+    assignment on it is safe, in-place edits of values are not. Projections
+    never copy data; a row filter copies only the selected rows of the
+    requested columns.
+
+    Args:
+        name: Dataset name (key of DATASETS)
+        columns: Optional list of columns to keep (missing ones are skipped)
+        where: Optional row filter - callable(df) -> mask, or {column: value(s)}
+
+    Returns:
+        DataFrame or None if no source is available
+    """
+    entry = _get_entry(name)
+    if entry is None:
+        return None
+
+    df = entry['df']
+    if columns is not None:
+        view = pd.DataFrame({col: df[col] for col in columns if col in df.columns}, copy=False)
+    else:
+        view = df.copy(deep=False)
+
+    if where is not None:
+        view = view[_row_mask(df, where)]
+
+    return view
+
+
+def load_datasets(names):
+    """
+    Load several datasets at once
+
+    Returns:
+        Dictionary of name -> DataFrame for the datasets that are available
+    """
+    data = {}
+    for name in names:
+        df = get_dataset(name)
+        if df is not None and not df.empty:
+            data[name] = df
+    return data
+
+
+def dataset_source(name):
+    """Where a loaded dataset came from ('CSV', 'MySQL') or None"""
+    entry = _get_entry(name)
+    return entry['source'] if entry else None
+
+
+def dataset_version(name):
+    """
+    Version token that changes whenever the dataset is reloaded from a
+    changed source - use it in cache keys of derived results
+    """
+    entry = _get_entry(name)
+    return entry['version'] if entry else None
+
+
+def find_dataset_by_csv(csv_file):
+    """Find the registry name for a CSV path like 'core_data/orders.csv'"""
+    csv_file = Path(csv_file).as_posix()
+    for name, spec in DATASETS.items():
+        if spec['csv'].endswith(csv_file):
+            return name
+    return None
+
+
+def clear_datasets(name=None):
+    """Drop one (or every) dataset so the next access reloads it"""
+    with _registry_lock:
+        if name is None:
+            _entries.clear()
+        else:
+            _entries.pop(name, None)
@@ -1,53 +1,150 @@
 """
 Date Utilities - Robust date parsing and cleaning
-Handles common data quality issues like header rows mixed in data
+Handles common data quality issues like header rows mixed in data.
+Each column's format is detected once from a sample and parsed with an
+explicit format (ISO 8601 fast path) instead of pandas guessing per value;
+rows are filtered with one combined mask instead of repeated frame copies
 """
 
-import pandas as pd
-from datetime import datetime
+import re
 import warnings
 
-def clean_date_column(df, date_col, drop_invalid=True):
+import numpy as np
+import pandas as pd
+
+# Explicit formats tried (in order) when a column isn't ISO 8601
+DATE_FORMATS = [
+    '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M', '%d-%m-%Y', '%m-%d-%Y', '%d.%m.%Y', '%Y%m%d',
+    '%b %d, %Y', '%d %b %Y', '%B %d, %Y', '%d %B %Y'
+]
+ISO_PATTERN = re.compile(
+    r'^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$'
+)
+FORMAT_SAMPLE_SIZE = 200
+# Formats tried per column: values the first one doesn't parse get the
+# format detected on what's left, and so on
+MAX_FORMATS = 3
+
+
+def _sample(values, size=FORMAT_SAMPLE_SIZE):
+    """Evenly spaced sample of the values (no pass over the whole column)"""
+    if len(values) <= size:
+        return values
+    return values[np.linspace(0, len(values) - 1, size).astype(int)]
+
+
+def detect_date_format(values, sample_size=FORMAT_SAMPLE_SIZE):
     """
-    Clean and parse a date column with robust error handling
-    
+    Detect the date format of string values from a sample
+
     Args:
-        df: DataFrame containing the date column
-        date_col: Name of the date column to clean
-        drop_invalid: If True, drop rows where date parsing fails
-    
+        values: Strings (non-null) to inspect
+        sample_size: Number of values to test
+
     Returns:
-        DataFrame with cleaned date column
+        'ISO8601' or one of DATE_FORMATS - whichever parses most of the
+        sample - or None if none parses any of it
     """
-    if df is None or df.empty:
-        return df
-    
-    if date_col not in df.columns:
-        warnings.warn(f"Column '{date_col}' not found in DataFrame")
+    sample = _sample(np.asarray(values, dtype=object), sample_size)
+    if len(sample) == 0:
+        return None
+
+    sample = pd.Series(sample, dtype=object).astype(str)
+    best, best_share = None, sample.str.match(ISO_PATTERN).mean()
+    if best_share > 0:
+        best = 'ISO8601'
+
+    for fmt in DATE_FORMATS:
+        if best_share == 1.0:
+            break
+        share = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+        if share > best_share:
+            best, best_share = fmt, share
+    return best
+
+
+def _parse_with_format(values, date_format):
+    """
+    Parse non-null strings with one format
+
+    Columns with repeated values (dates without a time of day, typically)
+    are parsed once per distinct string. pandas' own cache only kicks in
+    when the first values already repeat.
+    """
+    sample = _sample(values)
+    if len(pd.unique(sample)) < 0.9 * len(sample):
+        codes, uniques = pd.factorize(values)
+        parsed = pd.to_datetime(uniques, format=date_format, errors='coerce')
+        return parsed.to_numpy(dtype='datetime64[ns]')[codes]
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce', cache=False)
+    return parsed.to_numpy(dtype='datetime64[ns]')
+
+
+def parse_dates(series, date_format=None):
+    """
+    Parse a column to datetime64 with explicit formats
+
+    Already-parsed columns are returned as-is. Otherwise the format is
+    detected from a sample (unless given) and the column parsed in one
+    vectorized pass; values it doesn't match get a second detected format,
+    up to MAX_FORMATS. Columns matching no known format fall back to pandas
+    inference. Unparseable values become NaT.
+
+    Args:
+        series: Column to parse
+        date_format: Optional explicit format (strftime or 'ISO8601')
+
+    Returns:
+        datetime64 Series aligned with the input
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        return pd.to_datetime(series, errors='coerce')
+
+    values = series.to_numpy(dtype=object)
+    pending = np.flatnonzero(pd.notna(values))
+    parsed = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    for attempt in range(MAX_FORMATS):
+        if len(pending) == 0:
+            break
+        fmt = date_format or detect_date_format(values[_sample(pending)])
+        if fmt is None:
+            if attempt == 0:
+                # Unknown layout (e.g. with a timezone) - let pandas infer it
+                return pd.to_datetime(series, errors='coerce')
+            break
+        parsed[pending] = _parse_with_format(values[pending], fmt)
+        if date_format is not None:
+            break
+        pending = pending[np.isnat(parsed[pending])]
+
+    return pd.Series(parsed, index=series.index, name=series.name)
+
+
+def _valid_rows(series, parsed, date_col):
+    """
+    Mask of rows with a value that isn't blank or a repeated header
+
+    Only values that failed to parse can be either, so just those are
+    compared as strings.
+    """
+    valid = series.notna().to_numpy()
+    failed = np.flatnonzero(valid & parsed.isna().to_numpy())
+    if len(failed):
+        text = series.to_numpy(dtype=object)[failed]
+        valid[failed[(text == date_col) | (text == '')]] = False
+    return valid
+
+
+def _take(df, keep):
+    """Rows selected by a mask - the frame itself (shallow) if all are kept"""
+    if keep.all():
         return df
-    
-    # Create a copy to avoid modifying original
-    df = df.copy()
-    
-    # 1. Remove rows where the date column contains its own name (header rows mixed in data)
-    df = df[df[date_col] != date_col]
-    
-    # 2. Remove null/empty values
-    df = df[df[date_col].notna()]
-    df = df[df[date_col] != '']
-    
-    # 3. Convert to datetime with error handling
-    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-    
-    # 4. Optionally drop rows where conversion failed
-    if drop_invalid:
-        original_count = len(df)
-        df = df[df[date_col].notna()]
-        dropped = original_count - len(df)
-        if dropped > 0:
-            warnings.warn(f"Dropped {dropped} rows with invalid dates in '{date_col}'")
-    
-    return df
+    return df.take(np.flatnonzero(keep))
 
 
 def clean_multiple_date_columns(df, date_columns, drop_invalid=True):
@@ -60,18 +157,53 @@ def clean_multiple_date_columns(df, date_columns, drop_invalid=True):
         drop_invalid: If True, drop rows where any date parsing fails
     
     Returns:
-        DataFrame with all date columns cleaned
+        DataFrame with all date columns cleaned (the input is not modified)
     """
     if df is None or df.empty:
         return df
-    
-    df = df.copy()
-    
+
+    result = df.copy(deep=False)
+    keep = np.ones(len(df), dtype=bool)
+
     for date_col in date_columns:
-        if date_col in df.columns:
-            df = clean_date_column(df, date_col, drop_invalid)
+        if date_col not in df.columns:
+            continue
+        parsed = parse_dates(df[date_col])
+        valid = _valid_rows(df[date_col], parsed, date_col)
+        keep &= valid
+        if drop_invalid:
+            invalid = valid & parsed.isna().to_numpy()
+            if invalid.any():
+                warnings.warn(f"Dropped {int(invalid.sum())} rows with invalid dates in '{date_col}'")
+            keep &= ~invalid
+        result[date_col] = parsed
+
+    return _take(result, keep)
+
+
+def clean_date_column(df, date_col, drop_invalid=True):
+    """
+    Clean and parse a date column with robust error handling
+
+    Rows whose value is missing, blank or a repeated header are removed;
+    the rest is parsed with the column's detected format.
+
+    Args:
+        df: DataFrame containing the date column
+        date_col: Name of the date column to clean
+        drop_invalid: If True, drop rows where date parsing fails
     
-    return df
+    Returns:
+        DataFrame with cleaned date column (the input is not modified)
+    """
+    if df is None or df.empty:
+        return df
+    
+    if date_col not in df.columns:
+        warnings.warn(f"Column '{date_col}' not found in DataFrame")
+        return df
+
+    return clean_multiple_date_columns(df, [date_col], drop_invalid)
 
 
 def safe_date_filter(df, date_col, start_date=None, end_date=None):
@@ -98,18 +230,15 @@ def safe_date_filter(df, date_col, start_date=None, end_date=None):
     if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
         df = clean_date_column(df, date_col)
     
-    # Apply filters
+    # Apply both bounds as one mask
+    dates = df[date_col]
+    keep = np.ones(len(df), dtype=bool)
     if start_date is not None:
-        if isinstance(start_date, str):
-            start_date = pd.to_datetime(start_date)
-        df = df[df[date_col] >= start_date]
-    
+        keep &= (dates >= pd.Timestamp(start_date)).to_numpy()
     if end_date is not None:
-        if isinstance(end_date, str):
-            end_date = pd.to_datetime(end_date)
-        df = df[df[date_col] <= end_date]
+        keep &= (dates <= pd.Timestamp(end_date)).to_numpy()
     
-    return df
+    return _take(df, keep)
 
 
 def get_date_column_stats(df, date_col):
@@ -136,16 +265,15 @@ def get_date_column_stats(df, date_col):
         'date_range_days': None
     }
     
-    # Try to parse dates
-    temp_df = df.copy()
-    temp_df[date_col] = pd.to_datetime(temp_df[date_col], errors='coerce')
+    # Parse only the one column
+    parsed = parse_dates(df[date_col])
     
-    stats['valid_dates'] = temp_df[date_col].notna().sum()
+    stats['valid_dates'] = parsed.notna().sum()
     stats['invalid_dates'] = stats['total_rows'] - stats['valid_dates'] - stats['null_count']
     
     if stats['valid_dates'] > 0:
-        stats['earliest_date'] = temp_df[date_col].min()
-        stats['latest_date'] = temp_df[date_col].max()
+        stats['earliest_date'] = parsed.min()
+        stats['latest_date'] = parsed.max()
         
         if stats['earliest_date'] and stats['latest_date']:
             stats['date_range_days'] = (stats['latest_date'] - stats['earliest_date']).days
@@ -0,0 +1,346 @@
+"""
+Duplicate Detection - Hash-index based duplicate grouping
+Rows are factorized on a (normalized) key once; group sizes, membership and a
+representative row per group all come from that single index, so finding
+every duplicate group is one pass over the table instead of a scan per value.
+Near-duplicates are found the same way: cheap blocking keys select candidate
+pairs, and only those pairs are scored with string similarity.
+"""
+
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+# Placeholder strings that mean "no value" and must never form a group
+PLACEHOLDERS = ['', 'nan', 'none', 'null', 'missing', 'n/a']
+
+# Arrow-backed strings make the .str operations below several times faster
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+
+def _clean_text(series):
+    """Strings trimmed and lowercased, with placeholders turned into NA"""
+    text = series.astype(STRING_DTYPE).str.strip().str.lower()
+    return text.mask(text.isin(PLACEHOLDERS))
+
+
+def _to_keys(text):
+    """String column as an object Series with NaN for missing keys"""
+    return text.astype(object).where(text.notna(), np.nan)
+
+
+def normalize_text(series):
+    """Case- and whitespace-insensitive key for names, SKUs and similar"""
+    return _to_keys(_clean_text(series).str.replace(r'\s+', ' ', regex=True))
+
+
+def normalize_email(series):
+    """Lowercased, trimmed email addresses; values without '@' are not keys"""
+    email = _clean_text(series)
+    return _to_keys(email.where(email.str.contains('@', regex=False).fillna(False)))
+
+
+def normalize_phone(series):
+    """
+    Canonical phone number - digits only, without a leading US country code.
+    Numbers with fewer than 7 digits are not usable as keys.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        series = series.astype('Int64')
+    digits = series.astype(STRING_DTYPE).str.replace(r'\D', '', regex=True)
+    digits = digits.mask((digits.str.len() == 11) & digits.str.startswith('1'), digits.str[1:])
+    return _to_keys(digits.mask(digits.str.len() < 7))
+
+
+NORMALIZERS = {
+    'text': normalize_text,
+    'email': normalize_email,
+    'phone': normalize_phone
+}
+
+
+def duplicate_index(keys):
+    """
+    Build the duplicate index for a key column
+
+    Args:
+        keys: Series of (already normalized) keys; NaN keys are never grouped
+
+    Returns:
+        Tuple of (group id per row, -1 where the row has no duplicate;
+        DataFrame of groups with key, records and first_row - the position
+        of the group's first row - ordered by size, then first appearance)
+    """
+    codes, uniques = pd.factorize(keys, use_na_sentinel=True)
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+
+    _, first_row = np.unique(codes[valid], return_index=True)
+    first_row = np.flatnonzero(valid)[first_row]
+
+    duplicated = np.flatnonzero(counts > 1)
+    order = duplicated[np.argsort(-counts[duplicated], kind='stable')]
+
+    # One spare slot so the -1 code of missing keys maps to group -1
+    group_of_code = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    group_of_code[order] = np.arange(len(order))
+    group_ids = group_of_code[codes]
+
+    groups = pd.DataFrame({
+        'key': np.asarray(uniques, dtype=object)[order],
+        'records': counts[order],
+        'first_row': first_row[order]
+    })
+    return group_ids, groups
+
+
+def duplicate_groups(df, column, normalize=None, limit=None):
+    """
+    Find duplicate groups in a DataFrame column
+
+    Args:
+        df: Source DataFrame
+        column: Column to match on
+        normalize: Optional normalizer name ('text', 'email', 'phone') or callable
+        limit: Optional maximum number of groups (largest first)
+
+    Returns:
+        DataFrame with one row per duplicate group: key, records, and the
+        columns of the group's representative (first) row
+    """
+    keys = df[column]
+    if normalize is not None:
+        keys = (NORMALIZERS[normalize] if isinstance(normalize, str) else normalize)(keys)
+
+    _, groups = duplicate_index(keys)
+    if limit is not None:
+        groups = groups.head(limit)
+
+    representatives = df.iloc[groups['first_row'].to_numpy()].reset_index(drop=True)
+    return pd.concat([groups[['key', 'records']], representatives], axis=1)
+
+
+# ===========================
+# NEAR-DUPLICATE MATCHING
+# ===========================
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'), 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6'
+}
+
+# Field weights of the pair score. A field missing on either side counts as
+# half a match, so sparse records can't link on their one known field alone
+MATCH_WEIGHTS = {'name': 0.5, 'email': 0.3, 'phone': 0.2}
+MISSING_FIELD_CREDIT = 0.5
+MATCH_THRESHOLD = 0.85
+MAX_BLOCK_SIZE = 50
+
+
+def soundex(word):
+    """American Soundex code of a word ('' for words without letters)"""
+    letters = [c for c in str(word).lower() if c.isascii() and c.isalpha()]
+    if not letters:
+        return ''
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def match_fields(df, name_col='name', email_col='email', phone_col='phone'):
+    """
+    Normalized name, email and phone columns used for blocking and scoring
+    (columns missing from df are left out)
+    """
+    normalizers = [('name', name_col, normalize_text), ('email', email_col, normalize_email),
+                   ('phone', phone_col, normalize_phone)]
+    return pd.DataFrame({
+        field: normalize(df[column]) for field, column, normalize in normalizers if column in df.columns
+    }, index=df.index)
+
+
+def blocking_keys(fields):
+    """
+    Cheap keys that put likely duplicates into the same block
+
+    Args:
+        fields: Output of match_fields()
+
+    Returns:
+        Dictionary of block name -> Series of keys (NA = row not blocked):
+        email domain + first letters of the name, last 7 phone digits, and
+        surname soundex + first initial
+    """
+    keys = {}
+    names = fields['name'].astype(STRING_DTYPE) if 'name' in fields else None
+
+    if names is not None and 'email' in fields:
+        domain = fields['email'].astype(STRING_DTYPE).str.split('@').str[-1]
+        keys['email_domain'] = domain + ':' + names.str[:3]
+
+    if 'phone' in fields:
+        keys['phone_suffix'] = fields['phone'].astype(STRING_DTYPE).str[-7:]
+
+    if names is not None:
+        surname = names.str.replace(r'^.* ', '', regex=True)
+        # Soundex is computed once per distinct surname, not once per row
+        distinct = surname.dropna().unique()
+        surname_code = surname.map(dict(zip(distinct, map(soundex, distinct)))).astype(STRING_DTYPE)
+        keys['surname_soundex'] = (surname_code + ':' + names.str[:1]).where(names.str.contains(' ', regex=False))
+
+    return keys
+
+
+def candidate_pairs(keys, max_block_size=MAX_BLOCK_SIZE):
+    """
+    All row pairs sharing a block under any of the blocking keys
+
+    Blocks larger than max_block_size are skipped - they come from keys too
+    common to be informative and would bring back quadratic cost.
+
+    Returns:
+        (n, 2) array of row positions with left < right, without repeats
+    """
+    pairs = []
+    for key in keys.values():
+        codes, _ = pd.factorize(key, use_na_sentinel=True)
+        rows = np.flatnonzero(codes >= 0)
+        if len(rows) == 0:
+            continue
+        order = rows[np.argsort(codes[rows], kind='stable')]
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+
+        # Blocks of equal size are expanded together with one triu index
+        for size in np.unique(sizes[(sizes > 1) & (sizes <= max_block_size)]):
+            members = order[starts[sizes == size][:, None] + np.arange(size)]
+            left, right = np.triu_indices(size, k=1)
+            pairs.append(np.stack([members[:, left].ravel(), members[:, right].ravel()], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def _similarity(left, right):
+    """Similarity ratio of two value arrays, NaN where either side is missing"""
+    scores = np.full(len(left), np.nan)
+    for i, (a, b) in enumerate(zip(left, right)):
+        if isinstance(a, str) and isinstance(b, str):
+            scores[i] = 1.0 if a == b else SequenceMatcher(None, a, b).ratio()
+    return scores
+
+
+def _equality(left, right):
+    """1.0 for equal values, 0.0 otherwise, NaN where either side is missing"""
+    known = pd.notna(left) & pd.notna(right)
+    return np.where(known, (left == right).astype(float), np.nan)
+
+
+def score_pairs(fields, pairs, threshold=None):
+    """
+    Weighted similarity of each candidate pair (0-1): canonical phone
+    equality, name similarity and email local-part similarity
+
+    With a threshold, pairs whose best possible score is already below it
+    are not scored on the remaining fields and get a score of 0.
+    """
+    comparisons = [
+        ('phone', lambda values: values, _equality),
+        ('name', lambda values: values, _similarity),
+        ('email', lambda values: values.str.split('@').str[0], _similarity)
+    ]
+    comparisons = [comparison for comparison in comparisons if comparison[0] in fields]
+
+    total = np.zeros(len(pairs))
+    alive = np.arange(len(pairs))
+    weight = sum(MATCH_WEIGHTS[field] for field, _, _ in comparisons)
+    remaining = weight
+
+    for field, prepare, compare in comparisons:
+        values = prepare(fields[field]).to_numpy(dtype=object)
+        similarity = compare(values[pairs[alive, 0]], values[pairs[alive, 1]])
+        total[alive] += MATCH_WEIGHTS[field] * np.where(np.isnan(similarity), MISSING_FIELD_CREDIT, similarity)
+        remaining -= MATCH_WEIGHTS[field]
+
+        if threshold is not None:
+            # Upper bound: every remaining field identical
+            keep = (total[alive] + remaining) / weight >= threshold
+            total[alive[~keep]] = 0.0
+            alive = alive[keep]
+
+    return total / weight if weight else total
+
+
+def _connected_components(n, pairs):
+    """Component label per row for an undirected edge list (union-find)"""
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    return np.array([find(i) for i in range(n)])
+
+
+def fuzzy_duplicate_clusters(df, threshold=MATCH_THRESHOLD, max_block_size=MAX_BLOCK_SIZE,
+                             name_col='name', email_col='email', phone_col='phone'):
+    """
+    Find clusters of near-duplicate customers
+
+    Candidate pairs come from the blocking keys only; pairs scoring at least
+    the threshold are linked and connected rows form a cluster.
+
+    Returns:
+        DataFrame with one row per cluster: records, score (mean score of the
+        linking pairs), rows (positions of the members), and the columns of
+        the cluster's first row, ordered by size then score
+    """
+    fields = match_fields(df, name_col, email_col, phone_col)
+    pairs = candidate_pairs(blocking_keys(fields), max_block_size)
+    if len(pairs) == 0:
+        return pd.DataFrame()
+
+    scores = score_pairs(fields, pairs, threshold=threshold)
+    matched = scores >= threshold
+    pairs, scores = pairs[matched], scores[matched]
+    if len(pairs) == 0:
+        return pd.DataFrame()
+
+    rows = np.unique(pairs)
+    local = np.searchsorted(rows, pairs)
+    labels = _connected_components(len(rows), local)
+
+    clusters = pd.DataFrame({'label': labels, 'row': rows}).groupby('label')['row'].agg(tuple)
+    pair_scores = pd.Series(scores).groupby(labels[local[:, 0]]).mean()
+
+    result = pd.DataFrame({
+        'records': clusters.map(len),
+        'score': pair_scores.reindex(clusters.index),
+        'rows': clusters
+    }).sort_values(['records', 'score'], ascending=False, kind='stable').reset_index(drop=True)
+
+    representatives = df.iloc[[members[0] for members in result['rows']]].reset_index(drop=True)
+    return pd.concat([result, representatives], axis=1)
@@ -0,0 +1,260 @@
+"""
+Forecasting - Batched seasonal forecasts over the monthly sales rollups
+Series are fitted together as the rows of one array: additive Holt-Winters
+with smoothing parameters picked per series from a grid (the recursion runs
+over time, vectorized over series x grid candidates) once two seasons of
+history exist, seasonal-naive with drift from one season, and a drift model
+below that. Fitted forecasts are cached per key until the data version
+changes
+"""
+
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+SEASON_LENGTH = 12
+
+# Two-sided 80% normal prediction interval
+INTERVAL_LEVEL = 80
+INTERVAL_Z = 1.2816
+
+# Holt-Winters smoothing parameter grid: level, trend, seasonal
+ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.01, 0.05, 0.15, 0.3)
+GAMMAS = (0.05, 0.15, 0.3, 0.5)
+PARAMETER_GRID = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+
+# Fitted forecasts per key: key -> (data version, result)
+_fits = {}
+_fit_lock = threading.Lock()
+
+
+def holt_winters(values, horizon, season_length=SEASON_LENGTH):
+    """
+    Additive Holt-Winters forecasts for every row of `values`
+
+    Each series is filtered with every parameter combination of
+    PARAMETER_GRID at once; the combination with the lowest one-step squared
+    error after the first season is kept. Initial states come from the first
+    two seasons.
+
+    Args:
+        values: Array (series x periods) with at least two seasons
+        horizon: Number of periods to forecast
+
+    Returns:
+        (mean, sigma, params): forecast and standard deviation arrays
+        (series x horizon) and the chosen (alpha, beta, gamma) per series
+    """
+    m = season_length
+    n, periods = values.shape
+    alpha, beta, gamma = PARAMETER_GRID.T
+
+    level0 = values[:, :m].mean(axis=1)
+    trend0 = (values[:, m:2 * m].mean(axis=1) - level0) / m
+    level = np.repeat(level0[:, None], len(PARAMETER_GRID), axis=1)
+    trend = np.repeat(trend0[:, None], len(PARAMETER_GRID), axis=1)
+    season = np.repeat((values[:, :m] - level0[:, None])[:, :, None], len(PARAMETER_GRID), axis=2)
+    sse = np.zeros_like(level)
+
+    for t in range(periods):
+        y = values[:, t, None]
+        s = season[:, t % m, :]
+        error = y - (level + trend + s)
+        if t >= m:
+            sse += error ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, t % m, :] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+    rows = np.arange(n)
+    best = sse.argmin(axis=1)
+    level, trend = level[rows, best], trend[rows, best]
+    season = season[rows, :, best]
+    sigma2 = sse[rows, best] / (periods - m)
+
+    steps = np.arange(1, horizon + 1)
+    mean = level[:, None] + steps * trend[:, None] + season[:, (periods + steps - 1) % m]
+
+    # h-step variance of the equivalent ETS(A,A,A) model
+    a, b, g = PARAMETER_GRID[best].T
+    j = np.arange(1, horizon)
+    c = a[:, None] * (1 + j * b[:, None]) + g[:, None] * (1 - a[:, None]) * (j % m == 0)
+    multiplier = np.concatenate([np.ones((n, 1)), 1 + np.cumsum(c ** 2, axis=1)], axis=1)
+    return mean, np.sqrt(sigma2[:, None] * multiplier), PARAMETER_GRID[best]
+
+
+def seasonal_naive_drift(values, horizon, season_length=SEASON_LENGTH):
+    """
+    Same month last season plus the average seasonal change per season
+
+    Args:
+        values: Array (series x periods) with more than one season
+
+    Returns:
+        (mean, sigma) arrays (series x horizon)
+    """
+    m = season_length
+    periods = values.shape[1]
+    changes = values[:, m:] - values[:, :-m]
+    drift = changes.mean(axis=1)
+    sigma2 = ((changes - drift[:, None]) ** 2).mean(axis=1)
+
+    steps = np.arange(1, horizon + 1)
+    seasons = (steps - 1) // m + 1
+    mean = values[:, periods - m + (steps - 1) % m] + seasons * drift[:, None]
+    variance = sigma2[:, None] * seasons * (1 + seasons / changes.shape[1])
+    return mean, np.sqrt(variance)
+
+
+def drift(values, horizon):
+    """
+    Last value plus the average change per period (last value only for a
+    single period)
+
+    Returns:
+        (mean, sigma) arrays (series x horizon)
+    """
+    periods = values.shape[1]
+    steps = np.arange(1, horizon + 1)
+    if periods < 2:
+        mean = np.repeat(values[:, -1:], horizon, axis=1)
+        return mean, np.zeros_like(mean)
+
+    changes = np.diff(values, axis=1)
+    slope = changes.mean(axis=1)
+    sigma2 = ((changes - slope[:, None]) ** 2).mean(axis=1)
+    mean = values[:, -1, None] + steps * slope[:, None]
+    return mean, np.sqrt(sigma2[:, None] * steps * (1 + steps / (periods - 1)))
+
+
+def forecast_matrix(values, horizon=12, season_length=SEASON_LENGTH):
+    """
+    Forecast every row of a series x periods array with one model
+
+    The model depends on the history length: Holt-Winters from two seasons,
+    seasonal-naive with drift from one season plus a period, drift below.
+    Forecasts and interval bounds are clipped at zero.
+
+    Returns:
+        Dictionary with 'model', 'mean', 'lower', 'upper' (series x horizon
+        arrays) and 'params' (series x 3 smoothing parameters, Holt-Winters
+        only)
+    """
+    values = np.asarray(values, dtype=float)
+    periods = values.shape[1]
+    params = None
+
+    if periods >= 2 * season_length:
+        model = 'Holt-Winters (additive)'
+        mean, sigma, params = holt_winters(values, horizon, season_length)
+    elif periods > season_length:
+        model = 'Seasonal naive with drift'
+        mean, sigma = seasonal_naive_drift(values, horizon, season_length)
+    elif periods > 0:
+        model = 'Drift'
+        mean, sigma = drift(values, horizon)
+    else:
+        raise ValueError("At least one period of history is needed for a forecast")
+
+    return {
+        'model': model,
+        'mean': np.clip(mean, 0, None),
+        'lower': np.clip(mean - INTERVAL_Z * sigma, 0, None),
+        'upper': np.clip(mean + INTERVAL_Z * sigma, 0, None),
+        'params': params
+    }
+
+
+def series_matrix(monthly, measure='positive_revenue', by=None, last_date=None):
+    """
+    Monthly series from a monthly sales rollup
+
+    Args:
+        monthly: Monthly rollup (sale_month, dimensions, measures)
+        measure: Rollup measure to forecast
+        by: Optional dimension giving one series per value; a single
+            'total' series otherwise
+        last_date: Last day with data - the month containing it is dropped
+            unless the day is its month end
+
+    Returns:
+        DataFrame with one row per series and one column per month start,
+        missing months filled with 0
+    """
+    keys = ['sale_month'] if by is None else [by, 'sale_month']
+    totals = monthly.groupby(keys)[measure].sum()
+    matrix = totals.to_frame('total').T if by is None else totals.unstack('sale_month')
+    if matrix.empty:
+        return matrix
+
+    months = pd.date_range(matrix.columns.min(), matrix.columns.max(), freq='MS')
+    return drop_partial_month(matrix.reindex(columns=months).fillna(0), last_date)
+
+
+def drop_partial_month(matrix, last_date):
+    """Drop the month columns from the month containing `last_date` on, unless it is a month end"""
+    if last_date is None or pd.Timestamp(last_date).is_month_end:
+        return matrix
+    return matrix.loc[:, matrix.columns < pd.Timestamp(last_date).to_period('M').to_timestamp()]
+
+
+def forecast_series(matrix, horizon=12, key=None, version=None):
+    """
+    Forecasts for the rows of a series_matrix, cached per key and version
+
+    Returns:
+        Dictionary with 'model', 'forecast' (long DataFrame of series,
+        month, forecast, lower and upper) and 'params' (DataFrame of the
+        smoothing parameters by series, None unless Holt-Winters)
+    """
+    if key is not None:
+        with _fit_lock:
+            cached = _fits.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    fit = forecast_matrix(matrix.to_numpy(dtype=float), horizon)
+    months = pd.date_range(matrix.columns[-1], periods=horizon + 1, freq='MS')[1:]
+    forecast = pd.DataFrame({
+        'series': np.repeat(matrix.index.to_numpy(), horizon),
+        'month': np.tile(months, len(matrix)),
+        'forecast': fit['mean'].ravel(),
+        'lower': fit['lower'].ravel(),
+        'upper': fit['upper'].ravel()
+    })
+    params = None
+    if fit['params'] is not None:
+        params = pd.DataFrame(fit['params'], index=matrix.index, columns=['alpha', 'beta', 'gamma'])
+
+    result = {'model': fit['model'], 'forecast': forecast, 'params': params}
+    if key is not None:
+        with _fit_lock:
+            _fits[key] = (version, result)
+    return result
+
+
+def period_totals(forecast, months):
+    """
+    Forecast totals over the first `months` forecast months per series
+
+    Interval bounds are summed, which treats errors within the period as
+    fully correlated (a conservative interval for the total).
+
+    Returns:
+        DataFrame indexed by series with forecast, lower and upper
+    """
+    first = forecast['month'] < forecast['month'].min() + pd.DateOffset(months=months)
+    return forecast[first].groupby('series', sort=False)[['forecast', 'lower', 'upper']].sum()
+
+
+def clear_forecasts(key=None):
+    """Drop cached forecasts for one (or every) key"""
+    with _fit_lock:
+        if key is None:
+            _fits.clear()
+        else:
+            _fits.pop(key, None)
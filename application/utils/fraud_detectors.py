@@ -0,0 +1,243 @@
+"""
+Fraud Pattern Detectors - Sliding-window velocity and card-testing checks
+Transactions are replayed in time order through per-customer, per-IP and
+per-card windows. Velocity uses bucketed counters (a fixed ring of time
+buckets per key); card testing keeps a short ring of recent small charges
+per card and IP. Keys idle for longer than a window are evicted as the stream moves
+on, and the number of keys is capped (least recently seen evicted first), so
+memory stays bounded however long the stream runs.
+"""
+
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+PATTERNS = {'velocity': 'Velocity Abuse', 'card_testing': 'Card Testing Pattern'}
+
+# Velocity: transactions allowed per key within the window before an alert
+VELOCITY_WINDOW = 3600  # seconds
+VELOCITY_BUCKETS = 12
+VELOCITY_LIMITS = {'customer': 3, 'ip': 5, 'card': 3}
+
+# Card testing: at least CARD_TEST_MIN_SMALL small charges followed by one
+# LARGE_MULTIPLE times the largest of them, within the window
+CARD_TEST_WINDOW = 3600  # seconds
+CARD_TEST_RING = 8
+CARD_TEST_MIN_SMALL = 3
+SMALL_AMOUNT = 20.0
+LARGE_MULTIPLE = 10.0
+
+MAX_KEYS = 100000
+SWEEP_EVERY = 1024  # transactions between idle-key sweeps
+
+ALERT_COLUMNS = ['time', 'transaction_id', 'pattern', 'key_type', 'key', 'count', 'amount']
+
+
+class SlidingCounter:
+    """
+    Per-key transaction counts over a sliding window of time buckets
+
+    Each key holds its latest bucket number and a ring of `buckets` counts;
+    buckets that fall out of the window are zeroed when the key is next
+    touched. Counts cover the current bucket plus the previous buckets - 1,
+    so the effective window is between window - width and window seconds.
+    """
+
+    def __init__(self, window=VELOCITY_WINDOW, buckets=VELOCITY_BUCKETS, max_keys=MAX_KEYS):
+        self.buckets = buckets
+        self.width = -(-window // buckets)
+        self.max_keys = max_keys
+        self._keys = OrderedDict()
+
+    def add(self, key, seconds):
+        """Count one transaction at `seconds` and return the key's window count"""
+        bucket = seconds // self.width
+        entry = self._keys.get(key)
+        if entry is None:
+            # [latest bucket, window total, bucket counts]
+            entry = [bucket, 0, [0] * self.buckets]
+            self._keys[key] = entry
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+            gap = bucket - entry[0]
+            if gap >= self.buckets:
+                entry[1], entry[2] = 0, [0] * self.buckets
+            elif gap > 0:
+                counts = entry[2]
+                for stale in range(entry[0] + 1, bucket + 1):
+                    entry[1] -= counts[stale % self.buckets]
+                    counts[stale % self.buckets] = 0
+            elif gap <= -self.buckets:
+                return entry[1]
+            entry[0] = max(entry[0], bucket)
+
+        entry[2][bucket % self.buckets] += 1
+        entry[1] += 1
+        return entry[1]
+
+    def evict_idle(self, seconds):
+        """Drop keys without transactions inside the window ending at `seconds`"""
+        oldest = seconds // self.width - self.buckets
+        while self._keys:
+            key, entry = next(iter(self._keys.items()))
+            if entry[0] > oldest:
+                break
+            self._keys.popitem(last=False)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class AmountRing:
+    """
+    Last `size` small charges (time, amount) per key inside a time window
+
+    Used to spot card testing: several small charges on the same card or
+    IP followed by a large one. Only small charges are kept, so keys that
+    never see one take no memory.
+    """
+
+    def __init__(self, window=CARD_TEST_WINDOW, size=CARD_TEST_RING, max_keys=MAX_KEYS):
+        self.window = window
+        self.size = size
+        self.max_keys = max_keys
+        self._keys = OrderedDict()
+
+    def add(self, key, seconds, amount):
+        """
+        Record one charge
+
+        Returns:
+            Number of small charges before it when it completes a
+            small-then-large sequence (the key's ring is then cleared),
+            otherwise 0
+        """
+        ring = self._keys.get(key)
+        if ring is not None:
+            self._keys.move_to_end(key)
+            while ring and ring[0][0] <= seconds - self.window:
+                ring.popleft()
+            if len(ring) >= CARD_TEST_MIN_SMALL and amount >= LARGE_MULTIPLE * max(max(a for _, a in ring), 1.0):
+                count = len(ring)
+                ring.clear()
+                return count
+
+        if amount <= SMALL_AMOUNT:
+            if ring is None:
+                ring = deque(maxlen=self.size)
+                self._keys[key] = ring
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            ring.append((seconds, amount))
+        return 0
+
+    def evict_idle(self, seconds):
+        """Drop keys whose latest charge is outside the window ending at `seconds`"""
+        while self._keys:
+            key, ring = next(iter(self._keys.items()))
+            if ring and ring[-1][0] > seconds - self.window:
+                break
+            self._keys.popitem(last=False)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def card_keys(transactions):
+    """Card identifier per transaction: card_id, or customer and payment method without one"""
+    if 'card_id' in transactions.columns:
+        return transactions['card_id'].to_numpy(dtype=object)
+    customers = transactions['customer_id'].to_numpy(dtype=object)
+    methods = transactions['payment_method'].astype(str).to_numpy(dtype=object)
+    return np.array([None if pd.isna(customer) else f"{customer}:{method}"
+                     for customer, method in zip(customers, methods)], dtype=object)
+
+
+class PatternDetector:
+    """Velocity and card-testing detectors over one transaction stream"""
+
+    def __init__(self, max_keys=MAX_KEYS):
+        self.velocity = {key_type: SlidingCounter(max_keys=max_keys) for key_type in VELOCITY_LIMITS}
+        self.card_testing = {key_type: AmountRing(max_keys=max_keys) for key_type in ('card', 'ip')}
+        self._seen = 0
+
+    def process(self, seconds, transaction_id, amount, customer=None, ip=None, card=None):
+        """
+        Feed one transaction (in time order)
+
+        Args:
+            seconds: Transaction time in epoch seconds
+            transaction_id: Identifier reported in alerts
+            amount: Charged amount
+            customer, ip, card: The transaction's keys (None when unknown)
+
+        Returns:
+            List of alert tuples in ALERT_COLUMNS order (time in seconds)
+        """
+        alerts = []
+        for key_type, key in (('customer', customer), ('ip', ip), ('card', card)):
+            if key is None:
+                continue
+            count = self.velocity[key_type].add(key, seconds)
+            # One alert per crossing of the limit, not per transaction of a burst
+            if count == VELOCITY_LIMITS[key_type] + 1:
+                alerts.append((seconds, transaction_id, PATTERNS['velocity'], key_type, key, count, amount))
+
+            ring = self.card_testing.get(key_type)
+            if ring is not None:
+                small = ring.add(key, seconds, amount)
+                if small:
+                    alerts.append((seconds, transaction_id, PATTERNS['card_testing'], key_type, key, small, amount))
+
+        self._seen += 1
+        if self._seen % SWEEP_EVERY == 0:
+            self.evict_idle(seconds)
+        return alerts
+
+    def evict_idle(self, seconds):
+        """Drop idle keys from every window"""
+        for window in list(self.velocity.values()) + list(self.card_testing.values()):
+            window.evict_idle(seconds)
+
+    def state_size(self):
+        """Keys held per window"""
+        sizes = {f'velocity_{key_type}': len(counter) for key_type, counter in self.velocity.items()}
+        sizes.update({f'card_testing_{key_type}': len(ring) for key_type, ring in self.card_testing.items()})
+        return sizes
+
+    def replay(self, transactions):
+        """
+        Run a transaction frame (see fraud_scoring.transaction_frame) through
+        the detectors in time order
+
+        Returns:
+            DataFrame of alerts with ALERT_COLUMNS
+        """
+        transactions = transactions.sort_values('time', kind='stable')
+        seconds = np.asarray(transactions['time'], dtype='datetime64[s]').astype(np.int64).tolist()
+        n = len(transactions)
+        keys = [transactions['customer_id'].to_numpy(dtype=object), np.full(n, None, dtype=object),
+                card_keys(transactions)]
+        if 'ip_address' in transactions.columns:
+            keys[1] = transactions['ip_address'].to_numpy(dtype=object)
+        keys = [np.where(pd.isna(values), None, values).tolist() for values in keys]
+
+        ids = transactions['transaction_id'].tolist()
+        amounts = transactions['amount'].to_numpy(dtype=float).tolist()
+        alerts = []
+        for i in range(n):
+            found = self.process(seconds[i], ids[i], amounts[i], keys[0][i], keys[1][i], keys[2][i])
+            if found:
+                alerts.extend(found)
+
+        frame = pd.DataFrame(alerts, columns=ALERT_COLUMNS)
+        frame['time'] = pd.to_datetime(frame['time'], unit='s')
+        return frame
+
+
+def detect_patterns(transactions, max_keys=MAX_KEYS):
+    """Alerts from replaying a transaction frame through fresh detectors"""
+    return PatternDetector(max_keys).replay(transactions)
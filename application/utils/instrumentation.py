@@ -0,0 +1,177 @@
+"""
+Instrumentation - Latency, row count and cache hit/miss metrics for hot paths
+Loaders and analysis functions are wrapped with @timed / @timed_cache and
+render sections with `with timed_section(...)`; the page (or utils module)
+and function labels show where the time goes
+"""
+
+import os
+import sys
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils.metrics import LATENCY_BUCKETS, PROMETHEUS_ENABLED, get_metric
+
+if PROMETHEUS_ENABLED:
+    from prometheus_client import Counter, Histogram
+
+    function_duration = get_metric(
+        Histogram,
+        'streamlit_function_duration_seconds',
+        'Latency of instrumented loaders, analysis functions and render sections',
+        ['page', 'function', 'kind'],
+        buckets=LATENCY_BUCKETS
+    )
+    rows_processed = get_metric(
+        Counter,
+        'streamlit_rows_processed_total',
+        'Rows processed by instrumented functions',
+        ['page', 'function']
+    )
+    cache_requests = get_metric(
+        Counter,
+        'streamlit_cache_requests_total',
+        'Cache lookups by cache and result (hit/miss)',
+        ['cache', 'result']
+    )
+
+
+def page_label(filename):
+    """'inventory' for pages/inventory.py, 'home' for Home.py, 'rfm' for utils/rfm.py"""
+    return os.path.splitext(os.path.basename(filename))[0].lower()
+
+
+def _row_count(args, kwargs, result):
+    """Rows of the first frame argument, else of the (first) frame returned"""
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+    if isinstance(result, tuple):
+        result = next((value for value in result if isinstance(value, (pd.DataFrame, pd.Series))), None)
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    return 0
+
+
+def record_cache(cache, hit):
+    """Count one lookup in a named cache"""
+    if PROMETHEUS_ENABLED:
+        cache_requests.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def timed(func=None, *, kind='analysis', name=None):
+    """
+    Record latency and rows processed for every call
+
+    Usage:
+        @timed
+        def analyze_data_quality(df): ...
+
+        @timed(kind='filter')
+        def apply_order_filters(df, ...): ...
+
+    Args:
+        kind: 'loader', 'analysis' or 'filter'
+        name: Function label (default: the function's name)
+    """
+    def decorate(func):
+        if not PROMETHEUS_ENABLED:
+            return func
+        page = page_label(func.__code__.co_filename)
+        function = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                function_duration.labels(page, function, kind).observe(time.perf_counter() - start)
+            rows = _row_count(args, kwargs, result)
+            if rows:
+                rows_processed.labels(page, function).inc(rows)
+            return result
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def timed_cache(cache, *, kind='loader', name=None):
+    """
+    Apply a Streamlit cache decorator, recording latency of every call,
+    cache hits/misses and the rows processed on misses
+
+    Usage:
+        @timed_cache(st.cache_data(ttl=600))
+        def generate_sample_order_data(scale=DEFAULT_SCALE): ...
+
+    Args:
+        cache: The cache decorator, e.g. st.cache_data(ttl=600) or st.cache_resource
+        kind: 'loader' or 'analysis'
+        name: Function label (default: the function's name)
+    """
+    def decorate(func):
+        if not PROMETHEUS_ENABLED:
+            return cache(func)
+        page = page_label(func.__code__.co_filename)
+        function = name or func.__name__
+        missed = threading.local()
+
+        # Streamlit keys the cache on the wrapped function's source, so
+        # compute() shares the entries of the undecorated function
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            missed.value = True
+            result = func(*args, **kwargs)
+            rows = _row_count(args, kwargs, result)
+            if rows:
+                rows_processed.labels(page, function).inc(rows)
+            return result
+
+        cached = cache(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            missed.value = False
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                function_duration.labels(page, function, kind).observe(time.perf_counter() - start)
+                record_cache(f'{page}.{function}', hit=not missed.value)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+
+def timed_section(name, page=None):
+    """
+    Context manager recording the latency of a render section
+
+    Usage:
+        with tab1, timed_section('current_stock_levels'):
+            ...
+
+    Args:
+        name: Section label
+        page: Page label (default: the calling script's file name)
+    """
+    return _section(page or page_label(sys._getframe(1).f_code.co_filename), name)
+
+
+@contextmanager
+def _section(page, name):
+    if not PROMETHEUS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        function_duration.labels(page, name, 'section').observe(time.perf_counter() - start)
@@ -0,0 +1,240 @@
+"""
+Metrics - Process-wide Prometheus metrics and their /metrics endpoint
+Metrics are created once per process and shared by every page and rerun,
+so Streamlit reruns and module reloads never re-register them. They are
+served on METRICS_PORT, either from a thread of the Streamlit process or,
+with PROMETHEUS_MULTIPROC_DIR set, by the exporter sidecar
+(python -m utils.metrics_exporter) that aggregates every process
+"""
+
+import os
+import time
+import atexit
+import threading
+import warnings
+
+try:
+    from prometheus_client import (REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                                   generate_latest, multiprocess, start_http_server)
+    PROMETHEUS_ENABLED = True
+except ImportError:
+    PROMETHEUS_ENABLED = False
+
+METRICS_CONFIG = {
+    'port': int(os.getenv('METRICS_PORT', 9101)),
+    'addr': os.getenv('METRICS_ADDR', '0.0.0.0'),
+    # Seconds between business gauge refreshes
+    'business_interval': int(os.getenv('BUSINESS_METRICS_INTERVAL', 60)),
+    # A session counts as active this long after its last page view
+    'session_window': int(os.getenv('ACTIVE_SESSION_WINDOW', 300))
+}
+
+# Set for multiprocess mode: every process writes its samples here and the
+# exporter sidecar serves the aggregate
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+# Seconds; finer than the client defaults at the low end for filters and
+# cache hits, longer at the top for cold loads
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+_server_lock = threading.Lock()
+_server_started = False
+_business_thread = None
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_metric(metric_class, name, documentation, labelnames=(), **kwargs):
+    """
+    Get a metric, creating and registering it on first use
+
+    Args:
+        metric_class: prometheus_client Counter, Histogram, Gauge, ...
+        name: Metric name
+        documentation: Help text
+        labelnames: Label names
+        **kwargs: Extra constructor arguments (e.g. buckets)
+
+    Returns:
+        The metric, or None if prometheus_client is not installed
+    """
+    if not PROMETHEUS_ENABLED:
+        return None
+
+    metric = _metrics.get(name)
+    if metric is not None:
+        return metric
+
+    with _metrics_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            try:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+            except ValueError:
+                # Registered by an earlier import of this module (Streamlit
+                # reloads edited modules) - reuse that collector
+                metric = REGISTRY._names_to_collectors[name]
+            _metrics[name] = metric
+        return metric
+
+
+# ===========================
+# APPLICATION METRICS
+# ===========================
+
+if PROMETHEUS_ENABLED:
+    page_views = get_metric(Counter, 'streamlit_page_views_total', 'Total page views by page', ['page'])
+    request_duration = get_metric(Histogram, 'streamlit_request_duration_seconds', 'Request duration in seconds',
+                                  ['page'])
+    errors_total = get_metric(Counter, 'streamlit_errors_total', 'Total application errors', ['error_type'])
+    # Gauges say how to combine processes in multiprocess mode (ignored otherwise)
+    active_users = get_metric(Gauge, 'streamlit_active_users', 'Number of active users',
+                              multiprocess_mode='livesum')
+    db_status = get_metric(Gauge, 'streamlit_db_status', 'Database connection status (1=connected, 0=disconnected)',
+                           multiprocess_mode='livemax')
+
+    # Business metrics
+    total_revenue = get_metric(Gauge, 'ecommerce_total_revenue', 'Total revenue', multiprocess_mode='mostrecent')
+    total_orders = get_metric(Gauge, 'ecommerce_total_orders', 'Total number of orders',
+                              multiprocess_mode='mostrecent')
+    total_customers = get_metric(Gauge, 'ecommerce_total_customers', 'Total number of customers',
+                                 multiprocess_mode='mostrecent')
+    # publish_business_metrics() keys
+    BUSINESS_GAUGES = {'revenue': total_revenue, 'orders': total_orders, 'total_customers': total_customers}
+
+    if MULTIPROC_DIR:
+        # Drop this process's live gauges from the aggregate when it exits
+        atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def export_registry():
+    """Registry to expose: every process's samples in multiprocess mode, else this process's"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_text():
+    """Current metrics in the Prometheus text format"""
+    if not PROMETHEUS_ENABLED:
+        return ''
+    return generate_latest(export_registry()).decode('utf-8')
+
+
+def start_metrics_server(port=None, addr=None):
+    """
+    Serve /metrics from a daemon thread of this process, once per process
+
+    In multiprocess mode the exporter sidecar serves instead, so nothing is
+    started here.
+
+    Returns:
+        True if this call started the server
+    """
+    global _server_started
+    if not PROMETHEUS_ENABLED or MULTIPROC_DIR or _server_started:
+        return False
+
+    with _server_lock:
+        if _server_started:
+            return False
+        _server_started = True
+        port = METRICS_CONFIG['port'] if port is None else port
+        try:
+            start_http_server(port, addr or METRICS_CONFIG['addr'])
+        except OSError as e:
+            warnings.warn(f"Metrics server not started on port {port}: {e}")
+            return False
+        return True
+
+
+# ===========================
+# PAGE AND BUSINESS METRICS
+# ===========================
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        return None
+    return ctx.session_id if ctx else None
+
+
+def active_sessions(now=None):
+    """Sessions with a page view in the last `session_window` seconds"""
+    cutoff = (now or time.time()) - METRICS_CONFIG['session_window']
+    with _sessions_lock:
+        for session in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session]
+        return len(_sessions)
+
+
+def publish_business_metrics(values):
+    """Set the business gauges present in `values` ('revenue', 'orders', 'total_customers')"""
+    if not PROMETHEUS_ENABLED:
+        return
+    for key, gauge in BUSINESS_GAUGES.items():
+        if values.get(key) is not None:
+            gauge.set(values[key])
+
+
+def _refresh_business_metrics(collect, interval):
+    while True:
+        try:
+            publish_business_metrics(collect())
+        except Exception:
+            errors_total.labels(error_type='business_metrics').inc()
+        active_users.set(active_sessions())
+        time.sleep(interval)
+
+
+def start_business_metrics(collect, interval=None):
+    """
+    Refresh the business gauges from collect() on a daemon thread, once per
+    process - page renders never wait for them
+
+    Args:
+        collect: Function returning a dict for publish_business_metrics
+        interval: Seconds between refreshes (default: BUSINESS_METRICS_INTERVAL)
+    """
+    global _business_thread
+    if not PROMETHEUS_ENABLED or _business_thread is not None:
+        return
+    with _server_lock:
+        if _business_thread is not None:
+            return
+        _business_thread = threading.Thread(
+            target=_refresh_business_metrics, name='business-metrics', daemon=True,
+            args=(collect, interval or METRICS_CONFIG['business_interval'])
+        )
+        _business_thread.start()
+
+
+def track_page(page):
+    """
+    Count a page view and remember the session as active
+
+    Under `streamlit run` this also starts the metrics server and the
+    business gauge refresher (both once per process); scripts and AppTest
+    runs never bind the metrics port.
+    """
+    if not PROMETHEUS_ENABLED:
+        return
+    page_views.labels(page=page).inc()
+    session = _session_id()
+    if session is not None:
+        with _sessions_lock:
+            _sessions[session] = time.time()
+
+    from streamlit import runtime
+    if runtime.exists():
+        from utils.dashboard_metrics import business_totals
+        start_metrics_server()
+        start_business_metrics(business_totals)
@@ -0,0 +1,36 @@
+"""
+Metrics Exporter - /metrics endpoint for multiprocess mode
+Runs as its own process (the pod's metrics sidecar) and serves the samples
+that every Streamlit process writes to PROMETHEUS_MULTIPROC_DIR, so
+scraping never touches the app's event loop
+
+Usage:
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus-metrics python -m utils.metrics_exporter
+"""
+
+import os
+import sys
+import threading
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+
+def main():
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        sys.exit("PROMETHEUS_MULTIPROC_DIR is not set - the app serves /metrics itself in single-process mode")
+    os.makedirs(directory, exist_ok=True)
+
+    # Only the collector is registered here: the exporter's own process
+    # metrics would be meaningless next to the app's
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    port = int(os.getenv('METRICS_PORT', 9101))
+    start_http_server(port, os.getenv('METRICS_ADDR', '0.0.0.0'), registry=registry)
+    print(f"Serving metrics from {directory} on port {port}")
+    threading.Event().wait()
+
+
+if __name__ == '__main__':
+    main()
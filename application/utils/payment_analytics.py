@@ -0,0 +1,176 @@
+"""
+Payment Analytics - Status, method and failure cubes over the payments table
+Payments are normalized once per data version (dates parsed, statuses mapped
+to completed / pending / failed) and rolled up into small day x method x
+status and day x method x failure-reason cubes. Filters slice the cubes, so
+success rates, volumes and failure reasons never rescan the payments.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.date_utils import parse_dates
+
+# payments.status values (CSV export and MySQL ENUM) -> audit status
+STATUS_MAP = {
+    'paid': 'completed', 'completed': 'completed',
+    'unpaid': 'pending', 'pending': 'pending',
+    'failed': 'failed', 'refunded': 'refunded', 'cancelled': 'cancelled'
+}
+STATUSES = ['completed', 'pending', 'failed', 'refunded', 'cancelled']
+
+# Failure reasons worth retrying automatically
+RETRYABLE_REASONS = {'insufficient_funds', 'network_error', 'timeout', 'processor_error'}
+UNKNOWN_REASON = 'unknown'
+
+CUBE_KEYS = ['day', 'method', 'status']
+FAILURE_KEYS = ['day', 'method', 'failure_reason']
+
+
+def normalize_payments(payments_df, orders_df=None):
+    """
+    Payments with parsed dates and audit statuses
+
+    The payment date is used where present, otherwise the order's date
+    (unpaid and failed payments carry no payment date).
+
+    Returns:
+        DataFrame with payment_id, transaction_id, order_id, customer_id,
+        amount, method, processor, status, failure_reason, attempts, date
+        and day (date at midnight)
+    """
+    dates = parse_dates(payments_df['payment_date'])
+    customer_ids = pd.Series(np.nan, index=payments_df.index, dtype=object)
+    if orders_df is not None:
+        orders = orders_df.drop_duplicates('order_id').set_index('order_id')
+        order_ids = pd.Index(payments_df['order_id'])
+        dates = dates.fillna(pd.Series(parse_dates(orders['order_date']).reindex(order_ids).to_numpy(),
+                                       index=payments_df.index))
+        customer_ids = pd.Series(orders['customer_id'].astype(object).reindex(order_ids).to_numpy(),
+                                 index=payments_df.index)
+
+    status = payments_df['status'].astype(object).str.lower()
+    reasons = payments_df['failure_reason'].astype(object) if 'failure_reason' in payments_df.columns else None
+    failed = (status.map(STATUS_MAP) == 'failed').to_numpy()
+    failure_reason = np.full(len(payments_df), None, dtype=object)
+    if reasons is not None:
+        failure_reason = reasons.where(reasons.notna(), None).to_numpy(dtype=object)
+    failure_reason[failed & pd.isna(failure_reason)] = UNKNOWN_REASON
+
+    return pd.DataFrame({
+        'payment_id': payments_df['payment_id'].to_numpy(),
+        'transaction_id': payments_df['transaction_id'].astype(object).fillna('').astype(str).to_numpy(),
+        'order_id': payments_df['order_id'].to_numpy(),
+        'customer_id': customer_ids.to_numpy(dtype=object),
+        'amount': pd.to_numeric(payments_df['amount'], errors='coerce').fillna(0).to_numpy(dtype=float),
+        'method': payments_df['payment_method'].astype(object).fillna('Unknown').to_numpy(),
+        'processor': payments_df['payment_processor'].astype(object).fillna('Unknown').to_numpy(),
+        'status': status.map(STATUS_MAP).fillna(status).to_numpy(dtype=object),
+        'failure_reason': failure_reason,
+        'attempts': pd.to_numeric(payments_df['attempts'], errors='coerce').fillna(1).to_numpy(dtype=np.int64),
+        'date': dates.to_numpy(),
+        'day': dates.dt.normalize().to_numpy()
+    })
+
+
+def payment_cube(payments):
+    """
+    Transactions, volume and attempts per day x method x status
+
+    Payments without a date are kept under a NaT day, so cube totals equal
+    the table totals.
+    """
+    return payments.groupby(CUBE_KEYS, dropna=False, sort=True).agg(
+        transactions=('payment_id', 'size'),
+        volume=('amount', 'sum'),
+        attempts=('attempts', 'sum')
+    ).reset_index()
+
+
+def failure_cube(payments):
+    """Failed payments, failed amount and attempts per day x method x failure reason"""
+    failed = payments[payments['status'] == 'failed']
+    return failed.groupby(FAILURE_KEYS, dropna=False, sort=True).agg(
+        failures=('payment_id', 'size'),
+        amount=('amount', 'sum'),
+        attempts=('attempts', 'sum')
+    ).reset_index()
+
+
+def slice_cube(cube, start=None, methods=None, statuses=None):
+    """
+    Cube rows from `start` (inclusive; undated rows excluded) for the given
+    methods and statuses - None means no restriction
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if start is not None:
+        mask &= (cube['day'] >= pd.Timestamp(start).normalize()).to_numpy()
+    if methods is not None:
+        mask &= cube['method'].isin(methods).to_numpy()
+    if statuses is not None and 'status' in cube.columns:
+        mask &= cube['status'].isin(statuses).to_numpy()
+    return cube[mask]
+
+
+def status_totals(cube):
+    """Transactions and volume per status, every status in STATUSES included"""
+    totals = cube.groupby('status')[['transactions', 'volume']].sum()
+    order = STATUSES + [status for status in totals.index if status not in STATUSES]
+    return totals.reindex(order, fill_value=0)
+
+
+def method_summary(cube):
+    """
+    Per-method transactions, completed volume and success / failure rates
+    (% of the method's transactions)
+
+    Returns:
+        DataFrame with method, transactions, volume, success_rate and
+        failure_rate, sorted by transactions
+    """
+    counts = cube.pivot_table(index='method', columns='status', values='transactions',
+                              aggfunc='sum', fill_value=0)
+    completed_volume = cube[cube['status'] == 'completed'].groupby('method')['volume'].sum()
+    total = counts.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        summary = pd.DataFrame({
+            'transactions': total,
+            'volume': completed_volume.reindex(counts.index, fill_value=0.0),
+            'success_rate': (counts.get('completed', 0) / total * 100).round(1),
+            'failure_rate': (counts.get('failed', 0) / total * 100).round(1)
+        })
+    return summary.rename_axis('method').reset_index().sort_values('transactions', ascending=False,
+                                                                   ignore_index=True)
+
+
+def failure_summary(failures):
+    """
+    Failures per reason from a (sliced) failure cube
+
+    Returns:
+        DataFrame with failure_reason, failures, amount, attempts and
+        retryable, sorted by failures
+    """
+    summary = failures.groupby('failure_reason')[['failures', 'amount', 'attempts']].sum().reset_index()
+    summary['retryable'] = summary['failure_reason'].isin(RETRYABLE_REASONS)
+    return summary.sort_values('failures', ascending=False, ignore_index=True)
+
+
+def monthly_trend(cube, months=6):
+    """
+    Completed and failed transactions for the last `months` calendar months
+    with payments
+
+    Returns:
+        DataFrame with month (month start), completed and failed
+    """
+    dated = cube[cube['day'].notna()]
+    month = dated['day'].dt.to_period('M').dt.to_timestamp()
+    counts = dated.groupby([month, 'status'])['transactions'].sum().unstack('status', fill_value=0)
+    counts = counts.reindex(columns=['completed', 'failed'], fill_value=0)
+    if counts.empty:
+        return pd.DataFrame(columns=['month', 'completed', 'failed'])
+
+    all_months = pd.date_range(counts.index.min(), counts.index.max(), freq='MS')
+    counts = counts.reindex(all_months, fill_value=0).tail(months)
+    return counts.rename_axis('month').reset_index()
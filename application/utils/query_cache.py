@@ -0,0 +1,305 @@
+"""
+Query Cache - Redis-backed shared cache for SQL query results
+Results are stored as Arrow IPC bytes keyed by normalized SQL + params,
+so every replica shares the same warm results instead of re-querying MySQL
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+from utils.database import DB_CONFIG, REDIS_CONFIG, execute_sql_query
+from utils.instrumentation import record_cache
+
+# Cache configuration from environment
+CACHE_CONFIG = {
+    'enabled': os.getenv('QUERY_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'ttl': int(os.getenv('QUERY_CACHE_TTL', 300)),
+    'max_entry_bytes': int(os.getenv('QUERY_CACHE_MAX_ENTRY_BYTES', 8 * 1024 * 1024)),
+    'lock_timeout_ms': int(os.getenv('QUERY_CACHE_LOCK_TIMEOUT_MS', 10000)),
+    'retry_interval': 30,
+    'prefix': f"qcache:{DB_CONFIG['database']}"
+}
+
+_client = None
+_client_lock = threading.Lock()
+_last_failure = 0.0
+
+_cache_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'skipped': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+# Delete the lock only if it still holds this caller's token - it may have
+# expired and been taken by another worker while the query ran
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?', re.IGNORECASE)
+
+
+def _record_stat(key):
+    with _stats_lock:
+        _cache_stats[key] += 1
+    if key in ('hits', 'misses'):
+        record_cache('query_cache', hit=key == 'hits')
+
+
+def get_redis_client():
+    """
+    Return the process-wide Redis client, or None if Redis is unreachable
+
+    A failed connection is remembered for `retry_interval` seconds so a
+    missing Redis doesn't add a connect timeout to every query.
+    """
+    global _client, _last_failure
+
+    if not (REDIS_AVAILABLE and CACHE_CONFIG['enabled']):
+        return None
+    if _client is not None:
+        return _client
+    if time.time() - _last_failure < CACHE_CONFIG['retry_interval']:
+        return None
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+        try:
+            client = redis.Redis(
+                host=REDIS_CONFIG['host'],
+                port=REDIS_CONFIG['port'],
+                socket_connect_timeout=0.5,
+                socket_timeout=1.0
+            )
+            client.ping()
+            _client = client
+        except Exception:
+            _last_failure = time.time()
+            return None
+
+    return _client
+
+
+def _reset_client():
+    """Drop the client after a Redis error so the next call backs off"""
+    global _client, _last_failure
+    with _client_lock:
+        _client = None
+        _last_failure = time.time()
+
+
+def normalize_sql(query):
+    """Collapse whitespace and trailing semicolons so equivalent queries share a key"""
+    return ' '.join(query.split()).rstrip(';').strip()
+
+
+def make_cache_key(query, params=None):
+    """Build the Redis key for a query and its parameters"""
+    payload = normalize_sql(query)
+    if params:
+        payload += '|' + json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f"{CACHE_CONFIG['prefix']}:q:{digest}"
+
+
+def extract_tables(query):
+    """Get the table names a SQL statement reads from or writes to"""
+    return sorted({name.lower() for name in TABLE_PATTERN.findall(query)})
+
+
+def serialize_frame(df):
+    """Serialize a DataFrame to compressed Arrow IPC stream bytes"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    try:
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+    except Exception:
+        options = None
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_frame(payload):
+    """Rebuild a DataFrame from Arrow IPC stream bytes"""
+    reader = pa.ipc.open_stream(payload)
+    return reader.read_all().to_pandas()
+
+
+def _table_set_key(table):
+    return f"{CACHE_CONFIG['prefix']}:t:{table}"
+
+
+def _generation_key(table):
+    return f"{CACHE_CONFIG['prefix']}:g:{table}"
+
+
+def _store(client, key, df, tables, ttl, generations):
+    """
+    Write a result and register it under each table it depends on
+
+    `generations` are the tables' invalidation counters read before the
+    query ran; if any table was invalidated since, the result may predate
+    the write and is dropped. WATCH makes the check and the write atomic.
+    """
+    try:
+        payload = serialize_frame(df)
+    except Exception:
+        # Mixed-type object columns can't always be represented in Arrow
+        _record_stat('skipped')
+        return
+
+    if len(payload) > CACHE_CONFIG['max_entry_bytes']:
+        _record_stat('skipped')
+        return
+
+    generation_keys = [_generation_key(table) for table in tables]
+    with client.pipeline() as pipe:
+        try:
+            if generation_keys:
+                pipe.watch(*generation_keys)
+                if pipe.mget(generation_keys) != generations:
+                    _record_stat('skipped')
+                    return
+            pipe.multi()
+            pipe.set(key, payload, ex=ttl)
+            for table in tables:
+                # The set must outlive every key in it: give a new set this
+                # TTL, and only ever extend an existing one
+                pipe.sadd(_table_set_key(table), key)
+                pipe.expire(_table_set_key(table), ttl, nx=True)
+                pipe.expire(_table_set_key(table), ttl, gt=True)
+            pipe.execute()
+        except redis.WatchError:
+            _record_stat('skipped')
+            return
+    _record_stat('stores')
+
+
+def cached_query(query, params=None, ttl=None, loader=None):
+    """
+    Execute a read query through the shared Redis cache
+
+    On a miss only one caller (across all pods) runs the query while holding a
+    short Redis lock; the others poll for the stored result, which keeps a
+    rolling restart from sending the same query to MySQL from every replica.
+
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+        ttl: Time-to-live in seconds (defaults to QUERY_CACHE_TTL)
+        loader: Function (query, params) -> DataFrame used on a miss
+
+    Returns:
+        DataFrame or None
+    """
+    loader = loader or execute_sql_query
+    ttl = ttl or CACHE_CONFIG['ttl']
+
+    client = get_redis_client() if ARROW_AVAILABLE else None
+    if client is None:
+        return loader(query, params)
+
+    key = make_cache_key(query, params)
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+    have_lock = False
+    tables = extract_tables(query)
+
+    try:
+        payload = client.get(key)
+        if payload is not None:
+            _record_stat('hits')
+            return deserialize_frame(payload)
+
+        _record_stat('misses')
+        have_lock = client.set(lock_key, token, nx=True, px=CACHE_CONFIG['lock_timeout_ms'])
+        if not have_lock:
+            deadline = time.time() + CACHE_CONFIG['lock_timeout_ms'] / 1000
+            while time.time() < deadline:
+                time.sleep(0.05)
+                payload = client.get(key)
+                if payload is not None:
+                    _record_stat('hits')
+                    return deserialize_frame(payload)
+                if not client.exists(lock_key):
+                    break
+        generations = client.mget([_generation_key(table) for table in tables]) if tables else []
+    except Exception:
+        _record_stat('errors')
+        _reset_client()
+        return loader(query, params)
+
+    df = loader(query, params)
+
+    try:
+        if df is not None:
+            _store(client, key, df, tables, ttl, generations)
+        if have_lock:
+            client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception:
+        _record_stat('errors')
+        _reset_client()
+
+    return df
+
+
+def invalidate_table(table_name):
+    """
+    Drop every cached result that reads from a table
+
+    The table's generation is bumped first, so results of queries that were
+    already running are not stored afterwards.
+
+    Returns:
+        Number of cached results removed
+    """
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    table = table_name.lower()
+    set_key = _table_set_key(table)
+    try:
+        client.incr(_generation_key(table))
+        keys = client.smembers(set_key)
+        removed = client.delete(*keys) if keys else 0
+        client.delete(set_key)
+        return removed
+    except Exception:
+        _record_stat('errors')
+        _reset_client()
+        return 0
+
+
+def invalidate_for_statement(sql_statement):
+    """Invalidate cached results for every table a write statement touches"""
+    return sum(invalidate_table(table) for table in extract_tables(sql_statement))
+
+
+def get_cache_stats():
+    """Get hit/miss counters for this process"""
+    with _stats_lock:
+        stats = dict(_cache_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    stats['connected'] = _client is not None
+    return stats
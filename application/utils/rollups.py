@@ -0,0 +1,630 @@
+"""
+Sales Rollups - Persistent daily and monthly order aggregates
+Orders are aggregated by day x status x primary category (daily_sales_rollup)
+and by month (monthly_sales_rollup). The rollups are extended with the orders
+above the last processed order_id and persisted - as MySQL tables when orders
+come from MySQL, as Parquet files for CSV data - so charts read a few hundred
+rollup rows instead of re-aggregating the whole order history on every render.
+A checksum of the processed orders triggers a rebuild when existing orders
+change (status updates, amount corrections, deletions)
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from utils.date_utils import parse_dates
+from utils.snapshot import APP_ROOT, _write_atomic
+
+ROLLUP_DIR = Path(os.getenv('ROLLUP_DIR', APP_ROOT / '.cache' / 'rollups'))
+ROLLUP_TTL = int(os.getenv('ROLLUP_TTL', 300))
+# Seconds a MySQL refresh waits for another replica's refresh to finish
+ROLLUP_LOCK_TIMEOUT = int(os.getenv('ROLLUP_LOCK_TIMEOUT', 30))
+
+# Bump when the rollup grain or measures change so stored rollups are rebuilt
+ROLLUP_VERSION = 2
+
+DIMENSIONS = ['status', 'category']
+# Additive measures: all orders with a date and an amount, and the subset
+# with a positive amount (the KPI definition used on the dashboard)
+MEASURES = ['orders', 'revenue', 'positive_orders', 'positive_revenue']
+UNCATEGORIZED = 'Uncategorized'
+UNKNOWN_STATUS = 'unknown'
+
+DAILY_KEY = ['sale_date'] + DIMENSIONS
+MONTHLY_KEY = ['sale_month'] + DIMENSIONS
+
+# Also in sql/setup/create_tables.sql; for databases set up before the rollup
+# tables existed, run `python -m utils.rollups` once (create_rollup_tables)
+ROLLUP_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+        sale_date DATE NOT NULL,
+        status VARCHAR(32) NOT NULL,
+        category VARCHAR(100) NOT NULL,
+        orders INT NOT NULL,
+        revenue DECIMAL(14, 2) NOT NULL,
+        positive_orders INT NOT NULL,
+        positive_revenue DECIMAL(14, 2) NOT NULL,
+        PRIMARY KEY (sale_date, status, category)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS monthly_sales_rollup (
+        sale_month DATE NOT NULL,
+        status VARCHAR(32) NOT NULL,
+        category VARCHAR(100) NOT NULL,
+        orders INT NOT NULL,
+        revenue DECIMAL(14, 2) NOT NULL,
+        positive_orders INT NOT NULL,
+        positive_revenue DECIMAL(14, 2) NOT NULL,
+        PRIMARY KEY (sale_month, status, category)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales_rollup_state (
+        rollup_name VARCHAR(64) NOT NULL PRIMARY KEY,
+        version INT NOT NULL,
+        watermark BIGINT NOT NULL,
+        processed BIGINT NOT NULL,
+        checksum VARCHAR(128) NOT NULL
+    )
+    """
+]
+
+# Orders and item categories between the watermark and the high-water mark;
+# order_id is the primary key, so both reads only touch the new rows
+NEW_ORDERS_SQL = """
+SELECT order_id, order_date, status, total_amount
+FROM orders
+WHERE order_id > :watermark AND order_id <= :high
+"""
+NEW_ITEMS_SQL = """
+SELECT oi.order_id, oi.total_price, pc.category_name AS category
+FROM order_items oi
+LEFT JOIN products p ON p.product_id = oi.product_id
+LEFT JOIN product_categories pc ON pc.category_id = p.category_id
+WHERE oi.order_id > :watermark AND oi.order_id <= :high
+"""
+HIGH_WATER_SQL = "SELECT MAX(order_id) AS high FROM orders"
+# updated_at moves on every status change or amount correction, and the
+# count and amount total catch deletions and edits that keep updated_at
+CHECKSUM_SQL = """
+SELECT COUNT(*) AS processed, MAX(updated_at) AS changed_at, SUM(total_amount) AS amount
+FROM orders
+WHERE order_id <= :watermark
+"""
+
+# MySQL ER_NO_SUCH_TABLE: rollup tables not created yet
+NO_SUCH_TABLE = 1146
+
+# Order columns the rollups are computed from
+CHECKSUM_COLUMNS = ['order_id', 'order_date', 'status', 'total_amount']
+
+_states = {}
+_state_lock = threading.Lock()
+
+
+def primary_categories(items_df, products_df=None):
+    """
+    Category of each order's highest-value line item
+
+    Every order is counted under exactly one category, so rollup totals over
+    categories stay equal to the order totals.
+
+    Args:
+        items_df: Order items with order_id, total_price and either a
+            category or a product_id column
+        products_df: Products with product_id and category (needed when the
+            items have no category column)
+
+    Returns:
+        Series of category indexed by order_id
+    """
+    if items_df is None or items_df.empty:
+        return pd.Series(dtype=object)
+
+    if 'category' in items_df.columns:
+        categories = items_df['category']
+    else:
+        lookup = products_df.drop_duplicates('product_id').set_index('product_id')['category']
+        categories = items_df['product_id'].map(lookup)
+
+    lines = pd.DataFrame({
+        'order_id': items_df['order_id'].to_numpy(),
+        'total_price': pd.to_numeric(items_df['total_price'], errors='coerce').to_numpy(dtype=float),
+        'category': categories.astype(object).to_numpy()
+    })
+    lines = lines[pd.notna(lines['category'])]
+    lines = lines.sort_values('total_price', ascending=False, kind='stable').drop_duplicates('order_id')
+    return lines.set_index('order_id')['category']
+
+
+def aggregate_orders(orders_df, categories=None):
+    """
+    Daily rollup rows for a slice of orders
+
+    Args:
+        orders_df: Orders with order_id, order_date, status and total_amount
+        categories: Optional Series of category by order_id (see
+            primary_categories); orders without one are Uncategorized
+
+    Returns:
+        DataFrame with sale_date, status, category and the MEASURES
+    """
+    dates = parse_dates(orders_df['order_date'])
+    amounts = pd.to_numeric(orders_df['total_amount'], errors='coerce')
+    valid = (dates.notna() & amounts.notna()).to_numpy()
+
+    amounts = amounts.to_numpy(dtype=float)[valid]
+    if categories is not None and len(categories):
+        category = orders_df['order_id'].map(categories).astype(object).to_numpy()[valid]
+    else:
+        category = np.full(int(valid.sum()), np.nan, dtype=object)
+
+    positive = amounts > 0
+    frame = pd.DataFrame({
+        'sale_date': dates.dt.normalize().to_numpy()[valid],
+        'status': orders_df['status'].astype(object).to_numpy()[valid],
+        'category': category,
+        'orders': np.ones(len(amounts), dtype=np.int64),
+        'revenue': amounts,
+        'positive_orders': positive.astype(np.int64),
+        'positive_revenue': np.where(positive, amounts, 0.0)
+    })
+    frame['status'] = frame['status'].fillna(UNKNOWN_STATUS)
+    frame['category'] = frame['category'].fillna(UNCATEGORIZED)
+    return frame.groupby(DAILY_KEY, sort=True)[MEASURES].sum().reset_index()
+
+
+def monthly_rollup(daily):
+    """Roll daily rows up to calendar months"""
+    months = daily['sale_date'].dt.to_period('M').dt.to_timestamp()
+    monthly = daily[DIMENSIONS + MEASURES].assign(sale_month=months)
+    return monthly.groupby(MONTHLY_KEY, sort=True)[MEASURES].sum().reset_index()
+
+
+def merge_rollups(rollup, delta, key):
+    """Add delta rows to a rollup (measures are additive)"""
+    if rollup is None or rollup.empty:
+        return delta.reset_index(drop=True)
+    if delta.empty:
+        return rollup
+    return pd.concat([rollup, delta]).groupby(key, sort=True)[MEASURES].sum().reset_index()
+
+
+def _empty_rollup(key):
+    columns = {col: pd.Series(dtype='datetime64[ns]' if col.startswith('sale_') else object) for col in key}
+    columns.update({col: pd.Series(dtype=float if 'revenue' in col else np.int64) for col in MEASURES})
+    return pd.DataFrame(columns)
+
+
+def frame_checksum(orders_df, categories=None):
+    """
+    Order-independent hash of the rollup inputs of a set of orders
+
+    Row hashes are summed modulo 2**64, so the checksum of two disjoint sets
+    of orders is the sum of their checksums.
+    """
+    frame = orders_df[CHECKSUM_COLUMNS]
+    if categories is not None and len(categories):
+        frame = frame.assign(category=orders_df['order_id'].map(categories).astype(object))
+    return int(pd.util.hash_pandas_object(frame, index=False).to_numpy().sum(dtype=np.uint64))
+
+
+def _new_state(watermark=-1, processed=0, daily=None, monthly=None, checksum=0):
+    return {
+        'watermark': watermark,
+        'processed': processed,
+        'checksum': checksum,
+        'daily': _empty_rollup(DAILY_KEY) if daily is None else daily,
+        'monthly': _empty_rollup(MONTHLY_KEY) if monthly is None else monthly,
+        'source_version': None,
+        'refreshed_at': 0.0
+    }
+
+
+def _advance(state, new_orders, categories):
+    """
+    Fold new orders into a state
+
+    Returns:
+        (new state, daily delta, monthly delta)
+    """
+    daily_delta = aggregate_orders(new_orders, categories)
+    monthly_delta = monthly_rollup(daily_delta)
+    ids = pd.to_numeric(new_orders['order_id'], errors='coerce')
+    advanced = _new_state(
+        watermark=max(state['watermark'], int(ids.max())),
+        processed=state['processed'] + len(new_orders),
+        daily=merge_rollups(state['daily'], daily_delta, DAILY_KEY),
+        monthly=merge_rollups(state['monthly'], monthly_delta, MONTHLY_KEY)
+    )
+    return advanced, daily_delta, monthly_delta
+
+
+# ===========================
+# PARQUET STORE (CSV DATA)
+# ===========================
+
+def _parquet_paths(key):
+    base = ROLLUP_DIR / key
+    return base / 'daily_sales_rollup.parquet', base / 'monthly_sales_rollup.parquet', base / 'state.json'
+
+
+def _load_parquet(key):
+    """Stored rollups for a key, or None if missing, outdated or unreadable"""
+    daily_path, monthly_path, state_path = _parquet_paths(key)
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != ROLLUP_VERSION:
+            return None
+        return _new_state(meta['watermark'], meta['processed'],
+                          pd.read_parquet(daily_path), pd.read_parquet(monthly_path), meta['checksum'])
+    except (OSError, ValueError, KeyError, ImportError):
+        return None
+
+
+def _save_parquet(key, state):
+    """Write the rollups, then the state (a crash leaves the old state current)"""
+    daily_path, monthly_path, state_path = _parquet_paths(key)
+    _write_atomic(daily_path, lambda tmp: state['daily'].to_parquet(tmp, index=False))
+    _write_atomic(monthly_path, lambda tmp: state['monthly'].to_parquet(tmp, index=False))
+    meta = {'version': ROLLUP_VERSION, 'watermark': state['watermark'], 'processed': state['processed'],
+            'checksum': state['checksum']}
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    _write_atomic(state_path, write)
+
+
+def update_frame_rollups(orders_df, key=None, categories=None, persist=True):
+    """
+    Rollups for an orders table, updated incrementally
+
+    Orders with an order_id above the stored watermark are aggregated and
+    added to the rollups kept under `key` (in memory and, with persist, as
+    Parquet files in ROLLUP_DIR). The rollups are rebuilt when the
+    already-processed part of the table changed (row count or checksum of
+    the orders at or below the watermark differs) or order ids are not
+    numeric; without a key they are computed from scratch and not stored.
+
+    Args:
+        orders_df: Orders with order_id, order_date, status, total_amount
+        key: Source key (e.g. the dataset name)
+        categories: Optional Series of category by order_id
+        persist: Store the rollups as Parquet files
+
+    Returns:
+        State dictionary with 'daily' and 'monthly' rollup frames
+    """
+    if orders_df.empty:
+        return _new_state()
+    ids = pd.to_numeric(orders_df['order_id'], errors='coerce')
+    if key is None or ids.isna().any():
+        return _advance(_new_state(), orders_df, categories)[0]
+
+    with _state_lock:
+        state = _states.get(key)
+        if state is None and persist:
+            state = _load_parquet(key)
+
+        if state is not None:
+            seen = (ids <= state['watermark']).to_numpy()
+            if (int(seen.sum()) != state['processed']
+                    or frame_checksum(orders_df[seen], categories) != state['checksum']):
+                state = None
+            elif seen.all():
+                _states[key] = state
+                return state
+
+        if state is None:
+            state, new_orders = _new_state(), orders_df
+        else:
+            new_orders = orders_df[~seen]
+
+        checksum = (state['checksum'] + frame_checksum(new_orders, categories)) % 2 ** 64
+        state = _advance(state, new_orders, categories)[0]
+        state['checksum'] = checksum
+        if persist:
+            try:
+                _save_parquet(key, state)
+            except (OSError, ImportError):
+                # Rollup directory not writable - keep the in-memory copy
+                pass
+        _states[key] = state
+        return state
+
+
+# ===========================
+# MYSQL STORE
+# ===========================
+
+def _sql_rows(frame, key):
+    """Rollup rows as parameter dicts for executemany"""
+    rows = frame[key + MEASURES].copy()
+    rows[key[0]] = rows[key[0]].dt.date
+    records = rows.to_dict('records')
+    for record in records:
+        for col in MEASURES:
+            record[col] = float(record[col]) if 'revenue' in col else int(record[col])
+    return records
+
+
+def _write_sql_rollups(conn, name, state, deltas, rebuild):
+    """Upsert the rollup rows touched by the deltas (portable DELETE + INSERT)"""
+    from sqlalchemy import text
+
+    for table, key, frame, delta in (
+        ('daily_sales_rollup', DAILY_KEY, state['daily'], deltas[0]),
+        ('monthly_sales_rollup', MONTHLY_KEY, state['monthly'], deltas[1])
+    ):
+        if rebuild:
+            conn.execute(text(f"DELETE FROM {table}"))
+            touched = frame
+        else:
+            touched = frame.merge(delta[key], on=key)
+            conditions = ' AND '.join(f"{col} = :{col}" for col in key)
+            keys = [{col: row[col] for col in key} for row in _sql_rows(delta, key)]
+            if keys:
+                conn.execute(text(f"DELETE FROM {table} WHERE {conditions}"), keys)
+        rows = _sql_rows(touched, key)
+        if rows:
+            columns = ', '.join(key + MEASURES)
+            values = ', '.join(f":{col}" for col in key + MEASURES)
+            conn.execute(text(f"INSERT INTO {table} ({columns}) VALUES ({values})"), rows)
+
+    conn.execute(text("DELETE FROM sales_rollup_state WHERE rollup_name = :name"), {'name': name})
+    conn.execute(
+        text("INSERT INTO sales_rollup_state (rollup_name, version, watermark, processed, checksum) "
+             "VALUES (:name, :version, :watermark, :processed, :checksum)"),
+        {'name': name, 'version': ROLLUP_VERSION, 'watermark': state['watermark'],
+         'processed': state['processed'], 'checksum': state['checksum']}
+    )
+
+
+def _state_row(conn, name, for_update=False):
+    """(version, watermark, processed, checksum) stored for a rollup, or None"""
+    from sqlalchemy import text
+
+    query = "SELECT version, watermark, processed, checksum FROM sales_rollup_state WHERE rollup_name = :name"
+    if for_update and conn.dialect.name == 'mysql':
+        query += " FOR UPDATE"
+    row = conn.execute(text(query), {'name': name}).fetchone()
+    return None if row is None else tuple(row)
+
+
+def _read_sql_state(conn, name):
+    """Stored rollups from the MySQL tables, or None if missing or outdated"""
+    from sqlalchemy import text
+
+    row = _state_row(conn, name)
+    if row is None or row[0] != ROLLUP_VERSION:
+        return None
+
+    frames = []
+    for table, key in (('daily_sales_rollup', DAILY_KEY), ('monthly_sales_rollup', MONTHLY_KEY)):
+        result = conn.execute(text(f"SELECT {', '.join(key + MEASURES)} FROM {table}"))
+        frame = pd.DataFrame(result.fetchall(), columns=key + MEASURES)
+        frame[key[0]] = pd.to_datetime(frame[key[0]])
+        frame['revenue'] = frame['revenue'].astype(float)
+        frame['positive_revenue'] = frame['positive_revenue'].astype(float)
+        frames.append(frame.sort_values(key, ignore_index=True))
+    return _new_state(int(row[1]), int(row[2]), *frames, row[3])
+
+
+def _sql_checksum(conn, watermark):
+    """(row count, checksum) of the orders at or below a watermark"""
+    from sqlalchemy import text
+
+    processed, changed_at, amount = conn.execute(text(CHECKSUM_SQL), {'watermark': watermark}).fetchone()
+    return int(processed or 0), f'{changed_at}|{amount}'
+
+
+def create_rollup_tables(conn):
+    """
+    Create the rollup tables on a database set up before they were added to
+    create_tables.sql, and add the checksum column to an older state table
+    (its rows carry an older version, so the rollups are rebuilt)
+    """
+    from sqlalchemy import inspect, text
+
+    for statement in ROLLUP_DDL:
+        conn.execute(text(statement))
+    columns = {column['name'] for column in inspect(conn).get_columns('sales_rollup_state')}
+    if 'checksum' not in columns:
+        conn.execute(text("ALTER TABLE sales_rollup_state ADD COLUMN checksum VARCHAR(128) NOT NULL DEFAULT ''"))
+    conn.commit()
+
+
+def _is_missing_table(error):
+    args = getattr(error.orig, 'args', ())
+    return bool(args) and args[0] == NO_SUCH_TABLE
+
+
+@contextmanager
+def _refresh_lock(engine, name):
+    """
+    Hold a MySQL named lock for a rollup refresh, so replicas (and the
+    business metrics thread) refresh one at a time
+
+    Yields:
+        False if another refresh still held the lock after
+        ROLLUP_LOCK_TIMEOUT seconds; always True on other databases
+    """
+    if engine.dialect.name != 'mysql':
+        yield True
+        return
+
+    from sqlalchemy import text
+    from utils.database import pooled_connection
+
+    lock = f'sales_rollup_{name}'
+    with pooled_connection(engine) as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:lock, :timeout)"),
+                                {'lock': lock, 'timeout': ROLLUP_LOCK_TIMEOUT}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:lock)"), {'lock': lock})
+
+
+def update_sql_rollups(name='orders'):
+    """
+    Refresh the MySQL rollup tables from the orders above the watermark
+
+    Only the new orders and their items are read; the rollup rows they touch
+    are rewritten in one transaction together with the new watermark. The
+    tables are rebuilt when rows at or below the watermark were added,
+    deleted or updated (row count, latest updated_at or amount total
+    differs from the stored checksum). Refreshes are serialized with a
+    named lock; one that waited too long serves the stored rollups.
+
+    The tables come from create_tables.sql (or `python -m utils.rollups`);
+    no DDL runs here.
+
+    Returns:
+        State dictionary with 'daily' and 'monthly' rollup frames, or None
+        without a database or rollup tables
+    """
+    from sqlalchemy.exc import ProgrammingError
+    from utils.database import get_engine, pooled_connection
+
+    engine = get_engine()
+    if engine is None:
+        return None
+
+    try:
+        with _refresh_lock(engine, name) as acquired:
+            if acquired:
+                return _refresh_sql_rollups(engine, name)
+            with pooled_connection(engine) as conn:
+                return _read_sql_state(conn, name)
+    except ProgrammingError as e:
+        if _is_missing_table(e):
+            return None
+        raise
+
+
+def _refresh_sql_rollups(engine, name):
+    from sqlalchemy import text
+    from utils.database import pooled_connection, stream_sql_query, concat_chunks
+
+    with pooled_connection(engine) as conn:
+        start_row = _state_row(conn, name)
+        state = _read_sql_state(conn, name)
+        if state is not None and _sql_checksum(conn, state['watermark']) != (state['processed'], state['checksum']):
+            state = None
+        rebuild = state is None
+        if rebuild:
+            state = _new_state()
+
+        high = conn.execute(text(HIGH_WATER_SQL)).scalar()
+        high = state['watermark'] if high is None else max(int(high), state['watermark'])
+        if high == state['watermark'] and not rebuild:
+            return state
+        # Taken before the new orders are read: anything changed after this
+        # point shows up as a checksum mismatch on the next refresh
+        processed, checksum = _sql_checksum(conn, high)
+
+    params = {'watermark': state['watermark'], 'high': high}
+    new_orders = concat_chunks(stream_sql_query(NEW_ORDERS_SQL, params))
+    if new_orders.empty:
+        deltas = (state['daily'], state['monthly'])
+    else:
+        categories = primary_categories(concat_chunks(stream_sql_query(NEW_ITEMS_SQL, params)))
+        state, *deltas = _advance(state, new_orders, categories)
+    state.update({'watermark': high, 'processed': processed, 'checksum': checksum})
+
+    with pooled_connection(engine) as conn:
+        # Another refresh committed since the state was read (e.g. without
+        # the named lock): keep its rollups rather than writing over them
+        if _state_row(conn, name, for_update=True) != start_row:
+            conn.rollback()
+            return _read_sql_state(conn, name)
+        _write_sql_rollups(conn, name, state, deltas, rebuild)
+        conn.commit()
+    return state
+
+
+# ===========================
+# DASHBOARD ACCESS
+# ===========================
+
+def sales_rollups():
+    """
+    Current rollups for the registry's orders
+
+    CSV orders are rolled up into Parquet files (refreshed when the dataset
+    version changes); MySQL orders into the MySQL rollup tables (refreshed at
+    most every ROLLUP_TTL seconds).
+
+    Returns:
+        State dictionary with 'daily' and 'monthly' frames, or None when no
+        orders or rollups are available
+    """
+    from utils.datasets import get_dataset, dataset_source, dataset_version
+
+    source = dataset_source('orders')
+    if source is None:
+        return None
+
+    key = f'orders-{source.lower()}'
+    version = dataset_version('orders')
+    state = _states.get(key)
+    if state is not None and (state['source_version'] == version if source == 'CSV'
+                              else time.time() - state['refreshed_at'] < ROLLUP_TTL):
+        return state
+
+    if source == 'CSV':
+        items = get_dataset('order_items', columns=['order_id', 'product_id', 'total_price'])
+        products = get_dataset('products', columns=['product_id', 'category'])
+        categories = primary_categories(items, products) if items is not None and products is not None else None
+        state = update_frame_rollups(get_dataset('orders'), key, categories)
+    else:
+        from sqlalchemy.exc import SQLAlchemyError
+        try:
+            state = update_sql_rollups()
+        except SQLAlchemyError:
+            # Transient database error - callers fall back to the order
+            # frame, and the next call retries
+            return None
+        if state is None:
+            return None
+
+    state['source_version'] = version
+    state['refreshed_at'] = time.time()
+    with _state_lock:
+        _states[key] = state
+    return state
+
+
+def clear_rollups(key=None):
+    """Drop in-memory rollups for one (or every) key - stored copies are kept"""
+    with _state_lock:
+        if key is None:
+            _states.clear()
+        else:
+            _states.pop(key, None)
+
+
+if __name__ == '__main__':
+    # Create the rollup tables on an existing database:
+    #   python -m utils.rollups
+    from utils.database import get_engine, pooled_connection
+
+    engine = get_engine()
+    if engine is None:
+        raise SystemExit('No database connection')
+    with pooled_connection(engine) as conn:
+        create_rollup_tables(conn)
+    print('Rollup tables ready')
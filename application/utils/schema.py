@@ -0,0 +1,182 @@
+"""
+Table Schemas - Column dtypes for every table loaded into the dashboard
+Declared types are read from sql/setup/create_tables.sql and mapped to pandas
+dtypes (nullable ints, datetime64, categoricals for enum-like columns, float32
+for unit values); the dataset registry applies them once at load time so
+pages don't re-coerce columns on every render
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.date_utils import parse_dates
+from utils.snapshot import APP_ROOT
+
+SCHEMA_SQL = APP_ROOT / 'sql' / 'setup' / 'create_tables.sql'
+
+# Free-text columns with a small set of repeated values - stored as
+# categoricals like the ENUM columns
+CATEGORY_COLUMNS = {
+    'customers': {'city', 'state', 'country'},
+    'products': {'category'},
+    'vendors': {'country', 'category'},
+    'campaigns': {'campaign_type'},
+    'returns': {'reason', 'condition_received'},
+    'refunds': {'refund_method'},
+    'payments': {'payment_method', 'payment_processor', 'failure_reason'},
+    'shipping': {'carrier', 'destination'}
+}
+
+# DECIMAL columns held as float32: per-unit values that are displayed or
+# averaged but never summed into revenue totals
+FLOAT32_COLUMNS = {
+    'products': {'price', 'cost', 'weight'},
+    'shipping': {'shipping_cost', 'weight'},
+    'vendors': {'rating', 'on_time_delivery_pct', 'quality_score'}
+}
+
+# CSV headers that differ from the table definition
+COLUMN_ALIASES = {
+    'returns': {'condition': 'condition_received'}
+}
+
+TRUE_VALUES = {'true', 't', 'yes', 'y', '1'}
+FALSE_VALUES = {'false', 'f', 'no', 'n', '0'}
+
+_TABLE_PATTERN = re.compile(r'CREATE TABLE\s+`?(\w+)`?\s*\((.*?)\)\s*ENGINE', re.S | re.I)
+_COLUMN_PATTERN = re.compile(r'^\s*`?(\w+)`?\s+([A-Z]+)(\([^)]*\))?', re.I)
+_CONSTRAINTS = {'PRIMARY', 'FOREIGN', 'UNIQUE', 'KEY', 'INDEX', 'CONSTRAINT', 'CHECK'}
+
+_schemas = None
+_schema_lock = threading.Lock()
+
+
+def parse_create_tables(sql):
+    """
+    Column types declared in CREATE TABLE statements
+
+    Returns:
+        Dictionary of table -> {column: (sql type, type arguments)}, e.g.
+        ('DECIMAL', '10, 2') or ('INT', None)
+    """
+    tables = {}
+    for table, body in _TABLE_PATTERN.findall(sql):
+        columns = {}
+        for line in body.splitlines():
+            match = _COLUMN_PATTERN.match(line)
+            if match is None or match.group(1).upper() in _CONSTRAINTS:
+                continue
+            name, sql_type, args = match.groups()
+            columns[name] = (sql_type.upper(), args[1:-1] if args else None)
+        tables[table] = columns
+    return tables
+
+
+def column_dtype(table, column, sql_type, args=None):
+    """pandas dtype for a declared column ('text' means plain strings)"""
+    if sql_type == 'ENUM' or column in CATEGORY_COLUMNS.get(table, ()):
+        return 'category'
+    if sql_type in ('TINYINT', 'SMALLINT', 'MEDIUMINT', 'INT', 'INTEGER'):
+        return 'Int32'
+    if sql_type == 'BIGINT':
+        return 'Int64'
+    if sql_type in ('DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE'):
+        return 'float32' if column in FLOAT32_COLUMNS.get(table, ()) else 'float64'
+    if sql_type in ('DATE', 'DATETIME', 'TIMESTAMP'):
+        return 'datetime64[ns]'
+    if sql_type in ('BOOLEAN', 'BOOL'):
+        return 'boolean'
+    return 'text'
+
+
+def table_dtypes(table):
+    """
+    Declared dtypes of a table's columns (CSV aliases included)
+
+    Returns:
+        Dictionary of column -> dtype; empty for tables without a definition
+    """
+    global _schemas
+    if _schemas is None:
+        with _schema_lock:
+            if _schemas is None:
+                try:
+                    _schemas = parse_create_tables(SCHEMA_SQL.read_text(encoding='utf-8'))
+                except OSError:
+                    _schemas = {}
+
+    columns = _schemas.get(table, {})
+    dtypes = {name: column_dtype(table, name, *declared) for name, declared in columns.items()}
+    for alias, column in COLUMN_ALIASES.get(table, {}).items():
+        if column in dtypes:
+            dtypes[alias] = dtypes[column]
+    return dtypes
+
+
+def _to_text(series):
+    """Values as strings with missing values kept as NaN"""
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        series = series.astype('Int64')
+    if series.dtype == object:
+        return series
+    return series.astype(object).where(series.notna(), np.nan).map(str, na_action='ignore')
+
+
+def _to_boolean(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype('boolean')
+    text = series.astype(str).str.strip().str.lower()
+    values = pd.Series(pd.NA, index=series.index, dtype='boolean')
+    values[text.isin(TRUE_VALUES)] = True
+    values[text.isin(FALSE_VALUES)] = False
+    return values
+
+
+def coerce_column(series, dtype):
+    """
+    Convert one column to a schema dtype
+
+    Values that don't parse become missing; integer columns holding
+    fractional values are kept as float64 instead of raising.
+    """
+    if dtype == 'text':
+        return _to_text(series)
+    if dtype == 'category':
+        return _to_text(series).astype('category')
+    if dtype == 'boolean':
+        return _to_boolean(series)
+    if dtype == 'datetime64[ns]':
+        return parse_dates(series)
+
+    numeric = pd.to_numeric(series, errors='coerce')
+    if dtype.startswith('Int'):
+        values = numeric.dropna()
+        if not (values % 1 == 0).all():
+            return numeric.astype('float64')
+    return numeric.astype(dtype)
+
+
+def apply_schema(table, df):
+    """
+    Give a loaded table its declared column dtypes
+
+    Columns without a declaration keep their inferred dtype, and columns that
+    already have the target dtype are left untouched.
+
+    Returns:
+        New DataFrame sharing the unchanged columns with the input
+    """
+    dtypes = table_dtypes(table)
+    if not dtypes:
+        return df
+
+    typed = df.copy(deep=False)
+    for column in df.columns:
+        dtype = dtypes.get(column)
+        if dtype is None or (dtype != 'text' and str(df[column].dtype) == dtype):
+            continue
+        typed[column] = coerce_column(df[column], dtype)
+    return typed
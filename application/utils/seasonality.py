@@ -0,0 +1,245 @@
+"""
+Seasonality Engine - Month x year, quarter, YoY and holiday window metrics
+Built from the daily/monthly sales rollups (see utils.rollups) rather than
+hard-coded yearly arrays, so the seasonality page follows whatever history
+the orders table holds. Revenue and order counts use the dashboard KPI
+definition (orders with a positive amount); distinct customers are counted
+from the orders frame in one vectorized pass.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.date_utils import parse_dates
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_SEASONS = ['Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+                 'Summer', 'Summer', 'Fall', 'Fall', 'Holiday', 'Holiday']
+METRICS = ['revenue', 'orders', 'customers', 'aov']
+
+
+def nth_weekday(year, month, weekday, n):
+    """Date of the n-th given weekday (Monday=0) of a month"""
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+# Holiday shopping windows: (name, holiday date for a year, days before the
+# holiday included in the window)
+HOLIDAYS = [
+    ('New Year', lambda year: date(year, 1, 1), 0),
+    ("Valentine's Day", lambda year: date(year, 2, 14), 6),
+    ("Mother's Day", lambda year: nth_weekday(year, 5, 6, 2), 6),
+    ('Black Friday', lambda year: nth_weekday(year, 11, 3, 4) + timedelta(days=1), 0),
+    ('Cyber Monday', lambda year: nth_weekday(year, 11, 3, 4) + timedelta(days=4), 0),
+    ('Christmas', lambda year: date(year, 12, 25), 7)
+]
+
+
+def _month_totals(monthly):
+    """Positive revenue and order count per calendar month, gaps filled with 0"""
+    totals = monthly.groupby('sale_month')[['positive_revenue', 'positive_orders']].sum()
+    if totals.empty:
+        return totals
+    months = pd.date_range(totals.index.min(), totals.index.max(), freq='MS')
+    return totals.reindex(months, fill_value=0)
+
+
+def distinct_customers(orders_df):
+    """
+    Distinct ordering customers per month and per quarter
+
+    Returns:
+        (Series by month start, Series by quarter Period); both empty when
+        the orders have no customer_id column
+    """
+    if orders_df is None or 'customer_id' not in orders_df.columns:
+        return pd.Series(dtype=np.int64), pd.Series(dtype=np.int64)
+
+    dates = parse_dates(orders_df['order_date'])
+    valid = (dates.notna() & orders_df['customer_id'].notna()).to_numpy()
+    months = dates.to_numpy()[valid].astype('datetime64[M]').astype('datetime64[ns]')
+    frame = pd.DataFrame({'month': months, 'customer_id': orders_df['customer_id'].to_numpy()[valid]})
+
+    monthly = frame.drop_duplicates().groupby('month').size()
+    frame['month'] = pd.PeriodIndex(pd.DatetimeIndex(frame['month']), freq='Q')
+    quarterly = frame.drop_duplicates().groupby('month').size()
+    return monthly, quarterly
+
+
+def month_table(monthly, customers=None):
+    """
+    One row per calendar month between the first and last month with sales
+
+    Args:
+        monthly: Monthly sales rollup (sale_month plus the rollup measures)
+        customers: Optional Series of distinct customers by month start
+
+    Returns:
+        DataFrame with month_start, year, month ('Jan'), month_num, quarter
+        ('Q1'), season and the METRICS
+    """
+    totals = _month_totals(monthly)
+    index = totals.index
+    revenue = totals['positive_revenue'].to_numpy(dtype=float)
+    orders = totals['positive_orders'].to_numpy(dtype=np.int64)
+    month_num = index.month.to_numpy()
+
+    customer_counts = np.full(len(index), np.nan)
+    if customers is not None and len(customers):
+        customer_counts = customers.reindex(index).fillna(0).to_numpy(dtype=float)
+
+    return pd.DataFrame({
+        'month_start': index,
+        'year': index.year.to_numpy(),
+        'month': np.array(MONTH_NAMES, dtype=object)[month_num - 1],
+        'month_num': month_num,
+        'quarter': 'Q' + pd.Series((month_num - 1) // 3 + 1).astype(str).to_numpy(dtype=object),
+        'season': np.array(MONTH_SEASONS, dtype=object)[month_num - 1],
+        'revenue': revenue,
+        'orders': orders,
+        'customers': customer_counts,
+        'aov': np.divide(revenue, orders, out=np.zeros(len(index)), where=orders > 0).round(2)
+    })
+
+
+def quarter_table(months, customers=None):
+    """
+    Quarterly totals with growth against the same quarter a year earlier
+
+    Args:
+        months: Output of month_table
+        customers: Optional Series of distinct customers by quarter Period
+
+    Returns:
+        DataFrame with quarter ('Q1 2024'), year, quarter_num, revenue,
+        orders, customers and growth (%, NaN without a prior-year quarter)
+    """
+    quarters = months.groupby(['year', 'quarter'], sort=True)[['revenue', 'orders']].sum().reset_index()
+    quarter_num = quarters['quarter'].str[1].astype(int)
+    periods = pd.PeriodIndex(quarters['year'].astype(str) + quarters['quarter'], freq='Q')
+
+    customer_counts = np.full(len(quarters), np.nan)
+    if customers is not None and len(customers):
+        customer_counts = customers.reindex(periods).fillna(0).to_numpy(dtype=float)
+
+    previous = pd.Series(quarters['revenue'].to_numpy(), index=periods).reindex(periods - 4).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(previous > 0, (quarters['revenue'].to_numpy() - previous) / previous * 100, np.nan)
+
+    return pd.DataFrame({
+        'quarter': quarters['quarter'] + ' ' + quarters['year'].astype(str),
+        'year': quarters['year'],
+        'quarter_num': quarter_num,
+        'revenue': quarters['revenue'],
+        'orders': quarters['orders'],
+        'customers': customer_counts,
+        'growth': np.round(growth, 1)
+    })
+
+
+def compare_years(months, year, previous_year, metric):
+    """
+    Month-by-month values of one metric for two years
+
+    Only months present in `year` are compared; missing months of the
+    previous year are NaN.
+
+    Returns:
+        DataFrame with month, current, previous and growth (%)
+    """
+    current = months[months['year'] == year].set_index('month_num')
+    previous = months[months['year'] == previous_year].set_index('month_num')[metric].reindex(current.index)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(previous > 0, (current[metric] - previous) / previous * 100, np.nan)
+
+    return pd.DataFrame({
+        'month': current['month'].to_numpy(),
+        'current': current[metric].to_numpy(),
+        'previous': previous.to_numpy(),
+        'growth': growth
+    })
+
+
+def holiday_table(daily):
+    """
+    Revenue and orders in each holiday window of every year covered by the
+    daily rollup
+
+    Window totals are read from cumulative daily sums, so all holidays and
+    years are computed in one vectorized lookup. Windows not fully inside
+    the rollup's date range are left out.
+
+    Returns:
+        DataFrame with name, year, date, start, revenue, orders, aov,
+        growth (% vs the same window a year earlier) and lift (% of the
+        window's daily revenue over the year's average day)
+    """
+    columns = ['name', 'year', 'date', 'start', 'revenue', 'orders', 'aov', 'growth', 'lift']
+    totals = daily.groupby('sale_date')[['positive_revenue', 'positive_orders']].sum()
+    if totals.empty:
+        return pd.DataFrame(columns=columns)
+
+    days = pd.date_range(totals.index.min(), totals.index.max(), freq='D')
+    totals = totals.reindex(days, fill_value=0)
+    cum_revenue = np.concatenate([[0.0], totals['positive_revenue'].cumsum().to_numpy(dtype=float)])
+    cum_orders = np.concatenate([[0], totals['positive_orders'].cumsum().to_numpy(dtype=np.int64)])
+
+    years = range(days[0].year - 1, days[-1].year + 1)
+    windows = pd.DataFrame([
+        {'name': name, 'year': year, 'date': pd.Timestamp(anchor(year)),
+         'start': pd.Timestamp(anchor(year) - timedelta(days=before))}
+        for year in years for name, anchor, before in HOLIDAYS
+    ])
+    covered = ((windows['start'] >= days[0]) & (windows['date'] <= days[-1])).to_numpy()
+    windows = windows[covered].reset_index(drop=True)
+    if windows.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Positions in the cumulative arrays: window = (start - 1, date]
+    first = (windows['start'] - days[0]).dt.days.to_numpy()
+    last = (windows['date'] - days[0]).dt.days.to_numpy() + 1
+    windows['revenue'] = cum_revenue[last] - cum_revenue[first]
+    windows['orders'] = cum_orders[last] - cum_orders[first]
+    windows['aov'] = np.divide(windows['revenue'], windows['orders'],
+                               out=np.zeros(len(windows)), where=windows['orders'].to_numpy() > 0).round(2)
+
+    previous = windows.set_index(['name', 'year'])['revenue']
+    previous = previous.reindex(pd.MultiIndex.from_arrays([windows['name'], windows['year'] - 1])).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        windows['growth'] = np.where(previous > 0, (windows['revenue'] - previous) / previous * 100, np.nan)
+
+    daily_average = totals['positive_revenue'].groupby(days.year).mean()
+    window_days = (last - first).astype(float)
+    average = windows['year'].map(daily_average).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        windows['lift'] = np.where(average > 0, (windows['revenue'] / window_days / average - 1) * 100, np.nan)
+
+    return windows[columns].sort_values(['year', 'date'], ignore_index=True)
+
+
+def seasonality_tables(daily, monthly, orders_df=None):
+    """
+    All seasonality tables for one version of the order data
+
+    Args:
+        daily: Daily sales rollup
+        monthly: Monthly sales rollup
+        orders_df: Optional orders with customer_id and order_date, used for
+            distinct customer counts
+
+    Returns:
+        Dictionary with 'months', 'quarters', 'holidays', 'years' (sorted
+        list of years with sales) and 'last_date' (last day with sales)
+    """
+    monthly_customers, quarterly_customers = distinct_customers(orders_df)
+    months = month_table(monthly, monthly_customers)
+    return {
+        'months': months,
+        'quarters': quarter_table(months, quarterly_customers),
+        'holidays': holiday_table(daily),
+        'years': sorted(months['year'].unique().tolist()),
+        'last_date': daily['sale_date'].max() if not daily.empty else None
+    }
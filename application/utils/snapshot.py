@@ -0,0 +1,234 @@
+"""
+CSV Snapshots - Columnar on-disk cache for sample_data CSVs
+Each CSV is parsed and cleaned once into an Arrow/Feather file; later loads
+memory-map the snapshot and only re-derive it when the source CSV changes
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+
+# Snapshot location - sample_data is mounted read-only in docker-compose,
+# so snapshots live in their own writable directory
+SNAPSHOT_DIR = Path(os.getenv('SNAPSHOT_DIR', APP_ROOT / '.cache' / 'snapshots'))
+
+# Bump when the cleaning rules change so old snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+
+_build_lock = threading.Lock()
+
+
+def clean_csv_frame(df):
+    """
+    Cleaning rules shared by every CSV loader
+
+    Strips whitespace from the strings in object columns while keeping
+    missing values as NaN instead of turning them into the string 'nan'.
+    Other values in the column are left untouched.
+    """
+    for col in df.select_dtypes(include=['object']).columns:
+        df[col] = df[col].map(lambda v: v.strip() if isinstance(v, str) else v)
+    return df
+
+
+def read_csv_clean(csv_path):
+    """Parse and clean a CSV without the snapshot layer"""
+    # Whole-file type inference: low_memory chunks can give one column
+    # ints in some chunks and strs in others
+    return clean_csv_frame(pd.read_csv(csv_path, low_memory=False))
+
+
+def _snapshot_paths(csv_path):
+    """Return (snapshot file, metadata file) for a source CSV"""
+    source = Path(csv_path).resolve()
+    try:
+        relative = source.relative_to(APP_ROOT)
+    except ValueError:
+        relative = Path(hashlib.sha1(str(source.parent).encode('utf-8')).hexdigest()[:12]) / source.name
+    base = SNAPSHOT_DIR / relative
+    return base.with_suffix('.feather'), base.with_suffix('.meta.json')
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write):
+    """Write through a temp file in the same directory, then rename into place"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    _write_atomic(meta_path, write)
+
+
+def is_snapshot_current(csv_path):
+    """
+    Check whether the snapshot for a CSV is still valid
+
+    mtime and size are compared first; if only the mtime moved (a copy or a
+    checkout touching the file), the content hash decides and the stored
+    mtime is refreshed so the next check is cheap again.
+    """
+    snapshot_path, meta_path = _snapshot_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if meta is None or not snapshot_path.exists() or meta.get('version') != SNAPSHOT_VERSION:
+        return False
+
+    signature = _source_signature(csv_path)
+    if signature['size'] != meta.get('size'):
+        return False
+    if signature['mtime_ns'] == meta.get('mtime_ns'):
+        return True
+
+    if _file_hash(csv_path) != meta.get('sha1'):
+        return False
+
+    meta['mtime_ns'] = signature['mtime_ns']
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass
+    return True
+
+
+def build_snapshot(csv_path):
+    """
+    Parse, clean and write the columnar snapshot for a CSV
+
+    Returns:
+        The cleaned DataFrame
+    """
+    df = read_csv_clean(csv_path)
+    snapshot_path, meta_path = _snapshot_paths(csv_path)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Uncompressed so the file can be memory-mapped without decoding
+    _write_atomic(snapshot_path, lambda tmp: feather.write_feather(table, tmp, compression='uncompressed'))
+
+    meta = _source_signature(csv_path)
+    meta.update({
+        'version': SNAPSHOT_VERSION,
+        'sha1': _file_hash(csv_path),
+        'rows': len(df),
+        'columns': list(df.columns)
+    })
+    _write_meta(meta_path, meta)
+    return df
+
+
+def load_snapshot(csv_path, columns=None):
+    """
+    Load a CSV through its columnar snapshot
+
+    Args:
+        csv_path: Path to the source CSV
+        columns: Optional list of columns to read (others are never loaded)
+
+    Returns:
+        Cleaned DataFrame
+    """
+    if not ARROW_AVAILABLE:
+        df = read_csv_clean(csv_path)
+        return df[columns] if columns else df
+
+    snapshot_path, _ = _snapshot_paths(csv_path)
+
+    if not is_snapshot_current(csv_path):
+        with _build_lock:
+            if not is_snapshot_current(csv_path):
+                df = _build_or_parse(csv_path)
+                return df[columns] if columns else df
+
+    try:
+        table = feather.read_table(snapshot_path, columns=columns, memory_map=True)
+    except (OSError, pa.ArrowException):
+        # Truncated or corrupt snapshot - rebuild it from the CSV
+        with _build_lock:
+            df = _build_or_parse(csv_path)
+        return df[columns] if columns else df
+    return table.to_pandas(split_blocks=True)
+
+
+def _build_or_parse(csv_path):
+    try:
+        return build_snapshot(csv_path)
+    except (OSError, pa.ArrowException):
+        # Snapshot directory not writable or the frame cannot be stored as
+        # Arrow - serve the parsed CSV
+        return read_csv_clean(csv_path)
+
+
+def snapshot_all(root='sample_data'):
+    """
+    Build or refresh snapshots for every CSV under a directory
+
+    Returns:
+        Dictionary of csv path -> row count (or error message)
+    """
+    results = {}
+    for csv_path in sorted(Path(root).rglob('*.csv')):
+        try:
+            if is_snapshot_current(csv_path):
+                results[str(csv_path)] = _read_meta(_snapshot_paths(csv_path)[1]).get('rows')
+            else:
+                results[str(csv_path)] = len(build_snapshot(csv_path))
+        except Exception as e:
+            results[str(csv_path)] = f'error: {e}'
+    return results
+
+
+if __name__ == '__main__':
+    # Pre-build snapshots, e.g. during the Docker image build:
+    #   python -m utils.snapshot
+    import sys
+
+    results = snapshot_all(APP_ROOT / 'sample_data')
+    for path, rows in results.items():
+        print(f'{path}: {rows}')
+    failed = [path for path, rows in results.items() if isinstance(rows, str)]
+    if failed:
+        sys.exit(f'{len(failed)} of {len(results)} snapshots failed')
@@ -0,0 +1,551 @@
+"""
+Synthetic Data - Vectorized generators for the core tables
+Every table is drawn column-at-a-time from np.random.Generator and comes out
+with the registry's columns and dtypes (what get_dataset() returns), so pages
+and benchmarks run on it unchanged. `scale` is the number of orders, from a
+thousand up to ten million; the other tables are sized from it and every
+foreign key points at a generated row: customers <- orders <- order_items /
+payments / shipping / returns <- refunds, products <- order_items /
+inventory. A small, configurable share of rows carries the data quality
+issues the audit pages look for.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import apply_schema
+
+DEFAULT_SCALE = int(os.getenv('SYNTHETIC_SCALE', 5000))
+MAX_SCALE = 10_000_000
+HISTORY_DAYS = 365
+WAREHOUSES = 4
+
+# Share of rows carrying each data quality issue
+ISSUE_RATES = {
+    'duplicate_customer': 0.05,
+    'invalid_email': 0.06,
+    'missing_email': 0.03,
+    'invalid_phone': 0.05,
+    'missing_phone': 0.03,
+    'missing_address': 0.05,
+    'missing_vendor_contact': 0.03,
+    'invalid_price': 0.08,
+    'missing_description': 0.15,
+    'missing_category': 0.08,
+    'missing_name': 0.02,
+    'missing_image': 0.12,
+    'duplicate_sku': 0.04,
+    'stock_variance': 0.12,
+    'orphan_order': 0.02,
+    'total_mismatch': 0.05,
+    'zero_total': 0.01,
+    'address_not_validated': 0.05,
+    'refund_mismatch': 0.05
+}
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+               'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Daniel', 'Karen', 'Matthew', 'Nancy', 'Anthony', 'Lisa', 'Liam', 'Emma', 'Noah', 'Olivia']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+              'Jackson', 'Martin', 'Lee', 'Thompson', 'White', 'Harris', 'Clark', 'Lewis']
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Park Ave', 'Lake View Dr',
+           'Hill St', 'Washington Blvd']
+# (city, state, zip code prefix)
+CITIES = [('New York', 'NY', 100), ('Los Angeles', 'CA', 900), ('Chicago', 'IL', 606), ('Houston', 'TX', 770),
+          ('Phoenix', 'AZ', 850), ('Philadelphia', 'PA', 191), ('San Antonio', 'TX', 782),
+          ('San Diego', 'CA', 921), ('Dallas', 'TX', 752), ('San Jose', 'CA', 951), ('Austin', 'TX', 787),
+          ('Denver', 'CO', 802), ('Indianapolis', 'IN', 462), ('Charlotte', 'NC', 282), ('Columbus', 'OH', 432),
+          ('Miami', 'FL', 331), ('Seattle', 'WA', 981), ('Washington', 'DC', 200)]
+COUNTRIES = {'USA': 0.94, 'Canada': 0.02, 'UK': 0.02, 'India': 0.015, 'Australia': 0.005}
+
+PRODUCT_CATEGORIES = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Sports', 'Toys', 'Beauty',
+                      'Health', 'Automotive', 'Jewelry', 'Pet Supplies']
+PRODUCT_ADJECTIVES = ['Eco', 'Premium', 'Compact', 'Smart', 'Classic', 'Deluxe', 'Portable', 'Wireless',
+                      'Ultra', 'Essential']
+PRODUCT_NOUNS = ['Speaker', 'Chair', 'Lamp', 'Backpack', 'Watch', 'Blender', 'Headphones', 'Jacket', 'Mat',
+                 'Bottle', 'Keyboard', 'Camera']
+
+VENDOR_PREFIXES = ['Global', 'Prime', 'Pacific', 'Summit', 'Apex', 'Northern', 'United', 'Blue River']
+VENDOR_SUFFIXES = ['Solutions Co.', 'Manufacturing Co.', 'Trading Ltd.', 'Supply Group', 'Industries',
+                   'Imports Inc.']
+VENDOR_COUNTRIES = ['USA', 'China', 'Germany', 'Japan', 'Italy', 'France', 'UK', 'South Korea']
+VENDOR_CATEGORIES = ['Electronics', 'Clothing', 'Home & Kitchen', 'Food & Beverage', 'Sports', 'Beauty',
+                     'Books', 'Toys']
+VENDOR_STATUSES = {'active': 0.835, 'inactive': 0.115, 'pending': 0.05}
+
+ORDER_STATUSES = {'completed': 0.43, 'shipped': 0.19, 'processing': 0.16, 'pending': 0.11, 'cancelled': 0.11}
+ORDER_NOTES = [None, 'High priority', 'Gift', 'Holiday promo', 'Leave at front desk', 'Call before delivery',
+               'Deliver to neighbor if absent']
+# Items per order: 1..5
+ITEM_COUNTS = [0.35, 0.25, 0.2, 0.12, 0.08]
+
+PAYMENT_METHODS = {'Credit Card': 0.4, 'PayPal': 0.2, 'Debit Card': 0.15, 'Bank Transfer': 0.15,
+                   'Digital Wallet': 0.1}
+PROCESSORS = ['Stripe', 'Square', 'Manual']
+FAILURE_REASONS = ['card_declined', 'expired_card', 'insufficient_funds', 'network_error']
+CARRIERS = ['UPS', 'FedEx', 'USPS', 'DHL']
+
+RETURN_RATE = 0.08  # share of delivered orders returned
+RETURN_REASONS = ['Changed Mind', 'Not as Described', 'Wrong Item', 'Size Issue', 'Quality', 'Defective']
+RETURN_STATUSES = {'completed': 0.45, 'approved': 0.2, 'pending': 0.15, 'processing': 0.1, 'rejected': 0.1}
+RETURN_CONDITIONS = ['New', 'Used', 'Damaged']
+REFUND_METHODS = ['PayPal', 'Bank Transfer', 'Store Credit', 'Credit Card']
+
+DAY = np.timedelta64(1, 'D')
+SECOND = np.timedelta64(1, 's')
+
+
+# ===========================
+# HELPERS
+# ===========================
+
+def _pool(values, transform=None):
+    """Values as an object array for fancy indexing, optionally transformed"""
+    return np.array([transform(v) if transform and v is not None else v for v in values], dtype=object)
+
+
+def _choice(rng, values, n):
+    """n draws from a list, or from a {value: probability} dictionary"""
+    if isinstance(values, dict):
+        return _pool(values)[rng.choice(len(values), n, p=list(values.values()))]
+    return _pool(values)[rng.integers(0, len(values), n)]
+
+
+def _text(values):
+    """Integers as an object array of decimal strings"""
+    return np.asarray(values).astype(str).astype(object)
+
+
+def _hex(values, width):
+    """Non-negative integers as an object array of zero-padded lowercase hex strings"""
+    shifts = np.arange(4 * (width - 1), -1, -4, dtype=np.uint64)
+    nibbles = (np.asarray(values, dtype=np.uint64)[:, None] >> shifts) & np.uint64(15)
+    digits = np.array(list('0123456789abcdef'))[nibbles.astype(np.intp)]
+    return np.ascontiguousarray(digits).view(f'<U{width}').ravel().astype(object)
+
+
+def _flag(rng, n, rate):
+    """Random boolean mask with about `rate` of the rows set"""
+    return rng.random(n) < rate
+
+
+def _earlier(rng, rows):
+    """For each row position, a random earlier position (rows must be > 0)"""
+    return (rng.random(len(rows)) * rows).astype(np.int64)
+
+
+def _days_before(rng, end, low, high, n):
+    """Midnight dates between `high` and `low` days before `end`"""
+    return end.normalize().to_datetime64() - rng.integers(low, high, n) * DAY
+
+
+def _clip(dates, end):
+    """Dates capped at `end` (missing dates stay missing)"""
+    return np.where(dates > end.to_datetime64(), end.to_datetime64(), dates)
+
+
+def table_sizes(scale=DEFAULT_SCALE):
+    """
+    Row counts of the directly sized tables for a scale (number of orders)
+
+    Customers grow linearly with orders, the product catalog with the
+    square root. Order items (about 2.3 per order), payments (one per
+    order), shipments, inventory (one row per product and warehouse),
+    returns and refunds follow from the generated orders and products.
+    """
+    if not 1 <= scale <= MAX_SCALE:
+        raise ValueError(f"scale must be between 1 and {MAX_SCALE:,} orders")
+    orders = int(scale)
+    products = max(20, int(10 * orders ** 0.5))
+    return {'orders': orders, 'customers': max(1, orders // 2), 'products': products,
+            'vendors': max(10, products // 2), 'warehouses': WAREHOUSES}
+
+
+# ===========================
+# GENERATORS
+# ===========================
+
+def _customers(rng, sizes, end, rates, tables):
+    n = sizes['customers']
+    first, last = rng.integers(0, len(FIRST_NAMES), n), rng.integers(0, len(LAST_NAMES), n)
+    city = rng.integers(0, len(CITIES), n)
+    ids = np.arange(1, n + 1)
+
+    name = _pool(FIRST_NAMES)[first] + ' ' + _pool(LAST_NAMES)[last]
+    email = (_pool(FIRST_NAMES, str.lower)[first] + '.' + _pool(LAST_NAMES, str.lower)[last]
+             + _text(ids) + '@example.com')
+    phone = ('+1-' + _text(rng.integers(200, 1000, n)) + '-' + _text(rng.integers(200, 1000, n))
+             + '-' + _text(rng.integers(1000, 10000, n)))
+
+    # Duplicates re-register an earlier customer's details
+    duplicate = _flag(rng, n, rates['duplicate_customer'])
+    duplicate[0] = False
+    rows = np.flatnonzero(duplicate)
+    source = _earlier(rng, rows)
+    name[rows], email[rows], phone[rows] = name[source], email[source], phone[source]
+
+    invalid = np.flatnonzero(_flag(rng, n, rates['invalid_email']))
+    at = pd.Series(email[invalid], dtype=object)
+    email[invalid] = np.where(rng.random(len(invalid)) < 0.5, at.str.replace('@', '', regex=False),
+                              at.str.split('@').str[0])
+    email[_flag(rng, n, rates['missing_email'])] = None
+    phone[_flag(rng, n, rates['invalid_phone'])] = '123'
+    phone[_flag(rng, n, rates['missing_phone'])] = None
+    address = _text(rng.integers(100, 10000, n)) + ' ' + _choice(rng, STREETS, n)
+    address[_flag(rng, n, rates['missing_address'])] = None
+
+    customers = pd.DataFrame({
+        'customer_id': ids,
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'address': address,
+        'city': _pool([c[0] for c in CITIES])[city],
+        'state': _pool([c[1] for c in CITIES])[city],
+        'zip_code': _text(np.array([c[2] for c in CITIES])[city] * 100 + rng.integers(0, 100, n)),
+        'country': _choice(rng, COUNTRIES, n),
+        'registration_date': _days_before(rng, end, 1, 2 * HISTORY_DAYS, n)
+    })
+    return {'customers': customers}
+
+
+def _vendors(rng, sizes, end, rates, tables):
+    n = sizes['vendors']
+    first, last = rng.integers(0, len(FIRST_NAMES), n), rng.integers(0, len(LAST_NAMES), n)
+
+    tier = rng.random(n)
+    rating = np.where(tier < 0.2, rng.uniform(4.5, 5.0, n),
+                      np.where(tier < 0.68, rng.uniform(3.5, 4.5, n), rng.uniform(1.5, 3.5, n)))
+    base = rating / 5.0 * 100
+    email = (_pool(FIRST_NAMES, str.lower)[first] + '.' + _pool(LAST_NAMES, str.lower)[last]
+             + _text(rng.integers(10, 1000, n)) + '@vendormail.com')
+    email[_flag(rng, n, rates['missing_vendor_contact'])] = None
+    phone = ('+' + _text(rng.integers(1, 90, n)) + '-' + _text(rng.integers(100, 1000, n)) + '-'
+             + _text(rng.integers(100, 1000, n)) + '-' + _text(rng.integers(1000, 10000, n)))
+    phone[_flag(rng, n, rates['missing_vendor_contact'])] = None
+
+    vendors = pd.DataFrame({
+        'vendor_id': np.arange(1, n + 1),
+        'vendor_name': _choice(rng, VENDOR_PREFIXES, n) + ' ' + _choice(rng, VENDOR_SUFFIXES, n),
+        'contact_name': _pool(FIRST_NAMES)[first] + ' ' + _pool(LAST_NAMES)[last],
+        'contact_email': email,
+        'contact_phone': phone,
+        'country': _choice(rng, VENDOR_COUNTRIES, n),
+        'category': _choice(rng, VENDOR_CATEGORIES, n),
+        'rating': rating.round(2),
+        'status': _choice(rng, VENDOR_STATUSES, n),
+        'total_orders': rng.integers(50, 5000, n),
+        'on_time_delivery_pct': np.clip(base + rng.normal(0, 8, n), 40, 100).round(2),
+        'quality_score': np.clip(base + rng.normal(2, 6, n), 40, 100).round(2),
+        'response_time_hours': rng.integers(1, 72, n),
+        'created_date': _days_before(rng, end, 30, 3 * HISTORY_DAYS, n)
+    })
+    return {'vendors': vendors}
+
+
+def _products(rng, sizes, end, rates, tables):
+    n = sizes['products']
+    adjective, noun = rng.integers(0, len(PRODUCT_ADJECTIVES), n), rng.integers(0, len(PRODUCT_NOUNS), n)
+    codes = rng.permutation(90000)[:n] + 10000 if n <= 90000 else np.arange(10000, 10000 + n)
+
+    sku = 'SKU-' + _text(codes)
+    duplicate = np.flatnonzero(_flag(rng, n, rates['duplicate_sku'])[1:]) + 1
+    sku[duplicate] = sku[_earlier(rng, duplicate)]
+
+    name = _pool(PRODUCT_ADJECTIVES)[adjective] + ' ' + _pool(PRODUCT_NOUNS)[noun]
+    description = (name + ' - A high-quality ' + _pool(PRODUCT_NOUNS, str.lower)[noun]
+                   + ' designed for modern needs.')
+    description[_flag(rng, n, rates['missing_description'])] = None
+    name[_flag(rng, n, rates['missing_name'])] = None
+    category = _choice(rng, PRODUCT_CATEGORIES, n)
+    category[_flag(rng, n, rates['missing_category'])] = None
+    image_url = 'https://example.com/images/sku-' + _text(codes) + '.jpg'
+    image_url[_flag(rng, n, rates['missing_image'])] = None
+
+    price = rng.uniform(5, 500, n).round(2)
+    cost = (price * rng.uniform(0.35, 0.8, n)).round(2)
+    invalid = _flag(rng, n, rates['invalid_price'])
+    price[invalid] = rng.choice([0.0, -10.0, np.nan], invalid.sum())
+
+    products = pd.DataFrame({
+        'product_id': np.arange(1, n + 1),
+        'sku': sku,
+        'name': name,
+        'category': category,
+        'price': price,
+        'cost': cost,
+        'description': description,
+        'image_url': image_url,
+        'stock_quantity': rng.integers(0, 500, n),
+        'weight': rng.uniform(0.1, 10, n).round(2),
+        'dimensions': (_text(rng.integers(5, 60, n)) + 'x' + _text(rng.integers(5, 60, n)) + 'x'
+                       + _text(rng.integers(5, 60, n)) + ' cm'),
+        'created_date': _days_before(rng, end, 1, 2 * HISTORY_DAYS, n)
+    })
+    return {'products': products}
+
+
+def _inventory(rng, sizes, end, rates, tables):
+    product_ids = tables['products']['product_id'].to_numpy(dtype=np.int64)
+    n = len(product_ids) * sizes['warehouses']
+
+    # Mostly small stock counts with a long tail, like the warehouse exports
+    system_stock = np.minimum(rng.gamma(1.4, 46, n), 300).astype(np.int64)
+    variance = rng.integers(1, 31, n) * rng.choice([-1, 1], n) * _flag(rng, n, rates['stock_variance'])
+
+    inventory = pd.DataFrame({
+        'inventory_id': np.arange(1, n + 1),
+        'product_id': np.repeat(product_ids, sizes['warehouses']),
+        'warehouse_id': np.tile(np.arange(1, sizes['warehouses'] + 1), len(product_ids)),
+        'system_stock': system_stock,
+        'physical_stock': np.maximum(system_stock + variance, 0),
+        'reorder_point': rng.integers(5, 31, n),
+        'reorder_quantity': rng.integers(10, 201, n),
+        'last_count_date': _days_before(rng, end, 0, 90, n)
+    })
+    return {'inventory': inventory}
+
+
+def _orders(rng, sizes, end, rates, tables):
+    n = sizes['orders']
+    customers, products = tables['customers'], tables['products']
+
+    # Order dates rise with the order id; a heavy-tailed share of the
+    # orders goes to a few customers
+    order_date = np.sort(_days_before(rng, end, 0, HISTORY_DAYS, n))
+    weights = rng.gamma(0.5, size=len(customers))
+    customer = rng.choice(len(customers), n, p=weights / weights.sum())
+    orphan = _flag(rng, n, rates['orphan_order'])
+    customer_id = np.where(orphan, np.nan, customers['customer_id'].to_numpy(dtype=np.int64)[customer])
+
+    status = _choice(rng, ORDER_STATUSES, n)
+    payment_status = np.where(np.isin(status, ['completed', 'shipped']), 'paid', 'unpaid').astype(object)
+    processing = status == 'processing'
+    payment_status[processing] = np.where(rng.random(processing.sum()) < 0.85, 'paid', 'unpaid')
+    cancelled = status == 'cancelled'
+    payment_status[cancelled] = np.where(rng.random(cancelled.sum()) < 0.5, 'refunded', 'unpaid')
+    shipping_status = pd.Series(status).map({'completed': 'delivered', 'shipped': 'in-transit',
+                                             'processing': 'pending', 'pending': 'pending',
+                                             'cancelled': 'cancelled'}).to_numpy(dtype=object)
+
+    # Items: products drawn by popularity, priced from the catalog (unit
+    # price made up where the catalog price is invalid)
+    counts = rng.choice(np.arange(1, len(ITEM_COUNTS) + 1), n, p=ITEM_COUNTS)
+    m = int(counts.sum())
+    item_order = np.repeat(np.arange(n), counts)
+    popularity = rng.gamma(0.8, size=len(products))
+    product = rng.choice(len(products), m, p=popularity / popularity.sum())
+    catalog_price = products['price'].to_numpy(dtype=float)[product]
+    unit_price = np.where(catalog_price > 0, catalog_price, rng.uniform(5, 500, m)).round(2)
+    quantity = rng.integers(1, 6, m)
+    discount = np.where(_flag(rng, m, 0.15), quantity * unit_price * rng.uniform(0.05, 0.3, m), 0.0).round(2)
+    total_price = (quantity * unit_price - discount).round(2)
+
+    total_amount = np.bincount(item_order, weights=total_price, minlength=n).round(2)
+    mismatch = _flag(rng, n, rates['total_mismatch'])
+    total_amount[mismatch] = (total_amount[mismatch] * rng.uniform(1.02, 1.15, mismatch.sum())).round(2)
+    total_amount[_flag(rng, n, rates['zero_total'])] = 0.0
+
+    # Ship to the customer's address; orphaned orders get a random one
+    city_state = (customers['city'].astype(object) + ', ' + customers['state'].astype(object) + ' '
+                  + customers['zip_code'].astype(object)).to_numpy(dtype=object)
+    street = customers['address'].astype(object).fillna('1 Main St').to_numpy(dtype=object)
+    customer_address = street + ', ' + city_state
+    shipping_address = customer_address[customer]
+    shipping_address[orphan] = customer_address[rng.integers(0, len(customers), orphan.sum())]
+
+    order_ids = np.arange(1, n + 1)
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': customer_id,
+        'order_date': order_date,
+        'status': status,
+        'total_amount': total_amount,
+        'payment_status': payment_status,
+        'shipping_status': shipping_status,
+        'shipping_address': shipping_address,
+        'notes': _choice(rng, ORDER_NOTES, n)
+    })
+    order_items = pd.DataFrame({
+        'order_item_id': np.arange(1, m + 1),
+        'order_id': order_ids[item_order],
+        'product_id': products['product_id'].to_numpy(dtype=np.int64)[product],
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'total_price': total_price,
+        'discount': discount
+    })
+    return {'orders': orders, 'order_items': order_items}
+
+
+def _payments(rng, sizes, end, rates, tables):
+    orders = tables['orders']
+    n = len(orders)
+    order_date = orders['order_date'].to_numpy()
+    order_paid = orders['payment_status'].isin(['paid', 'refunded']).to_numpy()
+
+    status = np.where(order_paid, 'paid', np.where(rng.random(n) < 0.4, 'failed', 'unpaid')).astype(object)
+    failed = status == 'failed'
+    method = _choice(rng, PAYMENT_METHODS, n)
+    processor = np.where(method == 'PayPal', 'PayPal', _choice(rng, PROCESSORS, n)).astype(object)
+    attempts = np.where(failed, rng.choice([1, 2, 3], n, p=[0.3, 0.4, 0.3]),
+                        rng.choice([1, 2, 3], n, p=[0.85, 0.12, 0.03]))
+
+    payments = pd.DataFrame({
+        'payment_id': np.arange(1, n + 1),
+        'order_id': orders['order_id'].to_numpy(dtype=np.int64),
+        'payment_method': method,
+        'payment_processor': processor,
+        'amount': orders['total_amount'].to_numpy(dtype=float),
+        'transaction_id': 'txn_' + _hex(rng.integers(0, 2 ** 48, n), 12),
+        'payment_date': np.where(order_paid, _clip(order_date + rng.integers(60, 2 * 86400, n) * SECOND, end),
+                                 np.datetime64('NaT')),
+        'status': status,
+        'failure_reason': np.where(failed, _choice(rng, FAILURE_REASONS, n), None),
+        'attempts': attempts
+    })
+    return {'payments': payments}
+
+
+def _shipping(rng, sizes, end, rates, tables):
+    orders, customers = tables['orders'], tables['customers']
+    shipped = orders[orders['shipping_status'].isin(['delivered', 'in-transit'])]
+    n = len(shipped)
+
+    delivered = (shipped['shipping_status'] == 'delivered').to_numpy()
+    shipped_date = _clip(shipped['order_date'].to_numpy() + rng.integers(1, 4, n) * DAY, end)
+    delivered_date = np.where(delivered, _clip(shipped_date + rng.integers(1, 9, n) * DAY, end),
+                              np.datetime64('NaT'))
+    cities = customers['city'].astype(object).to_numpy(dtype=object)
+    customer = shipped['customer_id'].to_numpy(dtype=float, na_value=np.nan)
+    known = ~np.isnan(customer)
+    destination = _choice(rng, [c[0] for c in CITIES], n)
+    destination[known] = cities[customer[known].astype(np.int64) - 1]
+
+    shipping = pd.DataFrame({
+        'shipment_id': np.arange(1, n + 1),
+        'order_id': shipped['order_id'].to_numpy(dtype=np.int64),
+        'carrier': _choice(rng, CARRIERS, n),
+        'tracking_number': _hex(rng.integers(0, 2 ** 62, n), 16),
+        'shipped_date': shipped_date,
+        'delivered_date': delivered_date,
+        'destination': destination,
+        'shipping_address': shipped['shipping_address'].to_numpy(dtype=object),
+        'shipping_cost': rng.uniform(5, 40, n).round(2),
+        'weight': rng.uniform(0.2, 25, n).round(2),
+        'status': np.where(delivered, 'delivered', 'in-transit'),
+        'address_validated': ~_flag(rng, n, rates['address_not_validated'])
+    })
+    return {'shipping': shipping}
+
+
+def _returns(rng, sizes, end, rates, tables):
+    orders = tables['orders']
+    delivered = orders[orders['shipping_status'] == 'delivered']
+    returned = delivered[_flag(rng, len(delivered), RETURN_RATE)]
+    n = len(returned)
+
+    reason = _choice(rng, RETURN_REASONS, n)
+    status = _choice(rng, RETURN_STATUSES, n)
+    return_date = _clip(returned['order_date'].to_numpy() + rng.integers(3, 31, n) * DAY, end)
+    refund_amount = (returned['total_amount'].to_numpy(dtype=float) * rng.uniform(0.2, 1.0, n)).round(2)
+    return_ids = np.arange(1, n + 1)
+
+    returns = pd.DataFrame({
+        'return_id': return_ids,
+        'order_id': returned['order_id'].to_numpy(dtype=np.int64),
+        'customer_id': returned['customer_id'].to_numpy(dtype=float, na_value=np.nan),
+        'return_date': return_date,
+        'reason': reason,
+        'status': status,
+        'refund_amount': refund_amount,
+        'condition': _choice(rng, RETURN_CONDITIONS, n),
+        'notes': 'Return due to ' + _pool(RETURN_REASONS, str.lower)[
+            pd.Index(RETURN_REASONS).get_indexer(reason)] + ' issue.'
+    })
+
+    # Refunds for returns that were accepted
+    accepted = np.flatnonzero(np.isin(status, ['completed', 'approved', 'processing']))
+    k = len(accepted)
+    initiated = _clip(return_date[accepted] + rng.integers(0, 6, k) * DAY, end)
+    processing_days = rng.integers(1, 15, k)
+    completed = _clip(initiated + processing_days * DAY, end)
+    done = (status[accepted] == 'completed') & (completed < end.to_datetime64())
+    amount = refund_amount[accepted].copy()
+    mismatch = _flag(rng, k, rates['refund_mismatch'])
+    amount[mismatch] = (amount[mismatch] + rng.uniform(-5, 5, mismatch.sum())).round(2)
+
+    refunds = pd.DataFrame({
+        'refund_id': np.arange(1, k + 1),
+        'return_id': return_ids[accepted],
+        'order_id': returns['order_id'].to_numpy()[accepted],
+        'refund_amount': amount,
+        'refund_method': _choice(rng, REFUND_METHODS, k),
+        'initiated_date': initiated,
+        'completed_date': np.where(done, completed, np.datetime64('NaT')),
+        'processing_days': processing_days,
+        'status': np.where(done, 'completed', 'processing')
+    })
+    return {'returns': returns, 'refunds': refunds}
+
+
+# (tables produced, tables required, generator) - each generator draws from
+# its own random stream, so a table doesn't change with the set requested
+_GENERATORS = [
+    (('customers',), (), _customers),
+    (('vendors',), (), _vendors),
+    (('products',), (), _products),
+    (('inventory',), ('products',), _inventory),
+    (('orders', 'order_items'), ('customers', 'products'), _orders),
+    (('payments',), ('orders',), _payments),
+    (('shipping',), ('orders', 'customers'), _shipping),
+    (('returns', 'refunds'), ('orders',), _returns)
+]
+TABLES = [name for names, _, _ in _GENERATORS for name in names]
+
+
+def generate_tables(scale=DEFAULT_SCALE, tables=None, seed=42, end=None, issues=True):
+    """
+    Generate synthetic tables with valid foreign keys
+
+    Args:
+        scale: Number of orders (1 to MAX_SCALE)
+        tables: Table names to return (default all of TABLES); tables they
+            reference are generated too but not returned
+        seed: Random seed - the same seed, scale and end give the same data
+        end: Latest date in the data (default today at midnight)
+        issues: Inject data quality issues at ISSUE_RATES (False for clean data)
+
+    Returns:
+        Dictionary of table name -> DataFrame with the registry's dtypes
+    """
+    requested = list(TABLES if tables is None else tables)
+    unknown = set(requested) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown synthetic tables: {', '.join(sorted(unknown))}")
+
+    sizes = table_sizes(scale)
+    end = (pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end)).as_unit('ns')
+    rates = ISSUE_RATES if issues else dict.fromkeys(ISSUE_RATES, 0.0)
+    built = {}
+
+    def build(name):
+        for stream, (names, required, generator) in enumerate(_GENERATORS):
+            if name in names and name not in built:
+                for dependency in required:
+                    build(dependency)
+                rng = np.random.default_rng([seed, stream])
+                frames = generator(rng, sizes, end, rates, built)
+                built.update({table: apply_schema(table, frame) for table, frame in frames.items()})
+
+    for name in requested:
+        build(name)
+    return {name: built[name] for name in requested}
+
+
+def generate_table(name, scale=DEFAULT_SCALE, **kwargs):
+    """One synthetic table - see generate_tables()"""
+    return generate_tables(scale, tables=[name], **kwargs)[name]
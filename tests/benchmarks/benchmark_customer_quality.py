@@ -0,0 +1,45 @@
+"""
+Benchmark for the customer data quality engine
+
+Usage:
+    python tests/benchmarks/benchmark_customer_quality.py [rows]
+
+Reports vectorized throughput at 1M customers (or the given row count) and
+compares against the old iterrows() implementation on a smaller sample.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../unit'))
+
+from utils.data_quality import customer_quality_issues
+from test_data_quality import make_customers, reference_customer_issues
+
+LEGACY_SAMPLE_ROWS = 20_000
+
+
+def time_call(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    df = make_customers(rows)
+    elapsed, issues = time_call(customer_quality_issues, df)
+    print(f"vectorized: {rows:,} customers in {elapsed:.2f}s "
+          f"({rows / elapsed:,.0f} rows/s, {len(issues):,} issues)")
+
+    sample = df.head(LEGACY_SAMPLE_ROWS)
+    legacy_elapsed, _ = time_call(reference_customer_issues, sample)
+    legacy_rate = len(sample) / legacy_elapsed
+    print(f"iterrows:   {len(sample):,} customers in {legacy_elapsed:.2f}s "
+          f"({legacy_rate:,.0f} rows/s, ~{rows / legacy_rate:.0f}s projected for {rows:,})")
+
+
+if __name__ == '__main__':
+    main()
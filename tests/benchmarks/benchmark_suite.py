@@ -0,0 +1,376 @@
+"""
+Benchmark suite for the page analytics and filter functions
+
+Usage:
+    python tests/benchmarks/benchmark_suite.py [--scales 1000 10000 100000]
+        [--repeat 5] [--only NAME] [--threshold 1.0] [--save]
+
+Every benchmark runs against synthetic data (utils.synthetic) at each scale
+(number of orders). The best of `repeat` timings is compared with the stored
+baseline for that benchmark and scale in baselines.json; a run more than
+`threshold` slower (1.0 = twice the baseline) is a regression and the script exits with 1.
+--save records the current timings as the new baselines instead. Baselines
+are machine-specific: re-save them when the benchmark host changes.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+import numpy as np
+import pandas as pd
+
+from page_functions import load_page
+from utils import date_utils
+from utils.synthetic import generate_tables
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+DEFAULT_REPEAT = 5
+# Shared hosts routinely vary by 50% between runs; a real regression is
+# usually a complexity change, well past 2x
+DEFAULT_THRESHOLD = 1.0
+# Timings this short are mostly noise - never flagged as regressions
+MIN_SECONDS = 0.002
+# Fixed date the synthetic data ends on, so every run sees the same rows
+END = pd.Timestamp('2025-06-30')
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a setup function: (tables, scale) -> zero-argument callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def tile(df, rows):
+    """Repeat a fixed-size sample frame up to about `rows` rows"""
+    return pd.concat([df] * max(1, rows // max(len(df), 1)), ignore_index=True)
+
+
+def cutoff(days):
+    """Date filter cutoff for the synthetic tables (which end at END)"""
+    return (END - timedelta(days=days)).date()
+
+
+def days_ago(days):
+    """Date filter cutoff for page sample data (which ends today)"""
+    return (datetime.now() - timedelta(days=days)).date()
+
+
+# ===========================
+# ANALYTICS
+# ===========================
+
+@benchmark('home.calculate_dashboard_metrics')
+def _dashboard_metrics(tables, scale):
+    home = load_page('Home.py', PROMETHEUS_ENABLED=False, DEBUG_MODE=False)
+    return lambda: home.calculate_dashboard_metrics(tables, date_range_days=90)
+
+
+def _customer_frames(tables):
+    page = load_page('pages/customers.py')
+    return (page, page.standardize_dataframe(tables['customers'], 'customers'),
+            page.standardize_dataframe(tables['orders'], 'orders'))
+
+
+@benchmark('customers.analyze_data_quality')
+def _customer_quality(tables, scale):
+    page, customers, _ = _customer_frames(tables)
+    return lambda: page.analyze_data_quality(customers)
+
+
+@benchmark('customers.rfm_segmentation')
+def _customer_rfm(tables, scale):
+    page, _, orders = _customer_frames(tables)
+    return lambda: page.rfm_segmentation(orders)
+
+
+@benchmark('customers.detect_duplicates')
+def _customer_duplicates(tables, scale):
+    page, customers, _ = _customer_frames(tables)
+    return lambda: page.detect_duplicates(customers)
+
+
+@benchmark('products.category_analysis')
+def _product_categories(tables, scale):
+    page = load_page('pages/products.py')
+    products = page.generate_sample_product_data(scale)
+    return lambda: page.category_analysis(products)
+
+
+@benchmark('orders.analyze_integrity_issues')
+def _order_integrity(tables, scale):
+    page = load_page('pages/orders.py')
+    orders = page.generate_sample_order_data(scale)
+    return lambda: page.analyze_integrity_issues(orders)
+
+
+# ===========================
+# DATE CLEANERS
+# ===========================
+
+def _raw_orders(tables):
+    """Orders as exported: text dates with a few unparseable values"""
+    orders = tables['orders'][['order_id', 'order_date', 'total_amount']].copy()
+    dates = orders['order_date'].dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    dates[::97] = 'not a date'
+    orders['order_date'] = dates
+    return orders
+
+
+@benchmark('date_utils.parse_dates')
+def _parse_dates(tables, scale):
+    dates = _raw_orders(tables)['order_date']
+    return lambda: date_utils.parse_dates(dates)
+
+
+@benchmark('date_utils.clean_date_column')
+def _clean_date_column(tables, scale):
+    orders = _raw_orders(tables)
+    return lambda: date_utils.clean_date_column(orders, 'order_date')
+
+
+@benchmark('date_utils.clean_multiple_date_columns')
+def _clean_multiple_date_columns(tables, scale):
+    shipping = tables['shipping'][['shipment_id', 'shipped_date', 'delivered_date']].copy()
+    for column in ('shipped_date', 'delivered_date'):
+        shipping[column] = shipping[column].dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object)
+    return lambda: date_utils.clean_multiple_date_columns(shipping, ['shipped_date', 'delivered_date'],
+                                                          drop_invalid=False)
+
+
+@benchmark('date_utils.safe_date_filter')
+def _safe_date_filter(tables, scale):
+    orders = tables['orders']
+    return lambda: date_utils.safe_date_filter(orders, 'order_date', start_date=cutoff(90), end_date=END)
+
+
+# ===========================
+# PAGE FILTERS
+# ===========================
+
+@benchmark('customers.apply_quality_filters')
+def _customer_filters(tables, scale):
+    page, customers, _ = _customer_frames(tables)
+    issues = page.analyze_data_quality(customers)
+    return lambda: page.apply_quality_filters(issues, cutoff(365), ['critical', 'high'],
+                                              ['Invalid Email Format', 'Missing Phone'], 'smith')
+
+
+@benchmark('products.apply_quality_filters')
+def _product_filters(tables, scale):
+    page = load_page('pages/products.py')
+    issues = page.analyze_data_quality(page.generate_sample_product_data(scale))
+    return lambda: page.apply_quality_filters(issues, days_ago(365), ['critical', 'medium'],
+                                              ['Invalid Price', 'Missing Description'], 'sku')
+
+
+@benchmark('orders.apply_order_filters')
+def _order_filters(tables, scale):
+    page = load_page('pages/orders.py')
+    orders = page.generate_sample_order_data(scale)
+    return lambda: page.apply_order_filters(orders, days_ago(90), ['completed', 'shipped'], ['paid'], 'ord-1')
+
+
+@benchmark('inventory.apply_inventory_filters')
+def _inventory_filters(tables, scale):
+    page = load_page('pages/inventory.py')
+    stock = page.generate_sample_inventory_data(scale)[0]
+    return lambda: page.apply_inventory_filters(stock, ['critical', 'low'], list(page.WAREHOUSES)[:2],
+                                                ['Electronics', 'Toys'], 'sku-1')
+
+
+@benchmark('inventory.apply_movement_filters')
+def _movement_filters(tables, scale):
+    page = load_page('pages/inventory.py')
+    movements = page.generate_sample_inventory_data(scale)[2]
+    return lambda: page.apply_movement_filters(movements, list(page.WAREHOUSES)[:2], [], 'po-')
+
+
+@benchmark('vendors.apply_vendor_filters')
+def _vendor_filters(tables, scale):
+    page = load_page('pages/vendors.py')
+    vendors = page.generate_sample_vendor_data(scale)[0]
+    return lambda: page.apply_vendor_filters(vendors, ['active'], '4+ Stars', ['Electronics', 'Toys'],
+                                             ['USA', 'Germany'], 'global')
+
+
+@benchmark('shipping.apply_shipping_filters')
+def _shipping_filters(tables, scale):
+    page = load_page('pages/shipping.py')
+    records = page.generate_sample_shipping_data(scale)[0]
+    return lambda: page.apply_shipping_filters(records, days_ago(30), ['UPS', 'FedEx'],
+                                               ['in-transit', 'delayed'], 'ord-1')
+
+
+@benchmark('returns.apply_return_filters')
+def _return_filters(tables, scale):
+    page = load_page('pages/returns.py')
+    requests = page.generate_sample_return_data(scale)[0]
+    return lambda: page.apply_return_filters(requests, days_ago(90), ['pending', 'approved'],
+                                             ['Defective', 'Wrong Item'], 'ret-1')
+
+
+@benchmark('payments.apply_payment_filters')
+def _payment_filters(tables, scale):
+    page = load_page('pages/payments.py')
+    payments = page.build_payment_cubes('sample', tables['payments'], tables['orders'], tables['customers'])[0]
+    start = pd.Timestamp(cutoff(30))
+    return lambda: page.apply_payment_filters(payments, start, ['completed', 'failed'],
+                                              ['Credit Card', 'PayPal'], 'txn_a')
+
+
+@benchmark('fraud.apply_fraud_filters')
+def _fraud_filters(tables, scale):
+    page = load_page('pages/fraud.py')
+    view = page.build_fraud_scores(f'benchmark:{scale}', tables['payments'], tables['orders'],
+                                   tables['customers'])[0]
+    start = pd.Timestamp(cutoff(30))
+    return lambda: page.apply_fraud_filters(view, start, 'Low (0-49)', ['cleared', 'review'], 'ord-1')
+
+
+@benchmark('seasonality.apply_season_filters')
+def _season_filters(tables, scale):
+    page = load_page('pages/seasonality.py')
+    seasonality = page.build_seasonality(f'benchmark:{scale}', tables['orders'])
+    return lambda: page.apply_season_filters(seasonality['months'], 'Last 2 Years', 'Q4 (Fall/Holiday)',
+                                             seasonality['years'])
+
+
+# Pages whose sample data isn't derived from the synthetic tables: their
+# fixed samples are repeated up to the scale
+
+@benchmark('alerts.apply_alert_filters')
+def _alert_filters(tables, scale):
+    page = load_page('pages/alerts.py')
+    alerts = tile(page.generate_sample_alert_data()[0], scale)
+    return lambda: page.apply_alert_filters(alerts, ['critical', 'high'], [], ['active'])
+
+
+@benchmark('campaigns.apply_campaign_filters')
+def _campaign_filters(tables, scale):
+    page = load_page('pages/campaigns.py')
+    campaigns = tile(page.generate_sample_campaign_data()[0], scale)
+    return lambda: page.apply_campaign_filters(campaigns, days_ago(90), ['active'], ['Email', 'Social Media'], 'camp')
+
+
+@benchmark('geography.apply_geography_filters')
+def _geography_filters(tables, scale):
+    page = load_page('pages/geography.py')
+    regions = tile(page.generate_sample_geography_data()[0], scale)
+    return lambda: page.apply_geography_filters(regions, 'Underperforming', 'ca')
+
+
+@benchmark('loyalty.apply_loyalty_filters')
+def _loyalty_filters(tables, scale):
+    page = load_page('pages/loyalty.py')
+    performers = tile(page.generate_sample_loyalty_data()[2], scale)
+    return lambda: page.apply_loyalty_filters(performers, 'Gold', 'mem')
+
+
+# ===========================
+# RUNNER
+# ===========================
+
+def machine():
+    return {'node': platform.node(), 'processor': platform.machine(), 'cpus': os.cpu_count(),
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__}
+
+
+def time_benchmark(func, repeat):
+    """Best and median of `repeat` timed calls, after one warm-up call (GC off, as in timeit)"""
+    func()
+    gc.collect()
+    gc.disable()
+    try:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings), statistics.median(timings)
+
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {'machine': None, 'results': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check(best, baseline, threshold):
+    """'ok', 'new' (no baseline) or 'REGRESSION' for one timing"""
+    if baseline is None:
+        return 'new'
+    if best > max(baseline, MIN_SECONDS) * (1 + threshold):
+        return 'REGRESSION'
+    return 'ok'
+
+
+def run(scales, repeat, only=None):
+    """Yield (benchmark, scale, best, median) for every benchmark at every scale"""
+    names = [name for name in BENCHMARKS if not only or only in name]
+    for scale in scales:
+        tables = generate_tables(scale, end=END)
+        for name in names:
+            best, median = time_benchmark(BENCHMARKS[name](tables, scale), repeat)
+            yield name, scale, best, median
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--only', help='run benchmarks whose name contains this text')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--baselines', default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help='store the timings as the new baselines')
+    args = parser.parse_args(argv)
+    # The date cleaners warn about the invalid dates planted in their input
+    warnings.filterwarnings('ignore', message='Dropped .* invalid dates')
+
+    stored = load_baselines(args.baselines)
+    if stored['machine'] and stored['machine'] != machine():
+        print(f"warning: baselines were recorded on {stored['machine']}, not {machine()}")
+
+    regressions = 0
+    print(f"{'benchmark':<40} {'scale':>9} {'best':>10} {'median':>10} {'baseline':>10}  status")
+    for name, scale, best, median in run(args.scales, args.repeat, args.only):
+        baseline = stored['results'].get(name, {}).get(str(scale))
+        status = check(best, baseline, args.threshold)
+        regressions += status == 'REGRESSION'
+        if args.save:
+            stored['results'].setdefault(name, {})[str(scale)] = round(best, 6)
+        shown = f"{baseline * 1000:8.2f}ms" if baseline is not None else f"{'-':>10}"
+        print(f"{name:<40} {scale:>9,} {best * 1000:8.2f}ms {median * 1000:8.2f}ms {shown}  {status}")
+
+    if args.save:
+        stored['machine'] = machine()
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"saved baselines to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{regressions} regression(s) over {args.threshold:.0%} slower than baseline")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Page functions for benchmarks
+
+Pages run Streamlit calls at import time, so their analysis and filter
+functions can't be imported. load_page() compiles only a page's imports,
+UPPER_CASE constants and function definitions into a namespace, with the
+st.cache_data decorators removed so every call does the work being timed.
+"""
+import ast
+import os
+from types import SimpleNamespace
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../application'))
+
+
+def _is_constant(node):
+    return isinstance(node, ast.Assign) and all(
+        isinstance(target, ast.Name) and target.id.isupper() for target in node.targets)
+
+
+def _is_optional_import(node):
+    """try: import ... except ImportError: blocks (e.g. prometheus_client)"""
+    return isinstance(node, ast.Try) and all(
+        isinstance(statement, (ast.Import, ast.ImportFrom)) or _is_constant(statement)
+        for statement in node.body)
+
+
+def load_page(page, **overrides):
+    """
+    Definitions of a page without running it
+
+    Args:
+        page: Path relative to application/, e.g. 'pages/orders.py' or 'Home.py'
+        **overrides: Module globals to replace after loading (e.g.
+            PROMETHEUS_ENABLED=False)
+
+    Returns:
+        SimpleNamespace of the page's functions and constants
+    """
+    path = os.path.join(APP_DIR, page)
+    with open(path, encoding='utf-8') as source:
+        module = ast.parse(source.read(), filename=path)
+
+    body = []
+    for node in module.body:
+        if isinstance(node, ast.FunctionDef):
+            node.decorator_list = []
+            body.append(node)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) or _is_constant(node) or _is_optional_import(node):
+            body.append(node)
+    module.body = body
+
+    namespace = {'__name__': f"page_{os.path.splitext(os.path.basename(page))[0]}", '__file__': path}
+    exec(compile(module, path, 'exec'), namespace)
+    namespace.update(overrides)
+    return SimpleNamespace(**{name: value for name, value in namespace.items() if not name.startswith('__')})
@@ -0,0 +1,352 @@
+"""
+Headless page profiler
+
+Usage:
+    python tests/benchmarks/page_profiler.py [--pages inventory fraud]
+        [--source auto|csv|mysql|sample] [--scale 5000] [--runs 2]
+        [--interval 1] [--no-memory] [--output page-profile]
+
+Runs every page (Home.py and pages/*.py) under streamlit.testing.v1.AppTest,
+without a browser. The first run of a page is cold (Streamlit caches and the
+dataset registry are cleared first), later runs are reruns of the same
+session. For each run it records:
+
+- wall time, and time per section of the page. Sections are the banner
+  titles (# === / # TITLE / # ===) and the comments above top-level
+  `with` blocks (# TAB 1: ...)
+- peak traced memory (tracemalloc - slows the run down, see --no-memory)
+- calls to DataFrame.copy(), explicit or made inside pandas
+- stack samples of the script thread
+
+Writes report.json and profile.folded (collapsed stacks, one root frame per
+page and run kind) to --output. The folded file opens in speedscope or
+renders with flamegraph.pl.
+
+--source sets DATA_SOURCE for the dataset registry; 'sample' loads no
+tables, so every page falls back to its synthetic sample data. --scale sets
+SYNTHETIC_SCALE for that sample data.
+"""
+import argparse
+import ast
+import functools
+import json
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../application'))
+sys.path.insert(0, APP_DIR)
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+DEFAULT_RUNS = 2
+DEFAULT_TIMEOUT = 300
+# Milliseconds between stack samples
+DEFAULT_INTERVAL = 1.0
+# Time before the first section: imports, page config, CSS
+TOP = '(top)'
+# Time after the script ends until AppTest returns: message parsing
+AFTER = '(streamlit)'
+
+# Section timer of the run in progress, fed by mark() calls in the
+# instrumented page
+_timer = None
+
+
+def pages():
+    """Page scripts relative to application/, Home.py first"""
+    return ['Home.py'] + sorted(f'pages/{name}' for name in os.listdir(os.path.join(APP_DIR, 'pages'))
+                                if name.endswith('.py'))
+
+
+# ===========================
+# INSTRUMENTATION
+# ===========================
+
+def _is_rule(line):
+    return line.startswith('# ===')
+
+
+def instrument(source):
+    """
+    Replace a page's section comments with mark() calls
+
+    A column-0 comment between top-level statements is a section if it is
+    the title of a banner or sits directly above a top-level `with` block.
+    The comment line itself becomes the call, so line numbers (and
+    tracebacks) stay those of the original page.
+
+    Args:
+        source: Page source code
+
+    Returns:
+        (instrumented source, list of section names in page order)
+    """
+    tree = ast.parse(source)
+    covered = set()
+    with_starts = set()
+    for node in tree.body:
+        first = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+        covered.update(range(first, node.end_lineno + 1))
+        if isinstance(node, ast.With):
+            with_starts.add(node.lineno)
+
+    lines = source.splitlines()
+    sections = []
+    for index, line in enumerate(lines):
+        lineno = index + 1
+        if not line.startswith('#') or _is_rule(line) or lineno in covered:
+            continue
+        in_banner = 0 < index < len(lines) - 1 and _is_rule(lines[index - 1]) and _is_rule(lines[index + 1])
+        if not (in_banner or lineno + 1 in with_starts):
+            continue
+        name = line.lstrip('#').strip().replace(';', ',')
+        if name:
+            lines[index] = f"__import__('page_profiler').mark({name!r})"
+            sections.append(name)
+
+    lines.append(f"__import__('page_profiler').mark({AFTER!r})")
+    return '\n'.join(lines) + '\n', sections
+
+
+def mark(name):
+    """Start a new section of the page being profiled (called by the page)"""
+    if _timer is not None:
+        _timer.mark(name)
+
+
+class SectionTimer:
+    """Time between consecutive section marks of one run"""
+
+    def __init__(self):
+        self.marks = [(TOP, time.perf_counter())]
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def current(self):
+        return self.marks[-1][0]
+
+    def durations(self, end):
+        """Seconds per section in page order; a repeated section adds up"""
+        totals = {}
+        for (name, start), (_, stop) in zip(self.marks, self.marks[1:] + [(None, end)]):
+            totals[name] = totals.get(name, 0.0) + stop - start
+        return totals
+
+
+# ===========================
+# SAMPLING
+# ===========================
+
+def _frame_label(code):
+    path = code.co_filename
+    if path.startswith(APP_DIR):
+        path = os.path.relpath(path, APP_DIR)
+    else:
+        path = path.split('site-packages' + os.sep)[-1]
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({path}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Collapsed stacks of the thread running a script, sampled every `interval` seconds"""
+
+    def __init__(self, script_path, root, timer, interval):
+        super().__init__(daemon=True)
+        self.script_path = script_path
+        self.root = root
+        self.timer = timer
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident != self.ident:
+                    self._sample(frame)
+
+    def _sample(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == self.script_path and code.co_name == '<module>':
+                labels = [self.root, self.timer.current()] + [_frame_label(caller) for caller in reversed(stack)]
+                self.stacks[';'.join(labels)] += 1
+                return
+            stack.append(code)
+            frame = frame.f_back
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ===========================
+# PROFILING
+# ===========================
+
+@functools.lru_cache(maxsize=None)
+def _copy_counter():
+    """Wrap DataFrame.copy once; the wrapper counts while `active`"""
+    original = pd.DataFrame.copy
+    state = {'active': False, 'count': 0}
+
+    @functools.wraps(original)
+    def copy(self, *args, **kwargs):
+        if state['active']:
+            state['count'] += 1
+        return original(self, *args, **kwargs)
+
+    pd.DataFrame.copy = copy
+    return state
+
+
+def _clear_caches():
+    import streamlit as st
+    from utils.datasets import clear_datasets
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    clear_datasets()
+
+
+def profile_page(page, runs=DEFAULT_RUNS, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL, memory=True):
+    """
+    Profile one page
+
+    Args:
+        page: Path relative to application/, e.g. 'pages/inventory.py'
+        runs: Number of runs; the first is cold, the rest are reruns
+        timeout: Seconds before a run is abandoned
+        interval: Milliseconds between stack samples
+        memory: Trace peak memory (slower)
+
+    Returns:
+        (report dict, Counter of collapsed stacks)
+    """
+    global _timer
+    with open(os.path.join(APP_DIR, page), encoding='utf-8') as f:
+        source, sections = instrument(f.read())
+
+    copies = _copy_counter()
+    stacks = Counter()
+    report = {'page': page, 'sections': sections, 'runs': []}
+    switch_interval = sys.getswitchinterval()
+    directory = tempfile.mkdtemp(prefix='page_profile_')
+    try:
+        # Same file name as the page so exceptions and frames read naturally
+        script_path = os.path.join(directory, os.path.basename(page))
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+
+        _clear_caches()
+        app = AppTest.from_file(script_path, default_timeout=timeout)
+        sys.setswitchinterval(min(switch_interval, interval / 1000))
+        for run in range(runs):
+            _timer = SectionTimer()
+            root = f"{page} ({'cold' if run == 0 else 'rerun'})"
+            sampler = StackSampler(script_path, root, _timer, interval / 1000)
+            copies['count'] = 0
+            copies['active'] = True
+            if memory:
+                tracemalloc.reset_peak()
+            error = None
+            sampler.start()
+            start = time.perf_counter()
+            try:
+                app.run()
+            except RuntimeError as e:
+                # AppTest timeout
+                error = str(e)
+            end = time.perf_counter()
+            sampler.stop()
+            copies['active'] = False
+
+            stacks.update(sampler.stacks)
+            report['runs'].append({
+                'run': 'cold' if run == 0 else 'rerun',
+                'wall_seconds': round(end - start, 6),
+                'sections': {name: round(seconds, 6) for name, seconds in _timer.durations(end).items()},
+                'peak_memory_bytes': tracemalloc.get_traced_memory()[1] if memory else None,
+                'dataframe_copies': copies['count'],
+                'samples': sum(sampler.stacks.values()),
+                'exceptions': [error] if error else [exception.message for exception in app.exception]
+            })
+    finally:
+        _timer = None
+        copies['active'] = False
+        sys.setswitchinterval(switch_interval)
+        shutil.rmtree(directory, ignore_errors=True)
+    return report, stacks
+
+
+def write_folded(stacks, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+
+def _summary_line(report):
+    first = report['runs'][0]
+    rerun = report['runs'][-1] if len(report['runs']) > 1 else None
+    sections = dict(first['sections'])
+    sections.pop(AFTER, None)
+    slowest = max(sections, key=sections.get)
+    peak = f"{first['peak_memory_bytes'] / 2**20:7.1f}MB" if first['peak_memory_bytes'] is not None else f"{'-':>9}"
+    rerun_time = f"{rerun['wall_seconds'] * 1000:8.0f}ms" if rerun else f"{'-':>10}"
+    errors = ' ERROR' if any(run['exceptions'] for run in report['runs']) else ''
+    return (f"{report['page']:<24} {first['wall_seconds'] * 1000:8.0f}ms {rerun_time} {peak} "
+            f"{first['dataframe_copies']:>7} {slowest[:32]:<32} {sections[slowest] * 1000:7.0f}ms{errors}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', nargs='+', help='profile pages whose path contains any of these')
+    parser.add_argument('--source', choices=['auto', 'csv', 'mysql', 'sample'])
+    parser.add_argument('--scale', type=int, help='SYNTHETIC_SCALE for page sample data')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='milliseconds between samples')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc for undistorted timings')
+    parser.add_argument('--output', default='page-profile')
+    args = parser.parse_args(argv)
+
+    # Read by utils.datasets and utils.synthetic when the first page imports them
+    if args.source:
+        os.environ['DATA_SOURCE'] = args.source
+    if args.scale:
+        os.environ['SYNTHETIC_SCALE'] = str(args.scale)
+    # Pages call mark() through an import of this module
+    sys.modules.setdefault('page_profiler', sys.modules[__name__])
+
+    selected = [page for page in pages() if not args.pages or any(name in page for name in args.pages)]
+    memory = not args.no_memory
+    if memory:
+        tracemalloc.start()
+
+    reports, stacks = [], Counter()
+    print(f"{'page':<24} {'cold':>10} {'rerun':>10} {'peak':>9} {'copies':>7} {'slowest section (cold)':<32} {'time':>9}")
+    for page in selected:
+        report, page_stacks = profile_page(page, args.runs, args.timeout, args.interval, memory)
+        reports.append(report)
+        stacks.update(page_stacks)
+        print(_summary_line(report))
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'config': vars(args), 'pages': reports}, f, indent=2)
+        f.write('\n')
+    write_folded(stacks, os.path.join(args.output, 'profile.folded'))
+    print(f"wrote report.json and profile.folded to {args.output}")
+    return 1 if any(run['exceptions'] for report in reports for run in report['runs']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Unit tests for the benchmark suite's regression check and benchmark setups
+"""
+import unittest
+import os
+import sys
+import warnings
+
+# Add benchmarks directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../benchmarks'))
+
+import benchmark_suite
+from utils.synthetic import generate_tables
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test regression thresholds and that every benchmark still runs"""
+
+    def test_check(self):
+        """Test new, ok and regression statuses"""
+        self.assertEqual(benchmark_suite.check(0.5, None, 1.0), 'new')
+        self.assertEqual(benchmark_suite.check(0.19, 0.1, 1.0), 'ok')
+        self.assertEqual(benchmark_suite.check(0.21, 0.1, 1.0), 'REGRESSION')
+        self.assertEqual(benchmark_suite.check(0.12, 0.1, 0.1), 'REGRESSION')
+
+    def test_check_ignores_noise(self):
+        """Test timings under MIN_SECONDS are never regressions"""
+        tiny = benchmark_suite.MIN_SECONDS / 10
+        self.assertEqual(benchmark_suite.check(benchmark_suite.MIN_SECONDS * 1.5, tiny, 1.0), 'ok')
+
+    def test_benchmarks_run(self):
+        """Test every benchmark sets up and runs at a small scale"""
+        tables = generate_tables(200, end=benchmark_suite.END)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for name, setup in benchmark_suite.BENCHMARKS.items():
+                with self.subTest(benchmark=name):
+                    setup(tables, 200)()
+
+    def test_baselines_cover_benchmarks(self):
+        """Test the stored baselines have every benchmark at the default scales"""
+        results = benchmark_suite.load_baselines()['results']
+        for name in benchmark_suite.BENCHMARKS:
+            with self.subTest(benchmark=name):
+                self.assertEqual(set(results.get(name, {})),
+                                 {str(scale) for scale in benchmark_suite.DEFAULT_SCALES})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for dashboard metric aggregation
+"""
+import unittest
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import dashboard_metrics
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def make_orders(n=400, seed=9):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(NOW) - pd.to_timedelta(rng.integers(0, 200 * 24, n), unit='h')
+    return pd.DataFrame({
+        'order_id': np.arange(1, n + 1),
+        'order_date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'total_amount': rng.choice([0.0, 19.5, 120.0, 560.25], n)
+    })
+
+
+class TestDashboardMetrics(unittest.TestCase):
+    """Test the pandas fallback and the SQL pushdown give the same numbers"""
+
+    def setUp(self):
+        self.orders = make_orders()
+        self.engine = create_engine('sqlite://')
+        self.orders.to_sql('orders', self.engine, index=False)
+        pd.DataFrame({'product_id': [1, 2, 3], 'stock_quantity': [0, 5, 50]}).to_sql('products', self.engine, index=False)
+        pd.DataFrame({'rating': [4, 5, 3]}).to_sql('reviews', self.engine, index=False)
+
+    def load(self, query, params):
+        with self.engine.connect() as conn:
+            return pd.read_sql(text(query), conn, params=params)
+
+    def test_summarize_windows(self):
+        """Test AOV and period-over-period deltas"""
+        summary = dashboard_metrics.summarize_windows(300.0, 3, 200.0, 4)
+
+        self.assertEqual(summary['aov'], 100.0)
+        self.assertAlmostEqual(summary['revenue_delta'], 50.0)
+        self.assertAlmostEqual(summary['orders_delta'], -25.0)
+        self.assertEqual(dashboard_metrics.summarize_windows(10.0, 1, 0, 0)['revenue_delta'], 0)
+
+    def test_pushdown_matches_pandas(self):
+        """Test that the grouped SQL and the pandas fallback agree"""
+        expected = dashboard_metrics.frame_order_windows(self.orders, 'order_date', 'total_amount', 30, now=NOW)
+        result = dashboard_metrics.query_dashboard_metrics(['orders'], 30, now=NOW, loader=self.load)
+
+        self.assertAlmostEqual(result['revenue'], expected[0])
+        self.assertEqual(result['orders'], expected[1])
+        self.assertAlmostEqual(result['prev_revenue'], expected[2])
+        self.assertEqual(result['prev_orders'], expected[3])
+
+    def test_scalar_aggregates(self):
+        """Test low-stock counts and average rating from one query"""
+        calls = []
+
+        def loader(query, params):
+            calls.append(query)
+            return self.load(query, params)
+
+        result = dashboard_metrics.query_dashboard_metrics(['products', 'reviews'], now=NOW, loader=loader)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(result['total_products'], 3)
+        self.assertEqual(result['low_stock_items'], 2)
+        self.assertAlmostEqual(result['avg_rating'], 4.0)
+
+    def test_failed_query_leaves_metrics_out(self):
+        """Test that a failed query doesn't produce zero metrics"""
+        result = dashboard_metrics.query_dashboard_metrics(['orders'], now=NOW, loader=lambda q, p: None)
+        self.assertNotIn('revenue', result)
+
+    def test_business_totals(self):
+        """Test the all-time gauges cover every positive order and customer in the registry"""
+        from utils.datasets import get_dataset
+
+        totals = dashboard_metrics.business_totals()
+        orders = get_dataset('orders')
+        amounts = pd.to_numeric(orders['total_amount'], errors='coerce')
+        positive = orders['order_date'].notna() & (amounts > 0)
+
+        self.assertEqual(totals['orders'], int(positive.sum()))
+        self.assertAlmostEqual(totals['revenue'], amounts[positive].sum(), places=2)
+        self.assertEqual(totals['total_customers'], len(get_dataset('customers')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+"""
+Unit tests for the vectorized data quality rules
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import data_quality
+
+
+def reference_customer_issues(df):
+    """Row-by-row customer checks the vectorized engine replaced"""
+    issues = []
+    for _, row in df.iterrows():
+        customer_issues = []
+        severity = "low"
+
+        email = row['email']
+        if pd.isna(email) or email is None:
+            customer_issues.append("Missing Email")
+            severity = "critical"
+        elif '@' not in str(email) or '.' not in str(email):
+            customer_issues.append("Invalid Email Format")
+            severity = "high"
+
+        phone = row['phone']
+        if pd.isna(phone) or phone is None:
+            customer_issues.append("Missing Phone")
+            if severity not in ["critical"]:
+                severity = "high"
+        else:
+            phone_digits = ''.join(filter(str.isdigit, str(phone)))
+            if len(phone_digits) < 10:
+                customer_issues.append("Invalid Phone Format")
+                if severity == "low":
+                    severity = "medium"
+
+        address = row['address']
+        if pd.isna(address) or address is None:
+            customer_issues.append("Missing Address")
+            if severity == "low":
+                severity = "medium"
+
+        if customer_issues:
+            issues.append({
+                'Customer ID': row['customer_id'],
+                'Name': row['name'],
+                'Email': row['email'] if pd.notna(row['email']) else '❌ Missing',
+                'Phone': row['phone'] if pd.notna(row['phone']) else '❌ Missing',
+                'Address': row['address'] if pd.notna(row['address']) else '❌ Missing',
+                'Issue': ' & '.join(customer_issues),
+                'Severity': severity,
+                'Registered': row['created_date']
+            })
+    return pd.DataFrame(issues) if issues else pd.DataFrame()
+
+
+def reference_product_issues(df):
+    """Row-by-row product checks the vectorized engine replaced"""
+    issues = []
+    for _, row in df.iterrows():
+        product_issues = []
+        severity = "low"
+
+        if pd.isna(row['name']) or row['name'] is None:
+            product_issues.append("Missing Name")
+            severity = "critical"
+
+        price = row['price']
+        if pd.isna(price) or price is None:
+            product_issues.append("Missing Price")
+            if severity not in ["critical"]:
+                severity = "high"
+        elif price <= 0:
+            product_issues.append("Invalid Price")
+            severity = "critical"
+
+        if pd.isna(row['description']) or row['description'] is None:
+            product_issues.append("Missing Description")
+            if severity not in ["critical", "high"]:
+                severity = "medium"
+
+        if pd.isna(row['category']) or row['category'] is None:
+            product_issues.append("Missing Category")
+            if severity == "low":
+                severity = "high"
+
+        if row['image'] == 'No':
+            product_issues.append("Missing Image")
+            if severity == "low":
+                severity = "medium"
+
+        if product_issues:
+            issues.append({
+                'Product ID': row['product_id'],
+                'SKU': row['sku'],
+                'Name': row['name'] if pd.notna(row['name']) else '❌ Missing',
+                'Category': row['category'] if pd.notna(row['category']) else '❌ Missing',
+                'Price': f"${row['price']:.2f}" if pd.notna(row['price']) and row['price'] > 0 else '❌ Invalid',
+                'Description': 'Yes' if pd.notna(row['description']) else '❌ Missing',
+                'Image': row['image'],
+                'Stock': row['stock'],
+                'Issue': ' & '.join(product_issues),
+                'Severity': severity,
+                'Created': row['created_date']
+            })
+    return pd.DataFrame(issues) if issues else pd.DataFrame()
+
+
+def reference_category_analysis(df):
+    """Per-category loop the grouped completeness computation replaced"""
+    category_stats = []
+    for category in df['category'].dropna().unique():
+        cat_products = df[df['category'] == category]
+
+        complete_count = 0
+        for _, row in cat_products.iterrows():
+            fields_complete = 0
+            if pd.notna(row['name']): fields_complete += 1
+            if pd.notna(row['description']): fields_complete += 1
+            if pd.notna(row['price']) and row['price'] > 0: fields_complete += 1
+            if row['image'] == 'Yes': fields_complete += 1
+            if row['stock'] > 0: fields_complete += 1
+            complete_count += fields_complete
+        completeness = complete_count / (len(cat_products) * 5) * 100
+
+        issues = []
+        if (cat_products['description'].isna()).sum() > 0:
+            issues.append(('Missing descriptions', (cat_products['description'].isna()).sum()))
+        if (cat_products['image'] == 'No').sum() > 0:
+            issues.append(('Missing images', (cat_products['image'] == 'No').sum()))
+        if ((cat_products['price'].isna()) | (cat_products['price'] <= 0)).sum() > 0:
+            issues.append(('Invalid prices', ((cat_products['price'].isna()) | (cat_products['price'] <= 0)).sum()))
+
+        top_issue = max(issues, key=lambda x: x[1])[0] if issues else 'No issues'
+        avg_price = cat_products[cat_products['price'] > 0]['price'].mean()
+
+        category_stats.append({
+            'Category': category,
+            'Total Products': len(cat_products),
+            'Avg Price': f'${avg_price:.2f}' if pd.notna(avg_price) else 'N/A',
+            'Data Completeness': f'{completeness:.1f}%',
+            'Top Issue': top_issue
+        })
+
+    uncategorized = df[df['category'].isna()]
+    if len(uncategorized) > 0:
+        category_stats.append({
+            'Category': 'Uncategorized',
+            'Total Products': len(uncategorized),
+            'Avg Price': 'N/A',
+            'Data Completeness': '45.0%',
+            'Top Issue': 'No category assigned'
+        })
+    return pd.DataFrame(category_stats)
+
+
+def reference_integrity_issues(df):
+    """Row-by-row order checks the vectorized engine replaced (amounts unformatted)"""
+    issues = []
+    for _, row in df.iterrows():
+        discrepancy = row['calculated_total'] - row['order_total']
+        if pd.isna(row['customer_id']) or row['customer_id'] is None:
+            issue, customer = 'Orphaned Order', None
+        elif abs(discrepancy) > 0.01:
+            issue, customer = 'Price Mismatch', row['customer_id']
+        elif row['order_total'] <= 0:
+            issue, customer = 'Invalid Total', row['customer_id']
+        else:
+            continue
+        issues.append({
+            'Order ID': row['order_id'],
+            'Customer': customer,
+            'Date': row['order_date'],
+            'Order Total': row['order_total'],
+            'Calculated Total': row['calculated_total'],
+            'Discrepancy': discrepancy,
+            'Issue': issue
+        })
+    return pd.DataFrame(issues) if issues else pd.DataFrame()
+
+
+def make_customers(n, seed=7):
+    rng = np.random.default_rng(seed)
+    emails = np.array(['a@example.com', 'broken.example.com', 'noatsign', None, 'nan'], dtype=object)
+    phones = np.array(['+1-555-123-4567', '123', None, '555 0100', '(555) 010-9999'], dtype=object)
+    addresses = np.array(['1 Main St', None, 'nan', '99 Oak Ave'], dtype=object)
+    return pd.DataFrame({
+        'customer_id': np.arange(1, n + 1),
+        'name': [f'Customer {i}' for i in range(n)],
+        'email': rng.choice(emails, n),
+        'phone': rng.choice(phones, n),
+        'address': rng.choice(addresses, n),
+        'created_date': ['2025-01-01'] * n
+    })
+
+
+def make_products(n, seed=11):
+    rng = np.random.default_rng(seed)
+    categories = np.array(['Electronics', 'Books', 'Toys', None], dtype=object)
+    return pd.DataFrame({
+        'product_id': [f'P-{i:05d}' for i in range(n)],
+        'sku': [f'SKU-{i:05d}' for i in range(n)],
+        'name': rng.choice(np.array(['Widget', None], dtype=object), n, p=[0.9, 0.1]),
+        'category': rng.choice(categories, n),
+        'price': rng.choice(np.array([19.99, 250.0, 0.0, -10.0, np.nan]), n),
+        'description': rng.choice(np.array(['Nice', None], dtype=object), n),
+        'image': rng.choice(np.array(['Yes', 'No']), n),
+        'stock': rng.integers(0, 5, n),
+        'created_date': ['2025-01-01'] * n
+    })
+
+
+def make_orders(n, seed=5):
+    rng = np.random.default_rng(seed)
+    order_total = rng.choice(np.array([25.0, 99.99, 0.0, -5.0]), n)
+    return pd.DataFrame({
+        'order_id': [f'ORD-{i}' for i in range(n)],
+        'customer_id': rng.choice(np.array(['C-001', 'C-002', None], dtype=object), n),
+        'order_date': ['2025-01-01'] * n,
+        'order_total': order_total,
+        'calculated_total': order_total + rng.choice(np.array([0.0, 0.005, 3.5]), n)
+    })
+
+
+class TestCustomerQuality(unittest.TestCase):
+    """Test the customer rule engine against the row-wise reference"""
+
+    def test_matches_reference(self):
+        """Test identical issue table on mixed good and bad records"""
+        df = make_customers(500)
+        pd.testing.assert_frame_equal(
+            data_quality.customer_quality_issues(df),
+            reference_customer_issues(df)
+        )
+
+    def test_clean_data_returns_empty_frame(self):
+        """Test that clean customers produce an empty result"""
+        df = pd.DataFrame({
+            'customer_id': [1], 'name': ['A'], 'email': ['a@example.com'],
+            'phone': ['+1-555-123-4567'], 'address': ['1 Main St'], 'created_date': ['2025-01-01']
+        })
+        self.assertTrue(data_quality.customer_quality_issues(df).empty)
+
+    def test_severity_precedence(self):
+        """Test that the most severe rule wins"""
+        df = pd.DataFrame({
+            'customer_id': [1, 2], 'name': ['A', 'B'], 'email': [None, 'b@example.com'],
+            'phone': ['123', None], 'address': [None, '1 Main St'], 'created_date': ['2025-01-01'] * 2
+        })
+        result = data_quality.customer_quality_issues(df)
+
+        self.assertEqual(result['Issue'].tolist(), [
+            'Missing Email & Invalid Phone Format & Missing Address', 'Missing Phone'
+        ])
+        self.assertEqual(result['Severity'].tolist(), ['critical', 'high'])
+
+
+class TestProductQuality(unittest.TestCase):
+    """Test the product rule engine and category completeness"""
+
+    def test_matches_reference(self):
+        """Test identical issue table on mixed good and bad products"""
+        df = make_products(500)
+        pd.testing.assert_frame_equal(
+            data_quality.product_quality_issues(df),
+            reference_product_issues(df)
+        )
+
+    def test_category_severity_keeps_earlier_rule(self):
+        """Test that a missing category doesn't override a medium severity"""
+        df = make_products(1)
+        df.loc[0, ['name', 'price', 'description', 'category', 'image']] = ['Widget', 5.0, None, None, 'Yes']
+        result = data_quality.product_quality_issues(df)
+
+        self.assertEqual(result['Issue'].iloc[0], 'Missing Description & Missing Category')
+        self.assertEqual(result['Severity'].iloc[0], 'medium')
+
+    def test_category_completeness_matches_reference(self):
+        """Test identical per-category completeness, prices and top issues"""
+        df = make_products(500)
+        pd.testing.assert_frame_equal(
+            data_quality.category_completeness(df),
+            reference_category_analysis(df)
+        )
+
+    def test_category_completeness_ignores_unused_categories(self):
+        """Test that a filtered categorical frame only lists the categories present"""
+        df = make_products(500)
+        df['category'] = df['category'].astype('category')
+        present = df['category'].dropna().unique()[0]
+        filtered = df[df['category'] == present]
+
+        result = data_quality.category_completeness(filtered)
+        self.assertEqual(result['Category'].tolist(), [present])
+        self.assertEqual(result['Total Products'].tolist(), [len(filtered)])
+        self.assertNotIn('nan%', result['Data Completeness'].tolist())
+
+
+class TestOrderIntegrity(unittest.TestCase):
+    """Test the order integrity checks"""
+
+    def test_matches_reference(self):
+        """Test identical issues with amounts kept numeric"""
+        df = make_orders(500)
+        result = data_quality.order_integrity_issues(df)
+
+        pd.testing.assert_frame_equal(result, reference_integrity_issues(df))
+        self.assertTrue(pd.api.types.is_float_dtype(result['Discrepancy']))
+
+    def test_clean_orders_return_empty_frame(self):
+        """Test that consistent orders produce an empty result"""
+        df = make_orders(1)
+        df.loc[0, ['customer_id', 'order_total', 'calculated_total']] = ['C-001', 10.0, 10.0]
+        self.assertTrue(data_quality.order_integrity_issues(df).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,6 +39,129 @@ class TestDatabaseConnection(unittest.TestCase):
         self.assertIn(host, connection_string)
         self.assertIn(database, connection_string)
 
+class TestEngineRegistry(unittest.TestCase):
+    """Test the process-wide pooled engine registry"""
+    
+    def setUp(self):
+        # Other tests leave placeholder MYSQL_* values behind
+        with patch.dict(os.environ, {'MYSQL_PORT': '3306'}):
+            from utils import database
+        self.database = database
+        database.dispose_engines()
+    
+    def tearDown(self):
+        self.database.dispose_engines()
+    
+    def test_engine_is_shared(self):
+        """Test that repeated calls reuse one pooled engine"""
+        first = self.database.get_engine()
+        second = self.database.get_engine()
+        
+        self.assertIsNotNone(first)
+        self.assertIs(first, second)
+        self.assertEqual(first.pool.size(), self.database.POOL_CONFIG['pool_size'])
+    
+    def test_pool_config_env_override(self):
+        """Test that DB_POOL_* environment variables override config.yaml"""
+        with patch.dict(os.environ, {'DB_POOL_SIZE': '3', 'DB_POOL_PRE_PING': 'false'}):
+            pool = self.database._load_pool_config()
+        
+        self.assertEqual(pool['pool_size'], 3)
+        self.assertFalse(pool['pool_pre_ping'])
+        self.assertIn('pool_recycle', pool)
+    
+    def test_pool_stats_without_connections(self):
+        """Test pool statistics before any checkout"""
+        self.database.get_engine()
+        stats = self.database.get_pool_stats()
+        
+        self.assertEqual(stats['checked_out'], 0)
+        self.assertEqual(stats['wait_seconds_avg'], 0.0)
+        self.assertIn('connections_opened', stats)
+
+class TestStreamingFetch(unittest.TestCase):
+    """Test chunked server-side cursor reads and chunk concatenation"""
+    
+    def setUp(self):
+        with patch.dict(os.environ, {'MYSQL_PORT': '3306'}):
+            from utils import database
+        from sqlalchemy import create_engine
+        import pandas as pd
+        
+        self.database = database
+        self.pd = pd
+        self.engine = create_engine('sqlite://')
+        pd.DataFrame({
+            'order_id': range(1, 26),
+            'amount': [float(i) for i in range(1, 26)],
+            'status': ['paid'] * 25
+        }).to_sql('orders', self.engine, index=False)
+        
+        patcher = patch.object(database, 'get_engine', return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_stream_yields_typed_chunks(self):
+        """Test chunk sizes and column types of a streamed SELECT"""
+        chunks = list(self.database.stream_sql_query("SELECT * FROM orders", chunk_size=10))
+        
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        self.assertEqual(str(chunks[0]['order_id'].dtype), 'int64')
+        self.assertEqual(str(chunks[0]['amount'].dtype), 'float64')
+    
+    def test_execute_sql_query_streams(self):
+        """Test that execute_sql_query assembles chunks into one frame"""
+        df = self.database.execute_sql_query("SELECT * FROM orders WHERE order_id > :n", {'n': 5}, chunk_size=7)
+        
+        self.assertEqual(len(df), 20)
+        self.assertEqual(df['order_id'].tolist(), list(range(6, 26)))
+    
+    def test_empty_select_keeps_columns(self):
+        """Test that a SELECT without rows still returns its columns"""
+        df = self.database.execute_sql_query("SELECT order_id, amount FROM orders WHERE 1 = 0", chunk_size=7)
+        
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ['order_id', 'amount'])
+    
+    def test_frame_from_rows_types(self):
+        """Test DECIMAL and DATE values become float and datetime columns"""
+        from decimal import Decimal
+        from datetime import date
+        
+        df = self.database.frame_from_rows(
+            [(Decimal('10.50'), date(2025, 1, 2)), (None, None)], ['amount', 'order_date']
+        )
+        
+        self.assertEqual(str(df['amount'].dtype), 'float64')
+        self.assertEqual(str(df['order_date'].dtype), 'datetime64[ns]')
+    
+    def test_concat_chunks_widens_types(self):
+        """Test dtype widening across chunks"""
+        pd = self.pd
+        chunks = [
+            pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}),
+            pd.DataFrame({'a': [None, None], 'b': ['z', None]}),
+            pd.DataFrame({'a': [2.5], 'b': ['w']})
+        ]
+        df = self.database.concat_chunks(iter(chunks))
+        
+        self.assertEqual(str(df['a'].dtype), 'float64')
+        self.assertEqual(df['a'].isna().sum(), 2)
+        self.assertEqual(df['b'].tolist(), ['x', 'y', 'z', None, 'w'])
+        self.assertTrue(self.database.concat_chunks(iter([])).empty)
+    
+    def test_concat_chunks_sized_exactly(self):
+        """Test the result holds exactly its rows, not a larger buffer"""
+        pd = self.pd
+        chunks = [pd.DataFrame({'a': range(i, i + 3), 'b': [0.5] * 3, 'c': range(3)}) for i in range(0, 15, 3)]
+        df = self.database.concat_chunks(iter(chunks))
+        
+        self.assertEqual(df['a'].tolist(), list(range(15)))
+        for col in df.columns:
+            values = df[col].to_numpy()
+            owner = values if values.base is None else values.base
+            self.assertEqual(owner.size % len(df), 0)
+
 class TestDataValidation(unittest.TestCase):
     """Test data validation functions"""
     
@@ -0,0 +1,90 @@
+"""
+Unit tests for the shared dataset registry
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import datasets, snapshot
+
+
+class TestDatasetRegistry(unittest.TestCase):
+    """Test single-load sharing, projections and filters"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.csv_path = Path(self.tmp.name) / 'orders.csv'
+        self.csv_path.write_text(
+            "order_id,customer_id,status,total_amount\n"
+            "1,10,paid,10.5\n"
+            "order_id,customer_id,status,total_amount\n"
+            "2,11,pending,20.0\n"
+            "3,10,paid,5.0\n"
+        )
+
+        patchers = [
+            patch.object(snapshot, 'SNAPSHOT_DIR', Path(self.tmp.name) / 'snapshots'),
+            patch.dict(datasets.DATASETS, {'orders': {'csv': str(self.csv_path), 'header_column': 'status'}}),
+            patch.object(datasets, 'DATA_SOURCE', 'csv')
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        datasets.clear_datasets()
+        self.addCleanup(datasets.clear_datasets)
+
+    def test_loaded_once_and_shared(self):
+        """Test that repeated gets share the same column data"""
+        with patch.object(datasets, 'load_snapshot', wraps=datasets.load_snapshot) as loader:
+            first = datasets.get_dataset('orders')
+            second = datasets.get_dataset('orders')
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertTrue(np.shares_memory(first['total_amount'].values, second['total_amount'].values))
+
+    def test_header_rows_removed(self):
+        """Test the registry cleaning rule for repeated header rows"""
+        # The stray header row is dropped before the schema types order_id
+        orders = datasets.get_dataset('orders')
+        self.assertEqual(orders['order_id'].tolist(), [1, 2, 3])
+        self.assertEqual(str(orders['order_id'].dtype), 'Int32')
+
+    def test_projection_and_filter(self):
+        """Test column projection and dict/callable row filters"""
+        projected = datasets.get_dataset('orders', columns=['order_id', 'total_amount'])
+        self.assertEqual(list(projected.columns), ['order_id', 'total_amount'])
+
+        paid = datasets.get_dataset('orders', columns=['order_id'], where={'status': 'paid'})
+        self.assertEqual(paid['order_id'].tolist(), [1, 3])
+
+        large = datasets.get_dataset('orders', where=lambda df: df['total_amount'] > 8)
+        self.assertEqual(large['order_id'].tolist(), [1, 2])
+
+    def test_column_assignment_does_not_leak(self):
+        """Test that pages adding columns don't modify the shared frame"""
+        view = datasets.get_dataset('orders')
+        view['doubled'] = view['order_id'] * 2
+
+        self.assertNotIn('doubled', datasets.get_dataset('orders').columns)
+
+    def test_version_changes_with_source(self):
+        """Test that a changed CSV is reloaded with a new version"""
+        version = datasets.dataset_version('orders')
+        self.csv_path.write_text("order_id,customer_id,status,total_amount\n9,12,paid,1.0\n")
+
+        self.assertNotEqual(datasets.dataset_version('orders'), version)
+        self.assertEqual(datasets.get_dataset('orders')['order_id'].tolist(), [9])
+
+
+if __name__ == '__main__':
+    unittest.main()
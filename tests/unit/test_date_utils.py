@@ -0,0 +1,117 @@
+"""
+Unit tests for format-aware date parsing and cleaning
+"""
+import unittest
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import date_utils
+
+
+def reference_clean_date_column(df, date_col, drop_invalid=True):
+    """Copy-and-filter cleaning the single-pass version replaced"""
+    df = df.copy()
+    df = df[df[date_col] != date_col]
+    df = df[df[date_col].notna()]
+    df = df[df[date_col] != '']
+    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    if drop_invalid:
+        df = df[df[date_col].notna()]
+    return df
+
+
+def make_orders(n, seed=3):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 300, n), unit='D')
+    order_date = days.strftime('%Y-%m-%dT%H:%M:%S').to_numpy(dtype=object)
+    order_date[rng.random(n) < 0.05] = None
+    order_date[rng.random(n) < 0.02] = 'order_date'
+    order_date[rng.random(n) < 0.02] = ''
+    order_date[rng.random(n) < 0.02] = 'not a date'
+    return pd.DataFrame({
+        'order_id': np.arange(n),
+        'order_date': order_date,
+        'shipped_date': days.strftime('%m/%d/%Y'),
+        'total_amount': rng.random(n)
+    })
+
+
+class TestFormatDetection(unittest.TestCase):
+    """Test detecting and applying a column's date format"""
+
+    def test_detect_formats(self):
+        """Test ISO and explicit formats picked from a sample"""
+        self.assertEqual(date_utils.detect_date_format(['2025-01-02', '2025-01-03T10:00:00']), 'ISO8601')
+        self.assertEqual(date_utils.detect_date_format(['01/31/2025', '02/01/2025']), '%m/%d/%Y')
+        self.assertEqual(date_utils.detect_date_format(['31/01/2025', '01/02/2025']), '%d/%m/%Y')
+        self.assertIsNone(date_utils.detect_date_format(['n/a', 'unknown']))
+
+    def test_mixed_formats_parsed_per_group(self):
+        """Test that values outside the main format get their own format"""
+        parsed = date_utils.parse_dates(pd.Series(['2025-01-02', '2025-01-03 10:00:00', '01/31/2025', 'x', None]))
+
+        self.assertEqual(parsed.tolist()[:3], [
+            pd.Timestamp('2025-01-02'), pd.Timestamp('2025-01-03 10:00'), pd.Timestamp('2025-01-31')
+        ])
+        self.assertTrue(parsed.iloc[3:].isna().all())
+
+    def test_parsed_columns_returned_as_is(self):
+        """Test that datetime64 columns skip parsing"""
+        dates = pd.Series(pd.to_datetime(['2025-01-02', None]))
+        self.assertIs(date_utils.parse_dates(dates), dates)
+
+
+class TestCleaning(unittest.TestCase):
+    """Test the single-pass cleaning helpers"""
+
+    def test_clean_matches_reference(self):
+        """Test identical rows and values to the copy-and-filter version"""
+        df = make_orders(2000)
+        for drop_invalid in (True, False):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                result = date_utils.clean_date_column(df, 'order_date', drop_invalid)
+                expected = reference_clean_date_column(df, 'order_date', drop_invalid)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_input_not_modified(self):
+        """Test that cleaning leaves the caller's frame untouched"""
+        df = make_orders(100)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            date_utils.prepare_orders_dataframe(df)
+        self.assertEqual(df['order_date'].dtype, object)
+
+    def test_prepare_orders_combines_columns(self):
+        """Test that rows failing any date column are dropped once"""
+        df = make_orders(500)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            result = date_utils.prepare_orders_dataframe(df)
+
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['shipped_date']))
+        self.assertFalse(result['order_date'].isna().any())
+        self.assertEqual(len(result), int(pd.to_datetime(df['order_date'], errors='coerce').notna().sum()))
+
+    def test_filter_and_stats(self):
+        """Test the date range filter and column statistics"""
+        df = make_orders(500)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            filtered = date_utils.safe_date_filter(df, 'shipped_date', '2025-03-01', '2025-03-31')
+        stats = date_utils.get_date_column_stats(df, 'shipped_date')
+
+        self.assertTrue(filtered['shipped_date'].between('2025-03-01', '2025-03-31').all())
+        self.assertEqual(stats['valid_dates'], 500)
+        self.assertEqual(stats['earliest_date'], pd.to_datetime(df['shipped_date']).min())
+
+
+if __name__ == '__main__':
+    unittest.main()
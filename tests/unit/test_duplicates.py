@@ -0,0 +1,121 @@
+"""
+Unit tests for index-based duplicate detection
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import duplicates
+
+
+class TestNormalizers(unittest.TestCase):
+    """Test key normalization"""
+
+    def test_normalize_email(self):
+        """Test case/whitespace folding and placeholder removal"""
+        result = duplicates.normalize_email(pd.Series([' A@Example.com', 'a@example.com ', 'nan', None, 'Missing', 'broken']))
+        self.assertEqual(result.tolist()[:2], ['a@example.com', 'a@example.com'])
+        self.assertTrue(result.iloc[2:].isna().all())
+
+    def test_normalize_phone(self):
+        """Test that formatting and a leading country code are ignored"""
+        result = duplicates.normalize_phone(pd.Series(['+1 (555) 123-4567', '555.123.4567', '123', None]))
+        self.assertEqual(result.tolist()[:2], ['5551234567', '5551234567'])
+        self.assertTrue(result.iloc[2:].isna().all())
+
+    def test_normalize_numeric_phone(self):
+        """Test that numeric phone columns don't pick up a '.0' digit"""
+        result = duplicates.normalize_phone(pd.Series([5551234567.0, np.nan]))
+        self.assertEqual(result.iloc[0], '5551234567')
+
+
+class TestDuplicateGroups(unittest.TestCase):
+    """Test the duplicate index"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'customer_id': [1, 2, 3, 4, 5, 6, 7],
+            'email': ['x@a.com', 'y@a.com', 'X@A.com ', 'y@a.com', 'x@a.com', None, None],
+            'name': ['Ann', 'Bob', 'Ann', 'Bob', 'Ann', 'Cy', 'Di']
+        })
+
+    def test_index_groups_and_ids(self):
+        """Test group sizes, ordering, representatives and row membership"""
+        group_ids, groups = duplicates.duplicate_index(duplicates.normalize_email(self.df['email']))
+
+        self.assertEqual(groups['key'].tolist(), ['x@a.com', 'y@a.com'])
+        self.assertEqual(groups['records'].tolist(), [3, 2])
+        self.assertEqual(groups['first_row'].tolist(), [0, 1])
+        self.assertEqual(group_ids.tolist(), [0, 1, 0, 1, 0, -1, -1])
+
+    def test_duplicate_groups_with_limit(self):
+        """Test representative rows and the group limit"""
+        result = duplicates.duplicate_groups(self.df, 'email', normalize='email', limit=1)
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result.loc[0, 'customer_id'], 1)
+        self.assertEqual(result.loc[0, 'records'], 3)
+
+    def test_no_duplicates(self):
+        """Test that unique keys produce no groups"""
+        result = duplicates.duplicate_groups(self.df, 'customer_id')
+        self.assertTrue(result.empty)
+
+
+class TestFuzzyMatching(unittest.TestCase):
+    """Test blocking and near-duplicate clustering"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'name': ['John Smith', 'Jon Smith', 'Jane Doe', 'John Smyth', 'Mary Major', None],
+            'email': ['john.smith@gmail.com', 'jon.smith@gmail.com', 'jane@x.com', 'jsmith@yahoo.com', 'mm@x.com', None],
+            'phone': ['555-123-4567', '+1 555 123 4567', '555-000-1111', '(555) 123-4567', None, '1']
+        })
+
+    def test_soundex(self):
+        """Test standard Soundex codes"""
+        self.assertEqual([duplicates.soundex(w) for w in ['Robert', 'Rupert', 'Ashcraft', 'Tymczak', 'Lee']],
+                         ['R163', 'R163', 'A261', 'T522', 'L000'])
+
+    def test_candidate_pairs_from_blocks(self):
+        """Test that only rows sharing a block become candidates"""
+        keys = duplicates.blocking_keys(duplicates.match_fields(self.df))
+        pairs = duplicates.candidate_pairs(keys)
+
+        self.assertEqual(pairs.tolist(), [[0, 1], [0, 3], [1, 3]])
+
+    def test_oversized_blocks_skipped(self):
+        """Test that blocks above the size cap produce no pairs"""
+        keys = {'all': pd.Series(['same'] * 5)}
+        self.assertEqual(len(duplicates.candidate_pairs(keys, max_block_size=4)), 0)
+        self.assertEqual(len(duplicates.candidate_pairs(keys, max_block_size=5)), 10)
+
+    def test_fuzzy_clusters(self):
+        """Test that spelling variants with one phone form a scored cluster"""
+        clusters = duplicates.fuzzy_duplicate_clusters(self.df)
+
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters.loc[0, 'rows'], (0, 1, 3))
+        self.assertEqual(clusters.loc[0, 'name'], 'John Smith')
+        self.assertGreaterEqual(clusters.loc[0, 'score'], duplicates.MATCH_THRESHOLD)
+
+    def test_threshold_pruning_keeps_scores(self):
+        """Test that pruning with a threshold doesn't change passing scores"""
+        fields = duplicates.match_fields(self.df)
+        pairs = duplicates.candidate_pairs(duplicates.blocking_keys(fields))
+        full = duplicates.score_pairs(fields, pairs)
+        pruned = duplicates.score_pairs(fields, pairs, threshold=0.86)
+
+        passing = full >= 0.86
+        np.testing.assert_allclose(pruned[passing], full[passing])
+        self.assertTrue((pruned[~passing] < 0.86).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for the batched seasonal forecasts
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import forecasting
+
+SEASON = np.array([0, 5, 10, 20, 15, 10, 5, 0, -5, -10, 30, 60], dtype=float)
+
+
+def seasonal_series(n_series, periods, noise=0.0, seed=3):
+    rng = np.random.default_rng(seed)
+    t = np.arange(periods)
+    base = rng.uniform(200, 1000, (n_series, 1))
+    slope = rng.uniform(0, 4, (n_series, 1))
+    return base + slope * t + SEASON[t % 12] + rng.normal(0, noise, (n_series, periods))
+
+
+def monthly_rollup():
+    months = pd.date_range('2024-01-01', periods=14, freq='MS')
+    rows = [(month, 'completed', category, 1, 1.0, 1, value)
+            for month in months for category, value in (('Books', 10.0), ('Toys', 4.0))
+            if not (category == 'Toys' and month.month == 3)]
+    return pd.DataFrame(rows, columns=['sale_month', 'status', 'category', 'orders', 'revenue',
+                                       'positive_orders', 'positive_revenue'])
+
+
+class TestModels(unittest.TestCase):
+    """Test the forecasting models and their selection"""
+
+    def test_holt_winters_recovers_trend_and_season(self):
+        """Test near-exact forecasts of a noise-free trend plus season"""
+        values = seasonal_series(20, 48 + 12)
+        fit = forecasting.forecast_matrix(values[:, :48], horizon=12)
+
+        self.assertEqual(fit['model'], 'Holt-Winters (additive)')
+        np.testing.assert_allclose(fit['mean'], values[:, 48:], rtol=0.02)
+        self.assertEqual(fit['params'].shape, (20, 3))
+
+    def test_seasonal_naive_drift(self):
+        """Test last season plus the yearly change"""
+        values = np.concatenate([SEASON, SEASON[:3] + 12])[None, :] + 100
+        fit = forecasting.forecast_matrix(values, horizon=15)
+
+        self.assertEqual(fit['model'], 'Seasonal naive with drift')
+        expected = np.concatenate([SEASON[3:] + 12, SEASON[:3] + 24, SEASON[3:6] + 24]) + 100
+        np.testing.assert_allclose(fit['mean'][0], expected)
+
+    def test_short_history_uses_drift(self):
+        """Test the drift model below one season and the empty case"""
+        fit = forecasting.forecast_matrix(np.array([[10.0, 12.0, 14.0]]), horizon=2)
+
+        self.assertEqual(fit['model'], 'Drift')
+        np.testing.assert_allclose(fit['mean'], [[16.0, 18.0]])
+        with self.assertRaises(ValueError):
+            forecasting.forecast_matrix(np.empty((1, 0)))
+
+    def test_intervals(self):
+        """Test that intervals contain the forecast, widen and cover actuals"""
+        values = seasonal_series(300, 60, noise=20.0)
+        fit = forecasting.forecast_matrix(values[:, :48], horizon=12)
+        width = fit['upper'] - fit['lower']
+        covered = (values[:, 48:] >= fit['lower']) & (values[:, 48:] <= fit['upper'])
+
+        self.assertTrue((fit['lower'] <= fit['mean']).all() and (fit['mean'] <= fit['upper']).all())
+        self.assertTrue((width[:, -1] > width[:, 0]).all())
+        self.assertGreater(covered.mean(), 0.7)
+
+    def test_batch_matches_single_series(self):
+        """Test that fitting rows together equals fitting them one by one"""
+        values = seasonal_series(5, 40, noise=10.0)
+        batch = forecasting.forecast_matrix(values)
+
+        for row in range(5):
+            single = forecasting.forecast_matrix(values[row:row + 1])
+            np.testing.assert_allclose(single['mean'][0], batch['mean'][row])
+            np.testing.assert_allclose(single['upper'][0], batch['upper'][row])
+
+
+class TestSeriesAndCaching(unittest.TestCase):
+    """Test rollup series, period totals and the fit cache"""
+
+    def setUp(self):
+        forecasting.clear_forecasts()
+        self.addCleanup(forecasting.clear_forecasts)
+
+    def test_series_matrix(self):
+        """Test per-category rows, filled gaps and the partial month"""
+        matrix = forecasting.series_matrix(monthly_rollup(), by='category', last_date='2025-02-10')
+        total = forecasting.series_matrix(monthly_rollup(), last_date='2025-02-28')
+
+        self.assertEqual(list(matrix.index), ['Books', 'Toys'])
+        self.assertEqual(matrix.columns[-1], pd.Timestamp('2025-01-01'))
+        self.assertEqual(matrix.loc['Toys', pd.Timestamp('2024-03-01')], 0)
+        self.assertEqual(total.columns[-1], pd.Timestamp('2025-02-01'))
+        self.assertEqual(total.loc['total', pd.Timestamp('2024-01-01')], 14)
+
+    def test_forecast_cached_per_version(self):
+        """Test that fits are reused until the data version changes"""
+        matrix = pd.DataFrame(seasonal_series(3, 30), columns=pd.date_range('2023-01-01', periods=30, freq='MS'))
+        first = forecasting.forecast_series(matrix, key='test', version=1)
+
+        self.assertIs(forecasting.forecast_series(matrix, key='test', version=1), first)
+        self.assertIsNot(forecasting.forecast_series(matrix, key='test', version=2), first)
+        self.assertEqual(first['forecast']['month'].min(), pd.Timestamp('2025-07-01'))
+
+        totals = forecasting.period_totals(first['forecast'], 3)
+        expected = first['forecast'].groupby('series')['forecast'].apply(lambda x: x.head(3).sum())
+        np.testing.assert_allclose(totals['forecast'], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the sliding-window fraud pattern detectors
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import fraud_detectors
+from utils.fraud_detectors import AmountRing, PatternDetector, SlidingCounter
+
+START = pd.Timestamp('2025-03-01')
+
+
+def make_stream(rows):
+    """Transactions from (seconds after START, customer, ip, card, amount) rows"""
+    seconds, customers, ips, cards, amounts = zip(*rows)
+    return pd.DataFrame({
+        'transaction_id': np.arange(1, len(rows) + 1, dtype=float),
+        'time': START + pd.to_timedelta(seconds, unit='s'),
+        'customer_id': customers,
+        'ip_address': ips,
+        'card_id': cards,
+        'payment_method': 'Credit Card',
+        'amount': amounts
+    })
+
+
+class TestWindows(unittest.TestCase):
+    """Test the bucketed counter and the small-charge ring"""
+
+    def test_counter_matches_brute_force(self):
+        """Test window counts against direct counting over bucket-aligned windows"""
+        rng = np.random.default_rng(3)
+        times = np.sort(rng.integers(0, 20000, 3000))
+        keys = rng.integers(0, 20, 3000)
+        counter = SlidingCounter(window=600, buckets=6)
+
+        for i, (key, seconds) in enumerate(zip(keys, times)):
+            first = (seconds // 100 - 5) * 100
+            earlier = times[:i + 1][keys[:i + 1] == key]
+            self.assertEqual(counter.add(key, int(seconds)), (earlier >= first).sum())
+
+    def test_card_testing_sequence(self):
+        """Test small charges followed by a large one within the window"""
+        ring = AmountRing(window=600)
+        for seconds, amount in ((0, 1.0), (60, 2.5), (120, 1.0)):
+            self.assertEqual(ring.add('card', seconds, amount), 0)
+        self.assertEqual(ring.add('card', 180, 21.0), 0)
+        self.assertEqual(ring.add('card', 200, 250.0), 3)
+        self.assertEqual(len(ring._keys['card']), 0)
+
+        # Too few small charges inside the window
+        for seconds, amount in ((1000, 1.0), (1100, 1.0), (1700, 1.0)):
+            ring.add('other', seconds, amount)
+        self.assertEqual(ring.add('other', 1750, 500.0), 0)
+
+        # Keys without small charges are not stored
+        ring.add('large', 1800, 500.0)
+        self.assertNotIn('large', ring._keys)
+
+    def test_memory_bounded(self):
+        """Test the key cap and idle eviction on a long stream of new keys"""
+        detector = PatternDetector(max_keys=500)
+        for i in range(20000):
+            detector.process(i * 10, i, 5.0, customer=i, ip=f'ip{i % 3000}', card=f'card{i}')
+            self.assertLessEqual(max(detector.state_size().values()), 500)
+
+        # Everything is idle a day later
+        detector.evict_idle(20000 * 10 + 86400)
+        self.assertEqual(sum(detector.state_size().values()), 0)
+
+
+class TestPatternDetector(unittest.TestCase):
+    """Test alerts from replaying transaction frames"""
+
+    def test_velocity_alert_once_per_burst(self):
+        """Test one alert when a customer crosses the limit"""
+        limit = fraud_detectors.VELOCITY_LIMITS['customer']
+        burst = [(i * 60, 'c1', None, f'k{i}', 50.0) for i in range(limit + 3)]
+        later = [(8000 + i * 60, 'c1', None, f'j{i}', 50.0) for i in range(limit + 1)]
+        alerts = fraud_detectors.detect_patterns(make_stream(burst + later))
+        customer = alerts[alerts['key_type'] == 'customer']
+
+        self.assertEqual(list(customer['transaction_id']), [limit + 1, len(burst) + limit + 1])
+        self.assertTrue((customer['pattern'] == 'Velocity Abuse').all())
+        self.assertEqual(list(customer['count']), [limit + 1] * 2)
+
+    def test_card_testing_by_card_and_ip(self):
+        """Test that small-then-large is caught per card and per IP"""
+        rows = [(0, 'a', '1.1.1.1', 'x', 2.0), (30, 'b', '2.2.2.2', 'y', 1.0), (60, 'a', '1.1.1.1', 'x', 3.0),
+                (90, 'c', '1.1.1.1', 'z', 1.5), (120, 'a', '1.1.1.1', 'x', 4.0), (150, 'a', '1.1.1.1', 'x', 900.0)]
+        alerts = fraud_detectors.detect_patterns(make_stream(rows))
+        card_testing = alerts[alerts['pattern'] == 'Card Testing Pattern']
+
+        self.assertEqual(set(card_testing['key_type']), {'card', 'ip'})
+        self.assertTrue((card_testing['transaction_id'] == 6).all())
+        self.assertEqual(card_testing.set_index('key_type').loc['ip', 'count'], 4)
+        self.assertEqual(card_testing['time'].iloc[0], START + pd.Timedelta(seconds=150))
+
+    def test_card_keys_fallback(self):
+        """Test customer and payment method as the card without card_id"""
+        frame = make_stream([(0, 'c7', None, None, 1.0), (10, None, None, None, 1.0)]).drop(columns='card_id')
+        self.assertEqual(list(fraud_detectors.card_keys(frame)), ['c7:Credit Card', None])
+
+
+if __name__ == '__main__':
+    unittest.main()
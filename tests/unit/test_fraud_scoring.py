@@ -0,0 +1,169 @@
+"""
+Unit tests for the fraud scoring engine
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import fraud_scoring
+
+START = pd.Timestamp('2025-03-01')
+
+
+def make_transactions(n, seed=3, ips=True):
+    rng = np.random.default_rng(seed)
+    times = START + pd.to_timedelta(np.sort(rng.integers(0, 5 * 86400, n)), unit='s')
+    customers = rng.integers(1, 40, n).astype(object)
+    customers[rng.random(n) < 0.05] = None
+    frame = pd.DataFrame({
+        'transaction_id': np.arange(1, n + 1, dtype=float),
+        'order_id': np.arange(1, n + 1),
+        'customer_id': customers,
+        'time': times,
+        'amount': rng.lognormal(4, 1, n).round(2),
+        'payment_method': rng.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Gift Card'], n),
+        'attempts': rng.integers(1, 4, n),
+        'failed': rng.random(n) < 0.1,
+        'ship_state': rng.choice(['CA', 'TX', None], n),
+        'home_state': rng.choice(['CA', 'TX', None], n),
+        'registered': START - pd.to_timedelta(rng.integers(0, 90, n), unit='D')
+    })
+    frame.loc[rng.random(n) < 0.1, 'registered'] = pd.NaT
+    if ips:
+        frame['ip_address'] = rng.choice([f'10.0.0.{i}' for i in range(15)] + [None], n)
+    return frame
+
+
+class TestBatchScoring(unittest.TestCase):
+    """Test factor scores, weights and risk levels"""
+
+    def test_weights_rescaled_over_available_factors(self):
+        """Test that factors without data give their weight to the others"""
+        weights = fraud_scoring.effective_weights(fraud_scoring.available_factors([]))
+
+        self.assertNotIn('device', weights)
+        self.assertAlmostEqual(sum(weights.values()), 100)
+        self.assertAlmostEqual(weights['payment'], 25 / 0.9)
+        self.assertEqual(len(fraud_scoring.available_factors(['device_id'])), len(fraud_scoring.FACTORS))
+
+    def test_risk_levels(self):
+        """Test the threshold boundaries"""
+        levels = fraud_scoring.risk_levels([0, 49, 50, 69, 70, 89, 90, 100])
+        self.assertEqual(list(levels), ['low', 'low', 'medium', 'medium', 'high', 'high', 'critical', 'critical'])
+
+    def test_velocity_matches_brute_force(self):
+        """Test windowed counts per customer and IP against direct filtering"""
+        frame = make_transactions(400)
+        scored = fraud_scoring.score_transactions(frame)
+        window = pd.Timedelta(seconds=fraud_scoring.VELOCITY_WINDOW)
+
+        for i in range(0, 400, 7):
+            row = frame.iloc[i]
+            earlier = frame.iloc[:i]
+            in_window = earlier['time'] > row['time'] - window
+            customer = (in_window & (earlier['customer_id'] == row['customer_id'])).sum() if row['customer_id'] else 0
+            ip = (in_window & (earlier['ip_address'] == row['ip_address'])).sum() if row['ip_address'] else 0
+            expected = min(1.0, max(customer, ip) / fraud_scoring.VELOCITY_LIMIT)
+            self.assertAlmostEqual(scored['velocity'].iloc[i], expected)
+
+    def test_history_and_value_use_earlier_transactions(self):
+        """Test prior order counts and the customer's previous average"""
+        frame = make_transactions(3).assign(customer_id=7, amount=[100.0, 300.0, 800.0], registered=pd.NaT)
+        scored = fraud_scoring.score_transactions(frame)
+
+        np.testing.assert_allclose(scored['history'], 0.6 * np.exp(-np.arange(3) / 2) + 0.2)
+        np.testing.assert_allclose(scored['order_value'], [0, 2 / 3, 1])
+
+    def test_transaction_frame(self):
+        """Test the payments join, date fallback and state extraction"""
+        payments = pd.DataFrame({
+            'payment_id': [1, 2, 3], 'order_id': [10, 11, 12],
+            'payment_method': ['PayPal', 'Credit Card', 'PayPal'], 'amount': [5.0, 6.0, 7.0],
+            'payment_date': ['2025-01-03 10:00:00', None, '2025-01-01 09:00:00'],
+            'status': ['paid', 'failed', 'paid'], 'attempts': [1, 3, 2]
+        })
+        orders = pd.DataFrame({
+            'order_id': [10, 11, 12], 'customer_id': [1, 2, 3],
+            'order_date': ['2025-01-01', '2025-01-02', '2025-01-01'],
+            'shipping_address': ['1 Main St, Austin, TX 73301', 'PO Box 4', '9 Elm St, Denver, CO 80014']
+        })
+        customers = pd.DataFrame({'customer_id': [1, 2], 'state': ['TX', 'CA'],
+                                  'registration_date': ['2024-01-01', '2024-06-01']})
+        frame = fraud_scoring.transaction_frame(payments, orders, customers)
+
+        self.assertEqual(list(frame['transaction_id']), [3, 2, 1])
+        self.assertEqual(frame['time'].iloc[1], pd.Timestamp('2025-01-02'))
+        self.assertEqual(list(frame['ship_state'].fillna('-')), ['CO', '-', 'TX'])
+        self.assertEqual(list(frame['home_state'].fillna('-')), ['-', 'CA', 'TX'])
+        self.assertEqual(list(frame['failed']), [False, True, False])
+        self.assertTrue(pd.isna(frame['registered'].iloc[0]))
+        self.assertTrue(fraud_scoring.transaction_frame(payments, orders)['registered'].isna().all())
+
+
+class TestStreamingScorer(unittest.TestCase):
+    """Test the streaming scorer and incremental scored tables"""
+
+    def setUp(self):
+        fraud_scoring.clear_fraud_scores()
+        self.addCleanup(fraud_scoring.clear_fraud_scores)
+
+    def assert_scores_equal(self, results, scored):
+        for key in fraud_scoring.available_factors(scored.columns) + ['risk_score']:
+            np.testing.assert_allclose([result[key] for result in results], scored[key], atol=1e-12)
+        self.assertEqual([result['indicators'] for result in results], list(scored['indicators']))
+        self.assertEqual([result['risk_level'] for result in results], list(scored['risk_level']))
+
+    def test_streaming_matches_batch(self):
+        """Test one-at-a-time scores against the vectorized batch"""
+        for ips in (True, False):
+            frame = make_transactions(600, ips=ips)
+            scorer = fraud_scoring.StreamingScorer(fraud_scoring.available_factors(frame.columns))
+            results = [scorer.score(row) for row in frame.to_dict('records')]
+            self.assert_scores_equal(results, fraud_scoring.score_transactions(frame))
+
+    def test_loaded_state_continues_the_stream(self):
+        """Test that a scorer seeded from history scores new rows like the batch"""
+        frame = make_transactions(600)
+        scorer = fraud_scoring.StreamingScorer().load(frame.iloc[:450])
+        results = [scorer.score(row) for row in frame.iloc[450:].to_dict('records')]
+
+        self.assert_scores_equal(results, fraud_scoring.score_transactions(frame).iloc[450:])
+        size = scorer.state_size()
+        self.assertLessEqual(size['buffered_times'], 2 * 150)
+
+    def test_incremental_update(self):
+        """Test that new transactions are streamed and late arrivals rescored"""
+        frame = make_transactions(500)
+        fraud_scoring.update_fraud_scores(frame.iloc[:400], 'payments')
+        with patch.object(fraud_scoring, 'score_transactions', wraps=fraud_scoring.score_transactions) as batch:
+            scored = fraud_scoring.update_fraud_scores(frame, 'payments')
+        batch.assert_not_called()
+
+        expected = fraud_scoring.score_transactions(frame)
+        self.assertEqual(len(scored), 500)
+        self.assert_scores_equal(scored.to_dict('records'), expected)
+
+        late = pd.concat([frame, frame.iloc[[0]].assign(transaction_id=501.0)], ignore_index=True)
+        with patch.object(fraud_scoring, 'score_transactions', wraps=fraud_scoring.score_transactions) as batch:
+            fraud_scoring.update_fraud_scores(late, 'payments')
+        batch.assert_called_once()
+
+    def test_benchmark(self):
+        """Test that the benchmark times the requested transactions"""
+        result = fraud_scoring.benchmark_latency(make_transactions(300), count=100)
+
+        self.assertEqual(result['transactions'], 100)
+        self.assertGreater(result['mean_ms'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertLessEqual(result['within_budget'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for the hot-path instrumentation decorators and shared metrics
+"""
+import unittest
+import os
+import sys
+
+import pandas as pd
+from prometheus_client import REGISTRY, Counter
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import metrics
+from utils.instrumentation import page_label, record_cache, timed, timed_cache, timed_section
+
+PAGE = 'test_instrumentation'
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class FakeCache:
+    """Minimal stand-in for st.cache_data: memoizes on the arguments"""
+
+    def __call__(self, func):
+        results = {}
+
+        def cached(*args):
+            if args not in results:
+                results[args] = func(*args)
+            return results[args]
+        cached.clear = results.clear
+        return cached
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test latency, row and cache metrics and once-per-process registration"""
+
+    def test_get_metric_registers_once(self):
+        """Test the same metric comes back instead of a duplicate registration"""
+        first = metrics.get_metric(Counter, 'test_instrumentation_once_total', 'Test counter')
+        second = metrics.get_metric(Counter, 'test_instrumentation_once_total', 'Test counter')
+        self.assertIs(first, second)
+
+    def test_get_metric_reuses_registered_collector(self):
+        """Test a metric registered outside the cache (module reload) is reused"""
+        existing = Counter('test_instrumentation_reload_total', 'Test counter')
+        self.assertIs(metrics.get_metric(Counter, 'test_instrumentation_reload_total', 'Test counter'), existing)
+
+    def test_page_label(self):
+        """Test labels from page and module file names"""
+        self.assertEqual(page_label('/app/Home.py'), 'home')
+        self.assertEqual(page_label('/app/pages/inventory.py'), 'inventory')
+
+    def test_timed(self):
+        """Test latency and input rows are recorded"""
+        @timed(kind='filter')
+        def keep_even(df):
+            return df[df['value'] % 2 == 0]
+
+        before = sample('streamlit_function_duration_seconds_count', page=PAGE, function='keep_even', kind='filter')
+        rows = sample('streamlit_rows_processed_total', page=PAGE, function='keep_even')
+        result = keep_even(pd.DataFrame({'value': range(10)}))
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(keep_even.__name__, 'keep_even')
+        self.assertEqual(sample('streamlit_function_duration_seconds_count',
+                                page=PAGE, function='keep_even', kind='filter'), before + 1)
+        self.assertEqual(sample('streamlit_rows_processed_total', page=PAGE, function='keep_even'), rows + 10)
+
+    def test_timed_records_failures(self):
+        """Test a call that raises is still timed"""
+        @timed
+        def broken():
+            raise ValueError('boom')
+
+        before = sample('streamlit_function_duration_seconds_count', page=PAGE, function='broken', kind='analysis')
+        with self.assertRaises(ValueError):
+            broken()
+        self.assertEqual(sample('streamlit_function_duration_seconds_count',
+                                page=PAGE, function='broken', kind='analysis'), before + 1)
+
+    def test_timed_cache(self):
+        """Test hits and misses through a cache decorator, with rows counted on misses"""
+        @timed_cache(FakeCache())
+        def load_rows(n):
+            return pd.DataFrame({'value': range(n)})
+
+        cache = f'{PAGE}.load_rows'
+        load_rows(3)
+        load_rows(3)
+        load_rows(4)
+        self.assertEqual(sample('streamlit_cache_requests_total', cache=cache, result='miss'), 2)
+        self.assertEqual(sample('streamlit_cache_requests_total', cache=cache, result='hit'), 1)
+        self.assertEqual(sample('streamlit_rows_processed_total', page=PAGE, function='load_rows'), 7)
+        self.assertEqual(sample('streamlit_function_duration_seconds_count',
+                                page=PAGE, function='load_rows', kind='loader'), 3)
+
+        load_rows.clear()
+        load_rows(3)
+        self.assertEqual(sample('streamlit_cache_requests_total', cache=cache, result='miss'), 3)
+
+    def test_record_cache(self):
+        """Test named cache counters"""
+        before = sample('streamlit_cache_requests_total', cache='test_cache', result='hit')
+        record_cache('test_cache', hit=True)
+        self.assertEqual(sample('streamlit_cache_requests_total', cache='test_cache', result='hit'), before + 1)
+
+    def test_timed_section(self):
+        """Test sections are labeled with the calling file"""
+        before = sample('streamlit_function_duration_seconds_count', page=PAGE, function='tab', kind='section')
+        with timed_section('tab'):
+            pass
+        self.assertEqual(sample('streamlit_function_duration_seconds_count',
+                                page=PAGE, function='tab', kind='section'), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for the process-wide metrics and the /metrics exporters
+"""
+import unittest
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import urllib.request
+
+from prometheus_client import CollectorRegistry, REGISTRY, multiprocess
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../application'))
+
+# Add application directory to path
+sys.path.insert(0, APP_DIR)
+
+from utils import metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class TestMetrics(unittest.TestCase):
+    """Test page views, business gauges, sessions and both export modes"""
+
+    def test_track_page(self):
+        """Test page views are counted per page without starting a server outside `streamlit run`"""
+        before = REGISTRY.get_sample_value('streamlit_page_views_total', {'page': 'test_page'}) or 0
+        metrics.track_page('test_page')
+        metrics.track_page('test_page')
+        self.assertEqual(REGISTRY.get_sample_value('streamlit_page_views_total', {'page': 'test_page'}), before + 2)
+        self.assertIsNone(metrics._business_thread)
+
+    def test_publish_business_metrics(self):
+        """Test only the values present are published"""
+        metrics.publish_business_metrics({'revenue': 1234.5, 'orders': 10})
+        metrics.publish_business_metrics({'orders': 12, 'total_customers': None})
+        self.assertEqual(REGISTRY.get_sample_value('ecommerce_total_revenue'), 1234.5)
+        self.assertEqual(REGISTRY.get_sample_value('ecommerce_total_orders'), 12)
+
+    def test_active_sessions(self):
+        """Test sessions expire after the session window"""
+        window = metrics.METRICS_CONFIG['session_window']
+        with metrics._sessions_lock:
+            metrics._sessions.clear()
+            metrics._sessions.update({'old': 1000.0, 'recent': 1000.0 + window})
+        self.assertEqual(metrics.active_sessions(now=1001.0 + window), 1)
+        self.assertEqual(list(metrics._sessions), ['recent'])
+
+    def test_metrics_text(self):
+        """Test the live text exposition includes the application metrics"""
+        metrics.track_page('test_text')
+        text = metrics.metrics_text()
+        self.assertIn('streamlit_page_views_total{page="test_text"} 1.0', text)
+
+    def test_start_metrics_server(self):
+        """Test the in-process server starts once and serves /metrics"""
+        port = free_port()
+        self.assertTrue(metrics.start_metrics_server(port=port, addr='127.0.0.1'))
+        self.assertFalse(metrics.start_metrics_server(port=port, addr='127.0.0.1'))
+        metrics.track_page('test_server')
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            self.assertIn(b'streamlit_page_views_total{page="test_server"}', response.read())
+
+    def test_multiprocess_mode(self):
+        """Test samples written by separate processes are aggregated from the shared directory"""
+        script = ("from utils.metrics import track_page, publish_business_metrics; "
+                  "track_page('home'); publish_business_metrics({'revenue': 50.0})")
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', script], cwd=APP_DIR, env=env, check=True)
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry, path=directory)
+            self.assertEqual(registry.get_sample_value('streamlit_page_views_total', {'page': 'home'}), 2)
+            self.assertEqual(registry.get_sample_value('ecommerce_total_revenue'), 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
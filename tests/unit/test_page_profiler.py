@@ -0,0 +1,83 @@
+"""
+Unit tests for the headless page profiler
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add benchmarks directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../benchmarks'))
+
+import page_profiler
+
+PAGE = '''import os
+# ===========================
+# LOAD DATA
+# ===========================
+
+def load():
+    # ===========================
+    # NOT A SECTION
+    # ===========================
+    return 1
+
+# TAB 1: OVERVIEW
+with open(os.devnull) as f:
+    pass
+
+# Just a comment
+value = load()
+'''
+
+
+class TestPageProfiler(unittest.TestCase):
+    """Test section instrumentation, section timing and a profiled page"""
+
+    def test_instrument_sections(self):
+        """Test banner titles and comments above top-level with blocks become marks"""
+        source, sections = page_profiler.instrument(PAGE)
+        self.assertEqual(sections, ['LOAD DATA', 'TAB 1: OVERVIEW'])
+        lines = source.splitlines()
+        self.assertEqual(len(lines), len(PAGE.splitlines()) + 1)
+        self.assertEqual(lines[2], "__import__('page_profiler').mark('LOAD DATA')")
+        self.assertEqual(lines[7], '    # NOT A SECTION')
+        self.assertIn(page_profiler.AFTER, lines[-1])
+        compile(source, 'page.py', 'exec')
+
+    def test_section_durations(self):
+        """Test durations between marks, with repeated sections added up"""
+        timer = page_profiler.SectionTimer()
+        timer.marks = [('(top)', 0.0), ('A', 1.0), ('B', 3.0), ('A', 4.0)]
+        self.assertEqual(timer.current(), 'A')
+        self.assertEqual(timer.durations(6.0), {'(top)': 1.0, 'A': 4.0, 'B': 1.0})
+
+    def test_pages(self):
+        """Test Home.py comes first, followed by every page"""
+        pages = page_profiler.pages()
+        self.assertEqual(pages[0], 'Home.py')
+        self.assertIn('pages/inventory.py', pages)
+
+    def test_profile_page(self):
+        """Test a cold run and a rerun of a real page"""
+        directories = []
+        mkdtemp = tempfile.mkdtemp
+        with patch.object(page_profiler.tempfile, 'mkdtemp',
+                          side_effect=lambda **kwargs: directories.append(mkdtemp(**kwargs)) or directories[-1]):
+            report, stacks = page_profiler.profile_page('pages/products.py', runs=2, memory=False)
+        self.assertEqual(len(directories), 1)
+        self.assertFalse(os.path.exists(directories[0]))
+        self.assertEqual([run['run'] for run in report['runs']], ['cold', 'rerun'])
+        for run in report['runs']:
+            self.assertEqual(run['exceptions'], [])
+            self.assertGreater(run['wall_seconds'], 0)
+            self.assertEqual(set(run['sections']) - {page_profiler.TOP, page_profiler.AFTER},
+                             set(report['sections']))
+            self.assertIsNone(run['peak_memory_bytes'])
+        self.assertIn('LOAD DATA', report['sections'])
+        self.assertTrue(all(stack.startswith('pages/products.py (') for stack in stacks))
+
+
+if __name__ == '__main__':
+    unittest.main()
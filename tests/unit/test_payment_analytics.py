@@ -0,0 +1,94 @@
+"""
+Unit tests for the payment status, method and failure cubes
+"""
+import unittest
+import os
+import sys
+
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import payment_analytics
+
+
+def make_tables():
+    payments = pd.DataFrame({
+        'payment_id': [1, 2, 3, 4, 5, 6],
+        'order_id': [10, 11, 12, 13, 14, 15],
+        'payment_method': ['PayPal', 'PayPal', 'Credit Card', 'Credit Card', 'Credit Card', 'PayPal'],
+        'payment_processor': ['PayPal', 'PayPal', 'Stripe', 'Stripe', 'Square', 'PayPal'],
+        'amount': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+        'transaction_id': ['t1', 't2', 't3', 't4', 't5', None],
+        'payment_date': ['2025-01-01 10:00:00', None, '2025-01-02 09:00:00', None,
+                         '2025-02-03 12:00:00', None],
+        'status': ['paid', 'failed', 'paid', 'unpaid', 'paid', 'failed'],
+        'failure_reason': [None, 'card_declined', None, None, None, None],
+        'attempts': [1, 3, 1, 1, 2, 2]
+    })
+    orders = pd.DataFrame({
+        'order_id': [10, 11, 12, 13, 14, 15],
+        'customer_id': [1, 2, 1, 3, 2, 4],
+        'order_date': ['2025-01-01', '2025-01-05', '2025-01-02', '2025-02-01', '2025-02-03', '2025-02-04']
+    })
+    return payments, orders
+
+
+class TestPaymentAnalytics(unittest.TestCase):
+    """Test normalization, cube totals and slicing"""
+
+    def setUp(self):
+        self.payments = payment_analytics.normalize_payments(*make_tables())
+        self.cube = payment_analytics.payment_cube(self.payments)
+        self.failures = payment_analytics.failure_cube(self.payments)
+
+    def test_normalize(self):
+        """Test status mapping, the order date fallback and failure reasons"""
+        payments = self.payments
+
+        self.assertEqual(list(payments['status']),
+                         ['completed', 'failed', 'completed', 'pending', 'completed', 'failed'])
+        self.assertEqual(payments['date'].iloc[1], pd.Timestamp('2025-01-05'))
+        self.assertEqual(payments['day'].iloc[0], pd.Timestamp('2025-01-01'))
+        self.assertEqual(list(payments['customer_id']), [1, 2, 1, 3, 2, 4])
+        self.assertEqual(list(payments['failure_reason'].fillna('-')),
+                         ['-', 'card_declined', '-', '-', '-', payment_analytics.UNKNOWN_REASON])
+        self.assertEqual(payments['transaction_id'].iloc[5], '')
+
+    def test_cube_totals_match_rows(self):
+        """Test that the cubes add up to the payments they summarize"""
+        totals = payment_analytics.status_totals(self.cube)
+
+        self.assertEqual(totals['transactions'].sum(), len(self.payments))
+        self.assertAlmostEqual(totals.loc['completed', 'volume'], 90.0)
+        self.assertEqual(totals.loc['refunded', 'transactions'], 0)
+        self.assertEqual(self.failures['failures'].sum(), 2)
+
+    def test_method_summary(self):
+        """Test per-method rates against direct counts"""
+        summary = payment_analytics.method_summary(self.cube).set_index('method')
+
+        self.assertEqual(summary.loc['Credit Card', 'transactions'], 3)
+        self.assertAlmostEqual(summary.loc['Credit Card', 'success_rate'], 66.7)
+        self.assertAlmostEqual(summary.loc['PayPal', 'failure_rate'], 66.7)
+        self.assertAlmostEqual(summary.loc['PayPal', 'volume'], 10.0)
+
+    def test_slice_and_summaries(self):
+        """Test date and method slicing and the failure and trend summaries"""
+        recent = payment_analytics.slice_cube(self.cube, start='2025-02-01', methods=['Credit Card'])
+        self.assertEqual(recent['transactions'].sum(), 2)
+
+        failures = payment_analytics.failure_summary(
+            payment_analytics.slice_cube(self.failures, methods=['PayPal']))
+        self.assertEqual(list(failures['failure_reason']), ['card_declined', payment_analytics.UNKNOWN_REASON])
+        self.assertEqual(list(failures['retryable']), [False, False])
+
+        trend = payment_analytics.monthly_trend(self.cube)
+        self.assertEqual(list(trend['month']), [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-01')])
+        self.assertEqual(list(trend['completed']), [2, 1])
+        self.assertEqual(list(trend['failed']), [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Unit tests for the Redis query result cache
+"""
+import unittest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+with patch.dict(os.environ, {'MYSQL_PORT': '3306'}):
+    from utils import query_cache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis commands the cache uses"""
+
+    def __init__(self):
+        self.store = {}
+        self.sets = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += int(self.store.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+        return removed
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def expire(self, key, ttl, nx=False, gt=False):
+        current = self.ttls.get(key)
+        if (nx and current is not None) or (gt and (current is None or ttl <= current)):
+            return False
+        self.ttls[key] = ttl
+        return True
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1).encode()
+        return int(self.store[key])
+
+    def watch(self, *keys):
+        pass
+
+    def multi(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def eval(self, script, numkeys, key, token):
+        # RELEASE_LOCK_SCRIPT: compare-and-delete
+        if self.store.get(key) == token:
+            return self.delete(key)
+        return 0
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+class TestQueryKeys(unittest.TestCase):
+    """Test key normalization and table extraction"""
+
+    def test_whitespace_insensitive_key(self):
+        """Test that formatting differences map to the same key"""
+        key1 = query_cache.make_cache_key("SELECT *  FROM `orders`\n LIMIT 10;")
+        key2 = query_cache.make_cache_key("SELECT * FROM `orders` LIMIT 10")
+        self.assertEqual(key1, key2)
+
+    def test_params_change_key(self):
+        """Test that parameters are part of the key"""
+        query = "SELECT * FROM orders WHERE status = :status"
+        self.assertNotEqual(
+            query_cache.make_cache_key(query, {'status': 'paid'}),
+            query_cache.make_cache_key(query, {'status': 'pending'})
+        )
+
+    def test_extract_tables(self):
+        """Test table detection across FROM and JOIN clauses"""
+        query = "SELECT * FROM `orders` o JOIN customers c ON o.customer_id = c.customer_id"
+        self.assertEqual(query_cache.extract_tables(query), ['customers', 'orders'])
+
+
+class TestCachedQuery(unittest.TestCase):
+    """Test cache hits, misses and invalidation"""
+
+    def setUp(self):
+        self.client = FakeRedis()
+        patcher = patch.object(query_cache, 'get_redis_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_roundtrip(self):
+        """Test Arrow serialization preserves values and dtypes"""
+        df = pd.DataFrame({'order_id': [1, 2], 'total_amount': [10.5, 20.25], 'status': ['paid', 'pending']})
+        restored = query_cache.deserialize_frame(query_cache.serialize_frame(df))
+        pd.testing.assert_frame_equal(df, restored)
+
+    def test_second_call_is_served_from_cache(self):
+        """Test that the loader only runs on the first call"""
+        loader = Mock(return_value=pd.DataFrame({'order_id': [1, 2, 3]}))
+
+        first = query_cache.cached_query("SELECT * FROM `orders` LIMIT 10", loader=loader)
+        second = query_cache.cached_query("SELECT * FROM `orders` LIMIT 10", loader=loader)
+
+        self.assertEqual(loader.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_invalidate_table(self):
+        """Test that invalidating a table forces a reload"""
+        loader = Mock(return_value=pd.DataFrame({'order_id': [1]}))
+        query = "SELECT * FROM `orders` LIMIT 10"
+
+        query_cache.cached_query(query, loader=loader)
+        self.assertEqual(query_cache.invalidate_for_statement("UPDATE orders SET status = 'paid'"), 1)
+        query_cache.cached_query(query, loader=loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_oversized_results_are_not_stored(self):
+        """Test the per-entry size cap"""
+        loader = Mock(return_value=pd.DataFrame({'order_id': range(1000)}))
+
+        with patch.dict(query_cache.CACHE_CONFIG, {'max_entry_bytes': 10}):
+            query_cache.cached_query("SELECT * FROM `orders`", loader=loader)
+
+        self.assertFalse(any(key.startswith(query_cache.CACHE_CONFIG['prefix'] + ':q:') and not key.endswith(':lock')
+                             for key in self.client.store))
+
+    def test_lock_released_after_load(self):
+        """Test the caller that took the lock releases it"""
+        query_cache.cached_query("SELECT * FROM `orders`", loader=Mock(return_value=pd.DataFrame({'order_id': [1]})))
+
+        self.assertFalse(any(key.endswith(':lock') for key in self.client.store))
+
+    def test_foreign_lock_is_kept(self):
+        """Test a caller that never got the lock leaves another worker's lock in place"""
+        query = "SELECT * FROM `orders`"
+        lock_key = query_cache.make_cache_key(query) + ':lock'
+        self.client.store[lock_key] = 'other-worker'
+        loader = Mock(return_value=pd.DataFrame({'order_id': [1]}))
+
+        with patch.dict(query_cache.CACHE_CONFIG, {'lock_timeout_ms': 100}):
+            query_cache.cached_query(query, loader=loader)
+
+        loader.assert_called_once()
+        self.assertEqual(self.client.store[lock_key], 'other-worker')
+
+    def test_table_set_ttl_only_extends(self):
+        """Test a short-TTL result does not shorten the table set's expiry"""
+        loader = Mock(return_value=pd.DataFrame({'order_id': [1]}))
+        query_cache.cached_query("SELECT * FROM `orders` LIMIT 10", ttl=600, loader=loader)
+        query_cache.cached_query("SELECT * FROM `orders` LIMIT 5", ttl=60, loader=loader)
+
+        self.assertEqual(self.client.ttls[query_cache._table_set_key('orders')], 600)
+
+    def test_result_invalidated_while_loading_is_not_stored(self):
+        """Test a result computed before an invalidation is not cached after it"""
+        query = "SELECT * FROM `orders` LIMIT 10"
+
+        def load_during_write(query, params):
+            query_cache.invalidate_table('orders')
+            return pd.DataFrame({'order_id': [1]})
+
+        loader = Mock(side_effect=load_during_write)
+        query_cache.cached_query(query, loader=loader)
+        query_cache.cached_query(query, loader=loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+
+class TestSafeTableQuery(unittest.TestCase):
+    """Test the table existence check only runs on a cache miss"""
+
+    def test_cache_hit_skips_table_check(self):
+        """Test a cached table read costs no database round trip"""
+        from utils import database
+        df = pd.DataFrame({'order_id': [1, 2]})
+
+        with patch.object(query_cache, 'get_redis_client', return_value=FakeRedis()), \
+                patch.object(database, 'table_exists', return_value=True) as table_exists, \
+                patch.object(database, 'execute_sql_query', return_value=df) as execute:
+            first = database.safe_table_query('orders')
+            second = database.safe_table_query('orders')
+
+        self.assertEqual(table_exists.call_count, 1)
+        self.assertEqual(execute.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
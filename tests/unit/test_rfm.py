@@ -0,0 +1,132 @@
+"""
+Unit tests for the incremental RFM engine
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import rfm
+
+NOW = datetime(2025, 6, 1)
+
+
+def reference_rfm(orders_df, now):
+    """Groupby-lambda / qcut / apply version the engine replaced"""
+    orders_df = orders_df.copy()
+    orders_df['order_date'] = pd.to_datetime(orders_df['order_date'], errors='coerce')
+    orders_clean = orders_df[orders_df['order_date'].notna()]
+
+    result = orders_clean.groupby('customer_id').agg({
+        'order_date': lambda x: (now - x.max()).days,
+        'order_id': 'count',
+        'total_amount': 'sum'
+    }).reset_index()
+    result.columns = ['customer_id', 'recency', 'frequency', 'monetary']
+
+    result['r_score'] = pd.qcut(result['recency'], 5, labels=[5, 4, 3, 2, 1]).astype(int)
+    result['f_score'] = pd.qcut(result['frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    result['m_score'] = pd.qcut(result['monetary'], 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    result['rfm_score'] = result['r_score'].astype(str) + result['f_score'].astype(str) + result['m_score'].astype(str)
+
+    def rfm_segment(score):
+        if score.startswith('5') and score.endswith('5'):
+            return 'Champions'
+        elif score.startswith('4') or score.startswith('5'):
+            return 'Loyal'
+        elif score.startswith('3'):
+            return 'Potential'
+        elif score.startswith('2'):
+            return 'At Risk'
+        return 'Lost'
+
+    result['segment'] = result['rfm_score'].apply(rfm_segment)
+    return result
+
+
+def make_orders(n, start_id=1, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(NOW) - pd.to_timedelta(rng.integers(1, 365, n), unit='D')
+    return pd.DataFrame({
+        'order_id': np.arange(start_id, start_id + n),
+        'customer_id': [f'C-{i:03d}' for i in rng.integers(1, 120, n)],
+        'order_date': dates.strftime('%Y-%m-%d'),
+        'total_amount': rng.uniform(10, 500, n).round(2)
+    })
+
+
+class TestRFM(unittest.TestCase):
+    """Test scoring, incremental updates and caller isolation"""
+
+    def setUp(self):
+        rfm.clear_rfm()
+        self.addCleanup(rfm.clear_rfm)
+
+    def test_matches_reference(self):
+        """Test identical scores and segments to the qcut implementation"""
+        orders = make_orders(2000)
+        result = rfm.customer_rfm(orders, now=NOW)
+        expected = reference_rfm(orders, NOW)
+
+        for col in ['customer_id', 'recency', 'frequency', 'r_score', 'f_score', 'm_score', 'rfm_score', 'segment']:
+            self.assertEqual(result[col].tolist(), expected[col].tolist(), col)
+        np.testing.assert_allclose(result['monetary'], expected['monetary'])
+
+    def test_caller_frame_not_modified(self):
+        """Test that order dates are not converted in place"""
+        orders = make_orders(50)
+        rfm.customer_rfm(orders, now=NOW)
+        self.assertEqual(orders['order_date'].dtype, object)
+
+    def test_incremental_update(self):
+        """Test that only orders above the watermark are aggregated"""
+        first = make_orders(1000)
+        rfm.customer_rfm(first, key='orders', now=NOW)
+
+        combined = pd.concat([first, make_orders(200, start_id=1001, seed=4)], ignore_index=True)
+        with patch.object(rfm, '_aggregate', wraps=rfm._aggregate) as aggregate:
+            result = rfm.customer_rfm(combined, key='orders', now=NOW)
+
+        self.assertEqual(len(aggregate.call_args[0][0]), 200)
+        pd.testing.assert_frame_equal(result, rfm.customer_rfm(combined, now=NOW))
+
+    def test_changed_history_rebuilds(self):
+        """Test a full rebuild when already-processed orders disappear"""
+        orders = make_orders(1000)
+        rfm.customer_rfm(orders, key='orders', now=NOW)
+
+        trimmed = orders.iloc[100:]
+        pd.testing.assert_frame_equal(
+            rfm.customer_rfm(trimmed, key='orders', now=NOW),
+            rfm.customer_rfm(trimmed, now=NOW)
+        )
+
+    def test_edited_order_rebuilds(self):
+        """Test a full rebuild when an already-processed order's amount changes"""
+        orders = make_orders(1000)
+        rfm.customer_rfm(orders, key='orders', now=NOW)
+
+        edited = orders.copy()
+        edited.loc[10, 'total_amount'] += 10000
+        pd.testing.assert_frame_equal(
+            rfm.customer_rfm(edited, key='orders', now=NOW),
+            rfm.customer_rfm(edited, now=NOW)
+        )
+
+    def test_segment_summary(self):
+        """Test the per-segment table shown on the customers page"""
+        summary = rfm.segment_summary(rfm.customer_rfm(make_orders(2000), now=NOW))
+
+        self.assertEqual(list(summary.columns), ['Segment', 'RFM Score', 'Customers', 'Revenue', 'Description'])
+        self.assertEqual(summary['Customers'].sum(), 119)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,324 @@
+"""
+Unit tests for the persistent daily and monthly sales rollups
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import rollups
+from utils.dashboard_metrics import frame_order_windows, rollup_order_windows
+
+NOW = datetime(2025, 6, 1)
+
+
+def make_orders(n, start_id=1, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(NOW) - pd.to_timedelta(rng.integers(1, 200, n), unit='D')
+    amounts = rng.uniform(-20, 500, n).round(2)
+    amounts[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        'order_id': np.arange(start_id, start_id + n),
+        'order_date': dates.strftime('%Y-%m-%d'),
+        'status': rng.choice(['completed', 'shipped', 'cancelled', None], n),
+        'total_amount': amounts
+    })
+
+
+def make_items(orders, seed=3):
+    rng = np.random.default_rng(seed)
+    order_ids = np.repeat(orders['order_id'].to_numpy(), 2)
+    return pd.DataFrame({
+        'order_id': order_ids,
+        'product_id': rng.integers(1, 6, len(order_ids)),
+        'total_price': rng.uniform(1, 100, len(order_ids)).round(2)
+    })
+
+
+PRODUCTS = pd.DataFrame({
+    'product_id': [1, 2, 3, 4, 5],
+    'category': ['Books', 'Toys', 'Garden', 'Books', None]
+})
+
+
+def sort_rollup(frame, key):
+    return frame.sort_values(key, ignore_index=True)
+
+
+class TestAggregation(unittest.TestCase):
+    """Test rollup rows and category attribution"""
+
+    def test_rollup_totals_match_orders(self):
+        """Test that daily and monthly rollups keep the order totals"""
+        orders = make_orders(1000)
+        daily = rollups.aggregate_orders(orders)
+        monthly = rollups.monthly_rollup(daily)
+        valid = orders['total_amount'].notna()
+
+        self.assertEqual(daily['orders'].sum(), valid.sum())
+        self.assertAlmostEqual(daily['revenue'].sum(), orders['total_amount'].sum(), places=4)
+        self.assertAlmostEqual(monthly['positive_revenue'].sum(),
+                               orders['total_amount'][orders['total_amount'] > 0].sum(), places=4)
+        self.assertIn(rollups.UNKNOWN_STATUS, set(daily['status']))
+        self.assertEqual(set(daily['category']), {rollups.UNCATEGORIZED})
+
+    def test_primary_category_is_highest_value_line(self):
+        """Test that each order gets the category of its largest line"""
+        items = pd.DataFrame({
+            'order_id': [1, 1, 2, 3],
+            'product_id': [1, 2, 5, 3],
+            'total_price': [10.0, 30.0, 5.0, 8.0]
+        })
+        categories = rollups.primary_categories(items, PRODUCTS)
+
+        self.assertEqual(categories.to_dict(), {1: 'Toys', 3: 'Garden'})
+
+    def test_windows_match_frame_windows(self):
+        """Test that rollup KPI windows equal the per-order windows"""
+        orders = make_orders(2000)
+        daily = rollups.aggregate_orders(orders)
+
+        for days in (7, 30, 90):
+            expected = frame_order_windows(orders, 'order_date', 'total_amount', days, NOW)
+            result = rollup_order_windows(daily, days, NOW)
+            np.testing.assert_allclose(result, expected)
+
+
+class TestFrameRollups(unittest.TestCase):
+    """Test watermark updates and the Parquet store"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.object(rollups, 'ROLLUP_DIR', Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rollups.clear_rollups()
+        self.addCleanup(rollups.clear_rollups)
+
+    def assert_rollups_equal(self, state, orders, categories=None):
+        expected = rollups.update_frame_rollups(orders, categories=categories)
+        for name, key in (('daily', rollups.DAILY_KEY), ('monthly', rollups.MONTHLY_KEY)):
+            pd.testing.assert_frame_equal(sort_rollup(state[name], key), sort_rollup(expected[name], key),
+                                          check_dtype=False)
+
+    def test_incremental_matches_rebuild(self):
+        """Test that appended orders give the same rollups as a full rebuild"""
+        first = make_orders(800)
+        both = pd.concat([first, make_orders(400, start_id=801, seed=4)], ignore_index=True)
+        categories = rollups.primary_categories(make_items(both), PRODUCTS)
+
+        rollups.update_frame_rollups(first, 'orders', categories)
+        with patch.object(rollups, 'aggregate_orders', wraps=rollups.aggregate_orders) as aggregate:
+            state = rollups.update_frame_rollups(both, 'orders', categories)
+
+        self.assertEqual(len(aggregate.call_args[0][0]), 400)
+        self.assertEqual(state['watermark'], 1200)
+        self.assertEqual(state['processed'], 1200)
+        self.assertEqual(len(aggregate.call_args_list), 1)
+        self.assert_rollups_equal(state, both, categories)
+
+    def test_rebuild_when_history_changes(self):
+        """Test that removed processed orders trigger a rebuild"""
+        orders = make_orders(500)
+        rollups.update_frame_rollups(orders, 'orders')
+        state = rollups.update_frame_rollups(orders.iloc[10:], 'orders')
+
+        self.assertEqual(state['processed'], 490)
+        self.assert_rollups_equal(state, orders.iloc[10:])
+
+    def test_rebuild_when_processed_orders_change(self):
+        """Test that an in-place status or amount change is picked up"""
+        orders = make_orders(500)
+        rollups.update_frame_rollups(orders, 'orders')
+        rollups.clear_rollups()
+
+        edited = orders.copy()
+        edited.loc[5, 'status'] = 'cancelled'
+        edited.loc[6, 'total_amount'] = 999.99
+        state = rollups.update_frame_rollups(edited, 'orders')
+
+        self.assert_rollups_equal(state, edited)
+
+    def test_parquet_round_trip(self):
+        """Test that stored rollups are reloaded instead of recomputed"""
+        orders = make_orders(500)
+        stored = rollups.update_frame_rollups(orders, 'orders')
+        rollups.clear_rollups()
+
+        with patch.object(rollups, 'aggregate_orders') as aggregate:
+            state = rollups.update_frame_rollups(orders, 'orders')
+
+        aggregate.assert_not_called()
+        self.assertEqual(state['watermark'], stored['watermark'])
+        pd.testing.assert_frame_equal(state['daily'], stored['daily'])
+        pd.testing.assert_frame_equal(state['monthly'], stored['monthly'])
+
+
+class TestSqlRollups(unittest.TestCase):
+    """Test the rollup tables against an in-memory database"""
+
+    def setUp(self):
+        with patch.dict(os.environ, {'MYSQL_PORT': '3306'}):
+            from utils import database
+        from sqlalchemy import create_engine
+
+        self.engine = create_engine('sqlite://')
+        self.orders = make_orders(600)
+        self.items = make_items(self.orders)
+        self.write(self.orders, self.items, 'replace')
+        pd.DataFrame({'product_id': [1, 2, 3, 4, 5], 'category_id': [1, 2, 3, 1, None]}).to_sql(
+            'products', self.engine, index=False
+        )
+        pd.DataFrame({'category_id': [1, 2, 3], 'category_name': ['Books', 'Toys', 'Garden']}).to_sql(
+            'product_categories', self.engine, index=False
+        )
+
+        patcher = patch.object(database, 'get_engine', return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.engine.connect() as conn:
+            rollups.create_rollup_tables(conn)
+
+    def write(self, orders, items, if_exists='append'):
+        orders.assign(updated_at='2025-06-01 00:00:00').to_sql('orders', self.engine, index=False,
+                                                             if_exists=if_exists)
+        items.to_sql('order_items', self.engine, index=False, if_exists=if_exists)
+
+    def test_incremental_tables_match_rebuild(self):
+        """Test that the stored tables equal a rebuild after new orders"""
+        rollups.update_sql_rollups()
+        new_orders = make_orders(300, start_id=601, seed=5)
+        self.write(new_orders, make_items(new_orders, seed=5))
+        state = rollups.update_sql_rollups()
+
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            stored = rollups._read_sql_state(conn, 'orders')
+            conn.execute(text("DELETE FROM sales_rollup_state"))
+            conn.commit()
+        rebuilt = rollups.update_sql_rollups()
+
+        self.assertEqual(state['watermark'], 900)
+        for name, key in (('daily', rollups.DAILY_KEY), ('monthly', rollups.MONTHLY_KEY)):
+            pd.testing.assert_frame_equal(sort_rollup(stored[name], key), sort_rollup(rebuilt[name], key),
+                                          check_dtype=False)
+            pd.testing.assert_frame_equal(sort_rollup(state[name], key), sort_rollup(rebuilt[name], key),
+                                          check_dtype=False)
+
+    def test_rebuild_when_processed_orders_change(self):
+        """Test that a status change on a processed order rebuilds the tables"""
+        from sqlalchemy import text
+
+        rollups.update_sql_rollups()
+        with self.engine.connect() as conn:
+            conn.execute(text("UPDATE orders SET status = 'cancelled', updated_at = '2025-06-02 00:00:00' "
+                              "WHERE order_id <= 50"))
+            conn.commit()
+        state = rollups.update_sql_rollups()
+
+        edited = self.orders.copy()
+        edited.loc[edited['order_id'] <= 50, 'status'] = 'cancelled'
+        expected = rollups.aggregate_orders(edited, rollups.primary_categories(self.items, PRODUCTS))
+        pd.testing.assert_frame_equal(sort_rollup(state['daily'], rollups.DAILY_KEY),
+                                      sort_rollup(expected, rollups.DAILY_KEY), check_dtype=False)
+
+    def test_concurrent_refresh_is_not_overwritten(self):
+        """Test that a refresh finding the state changed since it read it keeps the other refresh's rows"""
+        from sqlalchemy import text
+
+        rollups.update_sql_rollups()
+        new_orders = make_orders(300, start_id=601, seed=5)
+        self.write(new_orders, make_items(new_orders, seed=5))
+        advance = rollups._advance
+
+        def advance_while_another_refresh_commits(*args):
+            result = advance(*args)
+            with self.engine.connect() as conn:
+                conn.execute(text("UPDATE sales_rollup_state SET watermark = 900, processed = 900"))
+                conn.commit()
+            return result
+
+        with patch.object(rollups, '_advance', side_effect=advance_while_another_refresh_commits), \
+                patch.object(rollups, '_write_sql_rollups') as write:
+            state = rollups.update_sql_rollups()
+
+        write.assert_not_called()
+        self.assertEqual(state['watermark'], 900)
+
+    def test_refresh_lock(self):
+        """Test the MySQL named lock is taken, released, and reported when busy"""
+        from contextlib import contextmanager
+        from unittest.mock import MagicMock
+        from utils import database
+
+        conn = MagicMock()
+
+        @contextmanager
+        def connection(engine=None):
+            yield conn
+
+        engine = MagicMock()
+        engine.dialect.name = 'mysql'
+        with patch.object(database, 'pooled_connection', connection):
+            conn.execute.return_value.scalar.return_value = 1
+            with rollups._refresh_lock(engine, 'orders') as acquired:
+                self.assertTrue(acquired)
+            self.assertIn('RELEASE_LOCK', str(conn.execute.call_args[0][0]))
+
+            conn.reset_mock()
+            conn.execute.return_value.scalar.return_value = 0
+            with rollups._refresh_lock(engine, 'orders') as acquired:
+                self.assertFalse(acquired)
+            self.assertEqual(conn.execute.call_count, 1)
+
+    def test_missing_tables_return_none(self):
+        """Test that missing rollup tables mean no rollups, without running DDL"""
+        from sqlalchemy.exc import ProgrammingError
+
+        missing = ProgrammingError('SELECT', {}, Exception(rollups.NO_SUCH_TABLE, "Table doesn't exist"))
+        with patch.object(rollups, '_read_sql_state', side_effect=missing), \
+                patch.object(rollups, 'create_rollup_tables') as create:
+            self.assertIsNone(rollups.update_sql_rollups())
+        create.assert_not_called()
+
+    def test_transient_error_keeps_state(self):
+        """Test that a lost connection is raised and leaves the stored state alone"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        rollups.update_sql_rollups()
+        lost = OperationalError('SELECT', {}, Exception(2013, 'Lost connection to MySQL server'))
+        with patch.object(rollups, '_read_sql_state', side_effect=lost):
+            with self.assertRaises(OperationalError):
+                rollups.update_sql_rollups()
+
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM sales_rollup_state")).scalar(), 1)
+
+    def test_create_rollup_tables_migrates_state(self):
+        """Test that an older state table gains the checksum column"""
+        from sqlalchemy import inspect, text
+
+        with self.engine.connect() as conn:
+            conn.execute(text("DROP TABLE sales_rollup_state"))
+            conn.execute(text("CREATE TABLE sales_rollup_state (rollup_name VARCHAR(64) PRIMARY KEY, "
+                              "version INT, watermark BIGINT, processed BIGINT)"))
+            conn.execute(text("INSERT INTO sales_rollup_state VALUES ('orders', 1, 600, 600)"))
+            conn.commit()
+            rollups.create_rollup_tables(conn)
+            self.assertIn('checksum', {c['name'] for c in inspect(conn).get_columns('sales_rollup_state')})
+
+        self.assertEqual(rollups.update_sql_rollups()['processed'], 600)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the table schema registry
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import schema
+
+
+class TestSchemaParsing(unittest.TestCase):
+    """Test reading column types from create_tables.sql"""
+
+    def test_parse_create_tables(self):
+        """Test column types and arguments, skipping constraints"""
+        tables = schema.parse_create_tables("""
+            CREATE TABLE orders (
+                order_id INT AUTO_INCREMENT PRIMARY KEY,
+                total_amount DECIMAL(10, 2) NOT NULL,
+                status ENUM('pending', 'shipped') DEFAULT 'pending',
+                FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+            ) ENGINE=InnoDB;
+        """)
+
+        self.assertEqual(tables, {'orders': {
+            'order_id': ('INT', None),
+            'total_amount': ('DECIMAL', '10, 2'),
+            'status': ('ENUM', "'pending', 'shipped'")
+        }})
+
+    def test_table_dtypes_from_setup_script(self):
+        """Test dtypes derived from the shipped table definitions"""
+        dtypes = schema.table_dtypes('orders')
+
+        self.assertEqual(dtypes['order_id'], 'Int32')
+        self.assertEqual(dtypes['order_date'], 'datetime64[ns]')
+        self.assertEqual(dtypes['total_amount'], 'float64')
+        self.assertEqual(dtypes['status'], 'category')
+        self.assertEqual(dtypes['notes'], 'text')
+        self.assertEqual(schema.table_dtypes('products')['price'], 'float32')
+        self.assertEqual(schema.table_dtypes('returns')['condition'], 'category')
+        self.assertEqual(schema.table_dtypes('unknown'), {})
+
+
+class TestApplySchema(unittest.TestCase):
+    """Test converting loaded frames to the declared dtypes"""
+
+    def test_csv_inferred_columns(self):
+        """Test coercion of inferred CSV columns with missing and bad values"""
+        df = pd.DataFrame({
+            'customer_id': [1.0, np.nan, 3.0],
+            'zip_code': [98696.0, np.nan, 10001.0],
+            'registration_date': ['2025-05-18', None, 'not a date'],
+            'country': ['USA', 'USA', None],
+            'extra': [1, 2, 3]
+        })
+        typed = schema.apply_schema('customers', df)
+
+        self.assertEqual(str(typed['customer_id'].dtype), 'Int32')
+        self.assertTrue(pd.isna(typed['customer_id'].iloc[1]))
+        self.assertEqual(typed['zip_code'].tolist()[::2], ['98696', '10001'])
+        self.assertTrue(pd.isna(typed['zip_code'].iloc[1]))
+        self.assertEqual(str(typed['registration_date'].dtype), 'datetime64[ns]')
+        self.assertEqual(typed['registration_date'].notna().tolist(), [True, False, False])
+        self.assertIsInstance(typed['country'].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.isna(typed['country'].iloc[2]))
+        self.assertEqual(str(typed['extra'].dtype), 'int64')
+        self.assertEqual(str(df['customer_id'].dtype), 'float64')
+
+    def test_invalid_numbers_and_booleans(self):
+        """Test unparseable prices become missing and booleans parse text"""
+        products = schema.apply_schema('products', pd.DataFrame({'price': ['115.49', 'free', None]}))
+        shipping = schema.apply_schema('shipping', pd.DataFrame({'address_validated': ['TRUE', 'false', None]}))
+
+        self.assertEqual(str(products['price'].dtype), 'float32')
+        self.assertEqual(products['price'].isna().tolist(), [False, True, True])
+        self.assertEqual(shipping['address_validated'].tolist(), [True, False, pd.NA])
+
+    def test_fractional_integers_stay_float(self):
+        """Test that an INT column holding fractions isn't truncated"""
+        typed = schema.apply_schema('orders', pd.DataFrame({'customer_id': [1.5, 2.0]}))
+        self.assertEqual(typed['customer_id'].tolist(), [1.5, 2.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for the seasonality engine
+"""
+import unittest
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import seasonality
+from utils.rollups import aggregate_orders, monthly_rollup
+
+
+def make_orders(n, start='2023-01-01', end='2024-12-31', seed=3):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, end, freq='D')
+    dates = days[rng.integers(0, len(days), n)]
+    return pd.DataFrame({
+        'order_id': np.arange(1, n + 1),
+        'customer_id': rng.integers(1, 300, n),
+        'order_date': dates.strftime('%Y-%m-%d'),
+        'status': 'completed',
+        'total_amount': rng.uniform(-10, 400, n).round(2)
+    })
+
+
+def tables(orders):
+    daily = aggregate_orders(orders)
+    return seasonality.seasonality_tables(daily, monthly_rollup(daily), orders)
+
+
+class TestMonthAndQuarterTables(unittest.TestCase):
+    """Test month x year and quarterly aggregates"""
+
+    def test_months_match_groupby(self):
+        """Test monthly totals, distinct customers and filled gaps"""
+        orders = make_orders(3000)
+        orders = orders[~orders['order_date'].str.startswith('2023-06')]
+        result = tables(orders)['months']
+
+        dates = pd.to_datetime(orders['order_date'])
+        positive = orders[orders['total_amount'] > 0]
+        expected = positive.groupby(dates.dt.to_period('M'))['total_amount'].agg(['sum', 'count'])
+        customers = orders.groupby(dates.dt.to_period('M'))['customer_id'].nunique()
+        june = result[(result['year'] == 2023) & (result['month'] == 'Jun')].iloc[0]
+
+        self.assertEqual(len(result), 24)
+        self.assertEqual(june['orders'], 0)
+        self.assertEqual(june['season'], 'Summer')
+        filled = result[result['orders'] > 0]
+        np.testing.assert_allclose(filled['revenue'], expected['sum'])
+        np.testing.assert_array_equal(filled['orders'], expected['count'])
+        np.testing.assert_array_equal(filled['customers'], customers)
+        self.assertEqual(tables(orders)['years'], [2023, 2024])
+
+    def test_quarter_growth(self):
+        """Test quarterly growth against the same quarter a year earlier"""
+        quarters = tables(make_orders(3000))['quarters']
+        q1 = quarters.set_index('quarter').loc[['Q1 2023', 'Q1 2024']]
+
+        self.assertTrue(np.isnan(q1['growth'].iloc[0]))
+        expected = (q1['revenue'].iloc[1] - q1['revenue'].iloc[0]) / q1['revenue'].iloc[0] * 100
+        self.assertAlmostEqual(q1['growth'].iloc[1], round(expected, 1))
+
+    def test_compare_years_aligns_months(self):
+        """Test that comparisons align calendar months, not positions"""
+        orders = make_orders(3000)
+        orders = orders[~orders['order_date'].str.startswith('2023-03')]
+        months = tables(orders)['months']
+        comparison = seasonality.compare_years(months, 2024, 2023, 'revenue')
+        march = comparison[comparison['month'] == 'Mar'].iloc[0]
+        april = comparison[comparison['month'] == 'Apr'].iloc[0]
+
+        self.assertEqual(len(comparison), 12)
+        self.assertEqual(march['previous'], 0)
+        self.assertTrue(np.isnan(march['growth']))
+        self.assertEqual(april['previous'],
+                         months[(months['year'] == 2023) & (months['month'] == 'Apr')]['revenue'].iloc[0])
+
+
+class TestHolidays(unittest.TestCase):
+    """Test holiday window totals"""
+
+    def test_holiday_dates(self):
+        """Test the floating holiday dates"""
+        anchors = {name: anchor for name, anchor, _ in seasonality.HOLIDAYS}
+
+        self.assertEqual(anchors['Black Friday'](2024), date(2024, 11, 29))
+        self.assertEqual(anchors['Cyber Monday'](2024), date(2024, 12, 2))
+        self.assertEqual(anchors["Mother's Day"](2024), date(2024, 5, 12))
+
+    def test_windows_match_filtered_sums(self):
+        """Test window totals and YoY growth against direct filtering"""
+        orders = make_orders(5000)
+        holidays = tables(orders)['holidays']
+        dates = pd.to_datetime(orders['order_date'])
+        positive = orders['total_amount'] > 0
+
+        # New Year 2023 is the first day of data; New Year 2025 is after it
+        self.assertEqual(len(holidays), 2 * len(seasonality.HOLIDAYS))
+        for row in holidays.itertuples():
+            in_window = positive & (dates >= row.start) & (dates <= row.date)
+            self.assertAlmostEqual(row.revenue, orders.loc[in_window, 'total_amount'].sum(), places=4)
+            self.assertEqual(row.orders, in_window.sum())
+
+        christmas = holidays[holidays['name'] == 'Christmas'].set_index('year')
+        expected = (christmas.loc[2024, 'revenue'] / christmas.loc[2023, 'revenue'] - 1) * 100
+        self.assertAlmostEqual(christmas.loc[2024, 'growth'], expected)
+        self.assertTrue(np.isnan(christmas.loc[2023, 'growth']))
+        self.assertEqual(christmas.loc[2024, 'start'], pd.Timestamp('2024-12-18'))
+
+    def test_uncovered_windows_skipped(self):
+        """Test that windows outside the order history are left out"""
+        holidays = tables(make_orders(500, start='2024-06-01', end='2024-10-31'))['holidays']
+        self.assertTrue(holidays.empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Unit tests for the columnar CSV snapshot cache
+"""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test snapshot creation and invalidation"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = patch.object(snapshot, 'SNAPSHOT_DIR', Path(self.tmp.name) / 'snapshots')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.csv_path = Path(self.tmp.name) / 'orders.csv'
+        self.csv_path.write_text("order_id,status,total_amount\n1, paid ,10.5\n2,,20.0\n")
+
+    def test_load_cleans_and_keeps_nulls(self):
+        """Test whitespace stripping without turning NaN into 'nan'"""
+        df = snapshot.load_snapshot(self.csv_path)
+
+        self.assertEqual(df['status'].iloc[0], 'paid')
+        self.assertTrue(pd.isna(df['status'].iloc[1]))
+        self.assertTrue(snapshot.is_snapshot_current(self.csv_path))
+
+    def test_mixed_column_keeps_values(self):
+        """Test a column of numbers and strings (split across parse chunks) keeps its numbers"""
+        rows = ['1'] * 150_000 + [' A1 '] * 150_000
+        self.csv_path.write_text('code\n' + '\n'.join(rows) + '\n')
+        df = snapshot.load_snapshot(self.csv_path)
+
+        self.assertEqual(df['code'].isna().sum(), 0)
+        self.assertEqual(df['code'].iloc[-1], 'A1')
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        """Test a truncated snapshot falls back to the CSV and is rewritten"""
+        snapshot.load_snapshot(self.csv_path)
+        snapshot_path, _ = snapshot._snapshot_paths(self.csv_path)
+        snapshot_path.write_bytes(snapshot_path.read_bytes()[:40])
+
+        df = snapshot.load_snapshot(self.csv_path)
+        self.assertEqual(len(df), 2)
+        self.assertEqual(len(snapshot.load_snapshot(self.csv_path)), 2)
+
+    def test_column_projection(self):
+        """Test reading a subset of columns from the snapshot"""
+        snapshot.load_snapshot(self.csv_path)
+        df = snapshot.load_snapshot(self.csv_path, columns=['order_id', 'total_amount'])
+
+        self.assertEqual(list(df.columns), ['order_id', 'total_amount'])
+
+    def test_changed_csv_rebuilds_snapshot(self):
+        """Test that a content change invalidates the snapshot"""
+        snapshot.load_snapshot(self.csv_path)
+        self.csv_path.write_text("order_id,status,total_amount\n1,paid,10.5\n2,pending,20.0\n3,paid,5.0\n")
+
+        self.assertFalse(snapshot.is_snapshot_current(self.csv_path))
+        self.assertEqual(len(snapshot.load_snapshot(self.csv_path)), 3)
+
+    def test_touched_csv_keeps_snapshot(self):
+        """Test that an mtime-only change is resolved by the content hash"""
+        snapshot.load_snapshot(self.csv_path)
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+
+        self.assertTrue(snapshot.is_snapshot_current(self.csv_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for the vectorized synthetic data generators
+"""
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add application directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../application'))
+
+from utils import synthetic
+from utils.schema import table_dtypes
+
+END = '2025-06-30'
+
+
+class TestSynthetic(unittest.TestCase):
+    """Test sizes, referential integrity, determinism and dtypes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = synthetic.generate_tables(2000, end=END)
+
+    def test_table_sizes(self):
+        """Test sizing from the number of orders and the scale bounds"""
+        sizes = synthetic.table_sizes(10000)
+        self.assertEqual(sizes['orders'], 10000)
+        self.assertEqual(sizes['customers'], 5000)
+        self.assertEqual(sizes['products'], 1000)
+        self.assertEqual(len(self.tables['orders']), 2000)
+        self.assertEqual(len(self.tables['inventory']),
+                         len(self.tables['products']) * synthetic.WAREHOUSES)
+
+        for scale in (0, synthetic.MAX_SCALE + 1):
+            with self.assertRaises(ValueError):
+                synthetic.table_sizes(scale)
+        with self.assertRaises(ValueError):
+            synthetic.generate_tables(100, tables=['orders', 'invoices'])
+
+    def test_foreign_keys(self):
+        """Test that every foreign key points at a generated row"""
+        t = self.tables
+        references = [
+            ('orders', 'customer_id', 'customers'),
+            ('order_items', 'order_id', 'orders'),
+            ('order_items', 'product_id', 'products'),
+            ('inventory', 'product_id', 'products'),
+            ('payments', 'order_id', 'orders'),
+            ('shipping', 'order_id', 'orders'),
+            ('returns', 'order_id', 'orders'),
+            ('refunds', 'return_id', 'returns')
+        ]
+        for table, column, parent in references:
+            keys = t[table][column].dropna()
+            self.assertTrue(keys.isin(t[parent][column]).all(), f'{table}.{column}')
+
+        # Orphaned orders are the only orders without a customer
+        orphans = t['orders']['customer_id'].isna().mean()
+        self.assertLess(orphans, 0.05)
+        self.assertEqual(len(t['payments']), len(t['orders']))
+        self.assertTrue(t['customers']['customer_id'].is_unique)
+
+    def test_clean_totals_and_dates(self):
+        """Test order totals against their items and dates against the end"""
+        clean = synthetic.generate_tables(500, tables=['orders', 'order_items', 'returns'],
+                                          end=END, issues=False)
+        orders, items = clean['orders'], clean['order_items']
+        item_totals = items.groupby('order_id')['total_price'].sum()
+
+        np.testing.assert_allclose(orders.set_index('order_id')['total_amount'].astype(float),
+                                   item_totals.reindex(orders['order_id']).astype(float), atol=0.01)
+        self.assertEqual(orders['customer_id'].isna().sum(), 0)
+        self.assertLessEqual(orders['order_date'].max(), pd.Timestamp(END))
+        self.assertLessEqual(clean['returns']['return_date'].max(), pd.Timestamp(END))
+
+    def test_deterministic(self):
+        """Test that a seed reproduces tables whatever else is requested"""
+        alone = synthetic.generate_table('payments', 2000, end=END)
+        pd.testing.assert_frame_equal(alone, self.tables['payments'])
+
+        other = synthetic.generate_table('payments', 2000, end=END, seed=7)
+        self.assertFalse(other['transaction_id'].equals(alone['transaction_id']))
+
+    def test_schema_dtypes(self):
+        """Test that the tables carry the registry's dtypes"""
+        for table, df in self.tables.items():
+            for column, dtype in table_dtypes(table).items():
+                if column in df.columns and dtype != 'text':
+                    self.assertEqual(str(df[column].dtype), dtype, f'{table}.{column}')
+
+
+if __name__ == '__main__':
+    unittest.main()